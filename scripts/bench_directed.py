@@ -0,0 +1,107 @@
+"""
+Time-to-solution benchmark: directed exploration (CFG distance, best-first,
+unreachable states dropped) against plain BFS, as run by reverse_angr_solve.
+
+    bfs        budgeted explore from the entry state, every active state stepped
+    directed   the same budget, ranked by CFG distance to the target; with
+               --prefix-hex it starts from where the seed's concrete path forks
+
+Each binary is loaded once through the angr project cache. CFGFast and the
+distance computation are timed separately: both are cached per binary, so
+only the first breakthrough against a target pays for them. The target is
+the block referencing --find-string unless --find gives an address.
+Without a binary, the tests/fixtures challenges are used.
+
+Usage:
+    python scripts/bench_directed.py [binary] [--find 0x401234 | --find-string "Correct!"]
+                                     [--prefix-hex 41414141] [--timeout 300] [--repeat 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add src to sys.path
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+sys.path.append(SRC_DIR)
+
+from asas_mcp.utils import angr_explore
+from asas_mcp.utils.angr_cache import AngrProjectCache
+
+FIXTURES = [
+    (os.path.join(ROOT_DIR, "tests", "fixtures", "simple_reverse"), "Correct!"),
+    (os.path.join(ROOT_DIR, "tests", "fixtures", "buuctf", "reverse_1.exe"), "this is the right flag!"),
+]
+
+
+def string_block(entry, text: str):
+    """Address of the first CFG block whose lifted code uses the address of ``text``."""
+    project = entry.project
+    target = next(iter(project.loader.memory.find(text.encode())), None)
+    if target is None:
+        return None
+    for node in sorted(entry.cfg_fast().graph.nodes(), key=lambda n: n.addr):
+        if not node.size or node.is_simprocedure:
+            continue
+        block = project.factory.block(node.addr, node.size)
+        if any(c.value == target for c in block.vex.all_constants):
+            return node.addr
+    return None
+
+
+def solve(entry, target: int, mode: str, timeout: int, prefix: bytes):
+    budget = angr_explore.ExplorationBudget(timeout, None, angr_explore.DEFAULT_MAX_ACTIVE)
+    state = entry.entry_state()
+    if prefix:
+        state.posix.stdin.content.append((prefix, len(prefix)))
+    search, start = None, state
+    if mode == "directed":
+        search = angr_explore.directed_search(entry, target)
+        if prefix and search is not None:
+            start = angr_explore.seed_states(entry, state, prefix, budget) or state
+    result = angr_explore.explore(entry.project, start, target, budget=budget, directed=search)
+    return time.monotonic() - budget.started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Directed vs BFS symbolic exploration")
+    parser.add_argument("binary", nargs="?")
+    parser.add_argument("--find", help="target address (hex)")
+    parser.add_argument("--find-string", help="target the block using this string")
+    parser.add_argument("--prefix-hex", default="", help="concrete stdin prefix (a fuzzer seed)")
+    parser.add_argument("--timeout", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    cases = [(args.binary, args.find_string)] if args.binary else FIXTURES
+    prefix = bytes.fromhex(args.prefix_hex)
+    cache = AngrProjectCache(persist=False)
+    print(f"{'binary':<20}{'target':>12}{'mode':>10}{'best s':>9}{'solved':>8}{'stopped':>26}")
+    for path, text in cases:
+        name = os.path.basename(path)
+        start = time.monotonic()
+        entry = cache.get(path)
+        load = time.monotonic() - start
+        start = time.monotonic()
+        entry.cfg_fast()
+        cfg = time.monotonic() - start
+        target = int(args.find, 16) if args.find else string_block(entry, text)
+        if target is None:
+            print(f"{name:<20}  no block references {text!r}")
+            continue
+        start = time.monotonic()
+        angr_explore.directed_search(entry, target)
+        distances = time.monotonic() - start
+        print(f"{name:<20}  load {load:.2f}s, CFGFast {cfg:.2f}s, distances {distances:.3f}s")
+        for mode in ("bfs", "directed"):
+            best, result = None, None
+            for _ in range(args.repeat):
+                elapsed, result = solve(entry, target, mode, args.timeout, prefix)
+                best = elapsed if best is None else min(best, elapsed)
+            solved = "yes" if result["solutions"] else "no"
+            print(f"{name:<20}{target:>#12x}{mode:>10}{best:>9.2f}{solved:>8}{str(result['stopped'] or ''):>26}")
+
+
+if __name__ == "__main__":
+    main()
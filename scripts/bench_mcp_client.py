@@ -0,0 +1,54 @@
+"""
+Benchmark: pooled MCP sessions vs. one server process per call.
+
+Usage:
+    python scripts/bench_mcp_client.py [--calls 20] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add src to sys.path
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from asas_agent.mcp_client.client import MCPToolClient
+
+TOOL = "crypto_decode"
+ARGS = {"content": "ZmxhZ3tiZW5jaH0=", "method": "base64"}
+
+
+async def run_calls(client: MCPToolClient, calls: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await client.call_tool(TOOL, ARGS)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(calls)])
+    return time.perf_counter() - start
+
+
+async def main(calls: int, concurrency: int):
+    legacy = MCPToolClient(pooled=False)
+    legacy_time = await run_calls(legacy, calls, concurrency)
+
+    async with MCPToolClient(max_concurrency=concurrency) as pooled:
+        # Warm-up: spawn and initialize the pool outside the measured window
+        await pooled.call_tool(TOOL, ARGS)
+        pooled_time = await run_calls(pooled, calls, concurrency)
+
+    print(f"{'mode':<10}{'calls':>8}{'seconds':>10}{'calls/s':>10}")
+    print(f"{'oneshot':<10}{calls:>8}{legacy_time:>10.2f}{calls / legacy_time:>10.1f}")
+    print(f"{'pooled':<10}{calls:>8}{pooled_time:>10.2f}{calls / pooled_time:>10.1f}")
+    print(f"speedup: {legacy_time / pooled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    opts = parser.parse_args()
+    asyncio.run(main(opts.calls, opts.concurrency))
@@ -0,0 +1,110 @@
+"""
+Throughput benchmark: string extraction before and after the mmap streaming
+extractor (reverse.scan_file_strings).
+
+    legacy     what reverse_extract_strings did: base64-decode the payload,
+               one regex findall over the bytes, ASCII only, no offsets
+    ascii      streaming over an mmap, ASCII only, with offsets/sections
+    all        ASCII + UTF-16LE + UTF-16BE
+    limit      all encodings, stopping after --limit strings
+
+Peak memory is the Python heap (tracemalloc); mapped pages are not counted
+because they are the page cache, not copies. Without a path a synthetic
+firmware-like blob (random bytes with ASCII and UTF-16 strings) is used.
+
+Usage:
+    python scripts/bench_strings.py [path] [--size-mb 100] [--repeat 3] [--limit 100]
+"""
+import argparse
+import base64
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add src to sys.path
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC_DIR)
+
+from asas_mcp.tools import reverse
+
+
+def make_blob(path: str, size: int, seed: int = 1):
+    rng = random.Random(seed)
+    written, i = 0, 0
+    with open(path, "wb") as f:
+        while written < size:
+            chunk = rng.randbytes(rng.randint(256, 8192)) + b"\0" * rng.randint(0, 512)
+            text = f"config_{i}=/etc/init.d/service_{i} --verbose"
+            chunk += text.encode() + b"\0"
+            if i % 3 == 0:
+                chunk += b"\0" * (len(chunk) % 2) + text.encode("utf-16le") + b"\0\0"
+            f.write(chunk)
+            written += len(chunk)
+            i += 1
+
+
+def legacy(path: str, min_length: int):
+    with open(path, "rb") as f:
+        payload = base64.b64encode(f.read())  # what the client sent
+    start = time.perf_counter()
+    data = base64.b64decode(payload)
+    pattern = rb'[\x20-\x7e]{' + str(min_length).encode() + rb',}'
+    strings = [m.decode('ascii') for m in re.findall(pattern, data)]
+    return time.perf_counter() - start, len(strings)
+
+
+def streaming(path: str, min_length: int, encodings, limit=None):
+    start = time.perf_counter()
+    result = reverse.scan_file_strings(path, min_length, encodings, limit=limit)
+    return time.perf_counter() - start, result["count"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="String extraction throughput")
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--size-mb", type=int, default=100, help="synthetic blob size without a path")
+    parser.add_argument("--min-length", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    tmp = None
+    path = args.path
+    if path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".bin", delete=False)
+        tmp.close()
+        path = tmp.name
+        make_blob(path, args.size_mb << 20)
+    size_mb = os.path.getsize(path) / (1 << 20)
+    print(f"{path}: {size_mb:.1f} MB, min_length={args.min_length}")
+
+    cases = [
+        ("legacy", lambda: legacy(path, args.min_length)),
+        ("ascii", lambda: streaming(path, args.min_length, ("ascii",), limit=None)),
+        ("all", lambda: streaming(path, args.min_length, reverse.ENCODINGS, limit=None)),
+        (f"limit={args.limit}", lambda: streaming(path, args.min_length, reverse.ENCODINGS, limit=args.limit)),
+    ]
+    try:
+        print(f"{'case':<12}{'best s':>9}{'MB/s':>9}{'strings':>10}{'peak MB':>10}")
+        for name, run in cases:
+            best, count = None, 0
+            for _ in range(args.repeat):
+                elapsed, count = run()
+                best = elapsed if best is None else min(best, elapsed)
+            # separate run: tracing every allocation would distort the timing
+            tracemalloc.start()
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<12}{best:>9.3f}{size_mb / best:>9.1f}{count:>10}{peak / (1 << 20):>10.1f}")
+    finally:
+        if tmp is not None:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
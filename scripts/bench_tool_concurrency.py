@@ -0,0 +1,104 @@
+"""
+Load test: concurrent calls to blocking MCP tools over a single server session.
+
+Starts a local HTTP server that answers after --delay seconds, then fires
+--calls concurrent web_extract_links requests at one asas_mcp process while a
+probe loop measures crypto_decode latency. With off-loop execution the slow
+calls overlap (wall time ~ calls / web concurrency * delay) and probes stay fast;
+with ASAS_TOOL_OFFLOAD=0 they run back to back and block the probes.
+
+Usage:
+    python scripts/bench_tool_concurrency.py [--calls 8] [--delay 1.0] [--compare]
+"""
+import argparse
+import asyncio
+import http.server
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Add src to sys.path
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC_DIR)
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+PROBE_TOOL = "crypto_decode"
+PROBE_ARGS = {"content": "ZmxhZ3tiZW5jaH0=", "method": "base64"}
+
+
+def start_slow_http_server(delay: float) -> http.server.ThreadingHTTPServer:
+    class SlowHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = b'<html><a href="/flag">flag</a><form action="/login"></form></html>'
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_load(url: str, calls: int, offload: bool) -> dict:
+    env = {**os.environ, "PYTHONPATH": os.path.abspath(SRC_DIR), "ASAS_TOOL_OFFLOAD": "1" if offload else "0"}
+    params = StdioServerParameters(command=sys.executable, args=["-m", "asas_mcp"], env=env)
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.call_tool(PROBE_TOOL, PROBE_ARGS)  # warm-up
+
+            probe_latencies = []
+            done = asyncio.Event()
+
+            async def probe():
+                while not done.is_set():
+                    t0 = time.perf_counter()
+                    await session.call_tool(PROBE_TOOL, PROBE_ARGS)
+                    probe_latencies.append(time.perf_counter() - t0)
+                    await asyncio.sleep(0.05)
+
+            probe_task = asyncio.create_task(probe())
+            start = time.perf_counter()
+            await asyncio.gather(*[session.call_tool("web_extract_links", {"url": url}) for _ in range(calls)])
+            wall = time.perf_counter() - start
+            done.set()
+            await probe_task
+
+    return {
+        "wall": wall,
+        "probe_p50": statistics.median(probe_latencies) * 1000,
+        "probe_max": max(probe_latencies) * 1000,
+    }
+
+
+async def main(calls: int, delay: float, compare: bool):
+    http_server = start_slow_http_server(delay)
+    url = f"http://127.0.0.1:{http_server.server_address[1]}/"
+    modes = [("offloaded", True)] + ([("inline", False)] if compare else [])
+    try:
+        print(f"{calls} x web_extract_links, {delay:.1f}s per request")
+        print(f"{'mode':<11}{'wall s':>9}{'serial s':>10}{'probe p50 ms':>14}{'probe max ms':>14}")
+        for name, offload in modes:
+            r = await run_load(url, calls, offload)
+            print(f"{name:<11}{r['wall']:>9.2f}{calls * delay:>10.2f}{r['probe_p50']:>14.1f}{r['probe_max']:>14.1f}")
+    finally:
+        http_server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=1.0)
+    parser.add_argument("--compare", action="store_true", help="also run with ASAS_TOOL_OFFLOAD=0")
+    opts = parser.parse_args()
+    asyncio.run(main(opts.calls, opts.delay, opts.compare))
@@ -0,0 +1,124 @@
+"""
+Seed the library-function signature DB used by reverse_ghidra to recognize
+(and hide from the LLM) libc/crypto code in stripped static binaries.
+
+    compile  build unstripped static reference binaries with the local gcc
+             (libc at several optimization levels, plus libcrypto if present)
+             and add every named function they contain
+    add      add the named functions of existing unstripped binaries
+    match    show which functions of a (stripped) binary are recognized
+    stats    signatures per library
+
+Usage:
+    python scripts/build_libsigs.py compile [--opt 0 2 s] [--crypto]
+    python scripts/build_libsigs.py add /path/to/libfoo_static --library foo-1.2
+    python scripts/build_libsigs.py match /path/to/stripped_binary
+    python scripts/build_libsigs.py stats
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add src to sys.path
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC_DIR)
+
+from asas_mcp.tools import reverse_ghidra
+from asas_mcp.utils.function_sigs import get_signature_db
+
+# Taking the address of each function makes the static linker pull it in
+REFERENCE_SOURCE = r"""
+#include <ctype.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+%(extra_includes)s
+
+void *volatile refs[] = {
+    (void *)memcpy, (void *)memmove, (void *)memset, (void *)memcmp, (void *)memchr,
+    (void *)strlen, (void *)strcmp, (void *)strncmp, (void *)strcpy, (void *)strncpy,
+    (void *)strcat, (void *)strchr, (void *)strrchr, (void *)strstr, (void *)strtok,
+    (void *)strtol, (void *)strtoul, (void *)atoi, (void *)qsort, (void *)bsearch,
+    (void *)malloc, (void *)calloc, (void *)realloc, (void *)free,
+    (void *)printf, (void *)sprintf, (void *)snprintf, (void *)puts, (void *)fgets,
+    (void *)scanf, (void *)sscanf, (void *)fopen, (void *)fread, (void *)fwrite,
+    (void *)read, (void *)write, (void *)rand, (void *)srand, (void *)toupper,
+    %(extra_refs)s
+};
+
+int main(void) { return refs[0] == 0; }
+"""
+
+CRYPTO = {
+    "includes": "#include <openssl/md5.h>\n#include <openssl/sha.h>\n#include <openssl/aes.h>\n#include <openssl/rc4.h>",
+    "refs": "(void *)MD5, (void *)SHA1, (void *)SHA256, (void *)AES_set_encrypt_key, (void *)AES_encrypt, "
+            "(void *)AES_decrypt, (void *)RC4_set_key, (void *)RC4,",
+    "libs": ["-lcrypto"],
+}
+
+
+def add_binary(path: str, library: str) -> int:
+    raw = reverse_ghidra.export_binary(path)
+    if isinstance(raw, dict):
+        print(f"[!] {path}: {raw.get('error')}")
+        return 0
+    added = get_signature_db().add(raw, library)
+    print(f"[+] {os.path.basename(path)}: {added} new signatures ({len(raw)} functions) as {library}")
+    return added
+
+
+def compile_references(levels, crypto: bool) -> int:
+    extra = CRYPTO if crypto else {"includes": "", "refs": "", "libs": []}
+    total = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "ref.c")
+        with open(src, "w") as f:
+            f.write(REFERENCE_SOURCE % {"extra_includes": extra["includes"], "extra_refs": extra["refs"]})
+        for level in levels:
+            out = os.path.join(tmp, f"ref_O{level}")
+            cmd = ["gcc", f"-O{level}", "-static", "-o", out, src, *extra["libs"]]
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"[!] {' '.join(cmd)} failed:\n{result.stderr[-1000:]}")
+                continue
+            library = f"libc{'+crypto' if crypto else ''}-static-O{level}"
+            total += add_binary(out, library)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Library function signature DB")
+    parser.add_argument("command", choices=["compile", "add", "match", "stats"])
+    parser.add_argument("binaries", nargs="*")
+    parser.add_argument("--library", help="with 'add': library label (e.g. libc-2.35-O2)")
+    parser.add_argument("--opt", nargs="+", default=["0", "2", "s"], help="with 'compile': -O levels")
+    parser.add_argument("--crypto", action="store_true", help="with 'compile': also link libcrypto")
+    args = parser.parse_args()
+
+    db = get_signature_db()
+    if args.command == "compile":
+        compile_references(args.opt, args.crypto)
+    elif args.command == "add":
+        if not args.library or not args.binaries:
+            parser.error("add needs binaries and --library")
+        for path in args.binaries:
+            add_binary(path, args.library)
+    elif args.command == "match":
+        for path in args.binaries:
+            raw = reverse_ghidra.export_binary(path)
+            if isinstance(raw, dict):
+                print(f"[!] {path}: {raw.get('error')}")
+                continue
+            matches = db.recognize(raw)
+            print(f"{os.path.basename(path)}: {len(matches)}/{len(raw)} functions recognized")
+            print(json.dumps(matches, indent=2))
+        return
+    print(json.dumps(db.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
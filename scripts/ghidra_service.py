@@ -0,0 +1,57 @@
+"""
+Manage the warm Ghidra worker pool used by reverse_ghidra.
+
+    build   build the worker image from docker/Dockerfile.ghidra
+    start   start (or reuse) every worker and wait until it answers
+    status  show which workers are reachable
+    stop    shut workers down (--remove also deletes the containers;
+            analyzed programs stay in ASAS_GHIDRA_SERVICE_DIR)
+    analyze pre-analyze binaries so later queries are served warm
+
+Usage:
+    python scripts/ghidra_service.py build|start|status|stop [--remove]
+    python scripts/ghidra_service.py analyze /path/to/binary [...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add src to sys.path
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC_DIR)
+
+from asas_mcp.executors.ghidra_service import GHIDRA_SERVICE_IMAGE, build_image, get_ghidra_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm Ghidra worker pool")
+    parser.add_argument("command", choices=["build", "start", "status", "stop", "analyze"])
+    parser.add_argument("binaries", nargs="*", help="binaries for 'analyze'")
+    parser.add_argument("--remove", action="store_true", help="with 'stop': remove the containers")
+    args = parser.parse_args()
+
+    pool = get_ghidra_pool()
+    if args.command == "build":
+        print(f"Building {GHIDRA_SERVICE_IMAGE} (this downloads Ghidra, may take a while)...")
+        result = build_image()
+        print(result.stdout[-2000:] if result.returncode == 0 else result.stderr[-2000:])
+        sys.exit(result.returncode)
+    elif args.command == "start":
+        start = time.perf_counter()
+        pool.start()
+        print(f"{len(pool.workers)} worker(s) ready in {time.perf_counter() - start:.1f}s")
+    elif args.command == "status":
+        print(json.dumps(pool.status(), indent=2))
+    elif args.command == "stop":
+        pool.stop(remove=args.remove)
+    elif args.command == "analyze":
+        for path in args.binaries:
+            start = time.perf_counter()
+            functions = pool.call(path, "analyze")["functions"]
+            print(f"{path}: {functions} functions in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Measure how many LLM tokens the Ghidra post-processing saves.
+
+Exports each binary (through the analysis cache, so re-runs are instant) and
+reports the estimated tokens of the user functions' pseudo-C after each
+compression stage, plus what reverse_ghidra_decompile returns within the
+default token budget.
+
+Usage:
+    python scripts/ghidra_token_report.py                 # tests/fixtures binaries
+    python scripts/ghidra_token_report.py /path/to/bin [...] [--abbreviate] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add src to sys.path
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+sys.path.append(SRC_DIR)
+
+from asas_mcp.tools import ghidra_compress as gc
+from asas_mcp.tools import reverse_ghidra
+from asas_mcp.tools.ghidra_rank import DECOMPILE_TOKEN_BUDGET, estimate_tokens, select_functions
+
+FIXTURES = [
+    os.path.join(ROOT_DIR, "tests", "fixtures", "simple_reverse"),
+    os.path.join(ROOT_DIR, "tests", "fixtures", "buuctf", "reverse_1.exe"),
+]
+
+STAGES = [
+    ("casts", gc.strip_casts),
+    ("types", gc.alias_types),
+    ("decls", gc.prune_declarations),
+    ("noise", gc.strip_noise),
+]
+
+
+def _tokens(entries):
+    return sum(estimate_tokens(e.get("code") or "") for e in entries)
+
+
+def measure(path: str, abbreviate: bool) -> dict:
+    raw = reverse_ghidra.export_binary(path)
+    if isinstance(raw, dict):
+        return {"binary": path, **raw}
+    funcs = [e for e in raw if reverse_ghidra._is_user_function(e.get("name", ""))]
+    row = {"binary": os.path.basename(path), "functions": len(funcs), "raw": _tokens(funcs)}
+
+    staged = [dict(e) for e in funcs]
+    for name, stage in STAGES:
+        for e in staged:
+            if e.get("code"):
+                e["code"] = stage(e["code"])
+        row[name] = _tokens(staged)
+
+    compressed = gc.compress_functions(funcs, abbreviate_identifiers=abbreviate)["functions"]
+    total = _tokens(compressed)
+    row["dedup" + ("+abbrev" if abbreviate else "")] = total
+    row["reduction"] = f"{100 * (1 - total / max(row['raw'], 1)):.1f}%"
+    unique = [e for e in compressed if "same_as" not in e]
+    row["budget"] = select_functions(unique, token_budget=DECOMPILE_TOKEN_BUDGET)["estimated_tokens"]
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token reduction of Ghidra output post-processing")
+    parser.add_argument("binaries", nargs="*", default=FIXTURES)
+    parser.add_argument("--abbreviate", action="store_true", help="include identifier abbreviation")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    rows = [measure(p, args.abbreviate) for p in args.binaries]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        if "error" in row:
+            print(f"{row['binary']}: {row['error']}")
+            continue
+        print(f"{row['binary']} ({row['functions']} user functions)")
+        for key, value in row.items():
+            if key not in ("binary", "functions"):
+                print(f"  {key:<14} {value}")
+
+
+if __name__ == "__main__":
+    main()
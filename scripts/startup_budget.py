@@ -0,0 +1,88 @@
+"""
+Startup budget for the asas_mcp server: process start -> first list_tools response.
+
+Spawns `python -X importtime -m asas_mcp`, measures wall-clock time until the
+first list_tools reply and prints the slowest imports (cumulative).
+Exits non-zero when the budget is exceeded, so it can run in CI.
+
+Usage:
+    python scripts/startup_budget.py [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+
+# Add src to sys.path
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC_DIR)
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+DEFAULT_BUDGET_MS = int(os.environ.get("ASAS_MCP_STARTUP_BUDGET_MS", "1500"))
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Modules that must not be imported before the first tool invocation
+DEFERRED_MODULES = ["chromadb", "onnxruntime", "requests", "bs4", "asyncvnc", "docker"]
+
+
+def parse_importtime(text: str):
+    """Return [(cumulative_us, self_us, module)] for top-level import entries."""
+    entries = []
+    for line in text.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            entries.append((int(m.group(2)), int(m.group(1)), m.group(4)))
+    return entries
+
+
+async def measure() -> tuple:
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=["-X", "importtime", "-m", "asas_mcp"],
+        env={**os.environ, "PYTHONPATH": os.path.abspath(SRC_DIR)},
+    )
+    with tempfile.TemporaryFile(mode="w+") as errlog:
+        start = time.perf_counter()
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                tools = await session.list_tools()
+                elapsed_ms = (time.perf_counter() - start) * 1000
+        errlog.seek(0)
+        return elapsed_ms, len(tools.tools), errlog.read()
+
+
+def main(budget_ms: int, top: int) -> int:
+    elapsed_ms, tool_count, stderr = asyncio.run(measure())
+    entries = parse_importtime(stderr)
+    imported = {name for _, _, name in entries}
+
+    print(f"startup -> first list_tools: {elapsed_ms:.0f} ms ({tool_count} tools), budget {budget_ms} ms")
+    print(f"\nslowest imports (cumulative):")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative, self_us, name in sorted(entries, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+
+    leaked = [m for m in DEFERRED_MODULES if m in imported]
+    if leaked:
+        print(f"\nFAIL: heavy modules imported at startup: {', '.join(leaked)}")
+        return 1
+    if elapsed_ms > budget_ms:
+        print(f"\nFAIL: startup exceeded budget by {elapsed_ms - budget_ms:.0f} ms")
+        return 1
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    opts = parser.parse_args()
+    sys.exit(main(opts.budget_ms, opts.top))
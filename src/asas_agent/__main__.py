@@ -9,6 +9,13 @@ from dotenv import load_dotenv
 # Import asas_mcp to ensure PyInstaller bundles it
 import asas_mcp.server
 import asas_mcp.__main__
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    # asas_mcp.server imports its tool modules lazily; list them so PyInstaller still bundles them
+    import asas_mcp.tools.recon, asas_mcp.tools.crypto, asas_mcp.tools.misc, asas_mcp.tools.reverse
+    import asas_mcp.tools.platform, asas_mcp.tools.reverse_ghidra, asas_mcp.tools.web
+    import asas_mcp.tools.kali, asas_mcp.tools.sandbox, asas_mcp.tools.vms_vnc
+    import asas_mcp.memory.db, asas_mcp.memory.loader
 
 load_dotenv()
 
@@ -128,141 +135,160 @@ def main_cli(input_text, url, token, llm, api_key, v2, v3, config):
         # 1. Setup Tools
         client = MCPToolClient()
         try:
-            all_tools = await convert_mcp_to_langchain_tools(client)
+            try:
+                all_tools = await convert_mcp_to_langchain_tools(client)
             
-            # 过滤：指挥官只需要核心工具，减轻本地模型和DeepSeek API压力
-            # 简化为最核心的三大件：扫描、SQL注入、命令执行
-            core_tool_names = [
-                "kali_nmap", 
-                "kali_sqlmap", 
-                "kali_exec", 
-                "web_extract_links",
-                "dispatch_to_agent",
-                "open_vm_vnc",
-                "kali_upload_file",
-                "kali_file",
-                "kali_checksec",
-                "reverse_ghidra_decompile",
-                "ghidra_list_functions",
-                "ghidra_decompile_function",
-                "sandbox_execute",
-                "vnc_capture_screen",
-                "vnc_mouse_click",
-                "vnc_keyboard_type",
-                "vnc_send_key",
-                "kali_pwn_cyclic",
-                "kali_pwn_gdb"
-            ]
-            tools = [t for t in all_tools if t.name in core_tool_names]
+                # 过滤：指挥官只需要核心工具，减轻本地模型和DeepSeek API压力
+                # 简化为最核心的三大件：扫描、SQL注入、命令执行
+                core_tool_names = [
+                    "kali_nmap", 
+                    "kali_sqlmap", 
+                    "kali_exec", 
+                    "web_extract_links",
+                    "dispatch_to_agent",
+                    "open_vm_vnc",
+                    "kali_upload_file",
+                    "kali_file",
+                    "kali_checksec",
+                    "reverse_ghidra_decompile",
+                    "ghidra_list_functions",
+                    "ghidra_decompile_function",
+                    "ghidra_xrefs_to",
+                    "ghidra_callers",
+                    "ghidra_strings",
+                    "reverse_strings",
+                    "code_search",
+                    "binary_info",
+                    "binary_symbols",
+                    "sandbox_execute",
+                    "vnc_capture_screen",
+                    "vnc_mouse_click",
+                    "vnc_keyboard_type",
+                    "vnc_send_key",
+                    "kali_pwn_cyclic",
+                    "kali_pwn_gdb",
+                    "result_read",
+                    "artifact_ingest",
+                    "job_submit",
+                    "fuzz_job_start",
+                    "hashcat_job_start",
+                    "ghidra_decompile_job_start",
+                    "job_wait",
+                    "job_status",
+                    "job_cancel"
+                ]
+                tools = [t for t in all_tools if t.name in core_tool_names]
             
-            # 手动确认 dispatch_to_agent 存在
-            if not any(t.name == "dispatch_to_agent" for t in tools):
-                tools.append(dispatch_to_agent)
+                # 手动确认 dispatch_to_agent 存在
+                if not any(t.name == "dispatch_to_agent" for t in tools):
+                    tools.append(dispatch_to_agent)
                 
-            print(f"✅ Loaded {len(tools)} core tools for Orchestrator (from total {len(all_tools)}).")
-        except Exception as e:
-            print(f"❌ Failed to load tools: {e}")
-            return
+                print(f"✅ Loaded {len(tools)} core tools for Orchestrator (from total {len(all_tools)}).")
+            except Exception as e:
+                print(f"❌ Failed to load tools: {e}")
+                return
 
-        # 2. Setup Orchestrator LLM
-        orch_cfg = cfg["orchestrator"]
-        if llm == 'openai':
-            # Use DeepSeek as default for 'openai' choice if not in config
-            if "api_key" not in orch_cfg:
-                orch_cfg["api_key"] = api_key or os.environ.get("DEEPSEEK_API_KEY")
-            if "base_url" not in orch_cfg:
-                orch_cfg["base_url"] = "https://api.deepseek.com/v1"
-            orch_cfg["model"] = "deepseek-chat"
-            orch_cfg["provider"] = "openai"
+            # 2. Setup Orchestrator LLM
+            orch_cfg = cfg["orchestrator"]
+            if llm == 'openai':
+                # Use DeepSeek as default for 'openai' choice if not in config
+                if "api_key" not in orch_cfg:
+                    orch_cfg["api_key"] = api_key or os.environ.get("DEEPSEEK_API_KEY")
+                if "base_url" not in orch_cfg:
+                    orch_cfg["base_url"] = "https://api.deepseek.com/v1"
+                orch_cfg["model"] = "deepseek-chat"
+                orch_cfg["provider"] = "openai"
             
-        if llm == 'claude':
-            orch_cfg["provider"] = "anthropic"
-            if "api_key" not in orch_cfg:
-                orch_cfg["api_key"] = api_key or os.environ.get("ANTHROPIC_API_KEY")
-            orch_cfg["model"] = "claude-3-5-sonnet-20240620"
+            if llm == 'claude':
+                orch_cfg["provider"] = "anthropic"
+                if "api_key" not in orch_cfg:
+                    orch_cfg["api_key"] = api_key or os.environ.get("ANTHROPIC_API_KEY")
+                orch_cfg["model"] = "claude-3-5-sonnet-20240620"
         
-        if llm == 'gemini':
-            orch_cfg["provider"] = "google"
-            if "api_key" not in orch_cfg:
-                orch_cfg["api_key"] = api_key or os.environ.get("GOOGLE_API_KEY")
-            orch_cfg["model"] = "gemini-2.5-flash"
+            if llm == 'gemini':
+                orch_cfg["provider"] = "google"
+                if "api_key" not in orch_cfg:
+                    orch_cfg["api_key"] = api_key or os.environ.get("GOOGLE_API_KEY")
+                orch_cfg["model"] = "gemini-2.5-flash"
 
-        if llm == 'deepseek':
-            orch_cfg["provider"] = "deepseek"
-            # 优先使用用户提供的 Key
-            orch_cfg["api_key"] = api_key or os.environ.get("DEEPSEEK_API_KEY")
-            if "model" not in orch_cfg:
-                orch_cfg["model"] = "deepseek-chat"
-            if "base_url" not in orch_cfg:
-                orch_cfg["base_url"] = "https://api.deepseek.com/v1"
+            if llm == 'deepseek':
+                orch_cfg["provider"] = "deepseek"
+                # 优先使用用户提供的 Key
+                orch_cfg["api_key"] = api_key or os.environ.get("DEEPSEEK_API_KEY")
+                if "model" not in orch_cfg:
+                    orch_cfg["model"] = "deepseek-chat"
+                if "base_url" not in orch_cfg:
+                    orch_cfg["base_url"] = "https://api.deepseek.com/v1"
         
-        if llm == 'zhipu' or llm == 'glm':
-            orch_cfg["provider"] = "zhipu"
-            if "api_key" not in orch_cfg:
-                orch_cfg["api_key"] = api_key or os.environ.get("ZHIPU_API_KEY")
-            orch_cfg["model"] = "glm-4-plus"
+            if llm == 'zhipu' or llm == 'glm':
+                orch_cfg["provider"] = "zhipu"
+                if "api_key" not in orch_cfg:
+                    orch_cfg["api_key"] = api_key or os.environ.get("ZHIPU_API_KEY")
+                orch_cfg["model"] = "glm-4-plus"
         
-        if llm == 'mock':
-            from asas_agent.llm.mock_react import ReActMockLLM
-            orch_llm = ReActMockLLM()
-        else:
-            if llm != 'config' and llm not in ['openai', 'claude', 'gemini', 'zhipu', 'glm', 'deepseek']:
-                orch_cfg["provider"] = llm
-            orch_llm = create_llm(orch_cfg)
+            if llm == 'mock':
+                from asas_agent.llm.mock_react import ReActMockLLM
+                orch_llm = ReActMockLLM()
+            else:
+                if llm != 'config' and llm not in ['openai', 'claude', 'gemini', 'zhipu', 'glm', 'deepseek']:
+                    orch_cfg["provider"] = llm
+                orch_llm = create_llm(orch_cfg)
             
-        # 3. Build Graph
-        print(f"🧠 Initializing v3 Multi-Agent Orchestrator ({orch_cfg.get('model')})...")
-        app = create_orchestrator_graph(orch_llm, tools)
+            # 3. Build Graph
+            print(f"🧠 Initializing v3 Multi-Agent Orchestrator ({orch_cfg.get('model')})...")
+            app = create_orchestrator_graph(orch_llm, tools)
         
-        # 4. Prepare Workflow - Generate smart initial instructions
-        if input_text:
-            initial_msg = input_text
-        elif url:
-            initial_msg = _generate_smart_instruction(url)
-        else:
-            initial_msg = "Awaiting instructions."
-        state = {"messages": [HumanMessage(content=initial_msg)]}
-        if url: state["platform_url"] = url
-        if token: state["platform_token"] = token
+            # 4. Prepare Workflow - Generate smart initial instructions
+            if input_text:
+                initial_msg = input_text
+            elif url:
+                initial_msg = _generate_smart_instruction(url)
+            else:
+                initial_msg = "Awaiting instructions."
+            state = {"messages": [HumanMessage(content=initial_msg)]}
+            if url: state["platform_url"] = url
+            if token: state["platform_token"] = token
 
-        # 5. Execute
-        print(f"🚀 Starting v3 Multi-Agent Mission: {initial_msg}")
-        print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+            # 5. Execute
+            print(f"🚀 Starting v3 Multi-Agent Mission: {initial_msg}")
+            print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
         
-        from asas_agent.utils.ui_emitter import ui_emitter
+            from asas_agent.utils.ui_emitter import ui_emitter
 
-        async for event in app.astream(state, config={"recursion_limit": 100}):
-            if not isinstance(event, dict):
-                continue
-            for key, value in event.items():
-                if key == "orchestrator":
-                    msg = value["messages"][-1]
-                    tools_used = []
-                    if msg.tool_calls:
-                        for tc in msg.tool_calls:
-                            tools_used.append({"name": tc["name"], "args": tc.get("args", {})})
-                            print(f"👑 指挥官决策: 调用工具 {tc['name']}")
-                            print(f"   目标/参数: {tc['args'].get('agent_type') or tc['args']}")
-                    else:
-                        print(f"💡 最终报告: {msg.content}")
-                        
-                    ui_emitter.emit("orchestrator_message", {
-                        "content": msg.content,
-                        "tool_calls": tools_used
-                    })
-                elif key == "tools":
-                    for msg in value["messages"]:
-                        content_str = str(msg.content)[:500]
-                        print(f"📥 代理返回 ({msg.name}): {content_str[:150]}...")
+            async for event in app.astream(state, config={"recursion_limit": 100}):
+                if not isinstance(event, dict):
+                    continue
+                for key, value in event.items():
+                    if key == "orchestrator":
+                        msg = value["messages"][-1]
+                        tools_used = []
+                        if msg.tool_calls:
+                            for tc in msg.tool_calls:
+                                tools_used.append({"name": tc["name"], "args": tc.get("args", {})})
+                                print(f"👑 指挥官决策: 调用工具 {tc['name']}")
+                                print(f"   目标/参数: {tc['args'].get('agent_type') or tc['args']}")
+                        else:
+                            print(f"💡 最终报告: {msg.content}")
                         
-                        ui_emitter.emit("tool_result", {
-                            "tool_name": msg.name,
-                            "content": content_str,
-                            "is_error": "Error:" in content_str or "Failed" in content_str
+                        ui_emitter.emit("orchestrator_message", {
+                            "content": msg.content,
+                            "tool_calls": tools_used
                         })
+                    elif key == "tools":
+                        for msg in value["messages"]:
+                            content_str = str(msg.content)[:500]
+                            print(f"📥 代理返回 ({msg.name}): {content_str[:150]}...")
                         
-        print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-        print("✅ v3 Mission Complete")
+                            ui_emitter.emit("tool_result", {
+                                "tool_name": msg.name,
+                                "content": content_str,
+                                "is_error": "Error:" in content_str or "Failed" in content_str
+                            })
+                        
+            print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+            print("✅ v3 Mission Complete")
+        finally:
+            await client.aclose()
 
     async def run_v2():
         from asas_agent.graph.workflow import create_react_agent_graph
@@ -271,55 +297,58 @@ def main_cli(input_text, url, token, llm, api_key, v2, v3, config):
         from langchain_core.messages import HumanMessage
         
         client = MCPToolClient()
-        tools = await convert_mcp_to_langchain_tools(client)
+        try:
+            tools = await convert_mcp_to_langchain_tools(client)
         
-        from asas_agent.utils.config import config_loader
-        from asas_agent.llm.factory import create_llm
-        cfg = config_loader.load_config(config) if config else config_loader.load_config("v3_config.yaml")
-        orch_cfg = cfg["orchestrator"]
+            from asas_agent.utils.config import config_loader
+            from asas_agent.llm.factory import create_llm
+            cfg = config_loader.load_config(config) if config else config_loader.load_config("v3_config.yaml")
+            orch_cfg = cfg["orchestrator"]
         
-        # Apply command line overrides
-        if llm == 'openai':
-            orch_cfg["api_key"] = api_key or os.environ.get("DEEPSEEK_API_KEY")
-            orch_cfg["base_url"] = "https://api.deepseek.com/v1"
-            orch_cfg["model"] = "deepseek-reasoner"
-            orch_cfg["provider"] = "openai"
+            # Apply command line overrides
+            if llm == 'openai':
+                orch_cfg["api_key"] = api_key or os.environ.get("DEEPSEEK_API_KEY")
+                orch_cfg["base_url"] = "https://api.deepseek.com/v1"
+                orch_cfg["model"] = "deepseek-reasoner"
+                orch_cfg["provider"] = "openai"
 
-        if llm == 'claude':
-            from asas_agent.llm.langchain_claude import create_langchain_claude
-            llm_provider = create_langchain_claude(api_key=api_key)
-        elif llm == 'mock':
-            from asas_agent.llm.mock_react import ReActMockLLM
-            llm_provider = ReActMockLLM()
-        else:
-            llm_provider = create_llm(orch_cfg)
+            if llm == 'claude':
+                from asas_agent.llm.langchain_claude import create_langchain_claude
+                llm_provider = create_langchain_claude(api_key=api_key)
+            elif llm == 'mock':
+                from asas_agent.llm.mock_react import ReActMockLLM
+                llm_provider = ReActMockLLM()
+            else:
+                llm_provider = create_llm(orch_cfg)
             
-        print(f"🧠 Initializing v2 ReAct Agent ({llm_provider._llm_type if hasattr(llm_provider, '_llm_type') else 'Generic'})...")
-        app = create_react_agent_graph(llm_provider, tools)
-        initial_msg = input_text or f"Fetching challenge from {url}"
-        inputs = {"messages": [HumanMessage(content=initial_msg)]}
-        if url: inputs["platform_url"] = url
-        if token: inputs["platform_token"] = token
+            print(f"🧠 Initializing v2 ReAct Agent ({llm_provider._llm_type if hasattr(llm_provider, '_llm_type') else 'Generic'})...")
+            app = create_react_agent_graph(llm_provider, tools)
+            initial_msg = input_text or f"Fetching challenge from {url}"
+            inputs = {"messages": [HumanMessage(content=initial_msg)]}
+            if url: inputs["platform_url"] = url
+            if token: inputs["platform_token"] = token
 
-        print(f"🚀 Starting v2 Mission: {initial_msg}")
-        print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-        async for event in app.astream(inputs):
-            if not isinstance(event, dict):
-                continue
-            for key, value in event.items():
-                if key == "agent":
-                    msg = value["messages"][-1]
-                    if msg.tool_calls:
-                        for tc in msg.tool_calls:
-                            print(f"🤔 思考中... 调用工具: {tc['name']}")
-                            print(f"   参数: {tc['args']}")
-                    else:
-                        print(f"💡 最终结果: {msg.content}")
-                elif key == "tools":
-                    for msg in value["messages"]:
-                        print(f"📥 工具返回 ({msg.name}): {str(msg.content)[:200]}...")
-        print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-        print("✅ v2 Mission Complete")
+            print(f"🚀 Starting v2 Mission: {initial_msg}")
+            print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+            async for event in app.astream(inputs):
+                if not isinstance(event, dict):
+                    continue
+                for key, value in event.items():
+                    if key == "agent":
+                        msg = value["messages"][-1]
+                        if msg.tool_calls:
+                            for tc in msg.tool_calls:
+                                print(f"🤔 思考中... 调用工具: {tc['name']}")
+                                print(f"   参数: {tc['args']}")
+                        else:
+                            print(f"💡 最终结果: {msg.content}")
+                    elif key == "tools":
+                        for msg in value["messages"]:
+                            print(f"📥 工具返回 ({msg.name}): {str(msg.content)[:200]}...")
+            print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+            print("✅ v2 Mission Complete")
+        finally:
+            await client.aclose()
 
     async def run_v1():
         from asas_agent.graph.workflow import create_agent_graph
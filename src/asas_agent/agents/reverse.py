@@ -6,9 +6,10 @@ from asas_mcp.tools.ida_tools import (
     ida_list_funcs, ida_get_imports, ida_find_regex
 )
 from asas_mcp.tools.reverse_angr import reverse_angr_solve, reverse_angr_eval
-from asas_mcp.tools.pwn_fuzz import pwn_fuzz_start, pwn_fuzz_check, pwn_fuzz_triage
+from asas_mcp.tools.pwn_fuzz import pwn_fuzz_triage
 from asas_mcp.tools.horde_bridge import pwn_horde_get_seeds, pwn_horde_inject_seed
-from asas_mcp.tools.gpu_tools import gpu_hashcat_crack, gpu_status
+from asas_mcp.tools.gpu_tools import gpu_status
+from asas_mcp.tools.job_tools import fuzz_job_start, ghidra_decompile_job_start, hashcat_job_start, job_wait
 
 def create_reverse_agent(llm, tools: List[BaseTool]):
     """
@@ -26,32 +27,40 @@ def create_reverse_agent(llm, tools: List[BaseTool]):
         "2. **符号寻路 (Guided Hunting)**: 当你在 IDA 中发现关键校验、'Success' 提示或特定的 Flag 校验函数时：\n"
         "   - 获取该逻辑分支或打印成功信息的地址。\n"
         "   - 调用 `reverse_angr_solve` 自动解算能够到达该地址的输入内容。\n"
-        "3. **方程破解**: 如果遇到复杂的数学方程或校验算法，将其简化并使用 `reverse_angr_eval` 进行离线求解。\n"
+        "3. **方程破解**: 如果遇到复杂的数学方程或校验算法，将其简化并使用 `reverse_angr_eval` 进行离线求解。"
+        "多条校验用 `constraints` 列表一次联立；需要多个候选时设置 `max_solutions`，求最值用 `minimize`/`maximize`。"
+        "逐步补充约束时保持之前的约束不变并追加在末尾，已编译的部分会被复用。\n"
         "4. **漏洞挖掘 (Swarm Fuzzing)**: 如果二进制文件逻辑过于复杂或疑似存在内存破坏漏洞（Pwn）：\n"
-        "   - 使用 `pwn_fuzz_start` 启动后台分布式 Fuzzer。\n"
-        "   - 使用 `pwn_fuzz_check` 定期观察进度。如果 `total_paths` 长时间不增加（Stagnation），则执行协同。 \n"
+        "   - 使用 `fuzz_job_start` 启动后台 Fuzz 任务（立即返回 job_id，`container` 事件给出 container_id）。\n"
+        "   - 然后只调用一次 `job_wait(job_id=..., until='crash')` 等待第一个崩溃，不要反复查询进度。"
+        "若超时返回时仍无崩溃且 `total_paths` 指标没有增长（Stagnation），则执行协同。\n"
         "   - 发现瓶颈时，通过 `pwn_horde_get_seeds` 提取最新种子，并作为 `stdin_prefix_hex` 传入 `reverse_angr_solve` 进行辅助寻路。\n"
-        "   - 发现 Crash 后，使用 `pwn_fuzz_triage` 进行崩溃分析。\n"
-        "5. **引擎回灌**: 将 Angr 找到的新解通过 `pwn_horde_inject_seed` 回灌给 Fuzzer，帮助其突破当前阶段。\n"
+        "   - 发现 Crash 后（`crash` 事件列出崩溃文件名），使用 `pwn_fuzz_triage` 进行崩溃分析。\n"
+        "5. **引擎回灌**: 设置 `max_solutions` 让 `reverse_angr_solve` 一次返回多个不同解，再逐个通过 `pwn_horde_inject_seed` 回灌给 Fuzzer，帮助其突破当前阶段。"
+        "路径爆炸时缩小 `timeout`/`max_active` 或改用 `techniques=['dfs']`。\n"
         "6. **硬件加速爆破 (GPU Cracking)**: 如果你在程序中发现硬编码的 Hash (如 MD5/SHA256) 或加密的 Zip/文件：\n"
         "   - 使用 `gpu_status` 确认算力节点 GPU 可用性。\n"
-        "   - 调用 `gpu_hashcat_crack` 进行高速暴力破解，优先使用 rockyou 等经典字典。\n"
+        "   - 调用 `hashcat_job_start` 启动后台破解任务，优先使用 rockyou 等经典字典；"
+        "再调用一次 `job_wait(job_id=..., until='cracked')` 等待结果。\n"
         "7. **自动化求解**: 使用 `ida_py_eval` 在 IDA 环境内运行脚本，提取内存数据或解密算法。\n"
-        "8. **灵活切换**: 如果 IDA 环境不可用（报错），降级使用 Ghidra 相关工具。\n\n"
+        "8. **灵活切换**: 如果 IDA 环境不可用（报错），降级使用 Ghidra 相关工具。"
+        "大型二进制用 `ghidra_decompile_job_start` 后台反编译，并以 `job_wait(job_id=..., until='main')` 先拿到 main。\n\n"
         "目标：找到 Flag 并解释漏洞/逻辑点。输出结果必须专业且详实。"
     )
     
-    # Bind All Engines (IDA + Angr + Fuzz + Horde Bridge + GPU)
+    # Bind All Engines (IDA + Angr + Fuzz + Horde Bridge + GPU + Jobs)
     ida_tools = [
         ida_decompile, ida_xrefs_to, ida_py_eval, 
         ida_list_funcs, ida_get_imports, ida_find_regex
     ]
     angr_tools = [reverse_angr_solve, reverse_angr_eval]
-    fuzz_tools = [pwn_fuzz_start, pwn_fuzz_check, pwn_fuzz_triage]
+    fuzz_tools = [fuzz_job_start, pwn_fuzz_triage]
     horde_tools = [pwn_horde_get_seeds, pwn_horde_inject_seed]
-    gpu_tools = [gpu_hashcat_crack, gpu_status]
+    gpu_tools = [hashcat_job_start, gpu_status]
+    # Long-running engines run as background jobs: started once, awaited with one job_wait
+    job_tools = [ghidra_decompile_job_start, job_wait]
     
-    all_tools = tools + ida_tools + angr_tools + fuzz_tools + horde_tools + gpu_tools
+    all_tools = tools + ida_tools + angr_tools + fuzz_tools + horde_tools + gpu_tools + job_tools
     
     graph = create_react_agent_graph(llm, all_tools, system_prompt=system_prompt)
     return graph
@@ -1,5 +1,7 @@
 import logging
 import asyncio
+import base64
+import hashlib
 import time
 from typing import Dict, Any, List, Optional
 from .seed_janitor import SeedJanitor
@@ -12,9 +14,14 @@ class ConcolicBreaker:
     Stagnation detector and Angr solver bridge.
     If the swarm fuzzing is stuck, it triggers symbolic execution to find new paths.
     """
-    def __init__(self, router: SwarmRouter, janitor: SeedJanitor):
+    def __init__(self, router: SwarmRouter, janitor: SeedJanitor, binary_path: Optional[str] = None,
+                 max_solutions: int = 8, target_addr: Optional[str] = None):
         self.router = router
         self.janitor = janitor
+        self.binary_path = binary_path
+        self.target_addr = target_addr  # uncovered branch to aim at (hex string); blind search without it
+        self.max_solutions = max_solutions  # one solve returns a batch of distinct seeds
+        self.warmed_nodes = set()  # experts whose angr project cache already holds the target
         self.last_path_count = 0
         self.stagnant_since = time.time()
         self.breakthrough_in_progress = False
@@ -67,8 +74,24 @@ class ConcolicBreaker:
             from .utils import is_ray_actor
             args = {
                 "seed_prefix_b64": target_seed["content_b64"],
-                "strategy": "explore_new_branches"
+                "strategy": "explore_new_branches",
+                "max_solutions": self.max_solutions
             }
+            if self.target_addr:
+                # Directed: rank states by CFG distance to the target, starting where the seed's path forks
+                args.update(find_addr=self.target_addr, directed=True,
+                            stdin_prefix_hex=base64.b64decode(target_seed["content_b64"]).hex())
+            if self.binary_path:
+                args["binary_path"] = self.binary_path
+                # Only a solve aimed at a target runs angr on the node: nothing to warm up otherwise
+                if self.target_addr and expert_node not in self.warmed_nodes:
+                    # First attempt on this node: load the project and its CFG (for distances) once
+                    if is_ray_actor(worker):
+                        warm = await worker.warm_start_angr.remote(self.binary_path, cfg=True)
+                    else:
+                        warm = await worker.warm_start_angr(self.binary_path, cfg=True)
+                    if warm.get("status") == "success":
+                        self.warmed_nodes.add(expert_node)
             
             if is_ray_actor(worker):
                 result = await worker.execute_tool.remote("reverse_angr_solve", args)
@@ -78,10 +101,10 @@ class ConcolicBreaker:
             if result.get("status") == "success" and "new_seeds" in result:
                 new_seeds = result["new_seeds"]
                 logger.info(f"Breakthrough SUCCESS! Found {len(new_seeds)} new breakthrough seeds.")
-                # Feed back to Janitor
+                # Feed back to Janitor (same dedup key as its sync loop)
                 for s in new_seeds:
-                    # In reality, new_seeds would be {filename, content_b64}
-                    pass
+                    s_hash = hashlib.md5(s["content_b64"].encode()).hexdigest()
+                    self.janitor.global_seed_pool.setdefault(s_hash, s)
             
             # Reset timer after attempt
             self.stagnant_since = time.time()
@@ -4,6 +4,10 @@ except ImportError:
     # Fallback for dev environment without Ray installed
     ray = None
 
+import asyncio
+import base64
+import hashlib
+import inspect
 import logging
 import os
 import platform
@@ -125,6 +129,10 @@ class SwarmWorker:
         task_record = {"tool": tool_func_name, "success": True}
         
         try:
+            if tool_func_name == "reverse_angr_solve" and args.get("binary_path") and args.get("find_addr"):
+                # Runs in this process, on the angr project cache warm_start_angr filled;
+                # a blind breakthrough (no target) keeps the simulated result below
+                return await self._solve_angr(args)
             # Here we would dispatch to the real tool registry
             # For v6.0 prototype, we support simulated and some real tools via MCP
             result = f"Distributed Result from {self.node_id}: {tool_func_name} executed."
@@ -138,6 +146,33 @@ class SwarmWorker:
             if len(self.task_history) > 100: # Keep last 100 tasks
                 self.task_history.pop(0)
 
+    async def _solve_angr(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """reverse_angr_solve with its stdin solutions handed back as fuzzer seeds."""
+        from asas_mcp.tools.reverse_angr import solve_stdin
+        accepted = inspect.signature(solve_stdin).parameters
+        result = await solve_stdin(**{k: v for k, v in args.items() if k in accepted})
+        seeds = [{"filename": f"angr_{hashlib.md5(s).hexdigest()[:12]}", "content_b64": base64.b64encode(s).decode()}
+                 for s in result["solutions"]]
+        summary = f"{len(seeds)} inputs reaching {args['find_addr']}"
+        if result["notes"]:
+            summary += f" ({', '.join(result['notes'])})"
+        return {"status": "success", "result": summary, "new_seeds": seeds}
+
+    async def warm_start_angr(self, binary_path: str, cfg: bool = False) -> Dict[str, Any]:
+        """
+        Load a target into this actor's angr project cache - from the shared
+        pickle directory when another node already loaded it - so every
+        following reverse_angr_solve on this node skips the load.
+        """
+        try:
+            from asas_mcp.utils.angr_cache import get_angr_cache
+            # Loading and CFGFast block for seconds: keep the actor's event loop free
+            warmed = await asyncio.to_thread(get_angr_cache().warm, binary_path, cfg=cfg)
+            return {"status": "success", **warmed}
+        except Exception as e:
+            logger.error(f"Worker {self.node_id} failed to warm-start angr for {binary_path}: {e}")
+            return {"status": "error", "message": str(e)}
+
     async def fetch_seeds(self, container_id: str) -> List[Dict[str, Any]]:
         """
         Fetch interesting seeds from a local fuzzer container.
@@ -0,0 +1,117 @@
+from langchain_core.messages import ToolMessage
+from typing import List, Dict, Any, Optional
+from fnmatch import fnmatch
+import asyncio
+import json
+
+# Upper bound on tool calls running at once within a single step
+DEFAULT_MAX_PARALLEL_TOOLS = 8
+
+# Per-tool concurrency limits. Keys are fnmatch patterns; all tools matching the
+# same pattern share one semaphore (e.g. every VNC action drives the same screen).
+DEFAULT_TOOL_CONCURRENCY = {
+    "vnc_*": 1,
+    "open_vm_vnc": 1,
+}
+
+# Tools whose side effects later calls in the same turn depend on
+# (e.g. kali_upload_file followed by kali_file on the uploaded path).
+# They act as barriers: everything before them finishes first, everything after waits.
+BARRIER_TOOLS = {"kali_upload_file"}
+
+
+def _to_content(result: Any, stringify: bool) -> Any:
+    if stringify or isinstance(result, str):
+        return str(result)
+    if isinstance(result, list):
+        # Multimodal content blocks (e.g. VNC screenshots) are passed through
+        return result
+    try:
+        return json.dumps(result, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return str(result)
+
+
+def _split_batches(tool_calls: List[Dict[str, Any]], barriers) -> List[List[int]]:
+    """Group call indices into batches that may run concurrently."""
+    batches, current = [], []
+    for i, tc in enumerate(tool_calls):
+        if tc.get("name") in barriers:
+            if current:
+                batches.append(current)
+            batches.append([i])
+            current = []
+        else:
+            current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def execute_tool_calls(
+    tools: List[Any],
+    tool_calls: List[Dict[str, Any]],
+    concurrency: Optional[Dict[str, int]] = None,
+    max_parallel: int = DEFAULT_MAX_PARALLEL_TOOLS,
+    stringify: bool = True,
+    log_prefix: str = "tools_node",
+) -> List[ToolMessage]:
+    """
+    Execute independent tool calls concurrently.
+
+    Returns one ToolMessage per call, in the original order. A failing or slow
+    tool never cancels its siblings; its error is reported in its own message.
+
+    Args:
+        tools: Available LangChain tools.
+        tool_calls: Tool calls emitted by the LLM ({name, args, id}).
+        concurrency: Per-tool limits as {fnmatch pattern: max concurrent}.
+            Defaults to DEFAULT_TOOL_CONCURRENCY.
+        max_parallel: Global cap on calls running at once.
+        stringify: Force ToolMessage content to str (otherwise lists pass through).
+    """
+    limits = DEFAULT_TOOL_CONCURRENCY if concurrency is None else concurrency
+    tools_by_name = {getattr(t, "name", None): t for t in tools}
+    global_sem = asyncio.Semaphore(max(1, max_parallel))
+    pattern_sems = {pattern: asyncio.Semaphore(max(1, n)) for pattern, n in limits.items()}
+
+    def _sem_for(tool_name: str) -> Optional[asyncio.Semaphore]:
+        for pattern, sem in pattern_sems.items():
+            if fnmatch(tool_name, pattern):
+                return sem
+        return None
+
+    async def _run_one(tc: Dict[str, Any]) -> ToolMessage:
+        tool_name = tc["name"]
+        tool_args = tc.get("args", {})
+        tool_call_id = tc["id"]
+
+        target_tool = tools_by_name.get(tool_name)
+        if not target_tool:
+            print(f"ERROR: Tool '{tool_name}' not found!")
+            return ToolMessage(content=f"Error: Tool '{tool_name}' not found.", tool_call_id=tool_call_id, name=tool_name)
+
+        tool_sem = _sem_for(tool_name)
+        try:
+            async with global_sem:
+                if tool_sem is not None:
+                    await tool_sem.acquire()
+                try:
+                    print(f"DEBUG [{log_prefix}]: Executing {tool_name}({tool_args})")
+                    # Use ainvoke - LangChain handles sync tools in a separate thread pool automatically
+                    result = await target_tool.ainvoke(tool_args)
+                finally:
+                    if tool_sem is not None:
+                        tool_sem.release()
+            print(f"DEBUG [{log_prefix}]: Result snippet: {str(result)[:200]}...")
+            return ToolMessage(content=_to_content(result, stringify), tool_call_id=tool_call_id, name=tool_name)
+        except Exception as e:
+            print(f"ERROR executing tool {tool_name}: {e}")
+            return ToolMessage(content=f"Error: {str(e)}", tool_call_id=tool_call_id, name=tool_name)
+
+    results: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+    for batch in _split_batches(tool_calls, BARRIER_TOOLS):
+        messages = await asyncio.gather(*[_run_one(tool_calls[i]) for i in batch])
+        for i, msg in zip(batch, messages):
+            results[i] = msg
+    return results
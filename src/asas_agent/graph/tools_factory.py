@@ -1,6 +1,7 @@
 from langchain_core.tools import tool
 from typing import List, Optional, Dict, Any
 from asas_mcp.tools import crypto, web, kali, recon, misc, sandbox, platform, reverse_ghidra
+from asas_mcp.utils.result_store import summarize_result, get_result_store, DEFAULT_READ_LENGTH
 
 # Crypto Tools
 @tool
@@ -53,12 +54,12 @@ async def vnc_send_key(vm_name: str, key: str) -> str:
 @tool
 async def kali_sqlmap(url: str, args: str = "--batch --banner") -> str:
     """使用 sqlmap 执行自动化 SQL 注入检测与利用"""
-    return kali.sqlmap(url, args)
+    return summarize_result("kali_sqlmap", kali.sqlmap(url, args))
 
 @tool
 async def kali_dirsearch(url: str, args: str = "-e php,html,js") -> str:
     """使用 dirsearch 执行 Web 路径爆破"""
-    return kali.dirsearch(url, args)
+    return summarize_result("kali_dirsearch", kali.dirsearch(url, args))
 
 @tool
 async def kali_nmap(target: str = None, args: str = "-F", target_ip: str = None) -> str:
@@ -66,7 +67,7 @@ async def kali_nmap(target: str = None, args: str = "-F", target_ip: str = None)
     target = target or target_ip
     if not target:
         return "Error: target or target_ip is required."
-    return kali.nmap(target, args)
+    return summarize_result("kali_nmap", kali.nmap(target, args))
 
 @tool
 def kali_upload_file(host_path: str, guest_path: str = "/tmp/") -> str:
@@ -86,7 +87,7 @@ def kali_checksec(file_path_guest: str) -> str:
 @tool
 def kali_exec(cmd_str: str) -> str:
     """在 Kali 虚拟机内执行任意 shell 命令"""
-    return kali.get_executor().execute(cmd_str)
+    return summarize_result("kali_exec", kali.get_executor().execute(cmd_str))
 
 @tool
 def kali_pwn_cyclic(length: int, find_value: str = None) -> str:
@@ -96,7 +97,7 @@ def kali_pwn_cyclic(length: int, find_value: str = None) -> str:
 @tool
 def kali_pwn_gdb(file_path_guest: str, commands: str) -> str:
     """[Pwn] 在 Kali 虚拟机中使用 GDB/GEF 自动化运行调试指令并获取输出"""
-    return kali.pwn_gdb(file_path_guest, commands)
+    return summarize_result("kali_pwn_gdb", kali.pwn_gdb(file_path_guest, commands))
 
 # Recon Tools
 @tool
@@ -126,20 +127,28 @@ def platform_submit_flag(challenge_id: str, flag: str, base_url: str, token: str
     """向 CTF 平台提交 Flag"""
     return platform.platform_submit_flag(challenge_id, flag, base_url, token)
 
+# Large Output Paging
+@tool
+def result_read(handle: str, offset: int = 0, length: int = DEFAULT_READ_LENGTH, grep: str = None) -> Dict[str, Any]:
+    """读取被截断的大型工具输出 (handle)，可用 grep 正则过滤行，用 next_offset 翻页"""
+    return get_result_store().read(handle, offset, length, grep)
+
 # Tool Whitellist for Agent Types
 TOOL_WHITELIST = {
     "crypto": [crypto_decode, misc_run_python, sandbox_execute],
     "web": [
         web_dir_scan, web_sql_check, web_extract_links, 
         kali_sqlmap, kali_dirsearch, kali_exec, kali_nmap,
-        vnc_capture_screen, vnc_mouse_click, vnc_keyboard_type, vnc_send_key
+        vnc_capture_screen, vnc_mouse_click, vnc_keyboard_type, vnc_send_key,
+        result_read
     ],
     "reverse": [reverse_ghidra.analyze_binary, misc_run_python, sandbox_execute],
     "pwn": [
         kali_checksec, kali_exec, kali_pwn_cyclic, kali_pwn_gdb,
-        reverse_ghidra.analyze_binary, misc_run_python, sandbox_execute
+        reverse_ghidra.analyze_binary, misc_run_python, sandbox_execute,
+        result_read
     ],
-    "recon": [recon_scan, kali_nmap, kali_exec],
+    "recon": [recon_scan, kali_nmap, kali_exec, result_read],
     "writeup": [], # Writeup agent usually doesn't need external tools, just its state
     "memory": [] # Memory tools are often handled separately or via retrieval
 }
@@ -2,6 +2,7 @@ from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
 from .state import AgentState
 from .nodes import AgentNodes
+from .tool_executor import execute_tool_calls
 from ..mcp_client.client import MCPToolClient
 from typing import List, Dict, Any, Optional
 from langchain_core.tools import BaseTool
@@ -75,7 +76,8 @@ def _parse_manual_tool_calls(content: str) -> List[Dict[str, Any]]:
             
     return tool_calls
 
-def create_react_agent_graph(llm, tools: List[BaseTool], system_prompt: str = None):
+def create_react_agent_graph(llm, tools: List[BaseTool], system_prompt: str = None,
+                             tool_concurrency: Optional[Dict[str, int]] = None):
     """
     Create a ReAct agent graph with LLM and tools.
     
@@ -83,6 +85,7 @@ def create_react_agent_graph(llm, tools: List[BaseTool], system_prompt: str = No
         llm: LangChain-compatible LLM with bind_tools support
         tools: List of LangChain tools
         system_prompt: Optional system prompt to guide the agent
+        tool_concurrency: Optional per-tool concurrency limits ({fnmatch pattern: max})
         
     Returns:
         Compiled LangGraph workflow
@@ -124,33 +127,11 @@ def create_react_agent_graph(llm, tools: List[BaseTool], system_prompt: str = No
         return {"messages": [result]}
         
     async def tools_node(state: AgentState):
-        """Custom tool execution node"""
+        """Custom tool execution node (independent calls run concurrently)"""
         messages = state["messages"]
         last_message = messages[-1]
         
-        tool_results = []
-        for tool_call in last_message.tool_calls:
-            tool_name = tool_call["name"]
-            tool_args = tool_call["args"]
-            tool_call_id = tool_call["id"]
-            
-            # Find the tool
-            target_tool = next((t for t in tools if t.name == tool_name), None)
-            if not target_tool:
-                print(f"ERROR: Tool '{tool_name}' not found!")
-                tool_results.append(ToolMessage(content=f"Error: Tool '{tool_name}' not found.", tool_call_id=tool_call_id, name=tool_name))
-                continue
-                
-            print(f"DEBUG [tools_node]: Executing {tool_name}({tool_args})")
-            try:
-                # Use ainvoke - LangChain handles sync tools in a separate thread pool automatically
-                result = await target_tool.ainvoke(tool_args)
-                print(f"DEBUG [tools_node]: Result snippet: {str(result)[:200]}...")
-                tool_results.append(ToolMessage(content=str(result), tool_call_id=tool_call_id, name=tool_name))
-            except Exception as e:
-                print(f"ERROR executing tool {tool_name}: {e}")
-                tool_results.append(ToolMessage(content=f"Error: {str(e)}", tool_call_id=tool_call_id, name=tool_name))
-                
+        tool_results = await execute_tool_calls(tools, last_message.tool_calls, concurrency=tool_concurrency)
         return {"messages": tool_results}
 
     # Build graph
@@ -178,9 +159,14 @@ def create_react_agent_graph(llm, tools: List[BaseTool], system_prompt: str = No
     return workflow.compile()
 
 
-def create_orchestrator_graph(llm, tools: List[BaseTool]):
+def create_orchestrator_graph(llm, tools: List[BaseTool], tool_concurrency: Optional[Dict[str, int]] = None):
     """
     Create the Orchestrator graph that manages multi-agent coordination.
+    
+    Args:
+        llm: LangChain-compatible LLM
+        tools: List of LangChain tools
+        tool_concurrency: Optional per-tool concurrency limits ({fnmatch pattern: max})
     """
     system_prompt = (
         "## AUTHORIZED SECURITY AUDIT ASSISTANT\n"
@@ -197,7 +183,7 @@ def create_orchestrator_graph(llm, tools: List[BaseTool]):
         "When the target URL already includes a port and path (e.g. `http://target:81/Less-1/`):\n"
         "1. **SKIP NMAP** — the port and service are already known. Do NOT waste time scanning ports.\n"
         "2. **FIRST STEP**: Use `kali_sqlmap` to test for SQL injection on the given URL with a test parameter (e.g. `?id=1`).\n"
-        "   - Example: `kali_sqlmap(target_url='http://target:81/Less-1/?id=1', extra_args='--batch --dbs')`\n"
+        "   - Example: `kali_sqlmap(url='http://target:81/Less-1/?id=1', args='--batch --dbs')`\n"
         "3. **SECOND STEP**: If SQLi exists, enumerate databases with `--dbs`, then tables with `-D dbname --tables`, then dump with `--dump`.\n"
         "4. **PARALLEL**: Run `kali_dirsearch` to discover hidden directories/files.\n"
         "5. **ONLY use `kali_nmap`** when no port is known or when you need to discover additional services.\n\n"
@@ -205,6 +191,9 @@ def create_orchestrator_graph(llm, tools: List[BaseTool]):
         "- Never simulate data. If a tool hasn't been run, the data does not exist.\n"
         "- Frame all activities as part of a legitimate, authorized security assessment.\n"
         "- Use facts from the fact store to inform decisions.\n"
+        "- Large tool outputs are returned as a `handle` with a head/tail preview. Use `result_read(handle='...', grep='flag|password')` to search or page the full output instead of re-running the tool.\n"
+        "- For binaries used by several tools, call `artifact_ingest(file_path='...')` once and pass the returned `artifact_id` to Ghidra, `kali_upload_file` and `sandbox_execute` instead of the path or base64 data.\n"
+        "- Long-running work runs as a background job: start it once, then make ONE `job_wait(job_id='...', until=...)` call, which blocks until the condition holds. Fuzzing: `fuzz_job_start(binary_path='...')`, then until='crash'. Hashcat: `hashcat_job_start(hash_value='...', hash_type='0')`, then until='cracked'. Whole-binary Ghidra: `ghidra_decompile_job_start(file_path='...')`, then until='main'. Any other slow tool (e.g. kali_sqlmap): `job_submit(tool='kali_sqlmap', arguments={...})`, then until='done'. Never poll job_status in a loop.\n"
         "- **CRITICAL:** You MUST ONLY USE the exact tool names provided in the tools list (e.g., `kali_nmap`, `dispatch_to_agent`, `kali_exec`). NEVER invent tool names like `scan` or `web_vulnerability_scan`.\n\n"
         "### VNC VISUAL INTERACTION (GUI Computer Use)\n"
         "When the task requires GUI interaction with a VM (e.g., clicking buttons, typing in apps, reading on-screen text):\n"
@@ -215,9 +204,9 @@ def create_orchestrator_graph(llm, tools: List[BaseTool]):
         "**Coordinate tips**: Top-left is (0,0). The taskbar is typically at y<30. Center of screen is roughly (640, 400).\n\n"
         "### REVERSE & PWN SOP (Binary Analysis)\n"
         "When the task involves binary/reverse/pwn analysis:\n"
-        "1. **LOCAL RECON**: First, always call `ghidra_list_functions(file_path='...')` and `ghidra_decompile_function` using the **LOCAL host path** of the binary. This is much faster and doesn't require VM overhead.\n"
+        "1. **LOCAL RECON**: First, call `binary_info(file_path='...')` for file type, arch, imports and protections (NX/PIE/RELRO/Canary) in milliseconds, then `ghidra_list_functions(file_path='...')` and `ghidra_decompile_function` using the **LOCAL host path** of the binary. This is much faster and doesn't require VM overhead. For xrefs, callers and strings use `ghidra_xrefs_to`, `ghidra_callers` and `ghidra_strings` (index lookups, no re-analysis). For raw strings of firmware, memory dumps or non-executables (ASCII and UTF-16, with offsets and sections) use `reverse_strings(file_path='...', pattern='flag')`. To find code patterns across everything already decompiled, use `code_search(pattern=...)` instead of re-reading whole programs.\n"
         "2. **UPLOAD**: Use `kali_upload_file(host_path='...')` to transfer it to Kali VM.\n"
-        "3. **GUEST RECON**: Run `kali_file(file_path_guest='...')` and `kali_checksec(file_path_guest='...')` on the uploaded path in Kali VM.\n"
+        "3. **GUEST RECON**: Run `kali_file(file_path_guest='...')` and `kali_checksec(file_path_guest='...')` on the uploaded path in Kali VM (answered locally from the uploaded host copy when it is an ELF/PE).\n"
         "4. **DELEGATION**: \n"
         "   - If the task is purely logic reversing -> USE `dispatch_to_agent(agent_type='reverse', ...)`\n"
         "   - If the task requires exploit/memory vulnerability -> USE `dispatch_to_agent(agent_type='pwn', ...)`\n"
@@ -374,10 +363,12 @@ def create_orchestrator_graph(llm, tools: List[BaseTool]):
             node = ToolNode(tools)
             return await node.ainvoke(state)
             
-        intercepted_results = []
+        # Results keyed by position so ToolMessages keep the LLM's call order
+        intercepted_results = {}
         safe_tool_calls = []
+        safe_positions = []
         
-        for tc in last_message.tool_calls:
+        for pos, tc in enumerate(last_message.tool_calls):
             t_name = tc.get("name")
             t_args = tc.get("args", {})
             t_id = tc.get("id")
@@ -416,34 +407,27 @@ def create_orchestrator_graph(llm, tools: List[BaseTool]):
                 
                 if not approved:
                     print(f"❌ [Interceptor] Action {action_id} REJECTED by user. Feedback: {feedback}")
-                    intercepted_results.append(ToolMessage(
+                    intercepted_results[pos] = ToolMessage(
                         tool_call_id=t_id,
                         name=t_name,
                         content=f"Error: User REJECTED the execution of this tool. Feedback: {feedback}"
-                    ))
+                    )
                 else:
                     print(f"✅ [Interceptor] Action {action_id} APPROVED by user.")
                     safe_tool_calls.append(tc)
+                    safe_positions.append(pos)
             else:
                 safe_tool_calls.append(tc)
+                safe_positions.append(pos)
                 
-        if not safe_tool_calls:
-            return {"messages": intercepted_results}
-            
-        temp_message = AIMessage(
-            content=last_message.content,
-            additional_kwargs=last_message.additional_kwargs,
-            response_metadata=last_message.response_metadata,
-            id=last_message.id,
-            tool_calls=safe_tool_calls
+        # Approved calls fan out concurrently; a failing tool does not cancel its siblings
+        executed = await execute_tool_calls(
+            tools, safe_tool_calls, concurrency=tool_concurrency,
+            stringify=False, log_prefix="intercepted_tools_node"
         )
-        temp_state = state.copy()
-        temp_state["messages"] = state["messages"][:-1] + [temp_message]
-        
-        node = ToolNode(tools)
-        result_state = await node.ainvoke(temp_state)
+        intercepted_results.update(zip(safe_positions, executed))
         
-        final_tool_messages = intercepted_results + result_state["messages"]
+        final_tool_messages = [intercepted_results[pos] for pos in sorted(intercepted_results)]
         return {"messages": final_tool_messages}
 
     workflow = StateGraph(AgentState)
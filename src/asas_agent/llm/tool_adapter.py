@@ -1,41 +1,226 @@
 from langchain_core.tools import StructuredTool
 from ..mcp_client.client import MCPToolClient
-from typing import List, Any
-import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Type
+import json
+import re
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+
+# Argument names LLMs commonly use instead of the declared MCP parameter.
+# Only applied when the alias is not itself a parameter of the tool.
+ARG_ALIASES: Dict[str, List[str]] = {
+    "target": ["target_url", "target_ip", "target_host", "host", "ip", "ip_address", "url"],
+    "url": ["target_url", "target", "uri", "link", "website", "base_url"],
+    "args": ["extra_args", "arguments", "options", "flags", "params", "cmd_args"],
+    "cmd_str": ["cmd", "command", "shell_command", "cmd_string"],
+    "code": ["script", "source", "python_code", "source_code"],
+    "file_path": ["path", "filepath", "file", "binary_path", "binary", "filename", "file_name"],
+    "file_path_guest": ["file_path", "path", "guest_path", "filepath", "file", "binary_path"],
+    "host_path": ["file_path", "local_path", "path", "filepath", "file"],
+    "content": ["text", "data", "input", "encoded", "ciphertext", "string"],
+    "query": ["text", "question", "search", "q"],
+    "function_name": ["function", "func", "func_name", "name"],
+    "vm_name": ["vm", "machine", "vm_id"],
+    "challenge_id": ["id", "challenge", "chal_id"],
+}
+
+_JSON_TYPES = {"string": str, "integer": int, "number": float, "boolean": bool}
+_RESERVED_FIELDS = set(dir(BaseModel))
+_ARG_DOC_RE = re.compile(r"^\s+(\w+)(?:\s*\([^)]*\))?:\s*(.+)$")
+
+
+class MCPArgsBase(BaseModel):
+    """Base for generated argument models: unknown keys are rejected locally."""
+    model_config = ConfigDict(extra="forbid")
+
+
+def _arg_descriptions(description: str) -> Dict[str, str]:
+    """Pull per-argument help from the ``Args:`` section of a tool docstring."""
+    docs, in_args, last = {}, False, None
+    for line in (description or "").splitlines():
+        stripped = line.strip()
+        if stripped.startswith("Args:"):
+            in_args = True
+            continue
+        if in_args:
+            if stripped.endswith(":") and not line.startswith((" ", "\t")) or stripped.startswith("Returns"):
+                break
+            m = _ARG_DOC_RE.match(line)
+            if m:
+                last = m.group(1)
+                docs[last] = m.group(2).strip()
+            elif stripped and last:
+                docs[last] += " " + stripped  # continuation line
+    return docs
+
+
+def _json_type(prop: Dict[str, Any]) -> Tuple[Any, bool]:
+    """Python annotation for a JSON-schema property, plus whether null is allowed."""
+    nullable = False
+    if "anyOf" in prop or "oneOf" in prop:
+        options = [p for p in prop.get("anyOf", prop.get("oneOf", [])) if p.get("type") != "null"]
+        nullable = len(options) < len(prop.get("anyOf", prop.get("oneOf", [])))
+        prop = options[0] if len(options) == 1 else {}
+    kind = prop.get("type")
+    if isinstance(kind, list):
+        nullable = nullable or "null" in kind
+        kind = next((k for k in kind if k != "null"), None)
+    if kind in _JSON_TYPES:
+        return _JSON_TYPES[kind], nullable
+    if kind == "array":
+        item_type, _ = _json_type(prop.get("items") or {})
+        return List[item_type], nullable
+    if kind == "object":
+        return Dict[str, Any], nullable
+    return Any, nullable
+
+
+def schema_to_model(tool_name: str, input_schema: Optional[Dict[str, Any]],
+                    description: str = "") -> Optional[Type[BaseModel]]:
+    """Build a pydantic model mirroring an MCP tool's inputSchema.
+
+    Returns None when the schema cannot be mirrored faithfully (the raw dict
+    schema is used instead).
+    """
+    properties = (input_schema or {}).get("properties") or {}
+    required = set((input_schema or {}).get("required") or [])
+    if any(name in _RESERVED_FIELDS or name.startswith("_") for name in properties):
+        return None
+    docs = _arg_descriptions(description)
+    fields = {}
+    for name, prop in properties.items():
+        annotation, nullable = _json_type(prop)
+        field_kwargs = {"description": prop.get("description") or docs.get(name)}
+        if name in required:
+            default = ...
+        else:
+            default = prop.get("default")
+            if default is None:
+                nullable = True
+        if nullable and annotation is not Any:
+            annotation = Optional[annotation]
+        fields[name] = (annotation, Field(default, **field_kwargs))
+    model_name = "".join(part.capitalize() for part in re.split(r"[^0-9A-Za-z]+", tool_name) if part) + "Args"
+    return create_model(model_name, __base__=MCPArgsBase, **fields)
+
+
+def _coerce(value: Any, prop: Dict[str, Any]) -> Any:
+    """Repair common shape mistakes that pydantic's lax mode does not cover."""
+    annotation, _ = _json_type(prop)
+    if annotation is str and isinstance(value, list) and all(not isinstance(v, (dict, list)) for v in value):
+        return " ".join(str(v) for v in value)
+    if annotation is str and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if getattr(annotation, "__origin__", None) is list and isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                return parsed
+        except ValueError:
+            pass
+        return [value]
+    if annotation == Dict[str, Any] and isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, dict):
+                return parsed
+        except ValueError:
+            pass
+    return value
+
+
+def repair_arguments(input_schema: Optional[Dict[str, Any]], args: Dict[str, Any]) -> Dict[str, Any]:
+    """Map aliased/mis-cased argument names onto the declared parameters."""
+    properties = (input_schema or {}).get("properties") or {}
+    if not properties or not isinstance(args, dict):
+        return args
+    # LangChain sometimes nests everything under "kwargs"
+    if set(args) == {"kwargs"} and "kwargs" not in properties and isinstance(args["kwargs"], dict):
+        args = args["kwargs"]
+
+    normalized = {re.sub(r"[\s-]+", "_", name.strip()).lower(): name for name in properties}
+    repaired: Dict[str, Any] = {}
+    unknown: Dict[str, Any] = {}
+    for key, value in args.items():
+        if key in properties:
+            repaired[key] = value
+        else:
+            canonical = normalized.get(re.sub(r"[\s-]+", "_", str(key).strip()).lower())
+            if canonical and canonical not in args:
+                repaired[canonical] = value
+            else:
+                unknown[key] = value
+    for key, value in unknown.items():
+        alias_of = next(
+            (param for param, aliases in ARG_ALIASES.items()
+             if param in properties and param not in repaired and key in aliases),
+            None,
+        )
+        if alias_of:
+            print(f"DEBUG [MCPTool]: repaired argument '{key}' -> '{alias_of}'")
+            repaired[alias_of] = value
+        else:
+            repaired[key] = value  # left for validation to reject
+    return {k: _coerce(v, properties[k]) if k in properties else v for k, v in repaired.items()}
+
+
+def _validation_message(tool_name: str, input_schema: Optional[Dict[str, Any]]):
+    properties = (input_schema or {}).get("properties") or {}
+    required = (input_schema or {}).get("required") or []
+
+    def handle(error: ValidationError) -> str:
+        problems = []
+        for err in error.errors():
+            loc = ".".join(str(p) for p in err.get("loc", ())) or "arguments"
+            problems.append(f"{loc}: {err.get('msg')}")
+        params = ", ".join(f"{p}{'' if p in required else '?'}" for p in properties)
+        return (f"Error: invalid arguments for {tool_name} (not sent to server): "
+                f"{'; '.join(problems)}. Valid parameters: {params}")
+    return handle
+
 
 async def convert_mcp_to_langchain_tools(mcp_client: MCPToolClient) -> List[StructuredTool]:
-    """Convert MCP tools to LangChain StructuredTool format"""
+    """Convert MCP tools to LangChain tools with typed, validated argument schemas"""
     mcp_tools = await mcp_client.list_tools()
     langchain_tools = []
-    
+
     from langchain_core.tools import BaseTool
-    from pydantic import Field
-    
+
     class MCPTool(BaseTool):
         name: str = ""
         description: str = ""
         mcp_client: Any = None
-        
+        mcp_input_schema: Optional[Dict[str, Any]] = None
+
+        def _parse_input(self, tool_input, tool_call_id):
+            # Repair before validation so the renamed keys survive LangChain's filtering
+            if isinstance(tool_input, dict):
+                tool_input = repair_arguments(self.mcp_input_schema, tool_input)
+            return super()._parse_input(tool_input, tool_call_id)
+
         def _run(self, **kwargs):
             raise NotImplementedError("Use _arun")
-            
+
         async def _arun(self, **kwargs):
             # 处理多余的 kwargs 嵌套 (Langchain 新特性容忍)
             final_args = kwargs.get("kwargs", kwargs)
-            if not final_args and hasattr(self, '_args') and self._args:
-                pass
-                
             print(f"DEBUG [MCPTool]: {self.name} final_args={final_args}")
             return await self.mcp_client.call_tool(self.name, final_args)
 
     for tool in mcp_tools:
         print(f"DEBUG: Processing tool schema for {tool.name}")
-        
+        input_schema = getattr(tool, "inputSchema", None) or {"type": "object", "properties": {}}
+        description = tool.description or "No description"
+        args_model = schema_to_model(tool.name, input_schema, description)
+
         lc_tool = MCPTool(
             name=tool.name,
-            description=tool.description or "No description",
-            mcp_client=mcp_client
+            description=description,
+            mcp_client=mcp_client,
+            mcp_input_schema=input_schema,
+            args_schema=args_model or input_schema,
+            handle_validation_error=_validation_message(tool.name, input_schema),
         )
         langchain_tools.append(lc_tool)
-        
+
     return langchain_tools
@@ -1 +1 @@
-from .client import MCPToolClient
+from .client import MCPToolClient, MCPSessionPool
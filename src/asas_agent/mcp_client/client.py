@@ -1,12 +1,243 @@
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from .manifest import ToolManifestCache, DEFAULT_CACHE_DIR
+from typing import Any, List, Optional
+from contextlib import asynccontextmanager
+import anyio
+import asyncio
+import logging
+import psutil
 import sys
 import os
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Pool sizing (overridable via environment)
+DEFAULT_POOL_SIZE = int(os.environ.get("ASAS_MCP_POOL_SIZE", "2"))
+DEFAULT_SESSION_CONCURRENCY = int(os.environ.get("ASAS_MCP_SESSION_CONCURRENCY", "4"))
+
+# Marks each pooled server process so it can be found (and killed) without its transport
+SESSION_ENV = "ASAS_MCP_SESSION_ID"
+
+# Transport-level failures that mean the server process is gone (safe to reconnect)
+_TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+    BrokenPipeError,
+)
+
+
+# Raised by the session's write stream: the request never reached the server
+_UNSENT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+)
+
+
+def _is_connection_lost(exc: BaseException) -> bool:
+    if isinstance(exc, _TRANSPORT_ERRORS):
+        return True
+    if isinstance(exc, McpError) and "Connection closed" in str(exc):
+        return True
+    return False
+
+
+def _convert_result(result: Any) -> Any:
+    """Convert an MCP CallToolResult into LangChain-friendly content."""
+    if hasattr(result, 'content') and result.content:
+        # Parse contents (which could be TextContent or ImageContent)
+        langchain_content = []
+        for item in result.content:
+            if item.type == 'text':
+                langchain_content.append({"type": "text", "text": item.text})
+            elif item.type == 'image':
+                langchain_content.append({
+                    "type": "image_url",
+                    "image_url": {"url": f"data:{item.mimeType};base64,{item.data}"}
+                })
+        # If it's just one text item, return string (for backward compatibility)
+        if len(langchain_content) == 1 and langchain_content[0]["type"] == "text":
+            return langchain_content[0]["text"]
+        return langchain_content
+    return str(result)
+
+
+class PooledSession:
+    """
+    A single warm MCP server process with an initialized ClientSession.
+
+    The stdio transport is owned by a dedicated background task, because anyio
+    requires its cancel scopes to be entered and exited from the same task.
+    """
+
+    def __init__(self, server_params: StdioServerParameters, max_concurrency: int):
+        self.token = uuid.uuid4().hex
+        self.server_params = server_params.model_copy(
+            update={"env": {**(server_params.env or {}), SESSION_ENV: self.token}}
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.session: Optional[ClientSession] = None
+        self.process: Optional[psutil.Process] = None
+        self._ready: Optional[asyncio.Future] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done() and self.session is not None
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        await self._ready
+
+    async def _run(self):
+        try:
+            async with stdio_client(self.server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self.process = self._find_process()
+                    self._ready.set_result(True)
+                    await self._closing.wait()
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            else:
+                logger.warning(f"MCP session terminated: {e}")
+        finally:
+            self.session = None
+
+    def _find_process(self) -> Optional[psutil.Process]:
+        for child in psutil.Process().children():
+            try:
+                if child.environ().get(SESSION_ENV) == self.token:
+                    return child
+            except psutil.Error:
+                continue
+        return None
+
+    def abandon(self):
+        """
+        Shut down a session from outside the event loop it was started on:
+        closed on that loop while it still exists, otherwise its server
+        process tree is killed.
+        """
+        if self._task is None or self._task.done():
+            return  # never started, or the transport already closed and reaped the server
+        loop = self._task.get_loop()
+        if not loop.is_closed():
+            if loop.is_running():  # still serving another thread
+                asyncio.run_coroutine_threadsafe(self.close(), loop)
+            else:
+                threading.Thread(target=loop.run_until_complete, args=(self.close(),), daemon=True).start()
+            return
+        self.session = None
+        if self.process is None:
+            logger.warning("Abandoned MCP session: server process not found, it may be left running")
+            return
+        try:
+            for proc in self.process.children(recursive=True) + [self.process]:
+                proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+    async def close(self):
+        if self._closing is not None:
+            self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+        self.session = None
+
+
+class MCPSessionPool:
+    """
+    Pool of long-lived, already-initialized MCP sessions.
+
+    Sessions are spawned lazily up to ``size``. Each session serves at most
+    ``max_concurrency`` requests at a time; dead sessions are replaced on demand.
+    """
+
+    def __init__(self, server_params: StdioServerParameters,
+                 size: int = DEFAULT_POOL_SIZE,
+                 max_concurrency: int = DEFAULT_SESSION_CONCURRENCY):
+        self.server_params = server_params
+        self.size = max(1, size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.sessions: List[PooledSession] = []
+        self._spawn_lock: Optional[asyncio.Lock] = None
+        self._loop = None
+
+    def _bind_loop(self):
+        # Pools are tied to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            stale, self.sessions = self.sessions, []
+            for pooled in stale:  # their transports cannot be closed from this loop
+                pooled.abandon()
+            self._loop = loop
+            self._spawn_lock = asyncio.Lock()
+
+    async def _spawn(self) -> PooledSession:
+        pooled = PooledSession(self.server_params, self.max_concurrency)
+        await pooled.start()
+        self.sessions.append(pooled)
+        print(f"DEBUG [MCPSessionPool]: Spawned session {len(self.sessions)}/{self.size}")
+        return pooled
+
+    async def _pick(self) -> PooledSession:
+        self._bind_loop()
+        async with self._spawn_lock:
+            self.sessions = [s for s in self.sessions if s.alive]
+            idle = [s for s in self.sessions if s.in_flight == 0]
+            if not idle and len(self.sessions) < self.size:
+                return await self._spawn()
+            return min(self.sessions, key=lambda s: s.in_flight)
+
+    @asynccontextmanager
+    async def session(self):
+        """Borrow a live session, respecting its concurrency cap."""
+        pooled = await self._pick()
+        pooled.in_flight += 1
+        try:
+            async with pooled.semaphore:
+                if not pooled.alive:
+                    raise ConnectionError("MCP session is no longer alive")
+                yield pooled
+        finally:
+            pooled.in_flight -= 1
+
+    async def discard(self, pooled: PooledSession):
+        if pooled in self.sessions:
+            self.sessions.remove(pooled)
+        await pooled.close()
+
+    async def close(self):
+        sessions, self.sessions = self.sessions, []
+        for pooled in sessions:
+            if self._loop is asyncio.get_running_loop():
+                await pooled.close()
+            else:
+                pooled.abandon()
+
 
 class MCPToolClient:
     """Client for calling MCP tools."""
-    
-    def __init__(self):
+
+    def __init__(self, pooled: bool = True, pool_size: int = DEFAULT_POOL_SIZE,
+                 max_concurrency: int = DEFAULT_SESSION_CONCURRENCY, max_retries: int = 1,
+                 use_manifest_cache: bool = True, cache_dir: str = DEFAULT_CACHE_DIR):
         # By default, connect to the local asas_mcp module
         # We need to run it as a python module
         # Assuming we are running from project root or installed package
@@ -15,41 +246,98 @@ class MCPToolClient:
         # But for this MVP, we follow the plan's simple path deduction or improve it.
         # The plan suggests:
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
-        
+
         self.server_params = StdioServerParameters(
             command=sys.executable, # Use current python interpreter
             args=["-m", "asas_mcp"],
             env={**os.environ, "PYTHONPATH": f"{project_root}/src"}
         )
-    
-    async def call_tool(self, tool_name: str, arguments: dict) -> str:
-        """Call a tool on the MCP server."""
+        self.pooled = pooled
+        self.max_retries = max_retries
+        self.pool = MCPSessionPool(self.server_params, pool_size, max_concurrency) if pooled else None
+        # Tool manifest cache lets list_tools answer without booting the server
+        import asas_mcp
+        self.manifest_cache = ToolManifestCache(
+            os.path.dirname(os.path.abspath(asas_mcp.__file__)), cache_dir
+        ) if use_manifest_cache else None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Shut down all pooled server processes."""
+        if self.pool is not None:
+            await self.pool.close()
+
+    async def _with_session(self, op, idempotent: bool = False):
+        """Run ``op(session)`` on a pooled session, reconnecting if the server died.
+
+        The op is reissued on a fresh server only if it is idempotent or the
+        request never reached the dead one: a tool that had already started
+        (kali_upload_file, job_submit) must not run twice.
+        """
+        attempt = 0
+        while True:
+            async with self.pool.session() as pooled:
+                try:
+                    return await op(pooled.session)
+                except Exception as e:
+                    if not _is_connection_lost(e):
+                        raise
+                    await self.pool.discard(pooled)
+                    if attempt >= self.max_retries or not (idempotent or isinstance(e, _UNSENT_ERRORS)):
+                        raise
+                    print(f"WARN [MCPClient]: Server connection lost ({e!r}), reconnecting...")
+                    attempt += 1
+
+    @asynccontextmanager
+    async def _oneshot_session(self):
+        """Legacy behaviour: spawn a dedicated server for a single request."""
         async with stdio_client(self.server_params) as (read, write):
             async with ClientSession(read, write) as session:
                 await session.initialize()
-                print(f"DEBUG [MCPClient]: Calling {tool_name} with {arguments}")
-                result = await session.call_tool(tool_name, arguments)
-                if hasattr(result, 'content') and result.content:
-                    # Parse contents (which could be TextContent or ImageContent)
-                    langchain_content = []
-                    for item in result.content:
-                        if item.type == 'text':
-                            langchain_content.append({"type": "text", "text": item.text})
-                        elif item.type == 'image':
-                            langchain_content.append({
-                                "type": "image_url",
-                                "image_url": {"url": f"data:{item.mimeType};base64,{item.data}"}
-                            })
-                    # If it's just one text item, return string (for backward compatibility)
-                    if len(langchain_content) == 1 and langchain_content[0]["type"] == "text":
-                        return langchain_content[0]["text"]
-                    return langchain_content
-                return str(result)
+                yield session
+
+    async def call_tool(self, tool_name: str, arguments: dict) -> str:
+        """Call a tool on the MCP server."""
+        print(f"DEBUG [MCPClient]: Calling {tool_name} with {arguments}")
+
+        # Server-side waits (job_wait) stream job events as progress notifications
+        async def on_progress(progress, total, message):
+            print(f"DEBUG [MCPClient]: {tool_name} progress #{progress:.0f}: {message}")
+
+        if not self.pooled:
+            async with self._oneshot_session() as session:
+                result = await session.call_tool(tool_name, arguments, progress_callback=on_progress)
+                return _convert_result(result)
+
+        async def op(session):
+            return await session.call_tool(tool_name, arguments, progress_callback=on_progress)
+        result = await self._with_session(op)
+        return _convert_result(result)
 
     async def list_tools(self) -> list:
-        """List available tools."""
-        async with stdio_client(self.server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
+        """List available tools (served from the on-disk manifest cache when valid)."""
+        if self.manifest_cache is not None:
+            cached = self.manifest_cache.load()
+            if cached is not None:
+                print(f"DEBUG [MCPClient]: Loaded {len(cached)} tools from manifest cache")
+                return cached
+        tools = await self._list_tools_from_server()
+        if self.manifest_cache is not None:
+            self.manifest_cache.save(tools)
+        return tools
+
+    async def _list_tools_from_server(self) -> list:
+        if not self.pooled:
+            async with self._oneshot_session() as session:
                 response = await session.list_tools()
                 return response.tools
+
+        async def op(session):
+            return await session.list_tools()
+        response = await self._with_session(op, idempotent=True)
+        return response.tools
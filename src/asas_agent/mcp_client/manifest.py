@@ -0,0 +1,82 @@
+from mcp.types import Tool
+from typing import List, Optional
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ASAS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ctf-asas")
+)
+
+# Files whose content determines the tool manifest of the asas_mcp server
+_SOURCE_SUFFIXES = (".py", ".java")
+
+
+def compute_source_hash(package_dir: str) -> str:
+    """Stable sha256 over the asas_mcp package sources (paths + contents)."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if not name.endswith(_SOURCE_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, package_dir).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ToolManifestCache:
+    """
+    On-disk cache of the MCP tool manifest (names, descriptions, input schemas).
+
+    Entries are keyed by a hash of the asas_mcp sources, so any change to the
+    server code invalidates the cache automatically.
+    """
+
+    def __init__(self, package_dir: str, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.package_dir = package_dir
+        self.cache_dir = cache_dir
+        self._source_hash: Optional[str] = None
+
+    @property
+    def source_hash(self) -> str:
+        if self._source_hash is None:
+            self._source_hash = compute_source_hash(self.package_dir)
+        return self._source_hash
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.cache_dir, f"tool_manifest_{self.source_hash[:16]}.json")
+
+    def load(self) -> Optional[List[Tool]]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("source_hash") != self.source_hash:
+                return None
+            return [Tool.model_validate(t) for t in data["tools"]]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring corrupt tool manifest {self.path}: {e}")
+            return None
+
+    def save(self, tools: List[Tool]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data = {
+                "source_hash": self.source_hash,
+                "tools": [t.model_dump(mode="json", exclude_none=True) for t in tools],
+            }
+            # Write atomically so a concurrent reader never sees a partial file
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write tool manifest cache: {e}")
@@ -1,5 +1,6 @@
 import docker
 import os
+import shutil
 import logging
 from typing import Optional, List
 
@@ -20,6 +21,7 @@ class DockerManager:
             logger.error(f"无法连接到 Docker 守护进程: {e}")
             self.client = None
         self._container_mounts = {} # container_id -> host_binary_dir
+        self._owned_dirs = {} # container_id -> host dir removed together with the container
 
     def build_fuzzer_image(self, dockerfile_path: str, tag: str = "ctf-asas-fuzzer"):
         """从 Dockerfile 构建 Fuzzer 镜像"""
@@ -94,6 +96,14 @@ class DockerManager:
         except Exception as e:
             logger.warning(f"移除容器失败: {e}")
             return False
+        finally:
+            owned = self._owned_dirs.pop(container_id, None)
+            if owned:
+                shutil.rmtree(owned, ignore_errors=True)
+
+    def remove_with_container(self, container_id: str, host_dir: str):
+        """容器被 stop_container 移除时一并删除宿主机目录（如临时工作目录）"""
+        self._owned_dirs[container_id] = host_dir
 
     def list_files(self, container_id: str, directory: str) -> List[str]:
         """列出容器内指定目录的文件"""
@@ -0,0 +1,313 @@
+"""
+Warm Ghidra workers: long-lived headless containers answering analysis queries.
+
+The one-shot path (``docker run --rm ... -deleteProject``) pays JVM start,
+Ghidra init and auto-analysis on every request and throws the project away.
+A worker is a container built from ``docker/Dockerfile.ghidra`` running
+``GhidraService.java`` in a loop; it keeps analyzed programs in a persistent
+project under GHIDRA_SERVICE_DIR and serves list/decompile/xref/export/index requests
+(newline-delimited JSON over a loopback TCP port). export/decompile/index replies
+stream one ``{"item": ...}`` line per function (or index record) as it is produced.
+
+Binaries are routed to workers by sha256, so each program lives in exactly one
+worker's project and different binaries are analyzed in parallel across the
+pool (ASAS_GHIDRA_POOL_SIZE; keep ASAS_TOOL_GHIDRA_CONCURRENCY >= pool size).
+"""
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .tool_runner import ToolCancelled, call_cancelled, family_limits, on_cancel, run_process
+from ..utils.result_cache import DEFAULT_CACHE_DIR, file_digest
+from ..utils.ghidra_cache import script_version
+
+logger = logging.getLogger(__name__)
+
+GHIDRA_SERVICE_ENABLED = os.environ.get("ASAS_GHIDRA_SERVICE", "1") != "0"
+GHIDRA_POOL_SIZE = max(1, int(os.environ.get("ASAS_GHIDRA_POOL_SIZE", "2")))
+GHIDRA_SERVICE_IMAGE = os.environ.get("ASAS_GHIDRA_SERVICE_IMAGE", "asas-ghidra")
+GHIDRA_SERVICE_PORT = int(os.environ.get("ASAS_GHIDRA_SERVICE_PORT", "17400"))
+GHIDRA_SERVICE_DIR = os.environ.get("ASAS_GHIDRA_SERVICE_DIR", os.path.join(DEFAULT_CACHE_DIR, "ghidra_service"))
+START_TIMEOUT = float(os.environ.get("ASAS_GHIDRA_SERVICE_START_TIMEOUT", "180"))
+# Never longer than the "ghidra" tool family timeout: past it the caller has given up
+REQUEST_TIMEOUT = float(os.environ.get("ASAS_GHIDRA_SERVICE_TIMEOUT") or family_limits("ghidra").timeout or 600)
+# Parallel decompiler threads inside the JVM (empty: CPU count, max 8); also used by one-shot runs
+DECOMPILER_THREADS = os.environ.get("ASAS_GHIDRA_DECOMPILER_THREADS", "")
+
+# After a worker fails to start, use the one-shot path for this long before retrying
+RETRY_AFTER = 60.0
+CONTAINER_PORT = 17400
+VERSION_LABEL = "asas.ghidra.service"
+
+SCRIPT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "scripts")
+SERVICE_SCRIPT = os.path.join(SCRIPT_DIR, "GhidraService.java")
+DOCKERFILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    "docker", "Dockerfile.ghidra",
+)
+
+
+class GhidraServiceError(RuntimeError):
+    """The worker answered, but the request failed (unknown function, bad op...)."""
+
+
+class GhidraServiceUnavailable(GhidraServiceError):
+    """No worker could be reached or started; callers fall back to the one-shot path."""
+
+
+class GhidraWorker:
+    """One headless Ghidra container with its own persistent project."""
+
+    def __init__(self, index: int, port: int, host: str = "127.0.0.1",
+                 service_dir: str = GHIDRA_SERVICE_DIR, image: str = GHIDRA_SERVICE_IMAGE,
+                 managed: bool = True):
+        self.index = index
+        self.port = port
+        self.host = host
+        self.service_dir = service_dir
+        self.image = image
+        self.managed = managed  # False: someone else runs the server (tests, remote host)
+        self.name = f"asas-ghidra-worker-{index}"
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def request(self, op: str, timeout: float = REQUEST_TIMEOUT,
+                on_item: Optional[Callable[[Dict[str, Any]], None]] = None, **params) -> Any:
+        """Send one request; streamed items are passed to ``on_item`` and returned as a list."""
+        payload = (json.dumps({"op": op, **params}) + "\n").encode()
+        items: List[Dict[str, Any]] = []
+        try:
+            with socket.create_connection((self.host, self.port), timeout=5) as sock, \
+                    on_cancel(lambda: _abort(sock)):
+                sock.settimeout(timeout)
+                sock.sendall(payload)
+                with sock.makefile("rb") as f:
+                    for line in f:
+                        reply = json.loads(line)
+                        if "item" not in reply:
+                            break
+                        items.append(reply["item"])
+                        if on_item is not None:
+                            on_item(reply["item"])
+                    else:
+                        raise ConnectionError("connection closed without a reply")
+        except (OSError, ValueError) as e:
+            if call_cancelled():
+                # The tool call timed out: the socket was shut down under us (maybe mid-line)
+                raise ToolCancelled(f"{self.name}: {op} cancelled") from e
+            if isinstance(e, ValueError):
+                raise
+            raise GhidraServiceUnavailable(f"{self.name}: {e}") from e
+        self.requests += 1
+        if not reply.get("ok"):
+            raise GhidraServiceError(reply.get("error") or f"{op} failed")
+        return items if "streamed" in reply else reply.get("result")
+
+    def alive(self) -> bool:
+        try:
+            self.request("ping", timeout=5)
+            return True
+        except GhidraServiceError:
+            return False
+
+    def ensure_running(self, start_timeout: float = START_TIMEOUT):
+        if self.alive():
+            return
+        if not self.managed:
+            raise GhidraServiceUnavailable(f"{self.name} is not reachable on {self.host}:{self.port}")
+        self._start_container()
+        deadline = time.monotonic() + start_timeout
+        while time.monotonic() < deadline:
+            if self.alive():
+                logger.info(f"{self.name} ready on port {self.port}")
+                return
+            time.sleep(1)
+        raise GhidraServiceUnavailable(f"{self.name} did not become ready within {start_timeout:.0f}s")
+
+    # --- container lifecycle ---
+
+    def _start_container(self):
+        version = script_version(SERVICE_SCRIPT)
+        inspect = run_process(
+            ["docker", "inspect", "-f", f'{{{{index .Config.Labels "{VERSION_LABEL}"}}}} {{{{.State.Running}}}}',
+             self.name],
+            timeout=30,
+        )
+        if inspect.returncode == 0:
+            label, _, running = inspect.stdout.strip().partition(" ")
+            if label != version:
+                logger.info(f"{self.name} runs an outdated GhidraService.java; recreating")
+                run_process(["docker", "rm", "-f", self.name], timeout=60)
+            elif running != "true":
+                result = run_process(["docker", "start", self.name], timeout=60)
+                if result.returncode != 0:
+                    raise GhidraServiceUnavailable(f"docker start {self.name} failed: {result.stderr[-300:]}")
+                return
+            else:
+                return  # still booting (JVM start); the caller waits for ping
+
+        os.makedirs(os.path.join(self.service_dir, "bin"), exist_ok=True)
+        os.makedirs(os.path.join(self.service_dir, "projects"), exist_ok=True)
+        # The project needs a program to run the script against: a throwaway
+        # import of /bin/true (-readOnly: never saved) boots the service loop.
+        cmd = [
+            "docker", "run", "-d",
+            "--name", self.name,
+            "--label", f"{VERSION_LABEL}={version}",
+            "--restart", "unless-stopped",
+            "-p", f"127.0.0.1:{self.port}:{CONTAINER_PORT}",
+            "-v", f"{self.service_dir}:/work",
+            "-v", f"{SCRIPT_DIR}:/scripts:ro",
+            "-e", f"GHIDRA_SERVICE_PORT={CONTAINER_PORT}",
+            "-e", f"GHIDRA_DECOMPILER_THREADS={DECOMPILER_THREADS}",
+            self.image,
+            "analyzeHeadless", "/work/projects", f"worker{self.index}",
+            "-import", "/bin/true", "-noanalysis", "-readOnly",
+            "-scriptPath", "/scripts",
+            "-postScript", "GhidraService.java",
+        ]
+        result = run_process(cmd, timeout=120)
+        if result.returncode != 0:
+            raise GhidraServiceUnavailable(f"Failed to start {self.name}: {result.stderr[-300:]}")
+
+    def stop(self, remove: bool = False):
+        if self.alive():
+            try:
+                self.request("shutdown", timeout=30)
+            except GhidraServiceError:
+                pass
+        if self.managed:
+            run_process(["docker", "rm" if remove else "stop", *(["-f"] if remove else []), self.name], timeout=60)
+
+
+def _abort(sock: socket.socket):
+    """Unblock a thread reading from ``sock`` (close() alone does not wake it)."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class GhidraServicePool:
+    def __init__(self, size: int = GHIDRA_POOL_SIZE, base_port: int = GHIDRA_SERVICE_PORT,
+                 service_dir: str = GHIDRA_SERVICE_DIR, image: str = GHIDRA_SERVICE_IMAGE,
+                 workers: Optional[List[GhidraWorker]] = None, enabled: bool = GHIDRA_SERVICE_ENABLED):
+        self.service_dir = service_dir
+        self.image = image
+        self.enabled = enabled
+        self.workers = workers or [
+            GhidraWorker(i, base_port + i, service_dir=service_dir, image=image) for i in range(size)
+        ]
+        self._image_ready = False
+        self._unavailable_until = 0.0
+        self._stage_lock = threading.Lock()
+
+    @property
+    def managed(self) -> bool:
+        return any(w.managed for w in self.workers)
+
+    def available(self) -> bool:
+        """Cheap check whether requests should go to the pool rather than the one-shot path."""
+        if not self.enabled or time.monotonic() < self._unavailable_until:
+            return False
+        if self.managed and not self._image_ready:
+            if not shutil.which("docker"):
+                return False
+            if run_process(["docker", "image", "inspect", self.image], timeout=30).returncode != 0:
+                logger.warning(
+                    f"Ghidra service image '{self.image}' not found; using one-shot analysis. "
+                    f"Build it with: python scripts/ghidra_service.py build"
+                )
+                self._unavailable_until = time.monotonic() + RETRY_AFTER
+                return False
+            self._image_ready = True
+        return True
+
+    def worker_for(self, binary_sha256: str) -> GhidraWorker:
+        # Affinity: a program is stored in one worker's project only
+        return self.workers[int(binary_sha256[:8], 16) % len(self.workers)]
+
+    def stage(self, file_path: str) -> str:
+        """Copy the binary into the shared work dir (named by sha256); returns the sha256."""
+        digest = file_digest(file_path)
+        if digest is None:
+            raise GhidraServiceError(f"File not found: {file_path}")
+        target = os.path.join(self.service_dir, "bin", digest)
+        with self._stage_lock:
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp = f"{target}.{os.getpid()}.tmp"
+                shutil.copyfile(file_path, tmp)
+                os.replace(tmp, target)
+        return digest
+
+    def call(self, file_path: str, op: str, on_item: Optional[Callable] = None, **params) -> Any:
+        digest = self.stage(file_path)
+        worker = self.worker_for(digest)
+        with worker.lock:
+            try:
+                worker.ensure_running()
+                return worker.request(op, on_item=on_item, program=digest, path=f"/work/bin/{digest}", **params)
+            except GhidraServiceUnavailable:
+                self._unavailable_until = time.monotonic() + RETRY_AFTER
+                raise
+
+    # --- queries ---
+
+    def export(self, file_path: str, on_function: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Every function with decompiled code (same shape as GhidraExport.java output)."""
+        return self.call(file_path, "export", on_item=on_function)
+
+    def list_functions(self, file_path: str) -> List[Dict[str, Any]]:
+        return self.call(file_path, "list")
+
+    def decompile(self, file_path: str, functions: List[str],
+                  on_function: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Decompile only the given function names/addresses."""
+        return self.call(file_path, "decompile", on_item=on_function, functions=list(functions))
+
+    def xrefs(self, file_path: str, target: str) -> List[Dict[str, Any]]:
+        """References to a function name or address."""
+        return self.call(file_path, "xrefs", target=target)
+
+    def index(self, file_path: str) -> List[Dict[str, Any]]:
+        """Whole-program index records (call graph, xrefs, strings, imports, exports)."""
+        return self.call(file_path, "index")
+
+    # --- management ---
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {"worker": w.name, "port": w.port, "alive": w.alive(), "requests": w.requests}
+            for w in self.workers
+        ]
+
+    def start(self):
+        for worker in self.workers:
+            with worker.lock:
+                worker.ensure_running()
+
+    def stop(self, remove: bool = False):
+        for worker in self.workers:
+            worker.stop(remove=remove)
+
+
+def build_image(image: str = GHIDRA_SERVICE_IMAGE, timeout: float = 3600):
+    return run_process(
+        ["docker", "build", "-t", image, "-f", DOCKERFILE, os.path.dirname(DOCKERFILE)], timeout=timeout
+    )
+
+
+_pool: Optional[GhidraServicePool] = None
+
+
+def get_ghidra_pool() -> GhidraServicePool:
+    global _pool
+    if _pool is None:
+        _pool = GhidraServicePool()
+    return _pool
@@ -0,0 +1,317 @@
+"""
+Background jobs for long-running tools (fuzzing, hashcat, sqlmap, Ghidra).
+
+A job is submitted once and runs off the request path; its body reports
+metrics and typed events (e.g. ``crash``, ``cracked``) through a JobContext.
+Clients block server-side with ``wait(job_id, until=...)`` instead of polling,
+and receive each event as an MCP progress notification while they wait.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .tool_runner import ToolCall, run_attached
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get("ASAS_JOB_WORKERS", "4"))
+MAX_FINISHED_JOBS = 100
+MAX_EVENTS_PER_JOB = 500
+MAX_WAIT = 600.0
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+_METRIC_COND_RE = re.compile(r"^(\w+)\s*(>=|<=|==|>|<)\s*(-?[\d.]+)$")
+_OPS = {
+    ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+    "==": lambda a, b: a == b,
+}
+
+
+class JobError(ValueError):
+    """Unknown job id or malformed wait condition."""
+
+
+class Job:
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None):
+        self.id = f"job_{uuid.uuid4().hex[:10]}"
+        self.kind = kind
+        self.params = params or {}
+        self.status = "running"
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.metrics: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.seq = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.call = ToolCall(kind)
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL
+
+    def snapshot(self, since: int = 0) -> Dict[str, Any]:
+        snap = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "elapsed": round((self.finished or time.time()) - self.created, 1),
+            "metrics": dict(self.metrics),
+            # Current metrics already summarize progress events; keep the notable ones
+            "events": [e for e in self.events if e["seq"] > since and e["type"] != "progress"],
+            "next_since": self.seq,
+        }
+        if self.done:
+            snap["result"] = self.result
+            if self.error:
+                snap["error"] = self.error
+        return snap
+
+
+class JobContext:
+    """Handle given to a job body running on a worker thread."""
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self._manager = manager
+        self._job = job
+
+    @property
+    def job_id(self) -> str:
+        return self._job.id
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.call.cancelled
+
+    def progress(self, message: Optional[str] = None, **metrics):
+        """Update metrics; emits a ``progress`` event only when something changed."""
+        changed = {k: v for k, v in metrics.items() if self._job.metrics.get(k) != v}
+        if changed or message:
+            self._manager._record(self._job, "progress", metrics, message=message)
+
+    def event(self, type: str, message: Optional[str] = None, **data):
+        self._manager._record(self._job, type, data, message=message)
+
+    def sleep(self, seconds: float) -> bool:
+        """Interruptible sleep; returns False once the job has been cancelled."""
+        deadline = time.time() + seconds
+        while not self.cancelled and time.time() < deadline:
+            time.sleep(min(0.2, max(0.0, deadline - time.time())))
+        return not self.cancelled
+
+
+def parse_condition(until: str) -> Callable[[Job, int], bool]:
+    """Compile a wait condition.
+
+    - ``done``: the job finished (succeeded/failed/cancelled)
+    - ``any``: any new event since the cursor
+    - ``<event type>``: a new event of that type (e.g. ``crash``, ``cracked``)
+    - ``<metric> <op> <number>``: e.g. ``unique_crashes > 0``, ``percent >= 50``
+    """
+    until = (until or "done").strip()
+    if until == "done":
+        return lambda job, since: job.done
+    if until == "any":
+        return lambda job, since: job.seq > since
+    m = _METRIC_COND_RE.match(until)
+    if m:
+        name, op, value = m.group(1), _OPS[m.group(2)], float(m.group(3))
+
+        def metric_cond(job, since):
+            current = job.metrics.get(name)
+            return isinstance(current, (int, float)) and op(current, value)
+        return metric_cond
+    if re.fullmatch(r"[A-Za-z_][\w-]*", until):
+        return lambda job, since: any(e["type"] == until and e["seq"] > since for e in job.events)
+    raise JobError(f"Unsupported wait condition: {until!r}")
+
+
+def _jsonable(value: Any) -> Any:
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class JobManager:
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self.max_workers = max_workers
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    # --- change notification (thread -> loop) ---
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._changed = asyncio.Event()
+
+    def _wake(self):
+        if self._changed is not None:
+            changed, self._changed = self._changed, asyncio.Event()
+            changed.set()
+
+    def _notify(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                self._wake()
+                return
+        except RuntimeError:
+            pass
+        loop.call_soon_threadsafe(self._wake)
+
+    def _record(self, job: Job, type: str, data: Dict[str, Any], message: Optional[str] = None):
+        with self._lock:
+            if type == "progress":
+                job.metrics.update(data)
+            job.seq += 1
+            event = {"seq": job.seq, "time": round(time.time(), 3), "type": type}
+            if data:
+                event["data"] = _jsonable(data)
+            if message:
+                event["message"] = message
+            job.events.append(event)
+            # Keep non-progress events (crashes, cracked hashes) when trimming history
+            if len(job.events) > MAX_EVENTS_PER_JOB:
+                for i, e in enumerate(job.events):
+                    if e["type"] == "progress":
+                        del job.events[i]
+                        break
+                else:
+                    del job.events[0]
+        self._notify()
+
+    # --- submission ---
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asas-job")
+        return self._executor
+
+    def _register(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.finished)
+            for old in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[old.id]
+
+    def submit(self, kind: str, body: Callable[[JobContext], Any],
+               params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Job:
+        """Run a blocking ``body(ctx)`` on the job pool. Must be called from the event loop."""
+        self._bind_loop()
+        job = Job(kind, params)
+        ctx = JobContext(self, job)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._pool(), contextvars.copy_context().run, run_attached, job.call, lambda: body(ctx)
+        )
+        return self._start(job, future, timeout)
+
+    def submit_async(self, kind: str, awaitable: Awaitable,
+                     params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Job:
+        """Run a coroutine (e.g. an existing MCP tool) as a job."""
+        self._bind_loop()
+        return self._start(Job(kind, params), awaitable, timeout)
+
+    def _start(self, job: Job, awaitable: Awaitable, timeout: Optional[float]) -> Job:
+        self._register(job)
+        self._record(job, "started", dict(job.params))
+        job.task = asyncio.ensure_future(self._run(job, awaitable, timeout))
+        return job
+
+    async def _run(self, job: Job, awaitable: Awaitable, timeout: Optional[float]):
+        inner = asyncio.ensure_future(awaitable)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(inner), timeout)
+            job.result = _jsonable(result)
+            job.status = "succeeded"
+        except asyncio.TimeoutError:
+            job.call.cancel()
+            inner.cancel()
+            job.status, job.error = "failed", f"Job timed out after {timeout:.0f}s"
+        except asyncio.CancelledError:
+            job.call.cancel()
+            inner.cancel()
+            job.status = "cancelled"
+        except Exception as e:
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+        job.finished = time.time()
+        self._record(job, "done", {"status": job.status})
+
+    # --- queries ---
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise JobError(f"Unknown job: {job_id}")
+        return job
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [{"job_id": j.id, "kind": j.kind, "status": j.status, "metrics": dict(j.metrics)} for j in jobs]
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        job = self.get(job_id)
+        if not job.done:
+            job.call.cancel()  # kills attached processes; thread bodies see ctx.cancelled
+            if job.task is not None:
+                job.task.cancel()
+        return job.snapshot()
+
+    async def wait(self, job_id: str, until: str = "done", timeout: float = 300, since: int = 0,
+                   on_event: Optional[Callable[[Job, Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """Block until ``until`` holds, the job finishes or ``timeout`` elapses."""
+        self._bind_loop()
+        job = self.get(job_id)
+        condition = parse_condition(until)
+        deadline = time.monotonic() + max(0.0, min(timeout, MAX_WAIT))
+        seen = since
+        while True:
+            if on_event is not None:
+                new_events = [e for e in job.events if e["seq"] > seen]
+                for event in new_events:
+                    await on_event(job, event)
+                if new_events:
+                    seen = new_events[-1]["seq"]
+            met = condition(job, since)
+            remaining = deadline - time.monotonic()
+            if met or job.done or remaining <= 0:
+                snap = job.snapshot(since)
+                snap["condition_met"] = met
+                snap["timed_out"] = not met and not job.done
+                return snap
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
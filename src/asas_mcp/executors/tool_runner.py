@@ -0,0 +1,365 @@
+"""
+Off-loop execution for synchronous MCP tools.
+
+FastMCP calls plain ``def`` tools inline on the event loop, so a 120s Ghidra
+run stalls every other request. ``offloaded(family, tool_name)`` turns a sync
+tool wrapper into a coroutine that runs on a worker thread, bounded by a
+per-family semaphore and timeout.
+
+Child processes started through ``run_process`` are attached to the running
+call; when the call times out or the client cancels it, their process groups
+are killed and any registered cleanup command (e.g. ``docker rm -f``) runs.
+Other blocking work (a socket read) registers a callback with ``on_cancel``.
+"""
+import asyncio
+import contextlib
+import contextvars
+import functools
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolFamily:
+    """Concurrency and wall-clock limits shared by one family of tools."""
+    max_concurrency: int
+    timeout: Optional[float]  # seconds; None = no limit
+
+
+# Overridable per family with ASAS_TOOL_<FAMILY>_CONCURRENCY / ASAS_TOOL_<FAMILY>_TIMEOUT
+TOOL_FAMILIES: Dict[str, ToolFamily] = {
+    "ghidra": ToolFamily(max_concurrency=2, timeout=300),    # each run is a JVM in docker
+    "kali": ToolFamily(max_concurrency=3, timeout=900),      # vmrun guest operations
+    "sandbox": ToolFamily(max_concurrency=4, timeout=60),
+    "web": ToolFamily(max_concurrency=8, timeout=120),
+    "platform": ToolFamily(max_concurrency=4, timeout=60),
+    "vnc": ToolFamily(max_concurrency=2, timeout=60),        # vmrun / vncdo against local VMs
+    "memory": ToolFamily(max_concurrency=1, timeout=300),    # one chromadb client per process
+    "default": ToolFamily(max_concurrency=4, timeout=300),
+}
+
+# ASAS_TOOL_OFFLOAD=0 keeps the old inline behaviour (for comparison/debugging)
+OFFLOAD_ENABLED = os.environ.get("ASAS_TOOL_OFFLOAD", "1") != "0"
+
+# How long a timed-out call may take to unwind after its processes are killed
+CANCEL_GRACE = 5.0
+
+
+class ToolTimeout(TimeoutError):
+    """Raised when an offloaded tool exceeds its family timeout."""
+
+
+class ToolCancelled(RuntimeError):
+    """Raised inside a worker thread when its call has already been cancelled."""
+
+
+def _env_number(name: str, default, cast):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}")
+        return default
+
+
+def family_limits(family: str) -> ToolFamily:
+    base = TOOL_FAMILIES.get(family, TOOL_FAMILIES["default"])
+    prefix = f"ASAS_TOOL_{family.upper()}"
+    timeout = _env_number(f"{prefix}_TIMEOUT", base.timeout, float)
+    return ToolFamily(
+        max_concurrency=max(1, _env_number(f"{prefix}_CONCURRENCY", base.max_concurrency, int)),
+        timeout=timeout if timeout else None,
+    )
+
+
+def kill_process_tree(proc: subprocess.Popen):
+    """Kill a process started with start_new_session=True together with its children."""
+    if proc.poll() is not None:
+        return
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+
+def _run_cleanup(cmd: Sequence[str]):
+    try:
+        subprocess.run(list(cmd), capture_output=True, timeout=30)
+    except Exception as e:
+        logger.warning(f"Cleanup command {cmd!r} failed: {e}")
+
+
+class ToolCall:
+    """Book-keeping for one offloaded invocation: its child processes and cleanups."""
+
+    def __init__(self, tool_name: str):
+        self.tool_name = tool_name
+        self.cancelled = False
+        self._processes: Dict[int, tuple] = {}
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def attach(self, proc: subprocess.Popen, cleanup: Optional[Sequence[str]] = None):
+        with self._lock:
+            self._processes[proc.pid] = (proc, cleanup)
+            cancelled = self.cancelled
+        if cancelled:
+            self._terminate(proc, cleanup)
+
+    def detach(self, proc: subprocess.Popen):
+        with self._lock:
+            self._processes.pop(proc.pid, None)
+
+    def add_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            self._callbacks.append(callback)
+            cancelled = self.cancelled
+        if cancelled:
+            callback()
+
+    def remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            procs = list(self._processes.values())
+            callbacks = list(self._callbacks)
+        for proc, cleanup in procs:
+            self._terminate(proc, cleanup)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancel callback of {self.tool_name} failed: {e}")
+
+    @staticmethod
+    def _terminate(proc: subprocess.Popen, cleanup: Optional[Sequence[str]]):
+        kill_process_tree(proc)
+        if cleanup:
+            # e.g. `docker rm -f`: killing the docker CLI does not stop the container
+            threading.Thread(target=_run_cleanup, args=(cleanup,), daemon=True).start()
+
+
+_current_call: contextvars.ContextVar[Optional[ToolCall]] = contextvars.ContextVar(
+    "asas_current_tool_call", default=None
+)
+
+
+def call_cancelled() -> bool:
+    """True when running inside an offloaded call that has timed out or been cancelled."""
+    call = _current_call.get()
+    return call is not None and call.cancelled
+
+
+@contextlib.contextmanager
+def on_cancel(callback: Callable[[], None]):
+    """Run ``callback`` if the current offloaded call is cancelled inside the block.
+
+    For blocking work that is not a child process, e.g. closing a socket the
+    worker thread is reading from. Outside an offloaded call it does nothing.
+    """
+    call = _current_call.get()
+    if call is None:
+        yield
+        return
+    call.add_callback(callback)
+    try:
+        yield
+    finally:
+        call.remove_callback(callback)
+
+
+def run_process(cmd: Sequence[str], timeout: Optional[float] = None,
+                input: Optional[str] = None, text: bool = True,
+                cleanup: Optional[Sequence[str]] = None, **kwargs) -> subprocess.CompletedProcess:
+    """Cancellable replacement for ``subprocess.run(cmd, capture_output=True)``.
+
+    The process runs in its own session so the whole tree can be killed, and is
+    attached to the current offloaded tool call (if any). ``cleanup`` is an extra
+    command to run when the process is killed early.
+    Raises subprocess.TimeoutExpired like subprocess.run.
+    """
+    call = _current_call.get()
+    if call is not None and call.cancelled:
+        raise ToolCancelled(f"{call.tool_name} was cancelled")
+
+    proc = subprocess.Popen(
+        list(cmd),
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=text, start_new_session=True, **kwargs,
+    )
+    if call is not None:
+        call.attach(proc, cleanup)
+    try:
+        try:
+            stdout, stderr = proc.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            ToolCall._terminate(proc, cleanup)
+            stdout, stderr = proc.communicate()
+            raise subprocess.TimeoutExpired(proc.args, timeout, output=stdout, stderr=stderr)
+        except BaseException:
+            kill_process_tree(proc)
+            proc.wait()
+            raise
+    finally:
+        if call is not None:
+            call.detach(proc)
+    return subprocess.CompletedProcess(proc.args, proc.returncode, stdout, stderr)
+
+
+def stream_process(cmd: Sequence[str], on_line: Callable[[str], None],
+                   cleanup: Optional[Sequence[str]] = None, **kwargs) -> int:
+    """Run a process and feed each stdout/stderr line to ``on_line`` as it arrives.
+
+    Same cancellation semantics as run_process; returns the exit code.
+    """
+    call = _current_call.get()
+    if call is not None and call.cancelled:
+        raise ToolCancelled(f"{call.tool_name} was cancelled")
+
+    proc = subprocess.Popen(
+        list(cmd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1, start_new_session=True, **kwargs,
+    )
+    if call is not None:
+        call.attach(proc, cleanup)
+    try:
+        for line in proc.stdout:
+            on_line(line.rstrip("\n"))
+        return proc.wait()
+    except BaseException:
+        kill_process_tree(proc)
+        proc.wait()
+        raise
+    finally:
+        proc.stdout.close()
+        if call is not None:
+            call.detach(proc)
+
+
+def run_attached(call: ToolCall, fn: Callable):
+    """Run ``fn`` with ``call`` as the owner of any processes it starts."""
+    token = _current_call.set(call)
+    try:
+        return fn()
+    finally:
+        _current_call.reset(token)
+
+
+class ToolRunner:
+    """Runs sync tool bodies on a thread pool under per-family semaphores."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is None:
+            max_workers = _env_number(
+                "ASAS_TOOL_WORKERS",
+                sum(family_limits(name).max_concurrency for name in TOOL_FAMILIES),
+                int,
+            )
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._active: Dict[str, int] = {}
+
+    def _semaphore(self, family: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores are bound to the loop that created them
+            self._loop = loop
+            self._semaphores = {}
+        sem = self._semaphores.get(family)
+        if sem is None:
+            sem = asyncio.Semaphore(family_limits(family).max_concurrency)
+            self._semaphores[family] = sem
+        return sem
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="asas-tool")
+        return self._executor
+
+    def active(self) -> Dict[str, int]:
+        return {k: v for k, v in self._active.items() if v}
+
+    async def run(self, family: str, tool_name: str, fn: Callable):
+        limits = family_limits(family)
+        loop = asyncio.get_running_loop()
+        call = ToolCall(tool_name)
+        async with self._semaphore(family):
+            self._active[family] = self._active.get(family, 0) + 1
+            start = time.perf_counter()
+            ctx = contextvars.copy_context()
+            future = loop.run_in_executor(self._pool(), ctx.run, run_attached, call, fn)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), limits.timeout)
+            except asyncio.TimeoutError:
+                call.cancel()
+                # Keep the slot until the worker has unwound (bounded), so the limit stays honest
+                await asyncio.wait({future}, timeout=CANCEL_GRACE)
+                raise ToolTimeout(f"{tool_name} timed out after {limits.timeout:.0f}s") from None
+            except asyncio.CancelledError:
+                call.cancel()
+                raise
+            finally:
+                self._active[family] -= 1
+                # stdout carries the MCP stdio transport, so log instead of print
+                logger.debug(f"{tool_name} ({family}) finished in {time.perf_counter() - start:.2f}s")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_runner: Optional[ToolRunner] = None
+
+
+def get_tool_runner() -> ToolRunner:
+    global _runner
+    if _runner is None:
+        _runner = ToolRunner()
+    return _runner
+
+
+async def run_offloaded(family: str, tool_name: str, fn: Callable):
+    """Await ``fn()`` on the tool runner; for async tools with blocking steps."""
+    if not OFFLOAD_ENABLED:
+        return fn()
+    return await get_tool_runner().run(family, tool_name, fn)
+
+
+def offloaded(family: str, tool_name: Optional[str] = None):
+    """Decorator running a sync MCP tool wrapper off the event loop.
+
+    The wrapper keeps the original signature (via ``__wrapped__``) so FastMCP
+    still derives the same input schema.
+    """
+    def decorator(fn):
+        if not OFFLOAD_ENABLED:
+            return fn
+        name = tool_name or fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await get_tool_runner().run(family, name, functools.partial(fn, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -1,8 +1,60 @@
-from mcp.server.fastmcp import FastMCP, Image
-from .tools import recon, crypto, misc, reverse, platform, reverse_ghidra, web, kali, sandbox, vms_vnc
+from mcp.server.fastmcp import FastMCP, Image, Context
+from .utils.result_cache import cached_tool, get_result_cache
+from .utils.result_store import paged_result, get_result_store, DEFAULT_READ_LENGTH
+from .executors.tool_runner import offloaded
+from .executors.jobs import get_job_manager
+from .utils.artifact_store import get_artifact_store, open_input, input_path
+from .utils.code_search import get_code_index
+import importlib
+import json
 import base64
 import os
-import base64
+
+# Lazy registration: tool schemas are declared below from the wrapper signatures,
+# but each implementation module is only imported on its first invocation.
+# Set ASAS_MCP_EAGER_IMPORTS=1 to import everything at startup instead.
+EAGER_IMPORTS = os.environ.get("ASAS_MCP_EAGER_IMPORTS") == "1"
+
+
+class _LazyModule:
+    """Proxy that imports ``asas_mcp.<name>`` on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(f".{self._name}", __package__)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+recon = _LazyModule("tools.recon")
+crypto = _LazyModule("tools.crypto")
+misc = _LazyModule("tools.misc")
+reverse = _LazyModule("tools.reverse")
+platform = _LazyModule("tools.platform")
+reverse_ghidra = _LazyModule("tools.reverse_ghidra")
+binfmt = _LazyModule("tools.binfmt")
+web = _LazyModule("tools.web")
+kali = _LazyModule("tools.kali")
+sandbox = _LazyModule("tools.sandbox")
+vms_vnc = _LazyModule("tools.vms_vnc")
+pwn_fuzz = _LazyModule("tools.pwn_fuzz")
+gpu_tools = _LazyModule("tools.gpu_tools")
+job_tools = _LazyModule("tools.job_tools")
+
+if EAGER_IMPORTS:
+    for _mod in (recon, crypto, misc, reverse, platform, reverse_ghidra, web, kali, sandbox, vms_vnc,
+                 pwn_fuzz, gpu_tools, job_tools):
+        _mod._load()
+
+# Blocking tools are wrapped with @offloaded(family): they run on worker threads
+# with per-family concurrency limits and timeouts (see executors/tool_runner.py),
+# so a long Ghidra or Kali job no longer stalls the event loop.
 
 # 创建 MCP Server 实例
 mcp_server = FastMCP("asas-core-mcp")
@@ -54,6 +106,7 @@ def recon_scan(target: str, ports: str = "1-1000") -> dict:
     return recon.scan(target, ports)
 
 @mcp_server.tool()
+@cached_tool("crypto_decode")
 def crypto_decode(content: str, method: str = "auto") -> str:
     """解码常见编码格式
     
@@ -67,19 +120,24 @@ def crypto_decode(content: str, method: str = "auto") -> str:
     return crypto.decode(content, method)
 
 @mcp_server.tool()
-def misc_identify_file(data_base64: str) -> dict:
+@cached_tool("misc_identify_file")
+def misc_identify_file(data_base64: str = None, artifact_id: str = None) -> dict:
     """识别文件类型
     
     Args:
-        data_base64: Base64 编码的文件数据
+        data_base64: Base64 编码的文件数据 (小文件)
+        artifact_id: artifact_ingest 返回的制品 ID (推荐，无需重复传输文件)
         
     Returns:
         文件类型信息字典
     """
-    data = base64.b64decode(data_base64)
-    return misc.identify_file_type(data)
+    with open_input(data_base64, artifact_id) as data:
+        # Magic bytes only need the header; avoids touching the rest of a mapped file
+        return misc.identify_file_type(bytes(data[:64]))
 
 @mcp_server.tool()
+@offloaded("sandbox")
+@paged_result("misc_run_python")
 def misc_run_python(code: str) -> str:
     """[安全沙箱] 在隔离容器内运行 Python 代码
     
@@ -89,65 +147,271 @@ def misc_run_python(code: str) -> str:
     return sandbox.run_python(code)
 
 @mcp_server.tool()
-def sandbox_execute(code: str, language: str = "python") -> str:
+@offloaded("sandbox")
+@paged_result("sandbox_execute")
+def sandbox_execute(code: str, language: str = "python", artifact_ids: list = None) -> str:
     """[安全沙箱] 在隔离容器内运行多种语言代码 (python/bash)
     
     Args:
         code: 脚本代码
         language: 语言类型 (python/bash)
+        artifact_ids: 可选，挂载到容器 /mnt/artifacts/<文件名> 的制品 ID 列表 (只读)
     """
-    return sandbox.run_in_sandbox(code, language)
+    store = get_artifact_store()
+    files = {store.info(a)["name"]: store.path(a) for a in artifact_ids or []}
+    return sandbox.run_in_sandbox(code, language, files=files)
 
 @mcp_server.tool()
-def reverse_extract_strings(data_base64: str, min_length: int = 4) -> list:
+@cached_tool("reverse_extract_strings")
+def reverse_extract_strings(data_base64: str = None, min_length: int = 4, artifact_id: str = None) -> list:
     """从二进制数据提取字符串
     
     Args:
-        data_base64: Base64 编码的二进制数据
+        data_base64: Base64 编码的二进制数据 (小文件)
         min_length: 最小字符串长度
+        artifact_id: artifact_ingest 返回的制品 ID (推荐，文件通过 mmap 读取)
         
     Returns:
         提取的字符串列表
     """
-    data = base64.b64decode(data_base64)
-    return reverse.extract_strings(data, min_length)
-
-@mcp_server.tool()
-def reverse_ghidra_decompile(file_path: str) -> dict:
-    """[逆向] 使用 Ghidra 反编译二进制文件的所有用户函数，返回每个函数的名称、地址和 C 伪代码。
+    with open_input(data_base64, artifact_id) as data:
+        return reverse.extract_strings(data, min_length)
+
+@mcp_server.tool()
+@offloaded("default")
+@paged_result("reverse_strings")
+@cached_tool("reverse_strings")
+def reverse_strings(file_path: str = None, artifact_id: str = None, min_length: int = 4,
+                    encodings: str = "ascii,utf-16le,utf-16be", pattern: str = None,
+                    section: str = None, limit: int = 1000) -> dict:
+    """[逆向] 流式提取文件中的字符串（mmap 读取，适合上百 MB 的固件/内存镜像）：支持 ASCII 与 UTF-16LE/BE，
+    每个字符串带文件偏移和所在节区 (ELF/PE)，达到 limit 后立即停止扫描。
+    
+    Args:
+        file_path: 宿主机上的文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+        min_length: 最小字符串长度（字符数）
+        encodings: 逗号分隔的编码：ascii, utf-16le, utf-16be
+        pattern: 可选，子串过滤（不区分大小写），如 flag
+        section: 可选，只返回该节区中的字符串，如 .rodata、.data
+        limit: 最多返回的字符串数量
+    """
+    wanted = tuple(e.strip().lower() for e in encodings.split(",") if e.strip())
+    return reverse.scan_file_strings(input_path(file_path, artifact_id), min_length, wanted, limit, pattern, section)
+
+@mcp_server.tool()
+@offloaded("ghidra")
+@paged_result("reverse_ghidra_decompile")
+@cached_tool("reverse_ghidra_decompile")
+def reverse_ghidra_decompile(file_path: str = None, artifact_id: str = None,
+                             token_budget: int = None, top_k: int = None, abbreviate: bool = None) -> dict:
+    """[逆向] 使用 Ghidra 反编译二进制文件的用户函数，按关注度排序（flag 字符串、strcmp/memcmp/read/system 调用、
+    从 main 可达、复杂度、加密常量），在 token 预算内返回最相关函数的 C 伪代码，其余函数只给出名称/地址/得分。
+    代码经过压缩（去除冗余类型转换、类型别名如 u32/u64、删除未使用的局部变量声明、相同函数体只保留一份）。
+    需要其他函数的代码时再调用 ghidra_decompile_function。
     
     Args:
         file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+        token_budget: 返回代码的大致 token 预算（默认 6000，0 表示不限制）
+        top_k: 最多返回代码的函数个数
+        abbreviate: 是否缩写自动生成/过长的标识符（param_1 -> p1，长名称映射见 identifiers）
         
     Returns:
-        包含所有用户函数及其反编译 C 代码的字典
+        包含按关注度排序的函数代码 (functions) 与其余函数存根列表 (omitted) 的字典
     """
-    return reverse_ghidra.analyze_binary(file_path)
+    return reverse_ghidra.analyze_binary(input_path(file_path, artifact_id), token_budget, top_k, abbreviate)
 
 @mcp_server.tool()
-def ghidra_list_functions(file_path: str) -> dict:
-    """[逆向-轻量] 快速列出二进制文件中的所有用户函数名称和地址（不反编译，速度快）。
+@offloaded("ghidra")
+@cached_tool("ghidra_list_functions")
+def ghidra_list_functions(file_path: str = None, artifact_id: str = None) -> dict:
+    """[逆向-轻量] 快速列出二进制文件中的所有用户函数：名称、地址、大小、签名、调用/被调用次数（不反编译，速度快）。
     适合首次侦察时使用，确定关键函数后再调用 ghidra_decompile_function 深入分析。
     
     Args:
         file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
     """
-    return reverse_ghidra.list_functions(file_path)
+    return reverse_ghidra.list_functions(input_path(file_path, artifact_id))
 
 @mcp_server.tool()
-def ghidra_decompile_function(file_path: str, function_name: str) -> dict:
+@offloaded("ghidra")
+@cached_tool("ghidra_decompile_function")
+def ghidra_decompile_function(function_name: str, file_path: str = None, artifact_id: str = None) -> dict:
     """[逆向-精准] 反编译二进制文件中指定名称的单个函数，返回其 C 伪代码。
     需要先用 ghidra_list_functions 获取函数列表，再对目标函数调用此工具。
     
+    Args:
+        function_name: 要反编译的目标函数名称或入口地址（如 main, check_flag, 0x401136）
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+    """
+    return reverse_ghidra.decompile_function(input_path(file_path, artifact_id), function_name)
+
+@mcp_server.tool()
+@offloaded("ghidra")
+def ghidra_xrefs_to(target: str, file_path: str = None, artifact_id: str = None) -> dict:
+    """[逆向-索引] 查询对某个函数/符号、地址或字符串的全部交叉引用（调用、数据引用、字符串引用）。
+    基于全程序索引（首次使用时由 Ghidra 分析一次并缓存），之后的查询只是索引查找。
+    
+    Args:
+        target: 函数/符号名称、地址（如 0x404040）或完整字符串内容
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+    """
+    return reverse_ghidra.xrefs_to(input_path(file_path, artifact_id), target)
+
+@mcp_server.tool()
+@offloaded("ghidra")
+def ghidra_callers(function_name: str, file_path: str = None, artifact_id: str = None, depth: int = 1) -> dict:
+    """[逆向-索引] 查询调用指定函数的所有函数（调用图），depth > 1 时向上追溯多层调用者。
+    
+    Args:
+        function_name: 被调用的函数名称或入口地址（如 strcmp, check_flag, 0x401100）
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+        depth: 向上追溯的调用层数（1-5，默认 1）
+    """
+    return reverse_ghidra.callers(input_path(file_path, artifact_id), function_name, depth)
+
+@mcp_server.tool()
+@offloaded("ghidra")
+def ghidra_strings(file_path: str = None, artifact_id: str = None, pattern: str = None, limit: int = 100) -> dict:
+    """[逆向-索引] 列出二进制中定义的字符串及引用它们的函数；不指定 pattern 时同时列出导入函数。
+    
+    Args:
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+        pattern: 可选，按子串过滤（不区分大小写），如 flag、correct
+        limit: 最多返回的字符串数量
+    """
+    return reverse_ghidra.strings(input_path(file_path, artifact_id), pattern, limit)
+
+@mcp_server.tool()
+@offloaded("default")
+def code_search(pattern: str, binary: str = None, limit: int = 20, ignore_case: bool = False) -> dict:
+    """[逆向-搜索] 在所有已反编译过的函数（Ghidra 导出与 IDA 反编译结果）中按正则搜索代码，毫秒级返回命中函数及代码片段。
+    例如 pattern="strcmp|memcmp" 查找比较位置，pattern="flag\\{" 查找 flag 格式。无需重新反编译或阅读整个程序。
+    
+    Args:
+        pattern: 正则表达式（无效正则按字面量搜索）
+        binary: 可选，限定二进制文件名、路径或 sha256 前缀（至少 8 位十六进制）
+        limit: 最多返回的命中函数数量
+        ignore_case: 是否忽略大小写
+    """
+    return get_code_index().search(pattern, binary=binary, limit=limit, ignore_case=ignore_case)
+
+@mcp_server.tool()
+@offloaded("default")
+def binary_info(file_path: str = None, artifact_id: str = None) -> dict:
+    """[逆向-原生] 在宿主机本地直接解析 ELF/PE 头（毫秒级，无需 Kali 虚拟机或 Ghidra）：文件类型、架构、入口点、
+    动态链接库与导入函数、是否 strip，以及 NX/PIE/RELRO/Canary/FORTIFY 等保护。可替代 kali_file + kali_checksec。
+    
+    Args:
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+    """
+    return binfmt.binary_info(input_path(file_path, artifact_id))
+
+@mcp_server.tool()
+@offloaded("default")
+def binary_checksec(file_path: str = None, artifact_id: str = None) -> dict:
+    """[逆向-原生] 本地检查 ELF/PE 的安全保护：ELF 为 RELRO/Canary/NX/PIE/FORTIFY/RWX，PE 为 DEP/ASLR/GS/CFG/SEH。
+    
+    Args:
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+    """
+    return binfmt.checksec(input_path(file_path, artifact_id))
+
+@mcp_server.tool()
+@offloaded("default")
+def binary_symbols(file_path: str = None, artifact_id: str = None, pattern: str = None, kind: str = None,
+                   defined_only: bool = False, limit: int = 200) -> dict:
+    """[逆向-原生] 本地读取 ELF 符号表 (.symtab/.dynsym) 或 PE 导入/导出表。
+    
+    Args:
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+        pattern: 可选，名称过滤（子串或通配符，如 *flag*、__*_chk，不区分大小写）
+        kind: 可选，符号类型 func / object
+        defined_only: 只返回本文件中定义的符号（排除导入）
+        limit: 最多返回的符号数量
+    """
+    return binfmt.symbols(input_path(file_path, artifact_id), pattern, kind, defined_only, limit)
+
+@mcp_server.tool()
+@offloaded("default")
+def binary_sections(file_path: str = None, artifact_id: str = None) -> list:
+    """[逆向-原生] 本地列出 ELF/PE 的节区：名称、地址、文件偏移、大小、读写执行权限。
+    
     Args:
         file_path: 宿主机上的二进制文件绝对路径
-        function_name: 要反编译的目标函数名称（如 main, check_flag）
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
     """
-    return reverse_ghidra.decompile_function(file_path, function_name)
+    return binfmt.sections(input_path(file_path, artifact_id))
+
+@mcp_server.tool()
+@offloaded("default")
+def artifact_ingest(file_path: str = None, data_base64: str = None, name: str = None) -> dict:
+    """[制品库] 将文件存入内容寻址制品库 (sha256)，之后各工具通过 artifact_id 引用，无需再次传输
+    
+    Args:
+        file_path: 宿主机上的文件路径 (推荐，服务端直接读取)
+        data_base64: 或者上传 Base64 编码的文件内容
+        name: 可选的文件名 (用于沙箱挂载和 Kali 上传)
+        
+    Returns:
+        制品信息 (artifact_id, name, size)
+    """
+    store = get_artifact_store()
+    if file_path:
+        return store.ingest_path(file_path, name)
+    if data_base64 is not None:
+        return store.ingest_bytes(base64.b64decode(data_base64), name)
+    return {"error": "Either file_path or data_base64 is required"}
+
+@mcp_server.tool()
+def artifact_list() -> list:
+    """[制品库] 列出已存储的制品 (artifact_id, name, size)"""
+    return get_artifact_store().list()
+
+@mcp_server.tool()
+def cache_stats(clear: bool = False) -> dict:
+    """[缓存] 查看确定性工具结果缓存的命中/未命中统计
+    
+    Args:
+        clear: 为 True 时在返回统计后清空缓存
+    """
+    from .utils.ghidra_cache import get_ghidra_cache
+    cache, ghidra_cache = get_result_cache(), get_ghidra_cache()
+    stats = cache.stats()
+    stats["ghidra_analysis"] = {**ghidra_cache.stats, "disk_bytes": ghidra_cache.disk_bytes(),
+                                "disk_max_bytes": ghidra_cache.max_bytes}
+    if clear:
+        cache.clear()
+        ghidra_cache.clear()
+    return stats
+
+@mcp_server.tool()
+def result_read(handle: str, offset: int = 0, length: int = DEFAULT_READ_LENGTH,
+                grep: str = None, ignore_case: bool = False) -> dict:
+    """[结果分页] 读取被截断的大型工具输出 (由 handle 引用)
+    
+    Args:
+        handle: 工具返回的结果句柄 (如 res_1a2b3c4d5e6f)
+        offset: 起始偏移量 (使用返回的 next_offset 继续翻页)
+        length: 本次读取的最大长度
+        grep: 可选正则，仅返回匹配的行 (带行号)，offset/length 作用于过滤后的文本
+        ignore_case: grep 是否忽略大小写
+    """
+    return get_result_store().read(handle, offset, length, grep, ignore_case)
 
 # --- Web Pentest Tools ---
 
 @mcp_server.tool()
+@offloaded("web")
 def web_dir_scan(url: str, custom_words: list = None) -> dict:
     """[Web] 扫描目标 URL 的公共目录与文件
     
@@ -158,6 +422,7 @@ def web_dir_scan(url: str, custom_words: list = None) -> dict:
     return web.dir_scan(url, custom_words)
 
 @mcp_server.tool()
+@offloaded("web")
 def web_sql_check(url: str, param: str) -> dict:
     """[Web] 对指定参数执行基础 SQL 注入检测
     
@@ -168,6 +433,7 @@ def web_sql_check(url: str, param: str) -> dict:
     return web.sql_check(url, param)
 
 @mcp_server.tool()
+@offloaded("web")
 def web_extract_links(url: str) -> dict:
     """[Web] 提取页面内的所有链接与表单结构
     
@@ -179,6 +445,7 @@ def web_extract_links(url: str) -> dict:
 # --- Platform Integration ---
 
 @mcp_server.tool()
+@offloaded("platform")
 def platform_get_challenge(url: str, token: str = None) -> str:
     """从 CTF 平台获取题目详情
     
@@ -192,6 +459,7 @@ def platform_get_challenge(url: str, token: str = None) -> str:
     return platform.platform_get_challenge(url, token)
 
 @mcp_server.tool()
+@offloaded("platform")
 def platform_submit_flag(base_url: str, challenge_id: str, flag: str, token: str = None) -> str:
     """向 CTF 平台提交 Flag
     
@@ -210,72 +478,204 @@ def platform_submit_flag(base_url: str, challenge_id: str, flag: str, token: str
 # --- Kali VM Integration ---
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_sqlmap")
 def kali_sqlmap(url: str, args: str = "--batch --banner") -> str:
     """[Kali] 使用 sqlmap 执行自动化 SQL 注入检测与利用"""
     return kali.sqlmap(url, args)
 
 @mcp_server.tool()
-def kali_upload_file(host_path: str, guest_path: str = "/tmp/") -> str:
-    """[Kali] 将本地物理机(宿主机)的文件上传到 Kali 虚拟机中，返回虚拟机内的路径以供后续分析使用"""
-    return kali.upload_file(host_path, guest_path)
+@offloaded("kali")
+def kali_upload_file(host_path: str = None, guest_path: str = "/tmp/", artifact_id: str = None) -> str:
+    """[Kali] 将本地物理机(宿主机)的文件或制品 (artifact_id) 上传到 Kali 虚拟机中，返回虚拟机内的路径以供后续分析使用"""
+    if artifact_id and guest_path.endswith("/"):
+        guest_path += get_artifact_store().info(artifact_id)["name"]
+    return kali.upload_file(input_path(host_path, artifact_id), guest_path)
 
 @mcp_server.tool()
+@offloaded("kali")
 def kali_file(file_path_guest: str) -> str:
     """[Kali] 使用 file 命令判断文件架构 (ELF32/64, Strip等)"""
     return kali.file_cmd(file_path_guest)
 
 @mcp_server.tool()
+@offloaded("kali")
 def kali_checksec(file_path_guest: str) -> str:
     """[Kali] 使用 checksec 工具检查二进制文件的安全选项保护 (NX, PIE, Canary等)"""
     return kali.checksec(file_path_guest)
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_dirsearch")
 def kali_dirsearch(url: str, args: str = "-e php,html,js") -> str:
     """[Kali] 使用 dirsearch 执行 Web 路径爆破"""
     return kali.dirsearch(url, args)
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_nmap")
 def kali_nmap(target: str, args: str = "-F") -> str:
     """[Kali] 使用 nmap 执行专业级端口扫描与指纹识别"""
     return kali.nmap(target, args)
 
 @mcp_server.tool()
+@offloaded("kali")
 def kali_steghide(file_path: str, passphrase: str = "") -> str:
     """[Kali] 使用 steghide 提取隐藏信息"""
     return kali.steghide(file_path, passphrase)
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_zsteg")
 def kali_zsteg(file_path: str) -> str:
     """[Kali] 使用 zsteg 进行图片 LSB 隐写检测"""
     return kali.zsteg(file_path)
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_binwalk")
 def kali_binwalk(file_path: str, extract: bool = True) -> str:
     """[Kali] 使用 binwalk 分析并提取文件"""
     return kali.binwalk(file_path, extract)
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_foremost")
 def kali_foremost(file_path: str) -> str:
     """[Kali] 使用 foremost 恢复文件"""
     return kali.foremost(file_path)
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_tshark")
 def kali_tshark(file_path: str, filter: str = "") -> str:
     """[Kali] 使用 tshark 分析流量包 (pcap)"""
     return kali.tshark(file_path, filter)
 
 @mcp_server.tool()
+@offloaded("kali")
+@paged_result("kali_exec")
 def kali_exec(cmd_str: str) -> str:
     """[Kali] 在 Kali 虚拟机内执行任意 shell 命令"""
     return kali.get_executor().execute(cmd_str)
 
+# --- Background Jobs ---
+# Long-running work is submitted once and awaited server-side with job_wait,
+# which streams job events as MCP progress notifications instead of LLM polling.
+
+@mcp_server.tool()
+async def job_submit(tool: str, arguments: dict = None) -> dict:
+    """[后台任务] 在后台运行任意耗时工具 (如 kali_sqlmap, reverse_ghidra_decompile)，立即返回 job_id
+    
+    Args:
+        tool: 要运行的工具名称
+        arguments: 该工具的参数字典
+        
+    Returns:
+        job_id 及状态，之后用 job_wait 等待结果
+    """
+    if tool.startswith("job_") or tool not in {t.name for t in mcp_server._tool_manager.list_tools()}:
+        return {"error": f"Tool cannot be run as a job: {tool}"}
+    call = mcp_server._tool_manager.call_tool(tool, arguments or {}, convert_result=False)
+    job = get_job_manager().submit_async(tool, call, params={"tool": tool})
+    return job.snapshot()
+
+@mcp_server.tool()
+async def fuzz_job_start(binary_path: str = None, artifact_id: str = None, duration_sec: int = 600) -> dict:
+    """[后台任务-Fuzz] 启动 AFL++ (QEMU 模式) Fuzz 任务，发现 crash 时产生 crash 事件
+    
+    Args:
+        binary_path: 宿主机上的二进制文件路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+        duration_sec: Fuzz 时长 (秒)
+        
+    Returns:
+        job_id；用 job_wait(job_id, until="crash") 等待第一个崩溃
+    """
+    return job_tools.start_fuzz_job(input_path(binary_path, artifact_id), duration_sec).snapshot()
+
+@mcp_server.tool()
+async def ghidra_decompile_job_start(file_path: str = None, artifact_id: str = None) -> dict:
+    """[后台任务-逆向] 并行反编译整个二进制，边反编译边产生事件：每个用户函数一个 function 事件，
+    main 完成时产生携带代码的 main 事件 (main 最先反编译)
+    
+    Args:
+        file_path: 宿主机上的二进制文件绝对路径
+        artifact_id: 或者使用 artifact_ingest 返回的制品 ID
+        
+    Returns:
+        job_id；用 job_wait(job_id, until="main") 先拿到 main，其余函数完成后结果进入缓存
+    """
+    return job_tools.start_ghidra_job(input_path(file_path, artifact_id)).snapshot()
+
+@mcp_server.tool()
+async def hashcat_job_start(hash_value: str, hash_type: str,
+                            wordlist_path: str = "/usr/share/wordlists/rockyou.txt") -> dict:
+    """[后台任务-GPU] 启动 Hashcat 字典破解任务，破解成功时产生 cracked 事件
+    
+    Args:
+        hash_value: 待破解的 Hash
+        hash_type: Hashcat 模式 (如 0=MD5, 100=SHA1, 1400=SHA256)
+        wordlist_path: 字典路径
+        
+    Returns:
+        job_id；用 job_wait(job_id, until="cracked") 等待结果
+    """
+    return job_tools.start_hashcat_job(hash_value, hash_type, wordlist_path).snapshot()
+
+@mcp_server.tool()
+async def job_wait(job_id: str, until: str = "done", timeout: float = 300, since: int = 0,
+                   ctx: Context = None) -> dict:
+    """[后台任务] 在服务端阻塞等待任务满足条件 (无需反复轮询)
+    
+    Args:
+        job_id: 任务 ID
+        until: 等待条件: "done" (结束), "any" (任意新事件), 事件类型 (如 "crash", "cracked"),
+               或指标表达式 (如 "unique_crashes > 0", "percent >= 50")
+        timeout: 最长等待秒数 (上限 600)，超时返回当前状态
+        since: 事件游标，传入上次返回的 next_since 只获取新事件
+    """
+    try:
+        ctx.request_context  # absent when called outside an MCP request (tests, job_submit)
+    except (AttributeError, ValueError):
+        ctx = None
+
+    async def notify(job, event):
+        if ctx is not None:
+            message = event.get("message") or f"{event['type']}: {json.dumps(event.get('data', {}), ensure_ascii=False)}"
+            await ctx.report_progress(event["seq"], None, message)
+
+    return await get_job_manager().wait(job_id, until, timeout, since, on_event=notify)
+
+@mcp_server.tool()
+def job_status(job_id: str, since: int = 0) -> dict:
+    """[后台任务] 查看任务当前状态、指标与事件 (非阻塞)"""
+    return get_job_manager().get(job_id).snapshot(since)
+
+@mcp_server.tool()
+def job_cancel(job_id: str) -> dict:
+    """[后台任务] 取消任务 (会终止其子进程)"""
+    return get_job_manager().cancel(job_id)
+
+@mcp_server.tool()
+def job_list() -> list:
+    """[后台任务] 列出所有任务及其状态"""
+    return get_job_manager().list()
+
+@mcp_server.resource("jobs://{job_id}")
+def job_resource(job_id: str) -> str:
+    """Current snapshot of a background job."""
+    return json.dumps(get_job_manager().get(job_id).snapshot(), ensure_ascii=False)
+
 # --- Memory Layer Integration ---
-from .memory.db import ChromaManager
-from .memory.loader import load_initial_knowledge
 import hashlib
 
-def _get_memory_manager() -> ChromaManager:
+def _get_memory_manager():
     # Initialize on first use (singleton)
+    # chromadb/onnxruntime are heavy, so the memory stack is imported here, not at startup
+    from .memory.db import ChromaManager
+    from .memory.loader import load_initial_knowledge
+
     # Also load initial knowledge if it's the first time running (empty DB)
     manager = ChromaManager()
     
@@ -287,6 +687,7 @@ def _get_memory_manager() -> ChromaManager:
     return manager
 
 @mcp_server.tool()
+@offloaded("memory")
 def memory_add(content: str, metadata: dict = {}, doc_id: str = None) -> str:
     """Add a document to the agent's knowledge base.
     
@@ -310,6 +711,7 @@ def memory_add(content: str, metadata: dict = {}, doc_id: str = None) -> str:
     return doc_id
 
 @mcp_server.tool()
+@offloaded("memory")
 def memory_query(query: str, n_results: int = 5) -> list:
     """Query the agent's knowledge base.
     
@@ -343,7 +745,19 @@ def create_app():
                 "misc_run_python",
                 "sandbox_execute",
                 "reverse_extract_strings",
+                "reverse_strings",
                 "reverse_ghidra_decompile",
+                "artifact_ingest",
+                "artifact_list",
+                "job_submit",
+                "fuzz_job_start",
+                "hashcat_job_start",
+                "job_wait",
+                "job_status",
+                "job_cancel",
+                "job_list",
+                "cache_stats",
+                "result_read",
                 "web_dir_scan",
                 "web_sql_check",
                 "web_extract_links",
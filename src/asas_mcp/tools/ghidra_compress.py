@@ -0,0 +1,258 @@
+"""
+Token compression for Ghidra pseudo-C.
+
+Ghidra output is verbose: scalar casts on every operand, undefined8-style
+types, one declaration line per stack variable (many unused) and identical
+thunk bodies. compress_functions() rewrites the decompiled code of an export
+before it is sent to the LLM:
+
+    casts      drop scalar casts that cannot change a value: the operand is a
+               variable already declared with the same width and signedness,
+               or a literal that already is an int; everything else stays
+    types      alias Ghidra/C type names to short fixed-width names (u32, i64)
+    decls      remove unused local declarations, merge same-type ones
+    noise      drop decompiler boilerplate warnings, trailing void returns and
+               blank-line runs
+    dedup      identical bodies become {"same_as": <first function>}
+    abbreviate (optional) shorten auto-generated names (param_1 -> p1,
+               local_28 -> l28) and map long identifiers to short aliases
+
+The casts, types and abbreviate passes only rewrite code: string and char
+literals and comments are passed through unchanged.
+"""
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+# Compress decompiled code returned by reverse_ghidra (ASAS_GHIDRA_COMPRESS=0 returns raw pseudo-C);
+# identifier abbreviation stays opt-in
+COMPRESS_OUTPUT = os.environ.get("ASAS_GHIDRA_COMPRESS", "1") != "0"
+ABBREVIATE_IDENTIFIERS = os.environ.get("ASAS_GHIDRA_ABBREVIATE", "0") == "1"
+
+TYPE_ALIASES = {
+    "undefined": "u8", "undefined1": "u8", "undefined2": "u16", "undefined4": "u32", "undefined8": "u64",
+    "uchar": "u8", "byte": "u8", "ushort": "u16", "word": "u16", "uint": "u32", "dword": "u32",
+    "ulong": "u64", "ulonglong": "u64", "qword": "u64", "longlong": "i64",
+    "unsigned char": "u8", "unsigned short": "u16", "unsigned int": "u32", "unsigned long": "u64",
+    "long long": "i64", "unsigned long long": "u64",
+}
+_ALIAS_RE = re.compile(
+    r"\b(" + "|".join(sorted((re.escape(t) for t in TYPE_ALIASES), key=len, reverse=True)) + r")\b"
+)
+
+_SCALAR = (r"(?:const\s+)?(?:unsigned\s+|signed\s+)?"
+           r"(?:undefined[1248]?|u?int\d*_t|u?char|u?short|u?int|u?long(?:\s*long)?|u?longlong|"
+           r"byte|word|dword|qword|size_t|ssize_t|u8|u16|u32|u64|i8|i16|i32|i64|long|char|short|int)")
+# A scalar cast (not a call or sizeof argument list) directly in front of an operand
+_CAST_RE = re.compile(r"(?<!\w)(?<!sizeof)\((" + _SCALAR + r")\)\s*(0x[0-9a-fA-F]+|\d+|[A-Za-z_]\w*)\b(?!\s*[(\[.]|->)")
+_SCALAR_RE = re.compile(r"^" + _SCALAR + r"$")
+# String and char literals and comments: the rewriting passes never touch them
+_LITERAL_RE = re.compile(r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|/\*.*?\*/)', re.DOTALL)
+# Scalar type names that denote the same width and signedness. Anything not
+# listed (char, long, undefinedN, ...) only matches itself: its width or
+# signedness depends on the target or is unknown.
+_CANONICAL_TYPES = {
+    "signed char": "i8", "int8_t": "i8", "i8": "i8",
+    "uchar": "u8", "unsigned char": "u8", "byte": "u8", "uint8_t": "u8", "u8": "u8",
+    "short": "i16", "signed short": "i16", "int16_t": "i16", "i16": "i16",
+    "ushort": "u16", "unsigned short": "u16", "word": "u16", "uint16_t": "u16", "u16": "u16",
+    "int": "i32", "signed int": "i32", "signed": "i32", "int32_t": "i32", "i32": "i32",
+    "uint": "u32", "unsigned int": "u32", "unsigned": "u32", "dword": "u32", "uint32_t": "u32", "u32": "u32",
+    "longlong": "i64", "long long": "i64", "int64_t": "i64", "i64": "i64",
+    "ulonglong": "u64", "unsigned long long": "u64", "qword": "u64", "uint64_t": "u64", "u64": "u64",
+}
+INT_MAX = 0x7FFFFFFF
+_PARAM_RE = re.compile(r"([A-Za-z_][\w ]*?[\w])\s*(\**)\s*([A-Za-z_]\w*)\s*$")
+
+_DECL_RE = re.compile(r"^(\s+)([A-Za-z_][\w ]*?[\w])\s*(\**)\s*([A-Za-z_]\w*)((?:\s*\[[^\]]*\])*);\s*$")
+_NOISE_RE = re.compile(
+    r"^\s*/\* WARNING: (?:Unknown calling convention|Could not reconcile|Removing unreachable|"
+    r"Globals starting with|Type propagation algorithm|Variable defined which should be unmapped|"
+    r"Restarted to delay deadcode).*\*/\s*\n",
+    re.MULTILINE,
+)
+_SIGNATURE_GAP_RE = re.compile(r"\)\s*\n\s*\n\{")
+_DEEP_COMMENT_RE = re.compile(r"^ {8,}(/\*.*\*/)\n(\s*)", re.MULTILINE)
+_VOID_RETURN_RE = re.compile(r"\n\s*return;\n\}\s*$")
+_BLANK_RUN_RE = re.compile(r"\n\s*\n(\s*\n)+")
+
+_AUTO_NAMES = [
+    (re.compile(r"\bparam_(\d+)\b"), r"p\1"),
+    (re.compile(r"\blocal_([0-9a-f]+)\b"), r"l\1"),
+    (re.compile(r"\b(DAT|PTR|LAB|UNK|s)_0+([0-9a-fA-F]+)\b"), r"\1_\2"),
+]
+LONG_IDENTIFIER = 24
+_IDENT_RE = re.compile(r"\b[A-Za-z_]\w*\b")
+
+
+def _outside_literals(code: str, rewrite) -> str:
+    """Apply ``rewrite`` to the code between string/char literals and comments only."""
+    parts = _LITERAL_RE.split(code)
+    parts[::2] = [rewrite(part) for part in parts[::2]]
+    return "".join(parts)
+
+
+def _canonical_type(name: str) -> str:
+    name = " ".join(name.replace("const", " ").split())
+    return _CANONICAL_TYPES.get(name, name)
+
+
+def _scalar_variables(code: str) -> Dict[str, str]:
+    """Parameters and locals declared with a non-pointer scalar type -> canonical type."""
+    types = {}
+    head, _, rest = code.partition("{")
+    if "(" in head:
+        for param in head[head.index("(") + 1:head.rindex(")")].split(","):
+            m = _PARAM_RE.match(param.strip())
+            if m and not m.group(2) and _SCALAR_RE.match(m.group(1)):
+                types[m.group(3)] = _canonical_type(m.group(1))
+    for line in rest.split("\n"):
+        m = _DECL_RE.match(line)
+        if m and not m.group(3) and not m.group(5) and _SCALAR_RE.match(m.group(2)):
+            types[m.group(4)] = _canonical_type(m.group(2))
+    return types
+
+
+def _literal_value(token: str) -> Optional[int]:
+    try:
+        return int(token, 0)
+    except ValueError:  # e.g. octal-looking 010
+        return None
+
+
+def strip_casts(code: str) -> str:
+    """
+    Drop scalar casts that are no-ops: the operand is a variable declared
+    with the same width and signedness as the cast type, or a literal that
+    is an int already and is cast to int. Any cast that could truncate,
+    extend or change signedness - and casts of pointers, calls and compound
+    expressions - is kept.
+    """
+    scalars = _scalar_variables(code)
+
+    def drop(m):
+        target, operand = _canonical_type(m.group(1)), m.group(2)
+        if operand[0].isdigit():
+            value = _literal_value(operand)
+            return operand if target == "i32" and value is not None and value <= INT_MAX else m.group(0)
+        return operand if scalars.get(operand) == target else m.group(0)
+
+    def strip(part):
+        for _ in range(3):  # chained casts: (int)(int)iVar1
+            stripped = _CAST_RE.sub(drop, part)
+            if stripped == part:
+                break
+            part = stripped
+        return part
+
+    return _outside_literals(code, strip)
+
+
+def alias_types(code: str) -> str:
+    return _outside_literals(code, lambda part: _ALIAS_RE.sub(lambda m: TYPE_ALIASES[m.group(1)], part))
+
+
+def strip_noise(code: str) -> str:
+    code = _NOISE_RE.sub("", code)
+    code = _SIGNATURE_GAP_RE.sub(")\n{", code)
+    code = _DEEP_COMMENT_RE.sub(lambda m: f"{m.group(2)}{m.group(1)}\n{m.group(2)}", code)
+    if code.lstrip().startswith("void"):
+        code = _VOID_RETURN_RE.sub("\n}\n", code)
+    return _BLANK_RUN_RE.sub("\n\n", code)
+
+
+def prune_declarations(code: str) -> str:
+    """Drop local declarations never used in the body and merge the rest by base type."""
+    lines = code.split("\n")
+    try:
+        start = next(i for i, line in enumerate(lines) if line.strip() == "{") + 1
+    except StopIteration:
+        return code
+    end = start
+    decls = []
+    while end < len(lines):
+        m = _DECL_RE.match(lines[end])
+        if not m or m.group(2) in ("return", "goto"):
+            break
+        decls.append(m)
+        end += 1
+    if not decls:
+        return code
+
+    body = "\n".join(lines[end:])
+    merged: Dict[str, List[str]] = {}
+    indent = decls[0].group(1)
+    for m in decls:
+        _, base, stars, name, dims = m.groups()
+        if re.search(r"\b" + re.escape(name) + r"\b", body):
+            merged.setdefault(base, []).append(stars + name + dims.replace(" ", ""))
+    kept = [f"{indent}{base} {', '.join(names)};" for base, names in merged.items()]
+    if not kept and end < len(lines) and not lines[end].strip():
+        end += 1  # the separator line after the declarations
+    return "\n".join(lines[:start] + kept + lines[end:])
+
+
+def abbreviate(code: str, legend: Dict[str, str], keep: set) -> str:
+    """Shorten Ghidra auto-names; long identifiers become aliases recorded in ``legend``."""
+    reverse = {v: k for k, v in legend.items()}
+
+    def short(m):
+        name = m.group(0)
+        if len(name) < LONG_IDENTIFIER or name in keep:
+            return name
+        if name not in reverse:
+            alias = f"id{len(legend) + 1}"
+            legend[alias] = name
+            reverse[name] = alias
+        return reverse[name]
+
+    def rewrite(part):
+        for pattern, repl in _AUTO_NAMES:
+            part = pattern.sub(repl, part)
+        return _IDENT_RE.sub(short, part)
+
+    return _outside_literals(code, rewrite)
+
+
+def compress_code(code: str) -> str:
+    if not code:
+        return code
+    return strip_noise(prune_declarations(alias_types(strip_casts(code)))).strip() + "\n"
+
+
+def _body_key(entry: Dict[str, Any]) -> str:
+    code = entry.get("code") or ""
+    name = entry.get("name") or ""
+    if name:
+        code = re.sub(r"\b" + re.escape(name) + r"\b", "\0", code)
+    return re.sub(r"\s+", " ", code).strip()
+
+
+def compress_functions(entries: List[Dict[str, Any]], abbreviate_identifiers: bool = False,
+                       keep: Optional[set] = None) -> Dict[str, Any]:
+    """
+    Compressed copies of export entries. Returns {"functions", "identifiers"}:
+    duplicates carry ``same_as`` instead of code, and ``identifiers`` maps
+    aliases back to long names when abbreviation is on. Function names are
+    never abbreviated (they are used by ghidra_decompile_function / xrefs).
+    """
+    keep = set(keep or ()) | {e.get("name") for e in entries}
+    legend: Dict[str, str] = {}
+    seen: Dict[str, str] = {}
+    out = []
+    for entry in entries:
+        entry = dict(entry)
+        code = entry.get("code")
+        if code:
+            key = _body_key(entry)
+            if key in seen:
+                entry["code"] = ""
+                entry["same_as"] = seen[key]
+            else:
+                seen[key] = entry.get("name")
+                code = compress_code(code)
+                if abbreviate_identifiers:
+                    code = abbreviate(code, legend, keep)
+                entry["code"] = code
+        out.append(entry)
+    return {"functions": out, "identifiers": legend}
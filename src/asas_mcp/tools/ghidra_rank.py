@@ -0,0 +1,146 @@
+"""
+Interest ranking for decompiled functions.
+
+Scores each function from its decompiled code (and the export metadata) so
+reverse_ghidra_decompile can return the most relevant functions within a
+token budget and only stubs for the rest. Signals: flag-like string
+literals, calls to comparison / input / exec primitives, reachability from
+main, cyclomatic complexity and well-known crypto constants.
+"""
+import os
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Default token budget for reverse_ghidra_decompile (0 disables the budget)
+DECOMPILE_TOKEN_BUDGET = int(os.environ.get("ASAS_DECOMPILE_TOKEN_BUDGET", "6000"))
+
+CALL_WEIGHTS = {
+    "strcmp": 6, "strncmp": 6, "memcmp": 6, "strcasecmp": 5, "strstr": 3,
+    "read": 3, "fgets": 3, "gets": 4, "scanf": 3, "getline": 3, "fread": 2, "recv": 3,
+    "system": 6, "execve": 6, "execl": 5, "popen": 5,
+    "ptrace": 4, "mprotect": 3, "strcpy": 2, "sprintf": 2, "printf": 1, "puts": 1,
+}
+
+FLAG_STRING = re.compile(
+    r"flag|ctf\{|correct|wrong|incorrect|success|congrat|passw|try again|nope|invalid|\bwin\b|\{.*\}",
+    re.IGNORECASE,
+)
+
+CRYPTO_CONSTANTS = {
+    "67452301": "md5/sha1", "efcdab89": "md5/sha1", "d76aa478": "md5", "c3d2e1f0": "sha1",
+    "6a09e667": "sha256", "428a2f98": "sha256", "9e3779b9": "tea/xtea", "61c88647": "tea/xtea",
+    "edb88320": "crc32", "04c11db7": "crc32", "b7e15163": "rc5/rc6",
+    "abcdefghijklmnopqrstuvwxyz": "base64 alphabet",
+}
+
+STRING_LITERAL = re.compile(r'"((?:[^"\\]|\\.)*)"')
+CALL_SITE = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\(")
+BRANCH = re.compile(r"\b(?:if|for|while|case)\b|&&|\|\|")
+CALL_PREFIXES = ("__isoc99_", "__isoc23_", "__", "_")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for C pseudo-code)."""
+    return (len(text) + 3) // 4
+
+
+def _callee(name: str) -> str:
+    for prefix in CALL_PREFIXES:
+        if name.startswith(prefix) and len(name) > len(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def _reachable_from_main(entries: List[Dict[str, Any]], names: set) -> Dict[str, int]:
+    """Call depth from main for every function reachable through the decompiled code."""
+    graph = {
+        e["name"]: {c for c in CALL_SITE.findall(e.get("code") or "") if c in names and c != e["name"]}
+        for e in entries
+    }
+    if "main" not in graph:
+        return {}
+    depth, queue = {"main": 0}, deque(["main"])
+    while queue:
+        current = queue.popleft()
+        for callee in graph.get(current, ()):
+            if callee not in depth:
+                depth[callee] = depth[current] + 1
+                queue.append(callee)
+    return depth
+
+
+def score_function(entry: Dict[str, Any], main_depth: Optional[int] = None) -> Dict[str, Any]:
+    """Interest score and the signals that produced it."""
+    code = entry.get("code") or ""
+    score, signals = 0.0, []
+
+    flagged = {s for s in STRING_LITERAL.findall(code) if FLAG_STRING.search(s)}
+    if flagged:
+        score += 8 * min(len(flagged), 3)
+        signals.append("strings: " + ", ".join(sorted(flagged)[:3]))
+
+    calls = {}
+    for name in CALL_SITE.findall(code):
+        callee = _callee(name)
+        if callee in CALL_WEIGHTS:
+            calls[callee] = CALL_WEIGHTS[callee]
+    if calls:
+        score += sum(calls.values())
+        signals.append("calls: " + ", ".join(sorted(calls)))
+
+    lowered = code.lower()
+    crypto = sorted({label for const, label in CRYPTO_CONSTANTS.items() if const in lowered})
+    if crypto:
+        score += 5 * len(crypto)
+        signals.append("crypto: " + ", ".join(crypto))
+
+    complexity = 1 + len(BRANCH.findall(code))
+    score += min(complexity, 20) * 0.3
+    xors = code.count("^")
+    if xors:
+        score += min(xors, 10) * 0.5
+    if complexity > 5:
+        signals.append(f"complexity: {complexity}")
+
+    if entry.get("name") == "main":
+        score += 10
+        signals.append("main")
+    elif main_depth is not None:
+        score += max(1, 5 - main_depth)
+        signals.append(f"reachable from main (depth {main_depth})")
+
+    if code.count("\n") <= 4:
+        score -= 3  # thunks and trivial wrappers
+    return {"score": round(score, 1), "signals": signals, "complexity": complexity}
+
+
+def rank_functions(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Entries with score/signals/tokens added, most interesting first (address order on ties)."""
+    depths = _reachable_from_main(entries, {e.get("name") for e in entries})
+    ranked = []
+    for position, entry in enumerate(entries):
+        info = score_function(entry, depths.get(entry.get("name")))
+        ranked.append({**entry, **info, "tokens": estimate_tokens(entry.get("code") or ""), "_pos": position})
+    ranked.sort(key=lambda e: (-e["score"], e["_pos"]))
+    for entry in ranked:
+        del entry["_pos"]
+    return ranked
+
+
+def select_functions(entries: List[Dict[str, Any]], token_budget: Optional[int] = DECOMPILE_TOKEN_BUDGET,
+                     top_k: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Highest-ranked functions whose code fits in ``token_budget`` (at most
+    ``top_k``), plus a stub (name, address, score) for every other function.
+    The best function is always included, even if it alone exceeds the budget.
+    """
+    selected, stubs, used = [], [], 0
+    for entry in rank_functions(entries):
+        fits = not token_budget or used + entry["tokens"] <= token_budget
+        if (fits or not selected) and (top_k is None or len(selected) < top_k):
+            selected.append(entry)
+            used += entry["tokens"]
+        else:
+            stubs.append({"name": entry.get("name"), "address": entry.get("address"), "score": entry["score"]})
+    return {"functions": selected, "omitted": stubs, "estimated_tokens": used}
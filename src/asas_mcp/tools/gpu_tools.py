@@ -65,3 +65,57 @@ async def gpu_status() -> str:
         return f"GPU Status:\n{output}"
     except Exception:
         return "NVIDIA GPU or nvidia-smi not detected."
+
+
+def hashcat_job(ctx, hash_value: str, hash_type: str, wordlist_path: str = "/usr/share/wordlists/rockyou.txt") -> dict:
+    """
+    Job body: run hashcat with JSON status lines, pushing percent/speed as progress
+    and a ``cracked`` event as soon as the hash is recovered.
+    """
+    from ..executors.tool_runner import stream_process
+    import tempfile
+
+    fd, hash_file = tempfile.mkstemp(prefix="asas_hash_", suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        f.write(hash_value)
+
+    tail = []
+
+    def on_line(line: str):
+        if line.startswith("{"):
+            try:
+                status = json.loads(line)
+            except ValueError:
+                return
+            done, total = (status.get("progress") or [0, 0])[:2]
+            speed = sum(d.get("speed", 0) for d in status.get("devices", []))
+            recovered = (status.get("recovered_hashes") or [0, 1])[0]
+            ctx.progress(
+                percent=round(100.0 * done / total, 2) if total else 0.0,
+                speed_hs=speed,
+                recovered=recovered,
+            )
+        else:
+            tail.append(line)
+            del tail[:-20]
+
+    cmd = ["hashcat", "-m", hash_type, "-a", "0", hash_file, wordlist_path, "--force",
+           "--potfile-disable", "--outfile-format", "2", "-o", hash_file + ".out",
+           "--status", "--status-json", "--status-timer", "5", "--quiet"]
+    logger.info(f"Running GPU Hashcat job: {' '.join(cmd)}")
+    try:
+        returncode = stream_process(cmd, on_line)
+        cracked = ""
+        if os.path.exists(hash_file + ".out"):
+            with open(hash_file + ".out") as f:
+                cracked = f.read().strip()
+        if cracked:
+            ctx.event("cracked", plaintext=cracked)
+            return {"cracked": True, "plaintext": cracked}
+        if returncode not in (0, 1):  # 1 = exhausted
+            raise RuntimeError(f"hashcat exited with {returncode}: " + "\n".join(tail[-5:]))
+        return {"cracked": False, "message": "Password not found in wordlist."}
+    finally:
+        for path in (hash_file, hash_file + ".out"):
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,6 +1,12 @@
-from typing import Dict, List, Optional
+import logging
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
 from langchain_core.tools import tool
 from ..clients.ida_client import IdaClient
+from ..utils.code_search import get_code_index
+
+logger = logging.getLogger(__name__)
 
 # Singleton client instance
 _ida_client: Optional[IdaClient] = None
@@ -12,6 +18,41 @@ def get_ida_client() -> IdaClient:
         _ida_client = IdaClient()
     return _ida_client
 
+async def _idb_identity(client: IdaClient) -> Optional[Tuple[str, str]]:
+    """(sha256, file name) of the binary open in IDA; None when the server does not report it."""
+    try:
+        meta = await client.execute_tool("get_metadata", {})
+    except Exception as e:
+        logger.warning(f"IDA metadata unavailable: {e}")
+        return None
+    if not isinstance(meta, dict):
+        return None
+    name = meta.get("module") or os.path.basename(meta.get("path") or "")
+    digest = str(meta.get("sha256") or "").lower()
+    if digest:
+        return digest, name or digest[:12]
+    if name:
+        return f"ida:{name}", name
+    return None
+
+
+def _index_decompilation(identity: Optional[Tuple[str, str]], addr: str, result) -> None:
+    """Add an IDA decompilation to the code_search index (keyed by the IDB's input file)."""
+    if isinstance(result, dict):
+        code = result.get("code") or result.get("decompiled") or result.get("pseudocode") or ""
+        name, address = result.get("name") or addr, result.get("addr") or result.get("address") or addr
+    else:
+        code, name, address = str(result or ""), addr, addr
+    if not code:
+        return
+    if identity is None:
+        return  # keyed by the server alone, main of one binary would replace another's
+    try:
+        get_code_index().add_functions(identity[0], identity[1], [{"name": name, "address": address, "code": code}],
+                                       source="ida")
+    except sqlite3.Error as e:
+        logger.warning(f"Code search indexing failed: {e}")
+
 @tool
 async def ida_decompile(addr: str) -> str:
     """
@@ -25,7 +66,9 @@ async def ida_decompile(addr: str) -> str:
     """
     client = get_ida_client()
     try:
+        identity = await _idb_identity(client)
         result = await client.execute_tool("decompile", {"addr": addr})
+        _index_decompilation(identity, addr, result)
         return str(result)
     except Exception as e:
         return f"Error decompiling at {addr}: {e}"
@@ -0,0 +1,104 @@
+"""
+Background jobs for the long-running tools (fuzzing, hashcat, whole-binary
+Ghidra). The start_* helpers back both the MCP job tools in server.py and the
+LangChain tools below, which agents that bind tools in-process (ReverseAgent)
+use: start a job once, then block in ONE job_wait instead of polling.
+"""
+import json
+import os
+from langchain_core.tools import tool
+
+from ..executors.jobs import Job, get_job_manager
+
+
+def start_fuzz_job(binary_path: str, duration_sec: int = 600) -> Job:
+    from . import pwn_fuzz
+    return get_job_manager().submit(
+        "fuzz", lambda ctx: pwn_fuzz.fuzz_job(ctx, binary_path, duration_sec),
+        params={"binary": os.path.basename(binary_path), "duration_sec": duration_sec},
+        timeout=duration_sec + 300,
+    )
+
+
+def start_ghidra_job(file_path: str) -> Job:
+    from . import reverse_ghidra
+    return get_job_manager().submit(
+        "ghidra", lambda ctx: reverse_ghidra.export_job(ctx, file_path),
+        params={"binary": os.path.basename(file_path)},
+    )
+
+
+def start_hashcat_job(hash_value: str, hash_type: str,
+                      wordlist_path: str = "/usr/share/wordlists/rockyou.txt") -> Job:
+    from . import gpu_tools
+    return get_job_manager().submit(
+        "hashcat", lambda ctx: gpu_tools.hashcat_job(ctx, hash_value, hash_type, wordlist_path),
+        params={"hash_type": hash_type},
+    )
+
+
+def _dumps(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False)
+
+
+@tool
+async def fuzz_job_start(binary_path: str, duration_sec: int = 600) -> str:
+    """
+    [后台任务-Fuzz] 启动 AFL++ (QEMU 模式) Fuzz 任务，立即返回 job_id。
+    container 事件给出容器 ID，发现 crash 时产生 crash 事件（列出崩溃文件名）。
+
+    Args:
+        binary_path: 需要 Fuzz 的二进制文件在本地的路径。
+        duration_sec: Fuzz 时长（秒），默认 10 分钟。
+
+    Returns:
+        任务快照 (job_id)；之后调用一次 job_wait(job_id, until="crash") 等待第一个崩溃。
+    """
+    return _dumps(start_fuzz_job(binary_path, duration_sec).snapshot())
+
+
+@tool
+async def ghidra_decompile_job_start(file_path: str) -> str:
+    """
+    [后台任务-逆向] 并行反编译整个二进制：每个用户函数一个 function 事件，
+    main 完成时产生携带代码的 main 事件（main 最先反编译）。
+
+    Args:
+        file_path: 二进制文件的本地路径。
+
+    Returns:
+        任务快照 (job_id)；之后调用 job_wait(job_id, until="main") 先拿到 main。
+    """
+    return _dumps(start_ghidra_job(file_path).snapshot())
+
+
+@tool
+async def hashcat_job_start(hash_value: str, hash_type: str,
+                            wordlist_path: str = "/usr/share/wordlists/rockyou.txt") -> str:
+    """
+    [后台任务-GPU] 启动 Hashcat 字典破解任务，破解成功时产生 cracked 事件。
+
+    Args:
+        hash_value: 待破解的 Hash。
+        hash_type: Hashcat 模式（如 '0'=MD5, '100'=SHA1, '1400'=SHA256）。
+        wordlist_path: 字典路径。
+
+    Returns:
+        任务快照 (job_id)；之后调用一次 job_wait(job_id, until="cracked") 等待结果。
+    """
+    return _dumps(start_hashcat_job(hash_value, hash_type, wordlist_path).snapshot())
+
+
+@tool
+async def job_wait(job_id: str, until: str = "done", timeout: float = 300, since: int = 0) -> str:
+    """
+    [后台任务] 阻塞等待任务满足条件（无需反复轮询）。
+
+    Args:
+        job_id: 任务 ID。
+        until: 等待条件: "done" (结束), "any" (任意新事件), 事件类型 (如 "crash", "cracked", "main"),
+               或指标表达式 (如 "unique_crashes > 0", "percent >= 50")。
+        timeout: 最长等待秒数 (上限 600)，超时返回当前状态与指标。
+        since: 事件游标，传入上次返回的 next_since 只获取新事件。
+    """
+    return _dumps(await get_job_manager().wait(job_id, until, timeout, since))
@@ -1,9 +1,11 @@
-import subprocess
 import os
 import tempfile
 import uuid
 import logging
 
+from ..executors.tool_runner import run_process
+from . import binfmt
+
 class KaliExecutor:
     """
     Executor for running commands inside a Kali Linux VM via VMware Fusion's vmrun.
@@ -34,7 +36,7 @@ class KaliExecutor:
         ]
         
         try:
-            res1 = subprocess.run(run_cmd, capture_output=True, text=True)
+            res1 = run_process(run_cmd)
             if res1.returncode != 0:
                 return f"Error running program in guest: {res1.stderr}"
             
@@ -48,7 +50,7 @@ class KaliExecutor:
                 guest_tmp_file,
                 host_tmp_file
             ]
-            res2 = subprocess.run(copy_cmd, capture_output=True, text=True)
+            res2 = run_process(copy_cmd)
             if res2.returncode != 0:
                 return f"Error copying file from guest: {res2.stderr}"
             
@@ -64,10 +66,10 @@ class KaliExecutor:
                 output = "Error: Host output file not found after copy."
             
             # Cleanup in guest
-            subprocess.run([
+            run_process([
                 self.vmrun_path, "-gu", self.user, "-gp", self.password, 
                 "runProgramInGuest", self.vmx_path, "/bin/rm", guest_tmp_file
-            ], capture_output=True)
+            ])
             
             return output
         except Exception as e:
@@ -87,7 +89,7 @@ class KaliExecutor:
             guest_path
         ]
         try:
-            res = subprocess.run(copy_cmd, capture_output=True, text=True)
+            res = run_process(copy_cmd)
             if res.returncode != 0:
                 return f"Error copying file to guest: {res.stderr}"
             return f"Success: File uploaded to {guest_path}"
@@ -114,6 +116,16 @@ def ensure_package(package_name: str):
         logging.info(f"Installing {package_name} in Kali VM...")
         executor.execute(f"sudo apt-get update && sudo apt-get install -y {package_name}")
 
+# guest path -> (host path, mtime at upload): lets header-only tools answer
+# from the host copy with binfmt instead of three vmrun round trips
+_host_copies = {}
+
+def _host_copy(file_path_guest: str):
+    host_path, mtime = _host_copies.get(os.path.normpath(file_path_guest), (None, None))
+    if host_path is None or not os.path.exists(host_path) or os.path.getmtime(host_path) != mtime:
+        return None
+    return host_path
+
 def upload_file(host_path: str, guest_path: str) -> str:
     """[Kali] 将本地物理机(宿主机)的文件上传到 Kali 虚拟机中以供分析"""
     executor = get_executor()
@@ -121,16 +133,31 @@ def upload_file(host_path: str, guest_path: str) -> str:
         return f"Error: Host file {host_path} does not exist."
     if guest_path.endswith("/"):
         guest_path = guest_path + os.path.basename(host_path)
-    return executor.copy_to_guest(host_path, guest_path)
+    result = executor.copy_to_guest(host_path, guest_path)
+    if result.startswith("Success"):
+        _host_copies[os.path.normpath(guest_path)] = (host_path, os.path.getmtime(host_path))
+    return result
 
 def file_cmd(file_path_guest: str) -> str:
     """[Kali] 使用 file 命令判断文件架构和类型"""
+    host_path = _host_copy(file_path_guest)
+    if host_path:
+        try:
+            return f"{file_path_guest}: {binfmt.describe(host_path)}"
+        except (OSError, binfmt.BinaryFormatError):
+            pass  # not an ELF/PE: let file(1) in the VM identify it
     executor = get_executor()
     return executor.execute(f"file '{file_path_guest}'")
 
 def checksec(file_path_guest: str) -> str:
     """[Kali] 使用 checksec 工具检查二进制文件的安全编译选项 (Pwn必备)"""
     # ensure_package("checksec") # checksec usually part of pwntools or can be installed
+    host_path = _host_copy(file_path_guest)
+    if host_path:
+        try:
+            return f"[*] '{file_path_guest}'\n{binfmt.checksec_report(host_path)}"
+        except (OSError, binfmt.BinaryFormatError):
+            pass
     executor = get_executor()
     return executor.execute(f"checksec '{file_path_guest}'")
 
@@ -4,6 +4,19 @@ from ..executors.docker_manager import get_docker_manager
 import time
 import json
 
+def parse_afl_stats(raw_stats: str) -> dict:
+    """解析 afl-whatsup 汇总行 (例子: total paths 30, unique crashes 0)"""
+    import re
+    data = {"total_paths": 0, "unique_crashes": 0, "execs_per_sec": 0}
+    paths_match = re.search(r"total paths (\d+)", raw_stats)
+    crashes_match = re.search(r"unique crashes (\d+)", raw_stats)
+    execs_match = re.search(r"speed (\d+) execs/sec", raw_stats)
+
+    if paths_match: data["total_paths"] = int(paths_match.group(1))
+    if crashes_match: data["unique_crashes"] = int(crashes_match.group(1))
+    if execs_match: data["execs_per_sec"] = int(execs_match.group(1))
+    return data
+
 @tool
 async def pwn_fuzz_start(binary_path: str, duration_sec: int = 600) -> str:
     """
@@ -53,29 +66,10 @@ async def pwn_fuzz_check(container_id: str) -> str:
     Args:
         container_id: Fuzzer 容器的 ID。
     """
-    import re
     dm = get_docker_manager()
     raw_stats = dm.exec_command(container_id, "afl-whatsup /data/out")
-    
-    # 简单的正则解析
-    data = {
-        "raw": raw_stats,
-        "fuzzers": [],
-        "total_paths": 0,
-        "unique_crashes": 0,
-        "execs_per_sec": 0
-    }
-    
-    # 提取总数 (afl-whatsup 汇总行)
-    # 例子: total paths 30, unique crashes 0
-    paths_match = re.search(r"total paths (\d+)", raw_stats)
-    crashes_match = re.search(r"unique crashes (\d+)", raw_stats)
-    execs_match = re.search(r"speed (\d+) execs/sec", raw_stats)
-    
-    if paths_match: data["total_paths"] = int(paths_match.group(1))
-    if crashes_match: data["unique_crashes"] = int(crashes_match.group(1))
-    if execs_match: data["execs_per_sec"] = int(execs_match.group(1))
-    
+    data = {"raw": raw_stats, "fuzzers": []}
+    data.update(parse_afl_stats(raw_stats))
     return json.dumps(data)
 
 @tool
@@ -106,3 +100,66 @@ async def pwn_fuzz_triage(container_id: str, crash_filename: str) -> str:
     report = dm.exec_command(container_id, triage_cmd)
     
     return f"--- Crash Triage Report for {crash_filename} ---\n{report}"
+
+
+def fuzz_job(ctx, binary_path: str, duration_sec: int = 600, poll_sec: int = 15) -> dict:
+    """
+    Job body: run AFL++ for duration_sec, pushing coverage metrics and one
+    ``crash`` event per batch of new crashes instead of waiting for pwn_fuzz_check polls.
+    """
+    import base64
+    import shutil
+    import tempfile
+    dm = get_docker_manager()
+
+    # The container mounts the binary's directory rw, so fuzz a private copy
+    work_dir = tempfile.mkdtemp(prefix="asas_fuzz_")
+    binary_name = os.path.basename(binary_path)
+    local_binary = os.path.join(work_dir, binary_name)
+    shutil.copy2(binary_path, local_binary)
+    os.chmod(local_binary, 0o755)
+
+    container, kept = None, False
+    try:
+        container = dm.start_fuzzer_container(local_binary)
+        if not container:
+            raise RuntimeError("Failed to start fuzzer container. Check docker daemon.")
+        ctx.event("container", container_id=container.id, binary=binary_name)
+
+        dm.exec_command(container.id, "mkdir -p /data/in /data/out")
+        dm.exec_command(container.id, "echo 'hello' > /data/in/seed")
+        fuzz_cmd = f"timeout {duration_sec} afl-fuzz -Q -i /data/in -o /data/out -- /data/{binary_name}"
+        dm.exec_command(container.id, f"bash -c 'nohup {fuzz_cmd} > /data/fuzz.log 2>&1 &'")
+
+        known_crashes = set()
+        stats = {}
+        deadline = time.time() + duration_sec
+        while time.time() < deadline:
+            if not ctx.sleep(min(poll_sec, max(0, deadline - time.time()))):
+                return {"status": "cancelled", "container_id": container.id, **stats}
+            stats = parse_afl_stats(dm.exec_command(container.id, "afl-whatsup /data/out"))
+            ctx.progress(**stats)
+            crashes = [f for f in dm.list_files(container.id, "/data/out/default/crashes") if f.startswith("id:")]
+            new = [f for f in crashes if f not in known_crashes]
+            if new:
+                known_crashes.update(new)
+                ctx.event("crash", files=new, total=len(known_crashes),
+                          message=f"{len(new)} new crash(es); triage with pwn_fuzz_triage")
+
+        # Crash inputs go into the result so they outlive the container
+        crash_inputs = {}
+        for name in sorted(known_crashes):
+            data = dm.read_file(container.id, f"/data/out/default/crashes/{name}")
+            if data is not None:
+                crash_inputs[name] = base64.b64encode(data).decode()
+
+        # Container is kept alive for pwn_fuzz_triage; its /data (work_dir) goes with it
+        dm.remove_with_container(container.id, work_dir)
+        kept = True
+        return {"status": "finished", "container_id": container.id,
+                "crashes": sorted(known_crashes), "crash_inputs": crash_inputs, **stats}
+    finally:
+        if not kept:
+            if container:
+                dm.stop_container(container.id)
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -1,9 +1,165 @@
-import re
-from typing import List
+import bisect
+import mmap
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from . import binfmt
+
+ENCODINGS = ("ascii", "utf-16le", "utf-16be")
+# Bytes scanned per step: memory stays bounded however large the mapped file is
+CHUNK_SIZE = 1 << 20
+
+# byte -> 0xff if it is in the class else 0x00 (for bytes.translate)
+_PRINTABLE_MASK = bytes(0xFF if 0x20 <= b <= 0x7E else 0 for b in range(256))
+_ZERO_MASK = bytes(0xFF if b == 0 else 0 for b in range(256))
+
 
 def extract_strings(data: bytes, min_length: int = 4) -> List[str]:
-    """从二进制数据中提取可打印字符串"""
-    # 匹配连续的可打印 ASCII 字符
-    pattern = rb'[\x20-\x7e]{' + str(min_length).encode() + rb',}'
-    matches = re.findall(pattern, data)
-    return [m.decode('ascii') for m in matches]
+    """从二进制数据中提取可打印字符串 (连续的可打印 ASCII 字符)"""
+    return [s["string"] for s in iter_strings(data, min_length, encodings=("ascii",))]
+
+
+def _mask_runs(mask: bytes, min_length: int) -> Iterator[tuple]:
+    """(start, end) of every run of at least min_length 0xff bytes (memchr-speed finds, no regex)."""
+    needle = b"\xff" * min_length
+    find = mask.find
+    pos = find(needle)
+    while pos != -1:
+        end = find(b"\x00", pos)
+        end = len(mask) if end == -1 else end
+        yield pos, end
+        pos = find(needle, end)
+
+
+def _utf16_runs(buf: bytes, min_length: int, base: int = 0) -> List[tuple]:
+    """
+    Sorted UTF-16 runs of printable ASCII code units. For each byte
+    alignment the even/odd byte lanes are turned into 0xff/0x00 masks with
+    translate and ANDed as big integers, then scanned like ASCII.
+    ``base`` is the file offset of ``buf`` (alignment is judged on it).
+    """
+    runs = []
+    for align in (0, 1):
+        odd = buf[align + 1::2]
+        even = buf[align::2][:len(odd)]
+        lanes = len(odd)
+        if lanes < min_length:
+            continue
+        masks = {
+            "utf-16le": int.from_bytes(even.translate(_PRINTABLE_MASK), "little")
+            & int.from_bytes(odd.translate(_ZERO_MASK), "little"),
+            "utf-16be": int.from_bytes(even.translate(_ZERO_MASK), "little")
+            & int.from_bytes(odd.translate(_PRINTABLE_MASK), "little"),
+        }
+        for encoding, value in masks.items():
+            runs += [(align + 2 * pos, align + 2 * end, encoding)
+                     for pos, end in _mask_runs(value.to_bytes(lanes, "little"), min_length)]
+    # "H\0i\0" between NUL padding also reads as "\0H\0i" in the other
+    # byte order: of two overlapping runs keep the 2-byte aligned one (both
+    # byte orders are always scanned so filtering one out cannot resurrect
+    # the misaligned twin)
+    runs.sort()
+    kept = []
+    for run in runs:
+        if kept and run[0] < kept[-1][1] and run[2] != kept[-1][2]:
+            if (base + run[0]) % 2:
+                continue
+            kept.pop()
+        kept.append(run)
+    return kept
+
+
+def iter_strings(data, min_length: int = 4, encodings: Sequence[str] = ENCODINGS,
+                 sections: Optional[List[tuple]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield {offset, encoding, string[, section]} in file order from a
+    bytes-like object (an mmap works without copying the whole file).
+
+    The input is scanned in CHUNK_SIZE steps; a string crossing a chunk
+    boundary is rescanned from its start with the next chunk (a string
+    filling the whole chunk doubles the window instead), so results are
+    identical to a single pass. ``sections`` are sorted
+    (start, end, name) file ranges, e.g. binfmt.section_ranges().
+    """
+    unknown = set(encodings) - set(ENCODINGS)
+    if unknown:
+        raise ValueError(f"Unknown encodings {sorted(unknown)}, expected a subset of {ENCODINGS}")
+    min_length = max(1, min_length)
+    wide = [e for e in encodings if e != "ascii"]
+    starts = [s[0] for s in sections or []]
+    overlap = 2 * min_length + 2  # a prefix too short to match yet is rescanned whole
+    total, pos, size = len(data), 0, CHUNK_SIZE
+    while pos < total:
+        end = min(pos + size, total)
+        buf = data[pos:end]
+        found = []
+        if "ascii" in encodings:
+            found = [(start, stop, "ascii") for start, stop in _mask_runs(buf.translate(_PRINTABLE_MASK), min_length)]
+        if wide:
+            # unwanted byte order kept until after the cut: it decides where twins split
+            found += _utf16_runs(buf, min_length, pos)
+            found.sort()
+        next_pos = end
+        if end < total:
+            # strings crossing the cut may continue in the next chunk: move the
+            # cut to their start (repeated, since moving it can make more cross)
+            cut, moved = len(buf) - overlap, True
+            while moved:
+                moved = False
+                for start, stop, _ in found:
+                    if start < cut < stop:
+                        cut, moved = start, True
+            if cut <= 0:
+                # a string runs from the window start past the cut: scan a wider window
+                size *= 2
+                continue
+            next_pos = pos + cut
+            found = [r for r in found if r[0] < cut]
+        for start, stop, encoding in found:
+            if encoding not in encodings:
+                continue
+            item = {"offset": pos + start, "encoding": encoding, "string": buf[start:stop].decode(encoding)}
+            if sections:
+                i = bisect.bisect_right(starts, pos + start) - 1
+                item["section"] = sections[i][2] if i >= 0 and pos + start < sections[i][1] else None
+            yield item
+        pos, size = next_pos, CHUNK_SIZE
+
+
+def scan_strings(data, min_length: int = 4, encodings: Sequence[str] = ENCODINGS, limit: Optional[int] = None,
+                 pattern: Optional[str] = None, section: Optional[str] = None,
+                 sections: Optional[List[tuple]] = None) -> Dict[str, Any]:
+    """
+    Filtered strings: ``pattern`` is a case-insensitive substring,
+    ``section`` a section name (needs ``sections``). Scanning stops as soon
+    as ``limit`` strings were collected.
+    """
+    needle = pattern.lower() if pattern else None
+    strings, truncated = [], False
+    for item in iter_strings(data, min_length, encodings, sections):
+        if needle and needle not in item["string"].lower():
+            continue
+        if section and item.get("section") != section:
+            continue
+        if limit is not None and len(strings) >= limit:
+            truncated = True
+            break
+        strings.append(item)
+    return {"count": len(strings), "truncated": truncated, "strings": strings}
+
+
+def scan_file_strings(path: str, min_length: int = 4, encodings: Sequence[str] = ENCODINGS,
+                      limit: Optional[int] = 1000, pattern: Optional[str] = None,
+                      section: Optional[str] = None) -> Dict[str, Any]:
+    """scan_strings over a read-only mapping of ``path``, with ELF/PE section names."""
+    if not os.path.isfile(path):
+        return {"error": f"File not found: {path}"}
+    unknown = set(encodings) - set(ENCODINGS)
+    if unknown:
+        return {"error": f"Unknown encodings {sorted(unknown)}, expected a subset of {list(ENCODINGS)}"}
+    if os.path.getsize(path) == 0:
+        return {"count": 0, "truncated": False, "strings": []}
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        result = scan_strings(data, min_length, encodings, limit, pattern, section, binfmt.section_ranges(path))
+    result["file_size"] = os.path.getsize(path)
+    return result
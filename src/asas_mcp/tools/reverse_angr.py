@@ -1,20 +1,38 @@
-from typing import List, Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 from langchain_core.tools import tool
 import logging
 
+from ..utils import angr_explore
+from ..utils.angr_cache import get_angr_cache
+from ..utils.constraint_solver import ExpressionError, get_constraint_cache
+
 logger = logging.getLogger(__name__)
 
 @tool
-async def reverse_angr_solve(binary_path: str, find_addr: str, avoid_addrs: Optional[List[str]] = None, stdin_prefix_hex: Optional[str] = None) -> str:
+async def reverse_angr_solve(binary_path: str, find_addr: str, avoid_addrs: Optional[List[str]] = None,
+                             stdin_prefix_hex: Optional[str] = None, max_solutions: int = 1,
+                             timeout: Optional[int] = None, max_memory_mb: Optional[int] = None,
+                             max_active: Optional[int] = None, techniques: Optional[List[str]] = None,
+                             workers: int = 1, directed: bool = False) -> str:
     """
     使用 Angr 符号执行查找二进制文件中的特定路径（目标地址）。
     支持从已有的输入前缀（种子）开始继续探索。
+    探索受时间/内存/活跃状态数预算约束，超出预算即停止并返回已找到的结果。
     
     Args:
         binary_path: 需要分析的二进制文件路径。
         find_addr: 目标地址（十六进制字符串，如 '0x401234'）。
         avoid_addrs: 需要避开的地址列表（可选）。
         stdin_prefix_hex: Stdin 初始前缀的十六进制字符串（可选，用于协同 Fuzzing）。
+        max_solutions: 最多返回的不同 Stdin 解个数（可作为一批 Fuzz 种子）。
+        timeout: 探索时间预算（秒，默认 ASAS_ANGR_TIMEOUT=300）。
+        max_memory_mb: 探索期间内存增长预算（MB，默认 ASAS_ANGR_MAX_MEMORY_MB=4096）。
+        max_active: 活跃状态数上限，超出部分移入 pruned（默认 ASAS_ANGR_MAX_ACTIVE=256）。
+        techniques: 探索策略列表，可选 'dfs', 'length_limiter', 'veritesting', 'spiller'。
+        workers: 大于 1 时将活跃状态拆分到多个进程并行探索。
+        directed: 定向模式：按到 find_addr 的 CFG 距离优先探索，丢弃不可达状态；
+            给出 stdin_prefix_hex 时从种子具体路径的首个分叉点开始，而非入口点。
         
     Returns:
         解算出的输入内容（Stdin）或错误信息。
@@ -25,54 +43,115 @@ async def reverse_angr_solve(binary_path: str, find_addr: str, avoid_addrs: Opti
         return "Error: 'angr' library is not installed. Please install it to use this tool."
 
     try:
-        # 1. 初始化项目
-        project = angr.Project(binary_path, auto_load_libs=False)
-        
-        # 2. 从入口点开始建立初始状态
-        state = project.factory.entry_state()
-        
-        # 如果提供了初始前缀，将其注入 Stdin
-        if stdin_prefix_hex:
-            prefix_bytes = bytes.fromhex(stdin_prefix_hex.replace('0x', ''))
-            state.posix.stdin.content.append((prefix_bytes, len(prefix_bytes)))
-            print(f"DEBUG [Angr]: Injected {len(prefix_bytes)} bytes of prefix from Fuzzer seeds.")
-        
-        # 3. 创建仿真管理器
-        simgr = project.factory.simgr(state)
+        result = await solve_stdin(binary_path, find_addr, avoid_addrs, stdin_prefix_hex, max_solutions,
+                                   timeout, max_memory_mb, max_active, techniques, workers, directed)
         
-        # 4. 转换地址格式
-        target_addr = int(find_addr, 16)
-        avoid_list = [int(a, 16) for a in (avoid_addrs or [])]
-        
-        # 5. 执行搜索
-        print(f"DEBUG [Angr]: Exploring path to {find_addr}...")
-        simgr.explore(find=target_addr, avoid=avoid_list)
-        
-        # 6. 处理结果
-        if simgr.found:
-            found_state = simgr.found[0]
-            # 提取 Stdin 产生的输入
-            solution = found_state.posix.dumps(0)
-            try:
-                decoded_solution = solution.decode('utf-8')
-            except:
-                decoded_solution = str(solution)
-                
-            return f"Success! Path found. Input reaching {find_addr}:\n{decoded_solution}"
-        else:
-            return f"Could not find a path to {find_addr}. Explored {len(simgr.deadended)} deadends."
+        # 5. 处理结果
+        note = f" ({', '.join(result['notes'])})" if result["notes"] else ""
+        solutions = result["solutions"]
+        if not solutions:
+            deadends = result["stashes"].get("deadended", 0)
+            return f"Could not find a path to {find_addr}. Explored {deadends} deadends.{note}"
+        if len(solutions) == 1:
+            return f"Success! Path found. Input reaching {find_addr}:{note}\n{_show_input(solutions[0])}"
+        lines = [f"Success! Found {len(solutions)} distinct inputs reaching {find_addr}:{note}"]
+        for i, solution in enumerate(solutions, 1):
+            lines.append(f"[{i}] {_show_input(solution)} (hex: {solution.hex()})")
+        return "\n".join(lines)
             
     except Exception as e:
         logger.error(f"Angr execution failed: {e}")
         return f"Error during Angr execution: {str(e)}"
+
+
+async def solve_stdin(binary_path: str, find_addr: str, avoid_addrs: Optional[List[str]] = None,
+                      stdin_prefix_hex: Optional[str] = None, max_solutions: int = 1,
+                      timeout: Optional[int] = None, max_memory_mb: Optional[int] = None,
+                      max_active: Optional[int] = None, techniques: Optional[List[str]] = None,
+                      workers: int = 1, directed: bool = False) -> Dict[str, Any]:
+    """
+    reverse_angr_solve 背后的搜索：返回 angr_explore.explore 的结果（solutions 为原始
+    Stdin 字节）并附加 notes。SwarmWorker 在进程内直接调用，以复用其 angr 项目缓存。
+    """
+    # 1-2. 加载项目并建立初始状态 (首次加载耗时数秒，放到线程中)
+    entry, state, prefix_bytes = await asyncio.to_thread(_start_state, binary_path, stdin_prefix_hex)
+    project = entry.project
+    
+    # 3. 转换地址格式
+    target_addr = int(find_addr, 16)
+    avoid_list = [int(a, 16) for a in (avoid_addrs or [])]
+    
+    # 4. 在预算内执行搜索 (放到线程中，避免阻塞事件循环)
+    budget = angr_explore.ExplorationBudget(
+        angr_explore.DEFAULT_TIMEOUT if timeout is None else timeout,
+        angr_explore.DEFAULT_MAX_MEMORY_MB if max_memory_mb is None else max_memory_mb,
+        angr_explore.DEFAULT_MAX_ACTIVE if max_active is None else max_active,
+    )
+    notes = []
+    search, start = None, state
+    if directed:
+        # CFG 距离按二进制与目标缓存；种子分叉点按前缀缓存
+        search = await asyncio.to_thread(angr_explore.directed_search, entry, target_addr)
+        if search is None:
+            notes.append(f"{find_addr} not in CFG, undirected")
+        elif prefix_bytes:
+            start = await asyncio.to_thread(angr_explore.seed_states, entry, state, prefix_bytes, budget) or state
+    print(f"DEBUG [Angr]: Exploring path to {find_addr}{' (directed)' if search else ''}...")
+    result = await asyncio.to_thread(
+        angr_explore.explore, project, start, target_addr, avoid_list,
+        max_solutions=max_solutions, budget=budget, techniques=techniques or (), workers=workers,
+        directed=search,
+    )
+    if result["stopped"]:
+        notes.append(f"stopped: {result['stopped']}")
+    if result["pruned"]:
+        notes.append(f"{result['pruned']} states pruned")
+    if result["unreachable"]:
+        notes.append(f"{result['unreachable']} states cannot reach the target")
+    result["notes"] = notes
+    return result
+
+
+def _start_state(binary_path: str, stdin_prefix_hex: Optional[str]):
+    # 1. 获取项目 (按二进制 sha256 缓存，重复调用跳过加载与提升)
+    entry = get_angr_cache().get(binary_path)
+    
+    # 2. 从入口点开始建立初始状态 (缓存的初始状态的副本)
+    state = entry.entry_state()
+    
+    # 如果提供了初始前缀，将其注入 Stdin
+    prefix_bytes = b""
+    if stdin_prefix_hex:
+        prefix_bytes = bytes.fromhex(stdin_prefix_hex.replace('0x', ''))
+        state.posix.stdin.content.append((prefix_bytes, len(prefix_bytes)))
+        print(f"DEBUG [Angr]: Injected {len(prefix_bytes)} bytes of prefix from Fuzzer seeds.")
+    return entry, state, prefix_bytes
+
+
+def _show_input(solution: bytes) -> str:
+    # 提取 Stdin 产生的输入
+    try:
+        return solution.decode('utf-8')
+    except UnicodeDecodeError:
+        return str(solution)
+
 @tool
-async def reverse_angr_eval(expression: str, symbolic_vars: dict) -> str:
+async def reverse_angr_eval(expression: str, symbolic_vars: dict, constraints: Optional[List[str]] = None,
+                            max_solutions: int = 1, minimize: Optional[str] = None,
+                            maximize: Optional[str] = None) -> str:
     """
-    使用 Angr/Claripy 解算独立的符号表达式或方程。
+    使用 Angr/Claripy 解算独立的符号表达式或方程组。
+    表达式经 AST 白名单编译（不使用 eval）；约束系统按变量与约束缓存，
+    在上一次调用的约束之后追加新约束时，只编译并添加新增部分。
     
     Args:
-        expression: Python 风格的表达式字符串，如 'x + 5 == 10'。
+        expression: Python 风格的表达式字符串，如 'x + 5 == 10'（可为空字符串，仅使用 constraints）。
         symbolic_vars: 变量名及其位宽的映射，如 {'x': 32}。
+        constraints: 更多约束表达式列表，与 expression 在同一个求解器中联立求解。
+            支持算术/位运算/比较、and/or/not、切片 x[7:0] 及 Concat、Extract、If、ZeroExt、SLT 等函数。
+        max_solutions: 最多枚举的不同解个数。
+        minimize: 需要最小化的目标表达式（如 'x'），在最优值处给出解。
+        maximize: 需要最大化的目标表达式。
         
     Returns:
         满足条件的变量解。
@@ -82,31 +161,36 @@ async def reverse_angr_eval(expression: str, symbolic_vars: dict) -> str:
     except ImportError:
         return "Error: 'claripy' library is not installed. Please install it to use this tool."
 
+    texts = ([expression] if expression and expression.strip() else []) + list(constraints or [])
+    if not symbolic_vars:
+        return "Error: symbolic_vars must declare at least one variable, e.g. {'x': 32}."
+    if not texts:
+        return "Error: no constraints given (expression or constraints)."
+
+    def solve():
+        # 1. 取得约束系统 (缓存命中或在缓存系统上追加增量约束)
+        variables = {name: int(bits) for name, bits in symbolic_vars.items()}
+        system, reused = get_constraint_cache().system(variables, texts)
+        # 2. 求解 (枚举多个解 / 求最优值)
+        return reused, system.solve(max_solutions, minimize, maximize)
+
     try:
-        solver = claripy.Solver()
-        
-        # 1. 创建符号变量
-        vars_map = {}
-        for name, bits in symbolic_vars.items():
-            vars_map[name] = claripy.BVS(name, bits)
-            
-        # 2. 构建并添加约束
-        # 安全注意：这里使用的是 eval。由于这是在受控的分析环境中，
-        # 并且输入由 Agent 产生，我们暂时信任此行为，但理想情况下应用解析库。
-        # 这里我们将 vars_map 作为 globals 传入 eval
-        constraint = eval(expression, {"__builtins__": None}, vars_map)
-        solver.add(constraint)
-        
-        # 3. 求解
-        if solver.satisfiable():
-            results = {}
-            for name, var in vars_map.items():
-                val = solver.eval(var, 1)[0]
-                results[name] = hex(val)
-                
-            return f"Solution found!\n{results}"
-        else:
-            return "Unsatisifiable: No solution exists for the given constraints."
-            
+        reused, result = await asyncio.to_thread(solve)
+    except ExpressionError as e:
+        return f"Error: {e}"
     except Exception as e:
         return f"Error during evaluation: {str(e)}"
+
+    if reused:
+        logger.debug(f"Reused {reused} cached constraints, added {len(texts) - reused}.")
+    if not result["satisfiable"]:
+        return "Unsatisifiable: No solution exists for the given constraints."
+    lines = [f"{name.capitalize()}: {hex(result[name])}" for name in ("minimum", "maximum") if name in result]
+    solutions = [{name: hex(value) for name, value in model.items()} for model in result["solutions"]]
+    if len(solutions) == 1:
+        lines.insert(0, "Solution found!")
+        lines.append(str(solutions[0]))
+    else:
+        lines.insert(0, f"Found {len(solutions)} distinct solutions:")
+        lines += [f"[{i}] {solution}" for i, solution in enumerate(solutions, 1)]
+    return "\n".join(lines)
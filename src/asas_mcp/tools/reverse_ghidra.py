@@ -1,8 +1,27 @@
 import subprocess
 import os
 import json
+import logging
 import tempfile
 import shutil
+import hashlib
+import sqlite3
+import threading
+import uuid
+
+from ..executors.tool_runner import run_process
+from ..executors.ghidra_service import (
+    DECOMPILER_THREADS, SERVICE_SCRIPT, GhidraServiceError, GhidraServiceUnavailable, get_ghidra_pool,
+)
+from ..utils.ghidra_cache import get_ghidra_cache, script_version
+from ..utils.code_search import get_code_index
+from ..utils.function_sigs import get_signature_db
+from ..utils.ghidra_index import GhidraIndex, build_index
+from . import binfmt
+from .ghidra_compress import ABBREVIATE_IDENTIFIERS, COMPRESS_OUTPUT, compress_code, compress_functions
+from .ghidra_rank import DECOMPILE_TOKEN_BUDGET, select_functions
+
+logger = logging.getLogger(__name__)
 
 # Timeout for Ghidra analysis (seconds)
 GHIDRA_TIMEOUT = 120
@@ -24,33 +43,125 @@ def _is_user_function(name: str) -> bool:
     return True
 
 
-def analyze_binary(file_path: str) -> dict:
+EXPORT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts", "GhidraExport.java")
+GHIDRA_IMAGE = "blacktop/ghidra"
+
+
+def _export_version() -> str:
+    return script_version(EXPORT_SCRIPT, SERVICE_SCRIPT, extra=GHIDRA_IMAGE)
+
+
+def _library_functions(entries: list) -> dict:
+    """{name: "memcpy (libc-static-O2)"} for entries matching the library signature DB."""
+    matches = get_signature_db().recognize([e for e in entries if e.get("code")])
+    return {name: f"{m['name']} ({m['library']})" for name, m in matches.items()}
+
+
+def _run_ghidra_export(file_path: str, mode: str = "full", functions: list = None, on_function=None):
     """
-    Run Ghidra Headless inside Docker to decompile ALL user functions.
-    
-    Args:
-        file_path: Absolute path to the binary file on the host.
-        
-    Returns:
-        Dictionary with 'functions' (list of {name, address, code}) and 'summary'.
+    Raw export (list of {name, address, size, signature, calls, callers[, code]})
+    or an error dict. ``mode`` follows the GhidraExport.java contract:
+    full | metadata (no decompiler) | targeted (only ``functions``) |
+    index (whole-program index records instead of functions).
+    ``on_function`` is called with each entry as soon as it is decompiled.
+    Prefers a warm worker from the Ghidra service pool; falls back to a
+    one-shot container when the service is disabled or cannot be started.
+    """
+    pool = get_ghidra_pool()
+    if pool.available():
+        try:
+            if mode == "metadata":
+                return pool.list_functions(file_path)
+            if mode == "index":
+                return pool.index(file_path)
+            if mode == "targeted":
+                return pool.decompile(file_path, functions or [], on_function=on_function)
+            return pool.export(file_path, on_function=on_function)
+        except GhidraServiceUnavailable as e:
+            logger.warning(f"Ghidra service unavailable ({e}); falling back to one-shot analysis")
+        except GhidraServiceError as e:
+            return {"error": f"Ghidra service error: {e}"}
+    return _run_ghidra_oneshot(file_path, mode, functions, on_function)
+
+
+def _is_end_marker(entry) -> bool:
+    """GhidraExport.java ends a complete export with {"done": <entries written>}."""
+    return isinstance(entry, dict) and set(entry) == {"done"}
+
+
+def _follow_jsonl(path: str, entries: list, on_entry, stop: threading.Event, poll: float = 0.2):
+    """Tail a JSON Lines file being written by Ghidra until ``stop`` is set."""
+    offset, buf = 0, b""
+    while True:
+        finished = stop.is_set()
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except OSError:
+            chunk = b""
+        offset += len(chunk)
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        if finished and buf:  # the writer is gone: a last line without a newline is still a line
+            lines.append(buf)
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            entries.append(entry)
+            if on_entry is not None and not _is_end_marker(entry):
+                on_entry(entry)
+        if finished:
+            return
+        stop.wait(poll)
+
+
+def _check_complete(entries: list, result: subprocess.CompletedProcess):
+    """
+    The export without its end marker, or an error dict when Ghidra failed
+    or stopped early: a truncated export must never be cached as complete.
+    """
+    stderr = result.stderr[-500:] if result.stderr else ""
+    if result.returncode != 0:
+        return {"error": f"Ghidra exited with status {result.returncode}", "stderr": stderr}
+    if not entries or not _is_end_marker(entries[-1]):
+        return {"error": "Ghidra export is incomplete (no end marker)", "stderr": stderr}
+    expected, entries = entries[-1]["done"], entries[:-1]
+    if expected != len(entries):
+        return {"error": f"Ghidra export is incomplete ({len(entries)} of {expected} entries)", "stderr": stderr}
+    return entries
+
+
+def _run_ghidra_oneshot(file_path: str, mode: str = "full", functions: list = None, on_function=None):
+    """
+    Run Ghidra Headless inside a throwaway Docker container and return the raw
+    export or an error dict. The JSONL output is consumed while Ghidra is still
+    decompiling, so ``on_function`` sees early functions (main first). A
+    non-zero exit or a missing/mismatched end marker is an error.
     """
-    if not os.path.exists(file_path):
-        return {"error": f"File not found: {file_path}"}
-        
     with tempfile.TemporaryDirectory() as tmp_dir:
         binary_path = os.path.join(tmp_dir, "input_binary")
-        output_json = os.path.join(tmp_dir, "output.json")
-        script_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "scripts"))
+        output_json = os.path.join(tmp_dir, "output.jsonl")
+        script_dir = os.path.dirname(EXPORT_SCRIPT)
         
         shutil.copy2(file_path, binary_path)
             
+        container = f"asas-ghidra-{uuid.uuid4().hex[:12]}"
         cmd = [
             "docker", "run", "--rm",
+            "--name", container,
             "--entrypoint", "",
             "-v", f"{tmp_dir}:/data",
             "-v", f"{script_dir}:/scripts",
-            "-e", "GHIDRA_OUTPUT_PATH=/data/output.json",
-            "blacktop/ghidra",
+            "-e", "GHIDRA_OUTPUT_PATH=/data/output.jsonl",
+            "-e", f"GHIDRA_DECOMPILER_THREADS={DECOMPILER_THREADS}",
+            "-e", f"GHIDRA_EXPORT_MODE={mode}",
+            "-e", f"GHIDRA_EXPORT_FUNCTIONS={','.join(functions or [])}",
+            GHIDRA_IMAGE,
             "/ghidra/support/analyzeHeadless", "/data", "temp_proj",
             "-scriptPath", "/scripts",
             "-import", "/data/input_binary",
@@ -58,38 +169,28 @@ def analyze_binary(file_path: str) -> dict:
             "-deleteProject"
         ]
         
+        entries, stop = [], threading.Event()
+        follower = threading.Thread(
+            target=_follow_jsonl, args=(output_json, entries, on_function, stop), daemon=True
+        )
+        follower.start()
         try:
-            print(f"[Ghidra] Analyzing {file_path} (timeout={GHIDRA_TIMEOUT}s)...")
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, 
-                timeout=GHIDRA_TIMEOUT
-            )
+            print(f"[Ghidra] Analyzing {file_path} (mode={mode}, timeout={GHIDRA_TIMEOUT}s)...")
+            try:
+                result = run_process(
+                    cmd, timeout=GHIDRA_TIMEOUT,
+                    cleanup=["docker", "rm", "-f", container]
+                )
+            finally:
+                stop.set()
+                follower.join()
             
             if os.path.exists(output_json):
-                with open(output_json, "r") as f:
-                    raw = json.load(f)
-                
-                # Filter and format
-                user_funcs = []
-                for entry in raw:
-                    name = entry.get("name", "")
-                    if _is_user_function(name):
-                        user_funcs.append({
-                            "name": name,
-                            "address": entry.get("address", "unknown"),
-                            "code": entry.get("code", "")
-                        })
-                
-                return {
-                    "total_functions": len(raw),
-                    "user_functions": len(user_funcs),
-                    "functions": user_funcs
-                }
-            else:
-                return {
-                    "error": "Ghidra produced no output",
-                    "stderr": result.stderr[-500:] if result.stderr else ""
-                }
+                return _check_complete(entries, result)
+            return {
+                "error": "Ghidra produced no output",
+                "stderr": result.stderr[-500:] if result.stderr else ""
+            }
                 
         except subprocess.TimeoutExpired:
             return {"error": f"Ghidra analysis timed out after {GHIDRA_TIMEOUT}s"}
@@ -99,41 +200,310 @@ def analyze_binary(file_path: str) -> dict:
             return {"error": str(e)}
 
 
-def list_functions(file_path: str) -> dict:
+def _normalize_target(target: str) -> str:
+    """'0x401136' / '00401136' -> '401136'; names are kept as-is."""
+    value = target.strip().lower()
+    if value.startswith("0x"):
+        value = value[2:]
+    try:
+        return format(int(value, 16), "x")
+    except ValueError:
+        return target.strip()
+
+
+def _select(entries: list, functions: list) -> list:
+    wanted = {_normalize_target(f) for f in functions}
+    return [e for e in entries
+            if e.get("name") in wanted or _normalize_target(e.get("address", "")) in wanted]
+
+
+def export_binary(file_path: str, mode: str = "full", functions: list = None, on_function=None):
+    """
+    Raw export, served from the sha256-keyed analysis cache when possible.
+
+    A cached full export answers metadata and targeted requests too, so only
+    the cheapest sufficient mode is ever run. Targeted mode only pays off on
+    a warm service worker: one-shot, every new set of names would be another
+    headless import and analysis, so one full export is run instead and
+    serves them all. ``on_function`` receives every entry: streamed while
+    Ghidra runs, or replayed from the cache. Decompiled functions are added
+    to the code_search index.
     """
-    Lightweight: only list function names and addresses (no decompilation).
-    Much faster, used for initial recon.
+    cache, version = get_ghidra_cache(), _export_version()
+    raw, replay = None, True
+    if mode != "full":
+        full = cache.lookup(file_path, version)
+        if full is None and mode == "targeted" and not get_ghidra_pool().available():
+            full = export_binary(file_path)
+            if not isinstance(full, list):
+                return full
+        if full is not None:
+            if mode == "metadata":
+                raw = [{k: v for k, v in e.items() if k != "code"} for e in full]
+            else:
+                raw = _select(full, functions or [])
+    if raw is None:
+        if mode == "metadata":
+            version += "-metadata"
+        elif mode == "targeted":
+            functions = sorted(set(functions or []))
+            version += "-targeted-" + hashlib.sha256("\0".join(functions).encode()).hexdigest()[:12]
+        streamed = []
+
+        def forward(entry):
+            streamed.append(entry)
+            on_function(entry)
+
+        raw = cache.get_or_analyze(
+            file_path, version,
+            lambda: _run_ghidra_export(file_path, mode, functions, on_function=forward if on_function else None)
+        )
+        replay = not streamed
+    if mode != "metadata":
+        _index_code(file_path, raw, complete=mode == "full")
+    if replay and on_function is not None and isinstance(raw, list):
+        for entry in raw:
+            on_function(entry)
+    return raw
+
+
+def _index_code(file_path: str, raw, complete: bool):
+    """Add decompiled functions to the code_search index (never fails the analysis)."""
+    if not isinstance(raw, list):
+        return
+    try:
+        get_code_index().add_file(file_path, raw, source="ghidra", complete=complete)
+    except sqlite3.Error as e:
+        logger.warning(f"Code search indexing failed: {e}")
+
+
+def analyze_binary(file_path: str, token_budget: int = None, top_k: int = None,
+                   abbreviate: bool = None) -> dict:
     """
-    result = analyze_binary(file_path)
-    if "error" in result:
-        return result
+    Decompile the user functions of a binary (cached per file content) and
+    return the most interesting ones within a token budget.
     
-    # Strip the heavy 'code' field for overview
+    Args:
+        file_path: Absolute path to the binary file on the host.
+        token_budget: Approximate token budget for returned code
+            (default ASAS_DECOMPILE_TOKEN_BUDGET; 0 returns everything).
+        top_k: Return at most this many functions with code.
+        abbreviate: Shorten auto-generated and long identifiers
+            (default ASAS_GHIDRA_ABBREVIATE).
+        
+    Returns:
+        Dictionary with 'functions' (list of {name, address, score, signals, code},
+        most interesting first), 'omitted' (stubs of the remaining user functions),
+        'library_functions' (recognized library code, excluded from the rest),
+        'duplicates' (function -> identical earlier function) and a summary.
+    """
+    if not os.path.exists(file_path):
+        return {"error": f"File not found: {file_path}"}
+
+    raw = export_binary(file_path)
+    if isinstance(raw, dict):
+        return raw
+
+    user_funcs = [e for e in raw if _is_user_function(e.get("name", ""))]
+    library = _library_functions(user_funcs)
+    user_funcs = [e for e in user_funcs if e.get("name") not in library]
+    identifiers = {}
+    if COMPRESS_OUTPUT:
+        if abbreviate is None:
+            abbreviate = ABBREVIATE_IDENTIFIERS
+        compressed = compress_functions(user_funcs, abbreviate_identifiers=abbreviate)
+        user_funcs, identifiers = compressed["functions"], compressed["identifiers"]
+    duplicates = {f["name"]: f["same_as"] for f in user_funcs if "same_as" in f}
+    if token_budget is None:
+        token_budget = DECOMPILE_TOKEN_BUDGET
+    selection = select_functions([f for f in user_funcs if "same_as" not in f],
+                                 token_budget=token_budget, top_k=top_k)
+
+    result = {
+        "total_functions": len(raw),
+        "user_functions": len(user_funcs),
+        "token_budget": token_budget,
+        "estimated_tokens": selection["estimated_tokens"],
+        "functions": [
+            {
+                "name": f.get("name", ""),
+                "address": f.get("address", "unknown"),
+                "score": f["score"],
+                "signals": f["signals"],
+                "code": f.get("code", ""),
+            }
+            for f in selection["functions"]
+        ],
+        "omitted": selection["omitted"],
+    }
+    if library:
+        result["library_functions"] = library
+    if duplicates:
+        result["duplicates"] = duplicates
+    if identifiers:
+        result["identifiers"] = identifiers
+    return result
+
+
+def list_functions(file_path: str) -> dict:
+    """
+    Lightweight: list functions with metadata only (no decompilation).
+    Much faster, used for initial recon. Unstripped ELF binaries are listed
+    from their symbol table (no Ghidra run) unless a Ghidra export, which
+    also has signatures and call counts, is already cached.
+    """
+    if not os.path.exists(file_path):
+        return {"error": f"File not found: {file_path}"}
+
+    cache, version = get_ghidra_cache(), _export_version()
+    if cache.lookup(file_path, version) is None and cache.lookup(file_path, version + "-metadata") is None:
+        symbols = binfmt.function_symbols(file_path)
+        if symbols:
+            overview = [f for f in symbols if _is_user_function(f["name"])]
+            return {"total_functions": len(symbols), "user_functions": len(overview),
+                    "functions": overview, "source": "symtab"}
+
+    raw = export_binary(file_path, mode="metadata")
+    if isinstance(raw, dict):
+        return raw
+    # Library recognition needs code: only possible once a full export is cached
+    full = get_ghidra_cache().lookup(file_path, _export_version())
+    library = _library_functions(full) if full else {}
+
     overview = []
-    for f in result.get("functions", []):
-        overview.append({"name": f["name"], "address": f["address"]})
-    
-    return {
-        "total_functions": result["total_functions"],
-        "user_functions": result["user_functions"],
+    for entry in raw:
+        if _is_user_function(entry.get("name", "")) and entry.get("name") not in library:
+            overview.append({
+                "name": entry.get("name", ""),
+                "address": entry.get("address", "unknown"),
+                "size": entry.get("size"),
+                "signature": entry.get("signature"),
+                "calls": entry.get("calls"),
+                "callers": entry.get("callers"),
+            })
+
+    result = {
+        "total_functions": len(raw),
+        "user_functions": len(overview),
         "functions": overview
     }
+    if library:
+        result["library_functions"] = library
+    return result
 
 
 def decompile_function(file_path: str, function_name: str) -> dict:
     """
-    Decompile a single specific function by name.
+    Decompile a single specific function by name (or entry address).
+    Only that function goes through the decompiler (targeted mode).
     """
-    result = analyze_binary(file_path)
-    if "error" in result:
+    if not os.path.exists(file_path):
+        return {"error": f"File not found: {file_path}"}
+
+    raw = export_binary(file_path, mode="targeted", functions=[function_name])
+    if isinstance(raw, dict):
+        return raw
+
+    if raw:
+        f = raw[0]
+        code = f.get("code", "")
+        result = {"name": f["name"], "address": f["address"], "code": compress_code(code) if COMPRESS_OUTPUT else code}
+        library = _library_functions([f])
+        if library:
+            result["library_match"] = library[f["name"]]
         return result
-    
-    for f in result.get("functions", []):
-        if f["name"] == function_name:
-            return {"name": f["name"], "address": f["address"], "code": f["code"]}
-    
-    available = [f["name"] for f in result.get("functions", [])]
+
+    listing = list_functions(file_path)
     return {
         "error": f"Function '{function_name}' not found",
-        "available_functions": available
+        "available_functions": [f["name"] for f in listing.get("functions", [])]
     }
+
+
+def export_job(ctx, file_path: str) -> dict:
+    """
+    Job body: full decompilation, streamed. Every user function emits a
+    ``function`` event as it completes, and ``main`` additionally emits a
+    ``main`` event carrying its code, so the agent can start on it while the
+    rest of the binary is still being decompiled.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    counts = {"decompiled": 0, "user_functions": 0}
+
+    def on_function(entry):
+        counts["decompiled"] += 1
+        name = entry.get("name", "")
+        if _is_user_function(name):
+            counts["user_functions"] += 1
+            ctx.event("function", name=name, address=entry.get("address"), size=entry.get("size"))
+            if name == "main":
+                ctx.event("main", address=entry.get("address"), code=entry.get("code", ""))
+        ctx.progress(**counts)
+
+    raw = export_binary(file_path, on_function=on_function)
+    if isinstance(raw, dict):
+        raise RuntimeError(raw.get("error", "Ghidra export failed"))
+    return {
+        "total_functions": len(raw),
+        "user_functions": counts["user_functions"],
+        "message": "Export cached; ghidra_decompile_function / reverse_ghidra_decompile now answer instantly.",
+    }
+
+
+def binary_index(file_path: str):
+    """
+    Open the whole-program SQLite index (call graph, xrefs, strings, imports,
+    exports) for a binary. Built by one Ghidra pass on first use and kept in
+    the analysis cache; returns a GhidraIndex or an error dict.
+    """
+    if not os.path.exists(file_path):
+        return {"error": f"File not found: {file_path}"}
+
+    def build(db_path):
+        records = _run_ghidra_export(file_path, mode="index")
+        if isinstance(records, dict):
+            return records
+        build_index(records, db_path)
+        return None
+
+    path = get_ghidra_cache().get_or_build_file(file_path, _export_version() + "-index", build)
+    if isinstance(path, dict):
+        return path
+    return GhidraIndex(path)
+
+
+def xrefs_to(file_path: str, target: str, limit: int = 200) -> dict:
+    """All references (calls, data, strings) to a function name, address or string."""
+    index = binary_index(file_path)
+    if isinstance(index, dict):
+        return index
+    with index:
+        refs = index.xrefs_to(target, limit=limit)
+    return {"target": target, "count": len(refs), "xrefs": refs}
+
+
+def callers(file_path: str, function_name: str, depth: int = 1) -> dict:
+    """Functions that call ``function_name``, transitively up to ``depth`` levels."""
+    index = binary_index(file_path)
+    if isinstance(index, dict):
+        return index
+    with index:
+        rows = index.callers(function_name, depth=depth)
+    return {"function": function_name, "depth": depth, "count": len(rows), "callers": rows}
+
+
+def strings(file_path: str, pattern: str = None, limit: int = 100) -> dict:
+    """
+    Defined strings (optionally filtered by substring) with the functions
+    referencing them. Without a pattern, imports are listed as well.
+    """
+    index = binary_index(file_path)
+    if isinstance(index, dict):
+        return index
+    with index:
+        rows = index.strings(pattern, limit=limit)
+        result = {"count": len(rows), "strings": rows}
+        if pattern is None:
+            result["imports"] = index.imports()
+    return result
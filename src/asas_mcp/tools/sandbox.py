@@ -2,10 +2,14 @@ import subprocess
 import os
 import tempfile
 import logging
+import uuid
 
-def run_in_sandbox(code: str, language: str = "python") -> str:
+from ..executors.tool_runner import run_process
+
+def run_in_sandbox(code: str, language: str = "python", files: dict = None) -> str:
     """
     Runs untrusted code in a highly restricted Docker container.
+    `files` maps file names to host paths that are mounted read-only under /mnt/artifacts/.
     """
     with tempfile.TemporaryDirectory() as tmp_dir:
         # 1. Prepare the script file
@@ -18,8 +22,10 @@ def run_in_sandbox(code: str, language: str = "python") -> str:
             
         # 2. Build Docker command with security constraints
         # Image: python:3.11-slim (small and safe)
+        container = f"asas-sandbox-{uuid.uuid4().hex[:12]}"
         docker_cmd = [
             "docker", "run", "--rm",
+            "--name", container,           # lets a cancelled call remove the container
             "--network", "none",           # NO network access
             "--memory", "128m",            # Limit memory
             "--cpus", "0.5",               # Limit CPU
@@ -32,12 +38,24 @@ def run_in_sandbox(code: str, language: str = "python") -> str:
             "python", f"/mnt/{script_name}"
         ]
         
+        # Bind stored artifacts in place instead of copying them into the script dir.
+        # /mnt is read-only, so the mountpoints are created on the host side first.
+        if files:
+            os.makedirs(os.path.join(tmp_dir, "artifacts"))
+            mounts = []
+            for name, host_path in files.items():
+                name = os.path.basename(name)
+                open(os.path.join(tmp_dir, "artifacts", name), "w").close()
+                mounts += ["-v", f"{host_path}:/mnt/artifacts/{name}:ro"]
+            image_idx = docker_cmd.index("python:3.11-slim")
+            docker_cmd[image_idx:image_idx] = mounts
+
         if language == "bash":
             docker_cmd[-2:] = ["bash", f"/mnt/{script_name}"]
 
         try:
             logging.info(f"Sandbox executing {language} code...")
-            result = subprocess.run(docker_cmd, capture_output=True, text=True, timeout=15)
+            result = run_process(docker_cmd, timeout=15, cleanup=["docker", "rm", "-f", container])
             
             if result.returncode == 0:
                 return result.stdout
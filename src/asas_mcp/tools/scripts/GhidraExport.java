@@ -1,81 +1,342 @@
 // Ghidra Headless Script: Decompile and Export Functions with Addresses
 // This script runs inside Ghidra's Java environment
+//
+// Contract (environment, set by reverse_ghidra.py):
+//   GHIDRA_OUTPUT_PATH         where to write the JSON Lines output (one function per line)
+//   GHIDRA_EXPORT_MODE         full (default) | metadata | targeted | index
+//   GHIDRA_EXPORT_FUNCTIONS    targeted mode: comma-separated names or addresses
+//   GHIDRA_DECOMPILER_THREADS  parallel decompiler interfaces (default: CPU count, max 8)
+// metadata skips the decompiler entirely; targeted decompiles only the
+// requested functions. Every entry carries name, address, size, signature,
+// calls and callers; full/targeted entries add code.
+//
+// Decompilation runs on a pool of threads, each with its own DecompInterface.
+// Lines are appended and flushed as functions complete (main and entry points
+// are queued first), so the caller can consume results while the rest run.
+// A function that fails to decompile is still written, with "error" set.
+//
+// Every mode ends a complete export with {"done": N}, N being the number of
+// lines before it; without that line the export was cut short.
+//
+// mode=index writes the whole-program index instead: JSON Lines too, one
+// record per line, discriminated by "k":
+//   ref     kind=call|data|string, from_func, from_func_addr, site, to_addr, to_name, type[, value]
+//   string  addr, value
+//   import  name, library
+//   export  name, addr
 // @category CTF-ASAS
 
 import ghidra.app.decompiler.DecompInterface;
 import ghidra.app.decompiler.DecompiledFunction;
 import ghidra.app.decompiler.DecompileResults;
 import ghidra.app.script.GhidraScript;
+import ghidra.program.model.address.Address;
+import ghidra.program.model.address.AddressIterator;
+import ghidra.program.model.listing.Data;
+import ghidra.program.model.listing.DataIterator;
 import ghidra.program.model.listing.Function;
 import ghidra.program.model.listing.FunctionManager;
+import ghidra.program.model.listing.Listing;
+import ghidra.program.model.symbol.RefType;
+import ghidra.program.model.symbol.Reference;
+import ghidra.program.model.symbol.ReferenceManager;
+import ghidra.program.model.symbol.Symbol;
+import ghidra.program.model.symbol.SymbolIterator;
+import ghidra.program.model.symbol.SymbolTable;
 import ghidra.util.task.ConsoleTaskMonitor;
 
-import java.io.FileWriter;
+import java.io.BufferedWriter;
+import java.io.FileOutputStream;
+import java.io.IOException;
+import java.io.OutputStreamWriter;
+import java.io.Writer;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.Collections;
 import java.util.Iterator;
+import java.util.List;
+import java.util.concurrent.Callable;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.atomic.AtomicInteger;
 
 public class GhidraExport extends GhidraScript {
-    
+
+    private Writer out;
+    private final AtomicInteger count = new AtomicInteger();
+
     @Override
     public void run() throws Exception {
-        println("CTF-ASAS Ghidra Export starting...");
-        
-        DecompInterface iface = new DecompInterface();
-        iface.openProgram(currentProgram);
-        
+        String mode = envOr("GHIDRA_EXPORT_MODE", "full");
+        println("CTF-ASAS Ghidra Export starting (mode=" + mode + ")...");
+        String outputPath = envOr("GHIDRA_OUTPUT_PATH", "/tmp/ghidra_output.jsonl");
+        if (mode.equals("index")) {
+            writeIndex(outputPath);
+            return;
+        }
+
         FunctionManager fm = currentProgram.getFunctionManager();
-        Iterator<Function> funcs = fm.getFunctions(true).iterator();
-        
-        StringBuilder sb = new StringBuilder();
-        sb.append("[");
-        boolean first = true;
-        int count = 0;
-        
-        while (funcs.hasNext()) {
-            Function func = funcs.next();
-            String name = func.getName();
-            String addr = func.getEntryPoint().toString();
-            
-            // Decompile with 30s timeout per function
-            DecompileResults res = iface.decompileFunction(func, 30, new ConsoleTaskMonitor());
-            String code = "";
-            if (res.decompileCompleted()) {
-                DecompiledFunction df = res.getDecompiledFunction();
-                if (df != null) {
-                    code = df.getC();
+        List<Function> selected = new ArrayList<>();
+        if (mode.equals("targeted")) {
+            for (String target : envOr("GHIDRA_EXPORT_FUNCTIONS", "").split(",")) {
+                Function func = findFunction(fm, target.trim());
+                if (func != null && !selected.contains(func)) {
+                    selected.add(func);
                 }
             }
-            
-            if (!first) sb.append(",");
-            first = false;
-            
-            sb.append("{");
-            sb.append("\"name\":\"").append(escapeJson(name)).append("\",");
-            sb.append("\"address\":\"").append(escapeJson(addr)).append("\",");
-            sb.append("\"code\":\"").append(escapeJson(code)).append("\"");
-            sb.append("}");
-            count++;
+        } else {
+            Iterator<Function> funcs = fm.getFunctions(true).iterator();
+            while (funcs.hasNext()) {
+                selected.add(funcs.next());
+            }
+            prioritize(selected);
         }
-        
-        sb.append("]");
-        
-        String outputPath = System.getenv("GHIDRA_OUTPUT_PATH");
-        if (outputPath == null || outputPath.isEmpty()) {
-            outputPath = "/tmp/ghidra_output.json";
+
+        out = new BufferedWriter(new OutputStreamWriter(new FileOutputStream(outputPath), StandardCharsets.UTF_8));
+        try {
+            if (mode.equals("metadata")) {
+                for (Function func : selected) {
+                    emit(describe(func).append("}").toString());
+                }
+            } else {
+                decompileAll(selected);
+            }
+            out.write("{\"done\":" + count.get() + "}\n");
+        } finally {
+            out.close();
         }
-        
-        FileWriter fw = new FileWriter(outputPath);
-        fw.write(sb.toString());
-        fw.close();
-        
-        println("Success: Exported " + count + " functions to " + outputPath);
+
+        println("Success: Exported " + count.get() + " functions to " + outputPath);
     }
-    
+
+    /** Call graph, data/string xrefs, strings, imports and exports in one pass. */
+    private void writeIndex(String path) throws Exception {
+        FunctionManager fm = currentProgram.getFunctionManager();
+        ReferenceManager rm = currentProgram.getReferenceManager();
+        Listing listing = currentProgram.getListing();
+        SymbolTable st = currentProgram.getSymbolTable();
+        int records = 0;
+
+        try (Writer w = new BufferedWriter(new OutputStreamWriter(new FileOutputStream(path), StandardCharsets.UTF_8))) {
+            Iterator<Function> funcs = fm.getFunctions(true).iterator();
+            while (funcs.hasNext()) {
+                Function func = funcs.next();
+                AddressIterator sites = rm.getReferenceSourceIterator(func.getBody(), true);
+                while (sites.hasNext()) {
+                    Address site = sites.next();
+                    for (Reference ref : rm.getReferencesFrom(site)) {
+                        Address to = ref.getToAddress();
+                        RefType type = ref.getReferenceType();
+                        String kind;
+                        String toName;
+                        String value = null;
+                        if (type.isCall()) {
+                            Function callee = fm.getFunctionAt(to);
+                            if (callee == null) continue;
+                            kind = "call";
+                            toName = callee.getName();
+                        } else if (!type.isFlow()) {
+                            Data data = listing.getDataAt(to);
+                            if (data != null && data.hasStringValue()) {
+                                kind = "string";
+                                value = String.valueOf(data.getValue());
+                            } else {
+                                kind = "data";
+                            }
+                            Symbol sym = st.getPrimarySymbol(to);
+                            toName = sym == null ? null : sym.getName();
+                        } else {
+                            continue;  // jumps inside the function
+                        }
+                        StringBuilder sb = new StringBuilder("{\"k\":\"ref\"");
+                        field(sb, "kind", kind);
+                        field(sb, "from_func", func.getName());
+                        field(sb, "from_func_addr", func.getEntryPoint().toString());
+                        field(sb, "site", site.toString());
+                        field(sb, "to_addr", to.toString());
+                        field(sb, "to_name", toName);
+                        field(sb, "type", type.getName());
+                        field(sb, "value", value);
+                        w.write(sb.append("}\n").toString());
+                        records++;
+                    }
+                }
+            }
+
+            DataIterator strings = listing.getDefinedData(true);
+            while (strings.hasNext()) {
+                Data data = strings.next();
+                if (!data.hasStringValue()) continue;
+                StringBuilder sb = new StringBuilder("{\"k\":\"string\"");
+                field(sb, "addr", data.getAddress().toString());
+                field(sb, "value", String.valueOf(data.getValue()));
+                w.write(sb.append("}\n").toString());
+                records++;
+            }
+
+            SymbolIterator externals = st.getExternalSymbols();
+            while (externals.hasNext()) {
+                Symbol sym = externals.next();
+                StringBuilder sb = new StringBuilder("{\"k\":\"import\"");
+                field(sb, "name", sym.getName());
+                field(sb, "library", sym.getParentNamespace().getName());
+                w.write(sb.append("}\n").toString());
+                records++;
+            }
+
+            AddressIterator entries = st.getExternalEntryPointIterator();
+            while (entries.hasNext()) {
+                Address addr = entries.next();
+                Symbol sym = st.getPrimarySymbol(addr);
+                StringBuilder sb = new StringBuilder("{\"k\":\"export\"");
+                field(sb, "name", sym == null ? null : sym.getName());
+                field(sb, "addr", addr.toString());
+                w.write(sb.append("}\n").toString());
+                records++;
+            }
+            w.write("{\"done\":" + records + "}\n");
+        }
+        println("Success: Indexed " + records + " records to " + path);
+    }
+
+    private void field(StringBuilder sb, String name, String value) {
+        if (value == null) return;
+        sb.append(",\"").append(name).append("\":\"").append(escapeJson(value)).append("\"");
+    }
+
+    /** main first, then external entry points, then the rest in address order. */
+    private void prioritize(List<Function> funcs) {
+        SymbolTable st = currentProgram.getSymbolTable();
+        List<Function> first = new ArrayList<>();
+        for (Function func : funcs) {
+            if (func.getName().equals("main")) {
+                first.add(0, func);
+            } else if (st.isExternalEntryPoint(func.getEntryPoint())) {
+                first.add(func);
+            }
+        }
+        funcs.removeAll(first);
+        funcs.addAll(0, first);
+    }
+
+    private void decompileAll(List<Function> funcs) throws Exception {
+        int threads = Math.min(Runtime.getRuntime().availableProcessors(), 8);
+        String configured = System.getenv("GHIDRA_DECOMPILER_THREADS");
+        if (configured != null && !configured.isEmpty()) {
+            threads = Integer.parseInt(configured);
+        }
+        threads = Math.max(1, Math.min(threads, funcs.size()));
+
+        // One decompiler process per worker thread; DecompInterface is not thread-safe
+        List<DecompInterface> interfaces = Collections.synchronizedList(new ArrayList<>());
+        ThreadLocal<DecompInterface> local = ThreadLocal.withInitial(() -> {
+            DecompInterface iface = new DecompInterface();
+            iface.openProgram(currentProgram);
+            interfaces.add(iface);
+            return iface;
+        });
+
+        List<Callable<Void>> tasks = new ArrayList<>();
+        for (Function func : funcs) {
+            tasks.add(() -> {
+                try {
+                    // Decompile with 30s timeout per function
+                    DecompileResults res = local.get().decompileFunction(func, 30, new ConsoleTaskMonitor());
+                    String code = "";
+                    if (res.decompileCompleted()) {
+                        DecompiledFunction df = res.getDecompiledFunction();
+                        if (df != null) {
+                            code = df.getC();
+                        }
+                    }
+                    emit(describe(func).append(",\"code\":\"").append(escapeJson(code)).append("\"}").toString());
+                } catch (Exception e) {
+                    emit("{\"name\":\"" + escapeJson(func.getName()) + "\",\"address\":\""
+                            + escapeJson(func.getEntryPoint().toString()) + "\",\"code\":\"\",\"error\":\""
+                            + escapeJson(e.getClass().getSimpleName() + ": " + e.getMessage()) + "\"}");
+                }
+                return null;
+            });
+        }
+
+        ExecutorService pool = Executors.newFixedThreadPool(threads);
+        try {
+            // get() rethrows anything a task let escape: the export then fails without its end marker
+            for (Future<Void> done : pool.invokeAll(tasks)) {
+                done.get();
+            }
+        } finally {
+            pool.shutdownNow();
+            for (DecompInterface iface : interfaces) {
+                iface.dispose();
+            }
+        }
+        println("Decompiled " + funcs.size() + " functions on " + threads + " threads");
+    }
+
+    /** Metadata fields of one entry, left open so code can be appended. */
+    private StringBuilder describe(Function func) {
+        StringBuilder sb = new StringBuilder();
+        sb.append("{");
+        sb.append("\"name\":\"").append(escapeJson(func.getName())).append("\",");
+        sb.append("\"address\":\"").append(escapeJson(func.getEntryPoint().toString())).append("\",");
+        sb.append("\"size\":").append(func.getBody().getNumAddresses()).append(",");
+        sb.append("\"signature\":\"").append(escapeJson(func.getPrototypeString(false, false))).append("\",");
+        sb.append("\"calls\":").append(func.getCalledFunctions(monitor).size()).append(",");
+        sb.append("\"callers\":").append(func.getCallingFunctions(monitor).size());
+        return sb;
+    }
+
+    private synchronized void emit(String line) throws IOException {
+        // A failed write propagates: the count in the end marker must match the lines written
+        out.write(line);
+        out.write("\n");
+        out.flush();
+        count.incrementAndGet();
+    }
+
+    private Function findFunction(FunctionManager fm, String target) {
+        if (target.isEmpty()) return null;
+        try {
+            Address addr = currentProgram.getAddressFactory().getAddress(target);
+            if (addr != null) {
+                Function func = fm.getFunctionAt(addr);
+                if (func != null) return func;
+            }
+        } catch (Exception e) {
+            // not an address, try the name
+        }
+        Iterator<Function> funcs = fm.getFunctions(true).iterator();
+        while (funcs.hasNext()) {
+            Function func = funcs.next();
+            if (func.getName().equals(target)) return func;
+        }
+        return null;
+    }
+
+    private String envOr(String name, String fallback) {
+        String value = System.getenv(name);
+        return (value == null || value.isEmpty()) ? fallback : value;
+    }
+
     private String escapeJson(String s) {
         if (s == null) return "";
-        return s.replace("\\", "\\\\")
-                .replace("\"", "\\\"")
-                .replace("\n", "\\n")
-                .replace("\r", "\\r")
-                .replace("\t", "\\t");
+        StringBuilder sb = new StringBuilder(s.length() + 16);
+        for (int i = 0; i < s.length(); i++) {
+            char c = s.charAt(i);
+            switch (c) {
+                case '\\': sb.append("\\\\"); break;
+                case '"': sb.append("\\\""); break;
+                case '\n': sb.append("\\n"); break;
+                case '\r': sb.append("\\r"); break;
+                case '\t': sb.append("\\t"); break;
+                default:
+                    // Other control characters would break a JSON line
+                    if (c < 0x20) sb.append(String.format("\\u%04x", (int) c));
+                    else sb.append(c);
+            }
+        }
+        return sb.toString();
     }
 }
@@ -0,0 +1,488 @@
+// Ghidra Headless Script: long-lived analysis service
+// Started once per worker container (see executors/ghidra_service.py) and never
+// returns. Serves newline-delimited JSON requests on a TCP port and keeps every
+// analyzed program in the persistent project, so later list/decompile/xref
+// queries skip import and auto-analysis.
+//
+// export/decompile run on a pool of decompiler threads (GHIDRA_DECOMPILER_THREADS)
+// and stream each function as an {"item": ...} line as soon as it is done; the
+// final {"ok": true, "streamed": n} line ends the reply.
+// @category CTF-ASAS
+
+import com.google.gson.Gson;
+import com.google.gson.JsonArray;
+import com.google.gson.JsonElement;
+import com.google.gson.JsonObject;
+import com.google.gson.JsonParser;
+import com.google.gson.JsonPrimitive;
+
+import ghidra.app.decompiler.DecompInterface;
+import ghidra.app.decompiler.DecompileResults;
+import ghidra.app.decompiler.DecompiledFunction;
+import ghidra.app.plugin.core.analysis.AutoAnalysisManager;
+import ghidra.app.script.GhidraScript;
+import ghidra.app.util.importer.AutoImporter;
+import ghidra.app.util.importer.MessageLog;
+import ghidra.app.util.opinion.LoadResults;
+import ghidra.framework.model.DomainFile;
+import ghidra.framework.model.DomainFolder;
+import ghidra.framework.model.Project;
+import ghidra.program.model.address.Address;
+import ghidra.program.model.address.AddressIterator;
+import ghidra.program.model.listing.Data;
+import ghidra.program.model.listing.DataIterator;
+import ghidra.program.model.listing.Listing;
+import ghidra.program.model.listing.Function;
+import ghidra.program.model.listing.FunctionIterator;
+import ghidra.program.model.listing.Program;
+import ghidra.program.model.symbol.RefType;
+import ghidra.program.model.symbol.Reference;
+import ghidra.program.model.symbol.ReferenceIterator;
+import ghidra.program.model.symbol.ReferenceManager;
+import ghidra.program.model.symbol.Symbol;
+import ghidra.program.model.symbol.SymbolIterator;
+import ghidra.program.model.symbol.SymbolTable;
+import ghidra.program.util.GhidraProgramUtilities;
+
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.io.Writer;
+import java.net.ServerSocket;
+import java.net.Socket;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.LinkedBlockingQueue;
+
+public class GhidraService extends GhidraScript {
+
+    // Programs kept open (with a warm decompiler) between requests
+    private static final int MAX_OPEN = 4;
+    private static final int DECOMPILE_TIMEOUT = 30;
+
+    private final LinkedHashMap<String, Program> open = new LinkedHashMap<>(16, 0.75f, true);
+    // Idle decompiler interfaces per program (one is borrowed per running task)
+    private final Map<String, LinkedBlockingQueue<DecompInterface>> decompilers = new ConcurrentHashMap<>();
+    private final Gson gson = new Gson();
+    private ExecutorService workers;
+    private Writer out;
+
+    @Override
+    public void run() throws Exception {
+        String portEnv = System.getenv("GHIDRA_SERVICE_PORT");
+        int port = (portEnv == null || portEnv.isEmpty()) ? 17400 : Integer.parseInt(portEnv);
+        String threadsEnv = System.getenv("GHIDRA_DECOMPILER_THREADS");
+        int threads = (threadsEnv == null || threadsEnv.isEmpty())
+                ? Math.min(Runtime.getRuntime().availableProcessors(), 8) : Integer.parseInt(threadsEnv);
+        workers = Executors.newFixedThreadPool(Math.max(1, threads));
+
+        try (ServerSocket server = new ServerSocket(port)) {
+            println("CTF-ASAS Ghidra service listening on " + port);
+            boolean running = true;
+            while (running) {
+                try (Socket sock = server.accept()) {
+                    running = serve(sock);
+                } catch (IOException e) {
+                    println("Connection error: " + e.getMessage());
+                }
+            }
+        } finally {
+            workers.shutdownNow();
+            for (String name : new ArrayList<>(open.keySet())) {
+                close(name);
+            }
+        }
+    }
+
+    /** Answer requests on one connection; returns false on "shutdown". */
+    private boolean serve(Socket sock) throws IOException {
+        BufferedReader in = new BufferedReader(new InputStreamReader(sock.getInputStream(), StandardCharsets.UTF_8));
+        out = new BufferedWriter(new OutputStreamWriter(sock.getOutputStream(), StandardCharsets.UTF_8));
+        String line;
+        while ((line = in.readLine()) != null) {
+            JsonObject reply = new JsonObject();
+            boolean shutdown = false;
+            try {
+                JsonObject req = JsonParser.parseString(line).getAsJsonObject();
+                String op = req.get("op").getAsString();
+                shutdown = op.equals("shutdown");
+                JsonElement result = shutdown ? new JsonObject() : dispatch(op, req);
+                if (result.isJsonPrimitive()) {
+                    reply.add("streamed", result);  // items were already sent
+                }
+                else {
+                    reply.add("result", result);
+                }
+                reply.addProperty("ok", true);
+            } catch (Exception e) {
+                reply.addProperty("ok", false);
+                reply.addProperty("error", e.getClass().getSimpleName() + ": " + e.getMessage());
+            }
+            send(reply);
+            if (shutdown) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    private synchronized void send(JsonObject message) throws IOException {
+        out.write(gson.toJson(message));
+        out.write("\n");
+        out.flush();
+    }
+
+    private JsonElement dispatch(String op, JsonObject req) throws Exception {
+        switch (op) {
+            case "ping":
+                return ping();
+            case "analyze": {
+                Program p = program(req);
+                JsonObject res = new JsonObject();
+                res.addProperty("program", p.getName());
+                res.addProperty("functions", p.getFunctionManager().getFunctionCount());
+                return res;
+            }
+            case "list":
+                return listFunctions(program(req));
+            case "decompile":
+                return decompile(program(req), req.getAsJsonArray("functions"));
+            case "export":
+                return decompile(program(req), null);
+            case "xrefs":
+                return xrefs(program(req), req.get("target").getAsString());
+            case "index":
+                return index(program(req));
+            case "close":
+                close(req.get("program").getAsString());
+                return new JsonObject();
+            default:
+                throw new IllegalArgumentException("unknown op " + op);
+        }
+    }
+
+    private JsonObject ping() {
+        JsonObject res = new JsonObject();
+        JsonArray names = new JsonArray();
+        for (String name : open.keySet()) {
+            names.add(name);
+        }
+        res.add("open", names);
+        res.addProperty("stored", state.getProject().getProjectData().getRootFolder().getFiles().length);
+        return res;
+    }
+
+    // --- program lifecycle ---
+
+    /** Open the requested program, importing and auto-analyzing it on first sight. */
+    private Program program(JsonObject req) throws Exception {
+        String name = req.get("program").getAsString();
+        Program p = open.get(name);
+        if (p != null) {
+            return p;
+        }
+        Project project = state.getProject();
+        DomainFolder root = project.getProjectData().getRootFolder();
+        DomainFile df = root.getFile(name);
+        if (df != null) {
+            p = (Program) df.getDomainObject(this, true, false, monitor);
+        }
+        else {
+            if (!req.has("path")) {
+                throw new IllegalArgumentException("program " + name + " not analyzed and no path given");
+            }
+            p = importAndAnalyze(project, new File(req.get("path").getAsString()));
+        }
+        open.put(name, p);
+        while (open.size() > MAX_OPEN) {
+            close(open.keySet().iterator().next());
+        }
+        return p;
+    }
+
+    private Program importAndAnalyze(Project project, File file) throws Exception {
+        println("Importing " + file);
+        MessageLog log = new MessageLog();
+        LoadResults<Program> results = AutoImporter.importByUsingBestGuess(file, project, "/", this, log, monitor);
+        results.releaseNonPrimary(this);
+        Program p = results.getPrimaryDomainObject();
+
+        int tx = p.startTransaction("Auto-analysis");
+        try {
+            AutoAnalysisManager mgr = AutoAnalysisManager.getAnalysisManager(p);
+            mgr.initializeOptions();
+            mgr.reAnalyzeAll(null);
+            mgr.startAnalysis(monitor);
+            GhidraProgramUtilities.markProgramAnalyzed(p);
+        }
+        finally {
+            p.endTransaction(tx, true);
+        }
+        results.save(project, this, log, monitor);
+        println("Analyzed " + p.getName() + ": " + p.getFunctionManager().getFunctionCount() + " functions");
+        return p;
+    }
+
+    private void close(String name) {
+        LinkedBlockingQueue<DecompInterface> idle = decompilers.remove(name);
+        if (idle != null) {
+            for (DecompInterface iface : idle) {
+                iface.dispose();
+            }
+        }
+        Program p = open.remove(name);
+        if (p != null) {
+            p.release(this);
+        }
+    }
+
+    /** DecompInterface is not thread-safe: each running task borrows its own. */
+    private DecompInterface borrow(Program p) {
+        DecompInterface iface = decompilers.computeIfAbsent(p.getName(), k -> new LinkedBlockingQueue<>()).poll();
+        if (iface == null) {
+            iface = new DecompInterface();
+            iface.openProgram(p);
+        }
+        return iface;
+    }
+
+    private void giveBack(Program p, DecompInterface iface) {
+        decompilers.computeIfAbsent(p.getName(), k -> new LinkedBlockingQueue<>()).offer(iface);
+    }
+
+    // --- queries ---
+
+    private Function findFunction(Program p, String target) {
+        try {
+            Address addr = p.getAddressFactory().getAddress(target);
+            if (addr != null) {
+                Function f = p.getFunctionManager().getFunctionContaining(addr);
+                if (f != null) {
+                    return f;
+                }
+            }
+        }
+        catch (Exception e) {
+            // not an address, fall through to name lookup
+        }
+        FunctionIterator it = p.getFunctionManager().getFunctions(true);
+        while (it.hasNext()) {
+            Function f = it.next();
+            if (f.getName().equals(target)) {
+                return f;
+            }
+        }
+        return null;
+    }
+
+    private JsonArray listFunctions(Program p) {
+        JsonArray arr = new JsonArray();
+        FunctionIterator it = p.getFunctionManager().getFunctions(true);
+        while (it.hasNext()) {
+            arr.add(describe(it.next()));
+        }
+        return arr;
+    }
+
+    /** Metadata-only entry (same fields as GhidraExport.java in metadata mode). */
+    private JsonObject describe(Function f) {
+        JsonObject o = new JsonObject();
+        o.addProperty("name", f.getName());
+        o.addProperty("address", f.getEntryPoint().toString());
+        o.addProperty("size", f.getBody().getNumAddresses());
+        o.addProperty("signature", f.getPrototypeString(false, false));
+        o.addProperty("calls", f.getCalledFunctions(monitor).size());
+        o.addProperty("callers", f.getCallingFunctions(monitor).size());
+        return o;
+    }
+
+    /**
+     * Decompile the named functions, or every function when {@code targets} is null
+     * (main and entry points first). Results are streamed as items; returns the count.
+     */
+    private JsonElement decompile(Program p, JsonArray targets) throws Exception {
+        List<Function> funcs = new ArrayList<>();
+        if (targets == null) {
+            FunctionIterator it = p.getFunctionManager().getFunctions(true);
+            List<Function> first = new ArrayList<>();
+            while (it.hasNext()) {
+                Function f = it.next();
+                if (f.getName().equals("main")) {
+                    first.add(0, f);
+                }
+                else if (p.getSymbolTable().isExternalEntryPoint(f.getEntryPoint())) {
+                    first.add(f);
+                }
+                else {
+                    funcs.add(f);
+                }
+            }
+            funcs.addAll(0, first);
+        }
+        else {
+            for (JsonElement t : targets) {
+                Function f = findFunction(p, t.getAsString());
+                if (f != null && !funcs.contains(f)) {
+                    funcs.add(f);
+                }
+            }
+        }
+        List<Future<?>> pending = new ArrayList<>();
+        for (Function f : funcs) {
+            pending.add(workers.submit(() -> {
+                DecompInterface iface = borrow(p);
+                String code = "";
+                try {
+                    DecompileResults res = iface.decompileFunction(f, DECOMPILE_TIMEOUT, monitor);
+                    if (res.decompileCompleted()) {
+                        DecompiledFunction df = res.getDecompiledFunction();
+                        if (df != null) {
+                            code = df.getC();
+                        }
+                    }
+                }
+                finally {
+                    giveBack(p, iface);
+                }
+                JsonObject o = describe(f);
+                o.addProperty("code", code);
+                sendItem(o);
+                return null;
+            }));
+        }
+        for (Future<?> f : pending) {
+            f.get();
+        }
+        return new JsonPrimitive(funcs.size());
+    }
+
+    private JsonArray xrefs(Program p, String target) {
+        Address addr;
+        Function func = findFunction(p, target);
+        if (func != null && func.getName().equals(target)) {
+            addr = func.getEntryPoint();
+        }
+        else {
+            addr = p.getAddressFactory().getAddress(target);
+        }
+        if (addr == null) {
+            throw new IllegalArgumentException("unknown function or address " + target);
+        }
+        JsonArray arr = new JsonArray();
+        ReferenceIterator refs = p.getReferenceManager().getReferencesTo(addr);
+        while (refs.hasNext()) {
+            Reference ref = refs.next();
+            Function from = p.getFunctionManager().getFunctionContaining(ref.getFromAddress());
+            JsonObject o = new JsonObject();
+            o.addProperty("from_address", ref.getFromAddress().toString());
+            o.addProperty("from_function", from == null ? null : from.getName());
+            o.addProperty("type", ref.getReferenceType().getName());
+            arr.add(o);
+        }
+        return arr;
+    }
+
+    /** Whole-program index records (same format as GhidraExport.java mode=index), streamed. */
+    private JsonElement index(Program p) throws IOException {
+        ReferenceManager rm = p.getReferenceManager();
+        Listing listing = p.getListing();
+        SymbolTable st = p.getSymbolTable();
+        int records = 0;
+
+        FunctionIterator funcs = p.getFunctionManager().getFunctions(true);
+        while (funcs.hasNext()) {
+            Function func = funcs.next();
+            AddressIterator sites = rm.getReferenceSourceIterator(func.getBody(), true);
+            while (sites.hasNext()) {
+                Address site = sites.next();
+                for (Reference ref : rm.getReferencesFrom(site)) {
+                    Address to = ref.getToAddress();
+                    RefType type = ref.getReferenceType();
+                    JsonObject o = new JsonObject();
+                    o.addProperty("k", "ref");
+                    if (type.isCall()) {
+                        Function callee = p.getFunctionManager().getFunctionAt(to);
+                        if (callee == null) {
+                            continue;
+                        }
+                        o.addProperty("kind", "call");
+                        o.addProperty("to_name", callee.getName());
+                    }
+                    else if (!type.isFlow()) {
+                        Data data = listing.getDataAt(to);
+                        boolean isString = data != null && data.hasStringValue();
+                        Symbol sym = st.getPrimarySymbol(to);
+                        o.addProperty("kind", isString ? "string" : "data");
+                        o.addProperty("to_name", sym == null ? null : sym.getName());
+                        if (isString) {
+                            o.addProperty("value", String.valueOf(data.getValue()));
+                        }
+                    }
+                    else {
+                        continue;  // jumps inside the function
+                    }
+                    o.addProperty("from_func", func.getName());
+                    o.addProperty("from_func_addr", func.getEntryPoint().toString());
+                    o.addProperty("site", site.toString());
+                    o.addProperty("to_addr", to.toString());
+                    o.addProperty("type", type.getName());
+                    sendItem(o);
+                    records++;
+                }
+            }
+        }
+
+        DataIterator strings = listing.getDefinedData(true);
+        while (strings.hasNext()) {
+            Data data = strings.next();
+            if (data.hasStringValue()) {
+                JsonObject o = new JsonObject();
+                o.addProperty("k", "string");
+                o.addProperty("addr", data.getAddress().toString());
+                o.addProperty("value", String.valueOf(data.getValue()));
+                sendItem(o);
+                records++;
+            }
+        }
+
+        SymbolIterator externals = st.getExternalSymbols();
+        while (externals.hasNext()) {
+            Symbol sym = externals.next();
+            JsonObject o = new JsonObject();
+            o.addProperty("k", "import");
+            o.addProperty("name", sym.getName());
+            o.addProperty("library", sym.getParentNamespace().getName());
+            sendItem(o);
+            records++;
+        }
+
+        AddressIterator entries = st.getExternalEntryPointIterator();
+        while (entries.hasNext()) {
+            Address addr = entries.next();
+            Symbol sym = st.getPrimarySymbol(addr);
+            JsonObject o = new JsonObject();
+            o.addProperty("k", "export");
+            o.addProperty("name", sym == null ? null : sym.getName());
+            o.addProperty("addr", addr.toString());
+            sendItem(o);
+            records++;
+        }
+        return new JsonPrimitive(records);
+    }
+
+    private void sendItem(JsonObject o) throws IOException {
+        JsonObject item = new JsonObject();
+        item.add("item", o);
+        send(item);
+    }
+}
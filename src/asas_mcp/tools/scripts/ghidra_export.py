@@ -1,50 +1,185 @@
 # Ghidra Headless Script: Decompile and Export Functions with Addresses
 # This script runs inside Ghidra's Jython environment
+#
+# Same contract as GhidraExport.java (environment, set by reverse_ghidra.py):
+#   GHIDRA_OUTPUT_PATH         where to write the JSON Lines output (one function per line)
+#   GHIDRA_EXPORT_MODE         full (default) | metadata | targeted | index
+#   GHIDRA_EXPORT_FUNCTIONS    targeted mode: comma-separated names or addresses
+#   GHIDRA_DECOMPILER_THREADS  parallel decompiler interfaces (default: CPU count, max 8)
+# A complete export ends with {"done": N}, N being the number of lines before it.
 
 from ghidra.app.decompiler import DecompInterface
 from ghidra.util.task import ConsoleTaskMonitor
+from java.lang import Runtime
 import json
 import os
+import threading
+
+
+def find_function(program, target):
+    fm = program.getFunctionManager()
+    try:
+        addr = program.getAddressFactory().getAddress(target)
+        if addr is not None and fm.getFunctionAt(addr) is not None:
+            return fm.getFunctionAt(addr)
+    except Exception:
+        pass  # not an address, try the name
+    for func in fm.getFunctions(True):
+        if func.getName() == target:
+            return func
+    return None
+
+
+def describe(func):
+    return {
+        "name": func.getName(),
+        "address": str(func.getEntryPoint()),
+        "size": func.getBody().getNumAddresses(),
+        "signature": func.getPrototypeString(False, False),
+        "calls": func.getCalledFunctions(monitor).size(),
+        "callers": func.getCallingFunctions(monitor).size(),
+    }
+
+
+def index_records(program):
+    """Whole-program index records (see GhidraExport.java for the format)."""
+    fm = program.getFunctionManager()
+    rm = program.getReferenceManager()
+    listing = program.getListing()
+    st = program.getSymbolTable()
+    for func in fm.getFunctions(True):
+        sites = rm.getReferenceSourceIterator(func.getBody(), True)
+        while sites.hasNext():
+            site = sites.next()
+            for ref in rm.getReferencesFrom(site):
+                to = ref.getToAddress()
+                rtype = ref.getReferenceType()
+                record = {"k": "ref", "from_func": func.getName(), "from_func_addr": str(func.getEntryPoint()),
+                          "site": str(site), "to_addr": str(to), "type": rtype.getName()}
+                if rtype.isCall():
+                    callee = fm.getFunctionAt(to)
+                    if callee is None:
+                        continue
+                    record["kind"] = "call"
+                    record["to_name"] = callee.getName()
+                elif not rtype.isFlow():
+                    data = listing.getDataAt(to)
+                    sym = st.getPrimarySymbol(to)
+                    record["kind"] = "data"
+                    if sym is not None:
+                        record["to_name"] = sym.getName()
+                    if data is not None and data.hasStringValue():
+                        record["kind"] = "string"
+                        record["value"] = unicode(data.getValue())
+                else:
+                    continue  # jumps inside the function
+                yield record
+    for data in listing.getDefinedData(True):
+        if data.hasStringValue():
+            yield {"k": "string", "addr": str(data.getAddress()), "value": unicode(data.getValue())}
+    for sym in st.getExternalSymbols():
+        yield {"k": "import", "name": sym.getName(), "library": sym.getParentNamespace().getName()}
+    for addr in st.getExternalEntryPointIterator():
+        sym = st.getPrimarySymbol(addr)
+        yield {"k": "export", "name": sym.getName() if sym else None, "addr": str(addr)}
+
+
+def prioritize(program, funcs):
+    """main first, then external entry points, then the rest in address order."""
+    st = program.getSymbolTable()
+    first = [f for f in funcs if f.getName() == "main"]
+    first += [f for f in funcs if f.getName() != "main" and st.isExternalEntryPoint(f.getEntryPoint())]
+    return first + [f for f in funcs if f not in first]
+
 
 def run():
     program = currentProgram
     name = program.getName()
-    print("Analyzing program: " + name)
-    
-    iface = DecompInterface()
-    iface.openProgram(program)
-    
-    results = []
-    
-    fm = program.getFunctionManager()
-    funcs = fm.getFunctions(True)
-    
-    for func in funcs:
-        func_name = func.getName()
-        func_addr = str(func.getEntryPoint())
-        
-        # Decompile
-        res = iface.decompileFunction(func, 30, ConsoleTaskMonitor())  # 30s per function
-        code = ""
-        if res.decompileCompleted():
-            decomp = res.getDecompiledFunction()
-            if decomp:
-                code = decomp.getC()
-        
-        results.append({
-            "name": func_name,
-            "address": func_addr,
-            "code": code
-        })
-            
-    # Save output
+    mode = os.environ.get("GHIDRA_EXPORT_MODE") or "full"
+    print("Analyzing program: " + name + " (mode=" + mode + ")")
+
+    if mode == "index":
+        funcs = []
+    elif mode == "targeted":
+        funcs = []
+        for target in (os.environ.get("GHIDRA_EXPORT_FUNCTIONS") or "").split(","):
+            func = find_function(program, target.strip()) if target.strip() else None
+            if func is not None and func not in funcs:
+                funcs.append(func)
+    else:
+        funcs = prioritize(program, list(program.getFunctionManager().getFunctions(True)))
+
+    output_path = os.environ.get("GHIDRA_OUTPUT_PATH", "/tmp/ghidra_output.jsonl")
+    out = open(output_path, 'w')
+    lock = threading.Lock()
+    written = [0]
+
+    def emit(entry):
+        # Streamed: each line is flushed as soon as its function is done
+        with lock:
+            out.write(json.dumps(entry) + "\n")
+            out.flush()
+            written[0] += 1
+
     try:
-        output_path = os.environ.get("GHIDRA_OUTPUT_PATH", "/tmp/ghidra_output.json")
-        with open(output_path, 'w') as f:
-            json.dump(results, f)
-        print("Success: Exported " + str(len(results)) + " functions to " + output_path)
+        if mode == "index":
+            for record in index_records(program):
+                emit(record)
+            out.write(json.dumps({"done": written[0]}) + "\n")
+            print("Success: Indexed " + str(written[0]) + " records to " + output_path)
+            return
+        if mode == "metadata":
+            for func in funcs:
+                emit(describe(func))
+        else:
+            threads = min(Runtime.getRuntime().availableProcessors(), 8)
+            if os.environ.get("GHIDRA_DECOMPILER_THREADS"):
+                threads = int(os.environ["GHIDRA_DECOMPILER_THREADS"])
+            threads = max(1, min(threads, len(funcs)))
+            queue = list(funcs)
+            failed = []
+
+            def worker():
+                # DecompInterface is not thread-safe: one per thread
+                iface = DecompInterface()
+                iface.openProgram(program)
+                try:
+                    while True:
+                        with lock:
+                            if not queue:
+                                return
+                            func = queue.pop(0)
+                        try:
+                            res = iface.decompileFunction(func, 30, ConsoleTaskMonitor())  # 30s per function
+                            code = ""
+                            if res.decompileCompleted():
+                                decomp = res.getDecompiledFunction()
+                                if decomp:
+                                    code = decomp.getC()
+                            entry = describe(func)
+                            entry["code"] = code
+                        except Exception as e:
+                            entry = {"name": func.getName(), "address": str(func.getEntryPoint()),
+                                     "code": "", "error": str(e)}
+                        emit(entry)
+                except Exception as e:
+                    failed.append(e)  # a lost function: the export must not look complete
+                finally:
+                    iface.dispose()
+
+            pool = [threading.Thread(target=worker) for _ in range(threads)]
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+            if failed:
+                raise failed[0]
+        out.write(json.dumps({"done": written[0]}) + "\n")
+        print("Success: Exported " + str(written[0]) + " functions to " + output_path)
     except Exception as e:
-        print("Error saving results: " + str(e))
+        print("Error exporting results: " + str(e))
+    finally:
+        out.close()
 
 if __name__ == "__main__":
     run()
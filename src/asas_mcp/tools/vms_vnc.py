@@ -1,17 +1,45 @@
 import os
-import subprocess
-import asyncio
 from dotenv import load_dotenv
 
+from ..executors.tool_runner import ToolTimeout, run_offloaded, run_process
+
+# vmrun and vncdo run on the tool runner's "vnc" family (bounded concurrency and
+# timeout), so a hung vmrun no longer stalls the MCP event loop.
+
+
+class _VmrunError(Exception):
+    def __init__(self, stderr: str):
+        super().__init__(stderr)
+        self.stderr = stderr
+
+
+def _vmrun(*args: str) -> str:
+    proc = run_process(["vmrun", *args])
+    if proc.returncode != 0:
+        raise _VmrunError(proc.stderr)
+    return proc.stdout
+
+
+async def _offload(tool_name: str, fn, *args) -> str:
+    try:
+        return await run_offloaded("vnc", tool_name, lambda: fn(*args))
+    except ToolTimeout as e:
+        return f"Error: {e}"
+
+
 async def get_vm_ip(vm_name: str) -> str:
     """
     Dynamically find the IP address of a running VM by partial name match.
     Runs `vmrun list` to find the correct .vmx path, then `vmrun getGuestIPAddress`.
     """
+    return await _offload("get_vm_ip", _get_vm_ip, vm_name)
+
+
+def _get_vm_ip(vm_name: str) -> str:
     try:
         # 1. Get list of running VMs
-        list_proc = subprocess.run(["vmrun", "list"], capture_output=True, text=True, check=True)
-        running_vms = list_proc.stdout.strip().split('\n')[1:] # Skip the first line "Total running VMs: X"
+        list_proc = _vmrun("list")
+        running_vms = list_proc.strip().split('\n')[1:] # Skip the first line "Total running VMs: X"
         
         vmx_path = None
         for path in running_vms:
@@ -24,8 +52,7 @@ async def get_vm_ip(vm_name: str) -> str:
             return f"Error: No running VM found containing '{vm_name}' in its path. Running VMs: {running_vms}"
 
         # 2. Get IP for the matched VM
-        ip_proc = subprocess.run(["vmrun", "getGuestIPAddress", vmx_path], capture_output=True, text=True, check=True)
-        ip = ip_proc.stdout.strip()
+        ip = _vmrun("getGuestIPAddress", vmx_path).strip()
         
         # If the result is not a valid IP (e.g., "unknown" or error message)
         if not ip or len(ip.split('.')) != 4:
@@ -33,7 +60,7 @@ async def get_vm_ip(vm_name: str) -> str:
             
         return ip
         
-    except subprocess.CalledProcessError as e:
+    except _VmrunError as e:
         return f"Error executing vmrun: {e.stderr}"
     except Exception as e:
         return f"Unexpected error getting VM IP: {str(e)}"
@@ -43,8 +70,12 @@ async def open_vm_vnc(vm_name: str) -> str:
     Opens a Browser-based VNC (NoVNC) session for the specified virtual machine.
     This bypasses any LLM layers and uses native macOS 'open' command for reliability.
     """
+    return await _offload("open_vm_vnc", _open_vm_vnc, vm_name)
+
+
+def _open_vm_vnc(vm_name: str) -> str:
     print(f"DEBUG: Attempting to dynamically get IP for VM: {vm_name}")
-    vm_ip = await get_vm_ip(vm_name)
+    vm_ip = _get_vm_ip(vm_name)
     
     # If the returned string starts with "Error", return it immediately
     if vm_ip.startswith("Error"):
@@ -60,7 +91,7 @@ async def open_vm_vnc(vm_name: str) -> str:
     # 2. Invoke browser directly to open NoVNC
     # Using macOS native 'open' command
     cmd = ["open", novnc_url]
-    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    proc = run_process(cmd)
     
     if proc.returncode == 0:
         return f"✅ Browser launched for {vm_name} at {novnc_url}"
@@ -71,7 +102,11 @@ async def open_vm_vnc(vm_name: str) -> str:
 # Used for Agent autonomous Computer Use interactions
 async def _execute_vnc_do_command(vm_name: str, commands: list) -> str:
     """Helper to execute vncdotool CLI commands against the VM's VNC port (5900)"""
-    ip = await get_vm_ip(vm_name)
+    return await _offload("vncdo", _vnc_do, vm_name, commands)
+
+
+def _vnc_do(vm_name: str, commands: list) -> str:
+    ip = _get_vm_ip(vm_name)
     if "Error" in ip:
         return ip
         
@@ -84,17 +119,12 @@ async def _execute_vnc_do_command(vm_name: str, commands: list) -> str:
         cli_args = ["vncdo", "-s", server_address] + commands
         print(f"DEBUG: VNC command executing -> {' '.join(cli_args)}")
         
-        proc = await asyncio.create_subprocess_exec(
-            *cli_args,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
+        proc = run_process(cli_args, text=False)
         
         if proc.returncode == 0:
-            return stdout.decode('utf-8') or "VNC sequence executed successfully"
+            return proc.stdout.decode('utf-8') or "VNC sequence executed successfully"
         else:
-            return f"VNC Execution Error: {stderr.decode('utf-8')}"
+            return f"VNC Execution Error: {proc.stderr.decode('utf-8')}"
     except Exception as e:
         return f"Unexpected VNC Error: {e}"
 
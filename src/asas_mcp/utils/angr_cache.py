@@ -0,0 +1,233 @@
+"""
+Per-process cache of loaded angr projects, keyed by binary sha256.
+
+reverse_angr_solve used to build a new angr.Project (CLE load, relocation,
+symbol resolution) and a new entry state on every call, and ConcolicBreaker
+calls it again and again against the same target. Cached entries keep the
+Project - and with it the VEX engine's lifted-block cache - plus a pristine
+entry state to copy and an optional CFGFast result. Entries are evicted
+least-recently-used under a memory budget. An entry's cost is estimated
+from the binary's size: RSS growth during a load would also count whatever
+other threads allocated meanwhile, including concurrent loads.
+
+Entries can be pickled to ASAS_ANGR_CACHE_DIR so that another process, e.g.
+a SwarmWorker actor sharing the directory, warm-starts from the pickle
+instead of reloading and re-running CFGFast. Pickles are only ever read
+from that local directory: do not point it at untrusted storage.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .result_cache import DEFAULT_CACHE_DIR, file_digest
+
+logger = logging.getLogger(__name__)
+
+ANGR_CACHE_DIR = os.environ.get("ASAS_ANGR_CACHE_DIR", os.path.join(DEFAULT_CACHE_DIR, "angr"))
+ANGR_CACHE_MAX_BYTES = int(os.environ.get("ASAS_ANGR_CACHE_MB", "2048")) * 1024 * 1024
+# Write every newly loaded project to disk (warm starts always read existing pickles)
+PERSIST = os.environ.get("ASAS_ANGR_PERSIST") == "1"
+DEFAULT_LOAD_OPTIONS = {"auto_load_libs": False}
+# Estimated in-memory size of a loaded project per byte of binary
+SIZE_FACTOR = 16
+
+
+class AngrProjectEntry:
+    """A loaded project and what is derived from it once per binary."""
+
+    def __init__(self, key: str, project: Any, cost: int, cfg: Any = None):
+        self.key = key
+        self.project = project
+        self.cost = cost
+        self.cfg = cfg
+        self.hits = 0
+        self.lock = threading.Lock()
+        self._entry_state = None
+        # results of later per-binary analyses, e.g. CFG distances per target (not pickled)
+        self.derived: Dict[Any, Any] = {}
+
+    def entry_state(self, **kwargs):
+        """
+        A fresh entry state. Without arguments it is a copy of a cached
+        pristine state (copy-on-write memory, so it is cheap and independent).
+        """
+        if kwargs:
+            return self.project.factory.entry_state(**kwargs)
+        with self.lock:
+            if self._entry_state is None:
+                self._entry_state = self.project.factory.entry_state()
+            return self._entry_state.copy()
+
+    def cfg_fast(self):
+        with self.lock:
+            if self.cfg is None:
+                start = time.perf_counter()
+                self.cfg = self.project.analyses.CFGFast(normalize=True)
+                logger.info(f"CFGFast for {self.key[:12]} took {time.perf_counter() - start:.1f}s")
+            return self.cfg
+
+
+class AngrProjectCache:
+    def __init__(self, root: str = ANGR_CACHE_DIR, max_bytes: int = ANGR_CACHE_MAX_BYTES, persist: bool = PERSIST):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.persist = persist
+        self._entries: "OrderedDict[str, AngrProjectEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.stats = {"hits": 0, "disk_hits": 0, "loads": 0, "evictions": 0, "load_seconds": 0.0}
+
+    @staticmethod
+    def make_key(binary_sha256: str, load_options: Dict[str, Any]) -> str:
+        options = hashlib.sha256(json.dumps(load_options, sort_keys=True, default=str).encode()).hexdigest()[:8]
+        return f"{binary_sha256}-{options}"
+
+    def _pickle_path(self, key: str) -> str:
+        import angr
+        return os.path.join(self.root, key[:2], f"{key}-angr{getattr(angr, '__version__', '')}.pkl")
+
+    # --- lookup ---
+
+    def get(self, file_path: str, load_options: Optional[Dict[str, Any]] = None,
+            persist: Optional[bool] = None) -> AngrProjectEntry:
+        """The cached entry for this binary, loading it (from a pickle or the binary) on a miss."""
+        options = dict(DEFAULT_LOAD_OPTIONS if load_options is None else load_options)
+        digest = file_digest(file_path)
+        if digest is None:  # unreadable: not cached, angr reports the error itself
+            return self._load(f"uncached:{file_path}", file_path, options)
+        key = self.make_key(digest, options)
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:  # single-flight: concurrent callers wait for one load
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+            entry = self._load_pickle(key)
+            if entry is None:
+                entry = self._load(key, file_path, options)
+                if self.persist if persist is None else persist:
+                    self.save(entry)
+            self._insert(entry)
+            return entry
+
+    def project(self, file_path: str, load_options: Optional[Dict[str, Any]] = None):
+        return self.get(file_path, load_options).project
+
+    def _lookup(self, key: str) -> Optional[AngrProjectEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+                self.stats["hits"] += 1
+            return entry
+
+    def _load(self, key: str, file_path: str, options: Dict[str, Any]) -> AngrProjectEntry:
+        import angr
+        start = time.perf_counter()
+        project = angr.Project(file_path, **options)
+        elapsed = time.perf_counter() - start
+        cost = os.path.getsize(file_path) * SIZE_FACTOR if os.path.isfile(file_path) else 0
+        with self._lock:
+            self.stats["loads"] += 1
+            self.stats["load_seconds"] = round(self.stats["load_seconds"] + elapsed, 3)
+        logger.info(f"Loaded angr project for {os.path.basename(file_path)} in {elapsed:.2f}s (~{cost >> 20} MB)")
+        return AngrProjectEntry(key, project, cost)
+
+    def _insert(self, entry: AngrProjectEntry):
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            total = sum(e.cost for e in self._entries.values())
+            # the newest entry always stays, even if it alone exceeds the budget
+            while total > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted.cost
+                self.stats["evictions"] += 1
+
+    # --- disk ---
+
+    def save(self, entry: AngrProjectEntry) -> Optional[str]:
+        """Pickle the project (and CFG, if computed) for warm starts in other processes."""
+        path = self._pickle_path(entry.key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with entry.lock, open(tmp, "wb") as f:
+                pickle.dump({"project": entry.project, "cfg": entry.cfg, "cost": entry.cost}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Could not pickle angr project {entry.key[:12]}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return None
+        return path
+
+    def _load_pickle(self, key: str) -> Optional[AngrProjectEntry]:
+        path = self._pickle_path(key)
+        if not os.path.exists(path):
+            return None
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:  # truncated or written by an incompatible angr/claripy
+            logger.warning(f"Discarding unreadable angr pickle {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        os.utime(path)
+        with self._lock:
+            self.stats["disk_hits"] += 1
+        logger.info(f"Warm-started angr project {key[:12]} from disk in {time.perf_counter() - start:.2f}s")
+        return AngrProjectEntry(key, state["project"], state["cost"], state.get("cfg"))
+
+    def warm(self, file_path: str, cfg: bool = False, load_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Load (or warm-start) a binary, optionally run CFGFast, and persist both."""
+        start = time.perf_counter()
+        entry = self.get(file_path, load_options, persist=False)
+        had_cfg = entry.cfg is not None
+        if cfg:
+            entry.cfg_fast()
+        path = self._pickle_path(entry.key)
+        if not os.path.exists(path) or (cfg and not had_cfg):
+            path = self.save(entry)
+        return {"key": entry.key, "pickle": path, "cfg": entry.cfg is not None,
+                "seconds": round(time.perf_counter() - start, 3)}
+
+    # --- maintenance ---
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(e.cost for e in self._entries.values())
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+        return {**self.stats, "entries": entries, "memory_bytes": self.memory_bytes(), "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[AngrProjectCache] = None
+
+
+def get_angr_cache() -> AngrProjectCache:
+    global _cache
+    if _cache is None:
+        _cache = AngrProjectCache()
+    return _cache
@@ -0,0 +1,371 @@
+"""
+Budgeted symbolic exploration for reverse_angr_solve.
+
+A plain ``simgr.explore`` has no limit: a bad target (path explosion, an
+unbounded loop on symbolic input) keeps a worker busy until it runs out of
+memory. ``explore`` here stops on a wall-clock, RSS-growth and active-state
+budget, applies exploration techniques by name, can split the active stash
+across forked worker processes, and returns up to ``max_solutions``
+distinct stdin inputs - one solve gives the fuzz swarm a batch of seeds.
+
+Directed mode ranks states by CFG distance to the target (computed once per
+binary and target), steps only the closest ones, drops states that cannot
+reach it, and starts from where the fuzzer seed's concrete path first forks
+instead of the entry point.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = int(os.environ.get("ASAS_ANGR_TIMEOUT", "300"))
+DEFAULT_MAX_MEMORY_MB = int(os.environ.get("ASAS_ANGR_MAX_MEMORY_MB", "4096"))
+DEFAULT_MAX_ACTIVE = int(os.environ.get("ASAS_ANGR_MAX_ACTIVE", "256"))
+# LengthLimiter bound (basic blocks in a state's history)
+DEFAULT_MAX_LENGTH = 1000
+# Directed mode: states stepped per round, the rest wait in the "deferred" stash
+DEFAULT_BEAM = int(os.environ.get("ASAS_ANGR_BEAM", "16"))
+# Seed fork-point snapshots kept per binary
+SEED_SNAPSHOTS = 8
+# CFGFast pseudo-nodes for jumps/calls it could not resolve
+_UNRESOLVED = ("UnresolvableJumpTarget", "UnresolvableCallTarget")
+
+# name -> angr.exploration_techniques class
+TECHNIQUES = {
+    "dfs": "DFS",
+    "length_limiter": "LengthLimiter",
+    "veritesting": "Veritesting",
+    "spiller": "Spiller",
+}
+
+
+def _rss() -> int:
+    return psutil.Process().memory_info().rss
+
+
+class ExplorationBudget:
+    """
+    ``until`` callback for ``simgr.explore``: True once the time or memory
+    budget is spent. Active states beyond ``max_active`` are moved to the
+    ``pruned`` stash instead of stopping, so exploration goes on bounded.
+    """
+
+    def __init__(self, seconds: Optional[float] = DEFAULT_TIMEOUT, memory_mb: Optional[int] = DEFAULT_MAX_MEMORY_MB,
+                 max_active: Optional[int] = DEFAULT_MAX_ACTIVE):
+        self.seconds = seconds
+        self.memory_mb = memory_mb
+        self.max_active = max_active
+        self.reason: Optional[str] = None
+        self.pruned = 0
+        self.start()
+
+    def start(self):
+        self.started = time.monotonic()
+        self.base_rss = _rss()
+
+    def remaining(self) -> Optional[float]:
+        if self.seconds is None:
+            return None
+        return max(0.0, self.seconds - (time.monotonic() - self.started))
+
+    def __call__(self, simgr) -> bool:
+        if self.max_active and len(simgr.active) > self.max_active:
+            self.pruned += len(simgr.active) - self.max_active
+            simgr.split(from_stash="active", to_stash="pruned", limit=self.max_active)
+        if self.seconds is not None and time.monotonic() - self.started > self.seconds:
+            self.reason = f"timeout after {self.seconds}s"
+        elif self.memory_mb is not None and _rss() - self.base_rss > self.memory_mb << 20:
+            self.reason = f"memory budget of {self.memory_mb} MB exceeded"
+        return self.reason is not None
+
+
+def use_techniques(simgr, names: Sequence[str], max_length: int = DEFAULT_MAX_LENGTH):
+    import angr
+    unknown = [n for n in names if n not in TECHNIQUES]
+    if unknown:
+        raise ValueError(f"Unknown exploration techniques {unknown}, expected some of {sorted(TECHNIQUES)}")
+    for name in names:
+        cls = getattr(angr.exploration_techniques, TECHNIQUES[name])
+        simgr.use_technique(cls(max_length=max_length) if name == "length_limiter" else cls())
+
+
+def stdin_solutions(states, limit: int, seen: Optional[List[bytes]] = None) -> List[bytes]:
+    """
+    Up to ``limit`` distinct stdin contents: one per found state first (each
+    is a different path), then further models of each state's stdin.
+    """
+    solutions = list(seen or [])
+    for state in states:
+        if len(solutions) >= limit:
+            break
+        data = state.posix.dumps(0)
+        if data not in solutions:
+            solutions.append(data)
+    for state in states:
+        if len(solutions) >= limit:
+            break
+        try:
+            stdin = state.posix.stdin
+            models = state.solver.eval_upto(stdin.load(0, stdin.size), limit - len(solutions) + 1, cast_to=bytes)
+        except Exception as e:  # e.g. a stdin plugin without load/size
+            logger.debug(f"No further stdin models: {e}")
+            continue
+        for data in models:
+            if len(solutions) >= limit:
+                break
+            if data not in solutions:
+                solutions.append(data)
+    return solutions[len(seen or []):]
+
+
+def cfg_distances(graph, target: int) -> Optional[Tuple[Dict[int, int], frozenset]]:
+    """
+    Basic-block distance from every CFG node to the block(s) containing
+    ``target``, by breadth-first search over reversed edges (every edge
+    kind, so a call site reaches targets inside its callee). Returns
+    (distances, known) where ``known`` are the blocks whose distance is
+    trustworthy: a block ending in an unresolved jump may reach the target
+    without an edge saying so. None if no block contains ``target``.
+    """
+    nodes = list(graph.nodes())
+    queue = deque(n for n in nodes if n.addr <= target < n.addr + max(n.size or 0, 1))
+    if not queue:
+        return None
+    depth = {n: 0 for n in queue}
+    while queue:
+        node = queue.popleft()
+        for pred in graph.predecessors(node):
+            if pred not in depth:
+                depth[pred] = depth[node] + 1
+                queue.append(pred)
+    distances: Dict[int, int] = {}
+    for node, d in depth.items():
+        if d < distances.get(node.addr, math.inf):
+            distances[node.addr] = d
+    unresolved = {pred.addr for n in nodes if getattr(n, "name", None) in _UNRESOLVED
+                  for pred in graph.predecessors(n)}
+    return distances, frozenset(n.addr for n in nodes) - unresolved
+
+
+class DirectedSearch:
+    """
+    ``until`` callback ranking states by CFG distance to the target: the
+    ``beam`` closest states stay active, the others wait in ``deferred``
+    (the farthest beyond ``max_deferred`` are dropped), and states in known
+    blocks with no path to the target - directly or by returning to a
+    caller - are dropped as unreachable.
+    """
+
+    def __init__(self, distances: Dict[int, int], known: frozenset, beam: int = DEFAULT_BEAM,
+                 max_deferred: Optional[int] = DEFAULT_MAX_ACTIVE):
+        self.distances = distances
+        self.known = known
+        self.beam = max(1, beam)
+        self.max_deferred = max_deferred
+        self.unreachable = 0
+        self.dropped = 0
+
+    def distance(self, state) -> Optional[float]:
+        """Blocks to the target; inf if unknown (kept, ranked last); None if unreachable."""
+        best = self.distances.get(state.addr, math.inf)
+        for frame in getattr(state, "callstack", ()):
+            ret = self.distances.get(getattr(frame, "ret_addr", None))
+            if ret is not None:
+                best = min(best, ret + 1)
+        if best == math.inf and state.addr in self.known:
+            return None
+        return best
+
+    def __call__(self, simgr) -> bool:
+        ranked = []
+        for i, state in enumerate(simgr.active + simgr.stashes.get("deferred", [])):
+            d = self.distance(state)
+            if d is None:
+                self.unreachable += 1
+            else:
+                ranked.append((d, i, state))
+        ranked.sort(key=lambda r: r[:2])
+        deferred = [state for _, _, state in ranked[self.beam:]]
+        if self.max_deferred is not None and len(deferred) > self.max_deferred:
+            self.dropped += len(deferred) - self.max_deferred
+            del deferred[self.max_deferred:]
+        simgr.stashes["active"] = [state for _, _, state in ranked[:self.beam]]
+        simgr.stashes["deferred"] = deferred
+        return False
+
+
+def directed_search(entry, target: int, beam: int = DEFAULT_BEAM,
+                    max_deferred: Optional[int] = DEFAULT_MAX_ACTIVE) -> Optional[DirectedSearch]:
+    """DirectedSearch towards ``target`` with distances cached on the project entry; None if the CFG lacks it."""
+    cfg = entry.cfg_fast()
+    with entry.lock:
+        key = ("distances", target)
+        if key not in entry.derived:
+            start = time.perf_counter()
+            entry.derived[key] = cfg_distances(cfg.graph, target)
+            logger.info(f"CFG distances to {target:#x} took {time.perf_counter() - start:.2f}s")
+        result = entry.derived[key]
+    return None if result is None else DirectedSearch(*result, beam=beam, max_deferred=max_deferred)
+
+
+def seed_states(entry, state, prefix: bytes, budget: ExplorationBudget) -> Optional[List]:
+    """
+    States where the seed's concrete path first forks: ``state`` (stdin
+    starting with ``prefix``) is stepped while it is the only active state,
+    i.e. while nothing symbolic decides a branch. The seed's path does not
+    reach the uncovered target - that is why there is a breakthrough - so
+    searching from the fork point loses nothing. Snapshots are cached on
+    the project entry per prefix; callers get copies. None if the path
+    ends or the budget runs out before forking.
+    """
+    with entry.lock:
+        snapshots = entry.derived.setdefault("seed_states", OrderedDict())
+        cached = snapshots.get(prefix)
+        if cached is not None:
+            snapshots.move_to_end(prefix)
+    if cached is None:
+        start = time.perf_counter()
+        simgr = entry.project.factory.simgr(state)
+        simgr.run(until=lambda sm: len(sm.active) != 1 or budget(sm))
+        if budget.reason or not simgr.active:
+            return None
+        cached = list(simgr.active)
+        logger.info(f"Seed path forks after {time.perf_counter() - start:.2f}s into {len(cached)} states")
+        with entry.lock:
+            snapshots[prefix] = cached
+            while len(snapshots) > SEED_SNAPSHOTS:
+                snapshots.popitem(last=False)
+    return [s.copy() for s in cached]
+
+
+def _stash_sizes(simgr) -> Dict[str, int]:
+    return {name: len(states) for name, states in simgr.stashes.items() if states}
+
+
+# Shard workers are forked so they inherit the project and states instead of
+# having them pickled. Forking copies only the calling thread: a lock another
+# thread holds stays held in the child forever. The children only step angr
+# states, and only one solve per process forks at a time; a solve that finds
+# the lock taken keeps exploring in-process.
+_fork_lock = threading.Lock()
+# The job of this shard worker process, set by the pool initializer
+_shard_job: Optional[Dict[str, Any]] = None
+
+
+def _init_shard(job: Dict[str, Any]):
+    # Runs in the forked child: the job came with the process, it is never pickled
+    global _shard_job
+    _shard_job = job
+
+
+def _until(budget: ExplorationBudget, directed: Optional[DirectedSearch]):
+    if directed is None:
+        return budget
+    return lambda sm: directed(sm) or budget(sm)
+
+
+def _explore_shard(index: int) -> Dict[str, Any]:
+    job = _shard_job
+    budget = ExplorationBudget(job["seconds"], job["memory_mb"], job["max_active"])
+    directed = job["directed"]
+    if directed is not None:
+        directed.unreachable = directed.dropped = 0  # counted by the parent up to the split
+    simgr = job["project"].factory.simgr(job["shards"][index])
+    if job["techniques"]:
+        use_techniques(simgr, job["techniques"], job["max_length"])
+    simgr.explore(find=job["find"], avoid=job["avoid"], num_find=job["max_solutions"], until=_until(budget, directed))
+    return {"solutions": stdin_solutions(simgr.found, job["max_solutions"]), "stashes": _stash_sizes(simgr),
+            "stopped": budget.reason, "pruned": budget.pruned + (directed.dropped if directed else 0),
+            "unreachable": directed.unreachable if directed else 0}
+
+
+def _summary(simgr, budget: ExplorationBudget, directed: Optional[DirectedSearch], max_solutions: int) -> Tuple:
+    """(solutions, stashes, stopped, pruned, unreachable) of an in-process search."""
+    return (stdin_solutions(simgr.found, max_solutions), _stash_sizes(simgr), budget.reason,
+            budget.pruned + (directed.dropped if directed else 0), directed.unreachable if directed else 0)
+
+
+def _merge_stashes(total: Dict[str, int], sizes: Dict[str, int]):
+    for name, count in sizes.items():
+        total[name] = total.get(name, 0) + count
+
+
+def explore(project, state, find, avoid=None, max_solutions: int = 1, budget: Optional[ExplorationBudget] = None,
+            techniques: Sequence[str] = (), max_length: int = DEFAULT_MAX_LENGTH, workers: int = 1,
+            directed: Optional[DirectedSearch] = None) -> Dict[str, Any]:
+    """
+    Explore from ``state`` (or a list of states) towards ``find`` within
+    ``budget``, best-first by CFG distance when ``directed`` is given.
+
+    With ``workers`` > 1 the active stash is explored in this process until
+    it holds that many states, then split round-robin over forked processes
+    that each explore their share with the remaining budget. One solve per
+    process forks at a time (see _fork_lock); a concurrent one keeps going
+    in-process and reports ``workers`` 1.
+
+    Returns {solutions: [bytes], stashes: {name: count}, stopped, pruned,
+    unreachable, workers, elapsed}.
+    """
+    budget = budget or ExplorationBudget()
+    started = time.monotonic()
+    max_solutions = max(1, max_solutions)
+    avoid = avoid or []
+    simgr = project.factory.simgr(state)
+    if techniques:
+        use_techniques(simgr, techniques, max_length)
+
+    parallel = workers > 1 and "fork" in multiprocessing.get_all_start_methods()
+    until = _until(budget, directed)
+    if parallel:
+        step = until
+        until = lambda sm: step(sm) or len(sm.active) >= workers
+    simgr.explore(find=find, avoid=avoid, num_find=max_solutions, until=until)
+    solutions, stashes, stopped, pruned, unreachable = _summary(simgr, budget, directed, max_solutions)
+    used = 1
+
+    split = parallel and len(solutions) < max_solutions and len(simgr.active) > 1 and stopped is None
+    if split and not _fork_lock.acquire(blocking=False):
+        logger.info("Another solve in this process is using worker processes: exploring in-process")
+        split = False
+        simgr.explore(find=find, avoid=avoid, num_find=max_solutions, until=_until(budget, directed))
+        solutions, stashes, stopped, pruned, unreachable = _summary(simgr, budget, directed, max_solutions)
+
+    if split:
+        # active then deferred is closest-first: round-robin gives every shard near states
+        pending = simgr.active + simgr.stashes.get("deferred", [])
+        shards = [pending[i::workers] for i in range(workers)]
+        shards = [s for s in shards if s]
+        stashes.pop("active", None)
+        stashes.pop("deferred", None)
+        job = {
+            "project": project, "shards": shards, "find": find, "avoid": avoid,
+            "max_solutions": max_solutions - len(solutions), "techniques": list(techniques),
+            "max_length": max_length, "seconds": budget.remaining(), "memory_mb": budget.memory_mb,
+            "max_active": budget.max_active, "directed": directed,
+        }
+        try:
+            with ProcessPoolExecutor(len(shards), mp_context=multiprocessing.get_context("fork"),
+                                     initializer=_init_shard, initargs=(job,)) as pool:
+                results = list(pool.map(_explore_shard, range(len(shards))))
+        finally:
+            _fork_lock.release()
+        used = len(shards)
+        for result in results:
+            new = [s for s in result["solutions"] if s not in solutions]
+            solutions += new[:max_solutions - len(solutions)]
+            _merge_stashes(stashes, result["stashes"])
+            pruned += result["pruned"]
+            unreachable += result["unreachable"]
+            stopped = stopped or result["stopped"]
+
+    return {"solutions": solutions, "stashes": stashes, "stopped": stopped, "pruned": pruned,
+            "unreachable": unreachable, "workers": used, "elapsed": round(time.monotonic() - started, 3)}
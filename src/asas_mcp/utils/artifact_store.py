@@ -0,0 +1,211 @@
+"""
+Content-addressed store for challenge binaries and other tool inputs.
+
+Files are ingested once (from a host path or an uploaded base64 payload) and
+addressed by the sha256 of their contents. Tools take the artifact id instead
+of re-sending the bytes: in-process consumers read through mmap, subprocess
+consumers (Ghidra, Kali upload, sandbox) get the stored path.
+"""
+import base64
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .result_cache import DEFAULT_CACHE_DIR
+
+# Shared by every pooled server process
+ARTIFACT_DIR = os.environ.get("ASAS_ARTIFACT_DIR", os.path.join(DEFAULT_CACHE_DIR, "artifacts"))
+MIN_PREFIX = 12
+_ID_RE = re.compile(r"^(?:sha256:)?([0-9a-f]{%d,64})$" % MIN_PREFIX)
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class ArtifactError(ValueError):
+    """Unknown, ambiguous or malformed artifact reference."""
+
+
+def _safe_name(name: Optional[str], digest: str) -> str:
+    name = _SAFE_NAME_RE.sub("_", os.path.basename(name or "")).strip("._")
+    return name or digest[:16]
+
+
+class ArtifactStore:
+    """Immutable sha256-addressed blobs with a small JSON metadata sidecar."""
+
+    def __init__(self, root: str = ARTIFACT_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _meta_path(self, digest: str) -> str:
+        return self._object_path(digest) + ".json"
+
+    # --- ingestion ---
+
+    def ingest_path(self, path: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """Copy a host file into the store (single pass: hash while copying)."""
+        if not os.path.isfile(path):
+            raise ArtifactError(f"File not found: {path}")
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".ingest.{os.getpid()}.{uuid.uuid4().hex}")
+        h = hashlib.sha256()
+        size = 0
+        try:
+            with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+                for chunk in iter(lambda: src.read(1 << 20), b""):
+                    h.update(chunk)
+                    dst.write(chunk)
+                    size += len(chunk)
+            return self._commit(tmp_path, h.hexdigest(), size, name or os.path.basename(path), path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def ingest_bytes(self, data: bytes, name: Optional[str] = None) -> Dict[str, Any]:
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".ingest.{os.getpid()}.{uuid.uuid4().hex}")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            return self._commit(tmp_path, hashlib.sha256(data).hexdigest(), len(data), name, None)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _commit(self, tmp_path: str, digest: str, size: int,
+                name: Optional[str], source: Optional[str]) -> Dict[str, Any]:
+        obj_path = self._object_path(digest)
+        existing = self.info(digest) if os.path.exists(obj_path) else None
+        if existing is not None:
+            return existing  # already stored: content addressing makes re-ingest a no-op
+        os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, obj_path)
+        meta = {
+            "artifact_id": digest,
+            "name": _safe_name(name, digest),
+            "size": size,
+            "source_path": source,
+            "created": time.time(),
+        }
+        meta_tmp = f"{self._meta_path(digest)}.{os.getpid()}.tmp"
+        with open(meta_tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, self._meta_path(digest))
+        return meta
+
+    # --- lookup ---
+
+    def resolve(self, ref: str) -> str:
+        """Full sha256 for an id, ``sha256:``-prefixed id or unique prefix (>= 12 hex)."""
+        m = _ID_RE.match((ref or "").strip().lower())
+        if not m:
+            raise ArtifactError(f"Malformed artifact id: {ref!r}")
+        digest = m.group(1)
+        if len(digest) == 64:
+            if not os.path.exists(self._object_path(digest)):
+                raise ArtifactError(f"Unknown artifact: {ref}")
+            return digest
+        try:
+            candidates = [n for n in os.listdir(os.path.join(self.root, digest[:2]))
+                          if n.startswith(digest) and not n.endswith(".json")]
+        except OSError:
+            candidates = []
+        if len(candidates) != 1:
+            raise ArtifactError(f"{'Ambiguous' if candidates else 'Unknown'} artifact: {ref}")
+        return candidates[0]
+
+    def path(self, ref: str) -> str:
+        """Read-only host path of the stored bytes (for subprocess consumers)."""
+        return self._object_path(self.resolve(ref))
+
+    def info(self, ref: str) -> Dict[str, Any]:
+        digest = self.resolve(ref)
+        try:
+            with open(self._meta_path(digest)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            size = os.path.getsize(self._object_path(digest))
+            return {"artifact_id": digest, "name": digest[:16], "size": size, "source_path": None}
+
+    @contextmanager
+    def open(self, ref: str) -> Iterator[Any]:
+        """Zero-copy read access: yields an mmap (or b"" for empty files)."""
+        with open(self.path(ref), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""
+                return
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mm
+            finally:
+                mm.close()
+
+    def list(self) -> List[Dict[str, Any]]:
+        out = []
+        try:
+            buckets = os.listdir(self.root)
+        except OSError:
+            return out
+        for bucket in buckets:
+            bucket_dir = os.path.join(self.root, bucket)
+            if len(bucket) != 2 or not os.path.isdir(bucket_dir):
+                continue
+            for name in os.listdir(bucket_dir):
+                if len(name) == 64 and not name.endswith(".json"):
+                    out.append(self.info(name))
+        return sorted(out, key=lambda m: m.get("created") or 0)
+
+    def delete(self, ref: str):
+        digest = self.resolve(ref)
+        with self._lock:
+            for p in (self._object_path(digest), self._meta_path(digest)):
+                try:
+                    os.chmod(p, 0o644)
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    global _store
+    if _store is None:
+        _store = ArtifactStore()
+    return _store
+
+
+@contextmanager
+def open_input(data_base64: Optional[str] = None, artifact_id: Optional[str] = None) -> Iterator[Any]:
+    """Bytes for a tool that accepts either an artifact id or an inline base64 payload."""
+    if artifact_id:
+        with get_artifact_store().open(artifact_id) as data:
+            yield data
+    elif data_base64 is not None:
+        yield base64.b64decode(data_base64)
+    else:
+        raise ArtifactError("Either artifact_id or data_base64 is required")
+
+
+def input_path(file_path: Optional[str] = None, artifact_id: Optional[str] = None) -> str:
+    """Host path for a tool that accepts either an artifact id or a host file path."""
+    if artifact_id:
+        return get_artifact_store().path(artifact_id)
+    if file_path:
+        return file_path
+    raise ArtifactError("Either artifact_id or file_path is required")
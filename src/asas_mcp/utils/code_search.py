@@ -0,0 +1,229 @@
+"""
+Trigram-indexed search over every decompiled function seen so far.
+
+reverse_ghidra exports and IDA decompilations are added per function to a
+local SQLite database with an FTS5 trigram index. code_search(pattern)
+extracts the literal substrings every match must contain, narrows the
+candidates with the trigram index, then runs the real regex only on those
+functions, so "where is the flag compared" is one cheap query instead of
+re-decompiling and reading whole programs.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from .result_cache import DEFAULT_CACHE_DIR, file_digest
+
+logger = logging.getLogger(__name__)
+
+CODE_SEARCH_DB = os.environ.get("ASAS_CODE_SEARCH_DB", os.path.join(DEFAULT_CACHE_DIR, "code_search.sqlite"))
+MAX_LINES_PER_HIT = 3
+SNIPPET_CHARS = 200
+# A binary filter is also tried as a sha256 prefix when it is 8 to 64 hex digits
+_SHA256_PREFIX_RE = re.compile(r"[0-9a-fA-F]{8,64}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS functions (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    binary TEXT NOT NULL,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    address TEXT,
+    code TEXT NOT NULL,
+    UNIQUE (sha256, source, name)
+);
+CREATE INDEX IF NOT EXISTS functions_binary ON functions(binary);
+CREATE TABLE IF NOT EXISTS binaries (
+    sha256 TEXT NOT NULL,
+    source TEXT NOT NULL,
+    binary TEXT NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (sha256, source)
+);
+"""
+
+
+def required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Substrings every match of ``pattern`` must contain (3+ chars each); an
+    empty list means the trigram index cannot narrow the search.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return [pattern] if len(pattern) >= 3 else []
+    literals, run = [], []
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            literals.append("".join(run))
+            run = []
+        if op is sre_parse.BRANCH:
+            return []  # top-level alternation: nothing is required
+    if run:
+        literals.append("".join(run))
+    return [lit for lit in literals if len(lit) >= 3]
+
+
+def _fts_query(literals: List[str]) -> str:
+    return " AND ".join('"' + lit.replace('"', '""') + '"' for lit in literals)
+
+
+class CodeSearchIndex:
+    def __init__(self, path: str = CODE_SEARCH_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.fts = True
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            try:
+                self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS code_fts USING fts5(code, tokenize='trigram')")
+            except sqlite3.OperationalError as e:
+                # SQLite < 3.34 has no trigram tokenizer: searches fall back to scanning
+                logger.warning(f"Code search without trigram index: {e}")
+                self.fts = False
+        return self._conn
+
+    # --- indexing ---
+
+    def is_indexed(self, sha256: str, source: str) -> bool:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT complete FROM binaries WHERE sha256 = ? AND source = ?", (sha256, source)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def add_functions(self, sha256: str, binary: str, entries: Iterable[Dict[str, Any]],
+                      source: str = "ghidra", complete: bool = False) -> int:
+        """Insert or update functions (entries with name/address/code); returns the number stored."""
+        stored = 0
+        with self._lock:
+            db = self._db()
+            for entry in entries:
+                code, name = entry.get("code"), entry.get("name")
+                if not code or not name:
+                    continue
+                row = db.execute(
+                    "SELECT id FROM functions WHERE sha256 = ? AND source = ? AND name = ?", (sha256, source, name)
+                ).fetchone()
+                if row:
+                    fid = row[0]
+                    db.execute("UPDATE functions SET binary = ?, address = ?, code = ? WHERE id = ?",
+                               (binary, entry.get("address"), code, fid))
+                    if self.fts:
+                        db.execute("DELETE FROM code_fts WHERE rowid = ?", (fid,))
+                else:
+                    fid = db.execute(
+                        "INSERT INTO functions (sha256, binary, source, name, address, code) VALUES (?, ?, ?, ?, ?, ?)",
+                        (sha256, binary, source, name, entry.get("address"), code),
+                    ).lastrowid
+                if self.fts:
+                    db.execute("INSERT INTO code_fts (rowid, code) VALUES (?, ?)", (fid, code))
+                stored += 1
+            db.execute(
+                "INSERT INTO binaries (sha256, source, binary, complete) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (sha256, source) DO UPDATE SET binary = excluded.binary, "
+                "complete = MAX(complete, excluded.complete)",
+                (sha256, source, binary, int(complete)),
+            )
+            db.commit()
+        return stored
+
+    def add_file(self, file_path: str, entries: List[Dict[str, Any]], source: str = "ghidra",
+                 complete: bool = False) -> int:
+        """Index the export of a binary on disk (skipped if its full export is already indexed)."""
+        digest = file_digest(file_path)
+        if digest is None or self.is_indexed(digest, source):
+            return 0
+        return self.add_functions(digest, os.path.basename(file_path), entries, source, complete)
+
+    # --- search ---
+
+    def search(self, pattern: str, binary: Optional[str] = None, limit: int = 20,
+               ignore_case: bool = False) -> Dict[str, Any]:
+        start = time.perf_counter()
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            regex = re.compile(pattern, flags)
+        except re.error:
+            regex = re.compile(re.escape(pattern), flags)  # not a regex: search literally
+            pattern = re.escape(pattern)
+        literals = required_literals(pattern, flags)
+
+        where, params = [], []
+        if binary:
+            match, params = ["f.binary = ?", "f.binary = ?"], params + [binary, os.path.basename(binary)]
+            if _SHA256_PREFIX_RE.fullmatch(binary):  # short hex-looking names ("add", "cafe") are not digests
+                match.append("f.sha256 LIKE ?")
+                params.append(binary.lower() + "%")
+            where.append("(" + " OR ".join(match) + ")")
+        if literals and self.fts:
+            sql = "SELECT f.binary, f.sha256, f.source, f.name, f.address, f.code FROM code_fts " \
+                  "JOIN functions f ON f.id = code_fts.rowid WHERE code_fts MATCH ?"
+            params.insert(0, _fts_query(literals))
+            if where:
+                sql += " AND " + " AND ".join(where)
+        else:
+            sql = "SELECT f.binary, f.sha256, f.source, f.name, f.address, f.code FROM functions f"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+        hits, scanned = [], 0
+        with self._lock:
+            # rows are consumed lazily: the scan stops as soon as ``limit`` functions matched
+            for binary_name, sha256, source, name, address, code in self._db().execute(sql, params):
+                scanned += 1
+                lines = [
+                    f"{no}: {line.strip()[:SNIPPET_CHARS]}"
+                    for no, line in enumerate(code.split("\n"), 1) if regex.search(line)
+                ]
+                if not lines and regex.search(code):  # multi-line match
+                    lines = [regex.search(code).group(0)[:SNIPPET_CHARS]]
+                if lines:
+                    hits.append({"binary": binary_name, "sha256": sha256[:12], "source": source, "function": name,
+                                 "address": address, "matches": len(lines), "snippet": lines[:MAX_LINES_PER_HIT]})
+                    if len(hits) >= limit:
+                        break
+        return {
+            "pattern": pattern,
+            "hits": hits,
+            "candidates": scanned,
+            "indexed_functions": self.count(),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db().execute("SELECT COUNT(*) FROM functions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_index: Optional[CodeSearchIndex] = None
+
+
+def get_code_index() -> CodeSearchIndex:
+    global _index
+    if _index is None:
+        _index = CodeSearchIndex()
+    return _index
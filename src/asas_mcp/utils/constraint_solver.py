@@ -0,0 +1,310 @@
+"""
+Constraint systems for reverse_angr_eval without ``eval``.
+
+Expressions are parsed with ``ast`` and compiled into closures over a
+whitelist of nodes: integer/bytes literals, declared variables, arithmetic,
+bitwise and comparison operators (claripy semantics: ``/``, ``%``, ``<``
+and ``>>`` are unsigned), ``and``/``or``/``not``, constant slices
+``x[7:0]`` and a few claripy functions (Concat, Extract, If, ...).
+Arithmetic on two plain integers is folded in Python, with ``/`` as
+integer division and the result bounded to MAX_CONSTANT_BITS.
+Anything else - attributes, other calls, lambdas, comprehensions - is
+rejected before it runs.
+
+A system is a set of variables plus a constraint list held in one
+incremental claripy.Solver. Systems are cached: a query whose constraints
+extend a cached system's branches that solver and only adds the new ones,
+so an agent refining a keygen one constraint at a time does not re-send
+the whole system each call.
+"""
+import ast
+import functools
+import logging
+import operator
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Compiled systems kept (LRU)
+MAX_SYSTEMS = 64
+# Constant shift amounts above this are rejected (1 << 10**9 would build a huge int)
+MAX_CONSTANT_SHIFT = 4096
+# Arithmetic on two Python ints may not produce a wider result (1 << (1 << 28) is built before claripy sees it)
+MAX_CONSTANT_BITS = 4096
+MAX_NODES = 5000
+
+_BINOPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.BitAnd: operator.and_, ast.BitOr: operator.or_, ast.BitXor: operator.xor,
+    ast.LShift: operator.lshift, ast.RShift: operator.rshift,
+}
+_UNARYOPS = {ast.USub: operator.neg, ast.Invert: operator.invert}
+_COMPARE = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+# claripy functions callable from expressions
+FUNCTIONS = (
+    "And", "Or", "Not", "If", "Concat", "Extract", "ZeroExt", "SignExt", "LShR",
+    "RotateLeft", "RotateRight", "SLT", "SLE", "SGT", "SGE", "ULT", "ULE", "UGT", "UGE",
+    "SDiv", "SMod",
+)
+
+
+class ExpressionError(ValueError):
+    """An expression uses syntax or names the compiler does not accept."""
+
+
+Compiled = Callable[[Dict[str, Any], Any], Any]
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(text: str, names: frozenset) -> Compiled:
+    """
+    Compile ``text`` into ``fn(variables, ops)``: ``variables`` maps names
+    to claripy ASTs (or ints), ``ops`` provides the FUNCTIONS (the claripy
+    module). Raises ExpressionError for anything outside the whitelist.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression {text!r}: {e.msg}") from None
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise ExpressionError(f"Expression too large (more than {MAX_NODES} nodes)")
+    return _compile(tree.body, names)
+
+
+def _compile(node: ast.AST, names: frozenset) -> Compiled:
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool):
+            return lambda v, ops: ops.BoolV(value)
+        if isinstance(value, bytes):
+            return lambda v, ops: ops.BVV(value)
+        if isinstance(value, int):
+            return lambda v, ops: value
+        raise ExpressionError(f"Unsupported constant {value!r}: only integers, bytes and booleans")
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name not in names:
+            raise ExpressionError(f"Unknown variable {name!r}, declared: {sorted(names)}")
+        return lambda v, ops: v[name]
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        if isinstance(node.op, (ast.LShift, ast.RShift)) and isinstance(node.right, ast.Constant) \
+                and isinstance(node.right.value, int) and node.right.value > MAX_CONSTANT_SHIFT:
+            raise ExpressionError(f"Shift amount {node.right.value} is larger than {MAX_CONSTANT_SHIFT}")
+        op, left, right = _BINOPS[type(node.op)], _compile(node.left, names), _compile(node.right, names)
+        if isinstance(node.op, ast.Div):
+            op = _int_div
+        return lambda v, ops: _apply(op, left(v, ops), right(v, ops))
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand, names)
+        if isinstance(node.op, ast.Not):
+            return lambda v, ops: ops.Not(operand(v, ops))
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        if type(node.op) in _UNARYOPS:
+            op = _UNARYOPS[type(node.op)]
+            return lambda v, ops: op(operand(v, ops))
+
+    if isinstance(node, ast.BoolOp):
+        values = [_compile(value, names) for value in node.values]
+        combine = "And" if isinstance(node.op, ast.And) else "Or"
+        return lambda v, ops: getattr(ops, combine)(*(value(v, ops) for value in values))
+
+    if isinstance(node, ast.Compare):
+        if not all(type(op) in _COMPARE for op in node.ops):
+            raise ExpressionError("Only ==, !=, <, <=, >, >= comparisons are supported")
+        operands = [_compile(node.left, names)] + [_compile(c, names) for c in node.comparators]
+        ops_ = [_COMPARE[type(op)] for op in node.ops]
+        if len(ops_) == 1:
+            op, left, right = ops_[0], operands[0], operands[1]
+            return lambda v, ops: op(left(v, ops), right(v, ops))
+
+        def chain(v, ops):  # a < b < c: And(a < b, b < c)
+            values = [operand(v, ops) for operand in operands]
+            return ops.And(*(op(values[i], values[i + 1]) for i, op in enumerate(ops_)))
+        return chain
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ExpressionError(f"Unsupported call {ast.unparse(node.func)}(), allowed: {', '.join(FUNCTIONS)}")
+        if node.keywords:
+            raise ExpressionError(f"{node.func.id}() takes positional arguments only")
+        func, args = node.func.id, [_compile(arg, names) for arg in node.args]
+        return lambda v, ops: getattr(ops, func)(*(arg(v, ops) for arg in args))
+
+    if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Slice):
+        bounds = (node.slice.lower, node.slice.upper)
+        if node.slice.step is not None or not all(isinstance(b, ast.Constant) and isinstance(b.value, int)
+                                                  for b in bounds):
+            raise ExpressionError("Slices need constant bounds, e.g. x[7:0] (high bit first)")
+        value, high, low = _compile(node.value, names), bounds[0].value, bounds[1].value
+        return lambda v, ops: value(v, ops)[high:low]
+
+    raise ExpressionError(f"Unsupported syntax: {ast.unparse(node)!r}")
+
+
+def _int_div(a, b):
+    # / on two ints is integer division, as on bitvectors; never a float
+    if isinstance(a, int) and isinstance(b, int):
+        return a // b
+    return operator.truediv(a, b)
+
+
+def _apply(op, a, b):
+    """``op(a, b)``; on two Python ints the result is bounded before it is built."""
+    if not (isinstance(a, int) and isinstance(b, int)):
+        return op(a, b)
+    if op in (operator.lshift, operator.rshift) and b > MAX_CONSTANT_SHIFT:
+        raise ExpressionError(f"Shift amount {b} is larger than {MAX_CONSTANT_SHIFT}")
+    try:
+        result = op(a, b)
+    except (ZeroDivisionError, ValueError) as e:  # x // 0, 1 << -1
+        raise ExpressionError(f"Invalid constant arithmetic: {e}") from None
+    if result.bit_length() > MAX_CONSTANT_BITS:
+        raise ExpressionError(f"Constant result is wider than {MAX_CONSTANT_BITS} bits")
+    return result
+
+
+class ConstraintSystem:
+    """Variables and constraints in one incremental claripy.Solver."""
+
+    def __init__(self, variables: Dict[str, int], constraints: Sequence[str] = (), solver=None,
+                 symbols: Optional[Dict[str, Any]] = None):
+        import claripy
+        self.variables = dict(variables)
+        self.constraints: List[str] = []
+        self.symbols = dict(symbols or {})
+        for name, bits in self.variables.items():
+            if name not in self.symbols:
+                self.symbols[name] = claripy.BVS(name, bits, explicit_name=True)
+        self.solver = solver if solver is not None else claripy.Solver()
+        self.lock = threading.Lock()
+        self.add(constraints)
+
+    def compile(self, text: str):
+        import claripy
+        return compile_expression(text, frozenset(self.symbols))(self.symbols, claripy)
+
+    def add(self, constraints: Sequence[str]):
+        compiled = [self.compile(c) for c in constraints]  # all or nothing: nothing added on an error
+        for expr in compiled:
+            self.solver.add(expr)
+        self.constraints += constraints
+
+    def branch(self, variables: Dict[str, int], delta: Sequence[str]) -> "ConstraintSystem":
+        """A copy sharing this system's solver state, with more variables and constraints."""
+        with self.lock:
+            solver = self.solver.branch()
+        system = ConstraintSystem(variables, (), solver, self.symbols)
+        system.constraints = list(self.constraints)
+        system.add(delta)
+        return system
+
+    def solve(self, max_solutions: int = 1, minimize: Optional[str] = None,
+              maximize: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Up to ``max_solutions`` distinct joint models {name: value}. With an
+        objective, its optimum is found first and models are taken at it.
+        """
+        import claripy
+        with self.lock:
+            if not self.solver.satisfiable():
+                return {"satisfiable": False, "solutions": []}
+            fixed, result = [], {"satisfiable": True}
+            for name, text, optimize in (("minimum", minimize, self.solver.min),
+                                         ("maximum", maximize, self.solver.max)):
+                if text:
+                    objective = self.compile(text)
+                    result[name] = optimize(objective, extra_constraints=tuple(fixed))
+                    fixed.append(objective == result[name])
+            solutions = []
+            while len(solutions) < max(1, max_solutions):
+                model = self._model(fixed)
+                if model is None:
+                    break
+                solutions.append(model)
+                # block this model: the next one differs in at least one variable
+                fixed.append(claripy.Or(*(self.symbols[n] != value for n, value in model.items())))
+            result["solutions"] = solutions
+            return result
+
+    def _model(self, extra: List[Any]) -> Optional[Dict[str, int]]:
+        # one variable at a time, pinning each value so the model is joint
+        pinned, model = list(extra), {}
+        if not self.solver.satisfiable(extra_constraints=tuple(pinned)):
+            return None
+        for name in self.variables:
+            symbol = self.symbols[name]
+            model[name] = self.solver.eval(symbol, 1, extra_constraints=tuple(pinned))[0]
+            pinned.append(symbol == model[name])
+        return model
+
+
+class ConstraintCache:
+    """LRU of compiled systems; a query reuses the cached system its constraints extend the most."""
+
+    def __init__(self, max_systems: int = MAX_SYSTEMS):
+        self.max_systems = max_systems
+        self._systems: "OrderedDict[Tuple, ConstraintSystem]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "extended": 0, "built": 0}
+
+    @staticmethod
+    def make_key(variables: Dict[str, int], constraints: Sequence[str]) -> Tuple:
+        return tuple(sorted(variables.items())), tuple(c.strip() for c in constraints)
+
+    def system(self, variables: Dict[str, int], constraints: Sequence[str]) -> Tuple[ConstraintSystem, int]:
+        """The system for this query and how many of its constraints were already compiled."""
+        constraints = [c.strip() for c in constraints]
+        key = self.make_key(variables, constraints)
+        with self._lock:
+            system = self._systems.get(key)
+            if system is not None:
+                self._systems.move_to_end(key)
+                self.stats["hits"] += 1
+                return system, len(constraints)
+            base = self._best_prefix(variables, constraints)
+        if base is None:
+            system, reused = ConstraintSystem(variables, constraints), 0
+            self.stats["built"] += 1
+        else:
+            reused = len(base.constraints)
+            system = base.branch(variables, constraints[reused:])
+            self.stats["extended"] += 1
+        with self._lock:
+            self._systems[key] = system
+            while len(self._systems) > self.max_systems:
+                self._systems.popitem(last=False)
+        return system, reused
+
+    def _best_prefix(self, variables: Dict[str, int], constraints: List[str]) -> Optional[ConstraintSystem]:
+        best = None
+        for system in self._systems.values():
+            n = len(system.constraints)
+            if n <= len(constraints) and system.constraints == constraints[:n] \
+                    and all(variables.get(name) == bits for name, bits in system.variables.items()) \
+                    and (best is None or n > len(best.constraints)):
+                best = system
+        return best
+
+    def clear(self):
+        with self._lock:
+            self._systems.clear()
+
+
+_cache: Optional[ConstraintCache] = None
+
+
+def get_constraint_cache() -> ConstraintCache:
+    global _cache
+    if _cache is None:
+        _cache = ConstraintCache()
+    return _cache
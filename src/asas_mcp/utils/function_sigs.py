@@ -0,0 +1,218 @@
+"""
+Library-function recognition by fingerprinting normalized decompiled code.
+
+Stripped, statically linked binaries contain hundreds of libc/crypto
+functions named FUN_xxxxxxxx that _is_user_function cannot filter. Each
+function's pseudo-C is normalized (auto-generated names, addresses and
+variable names are erased, structure and constants kept), split into token
+shingles and summarized by a MinHash signature (one-permutation hashing
+with densification, 64 bins). Signatures of reference libraries compiled
+locally (scripts/build_libsigs.py) are stored in SQLite with LSH band
+buckets, so matching a function is a handful of indexed lookups.
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import struct
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .result_cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_DB = os.environ.get("ASAS_LIBSIG_DB", os.path.join(DEFAULT_CACHE_DIR, "libsigs.sqlite"))
+MATCH_THRESHOLD = float(os.environ.get("ASAS_LIBSIG_THRESHOLD", "0.8"))
+NUM_BINS = 64
+BANDS = 16
+ROWS = NUM_BINS // BANDS
+SHINGLE = 5
+MIN_TOKENS = 24  # smaller bodies are too generic to attribute
+
+_TOKEN_RE = re.compile(r"0x[0-9a-fA-F]+|\d+|[A-Za-z_]\w*|\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'|->|<<|>>|[<>=!]=|&&|\|\||\S")
+_AUTO_NAME_RE = re.compile(r"^(?:FUN|LAB|DAT|PTR|UNK|SUB|thunk_FUN|switchD|caseD|s)_\w+$")
+_VARIABLE_RE = re.compile(r"^(?:[a-z]{1,3}Var\d+|[a-z]{1,3}Stack_\w+|local_\w+|param_\d+|in_\w+|extraout_\w+|unaff_\w+)$")
+_MASK = (1 << 64) - 1
+# Typical image ranges: ELF non-PIE / PE32, Ghidra's PIE base, i386 ELF, PE32+
+ADDRESS_RANGES = [(0x400000, 0x1000000), (0x100000, 0x200000), (0x8000000, 0x9000000), (0x140000000, 0x150000000)]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS functions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    library TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    signature BLOB NOT NULL,
+    UNIQUE (name, library, signature)
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    function_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_bucket ON bands(band, bucket);
+"""
+
+
+def normalize_tokens(code: str, own_name: Optional[str] = None) -> List[str]:
+    """C tokens with everything that differs between builds of the same source erased."""
+    body = code[code.find("{"):] if "{" in code else code  # the signature carries the (auto) name
+    tokens = []
+    for tok in _TOKEN_RE.findall(body):
+        if tok == own_name:
+            tokens.append("SELF")
+        elif _VARIABLE_RE.match(tok):
+            tokens.append("V")
+        elif _AUTO_NAME_RE.match(tok):
+            tokens.append(tok.split("_", 1)[0].upper())
+        elif tok.startswith("0x") and _looks_like_address(int(tok, 16)):
+            tokens.append("ADDR")  # differs per link; other constants (IVs, masks) are kept
+        else:
+            tokens.append(tok)
+    return tokens
+
+
+def _looks_like_address(value: int) -> bool:
+    return any(lo <= value < hi for lo, hi in ADDRESS_RANGES)
+
+
+def _hash64(data: bytes) -> int:
+    return struct.unpack("<Q", hashlib.blake2b(data, digest_size=8).digest())[0]
+
+
+def minhash(tokens: List[str]) -> Optional[Tuple[int, ...]]:
+    """One-permutation MinHash over token shingles, or None when the body is too small."""
+    if len(tokens) < MIN_TOKENS:
+        return None
+    bins = [None] * NUM_BINS
+    for i in range(len(tokens) - SHINGLE + 1):
+        h = _hash64("\x1f".join(tokens[i:i + SHINGLE]).encode())
+        b, v = h % NUM_BINS, h // NUM_BINS
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    # densification: an empty bin borrows from the next non-empty one
+    for b in range(NUM_BINS):
+        if bins[b] is None:
+            step = 1
+            while bins[(b + step) % NUM_BINS] is None:
+                step += 1
+            bins[b] = (bins[(b + step) % NUM_BINS] + step * 0x9E3779B97F4A7C15) & _MASK
+    return tuple(bins)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+
+
+def _pack(sig: Tuple[int, ...]) -> bytes:
+    return struct.pack(f"<{NUM_BINS}Q", *sig)
+
+
+def _unpack(blob: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f"<{NUM_BINS}Q", blob)
+
+
+def _bands(sig: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    # SQLite integers are signed 64-bit
+    return [(band, _hash64(_pack(sig)[band * ROWS * 8:(band + 1) * ROWS * 8]) >> 1) for band in range(BANDS)]
+
+
+def fingerprint(entry: Dict[str, Any]) -> Optional[Tuple[int, ...]]:
+    code = entry.get("code") or ""
+    return minhash(normalize_tokens(code, entry.get("name"))) if code else None
+
+
+class FunctionSignatureDB:
+    def __init__(self, path: str = SIGNATURE_DB, threshold: float = MATCH_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def add(self, entries: Iterable[Dict[str, Any]], library: str) -> int:
+        """Store signatures of named reference functions; returns how many were new."""
+        added = 0
+        with self._lock:
+            db = self._db()
+            for entry in entries:
+                name = entry.get("name") or ""
+                if not name or _AUTO_NAME_RE.match(name):
+                    continue
+                sig = fingerprint(entry)
+                if sig is None:
+                    continue
+                tokens = len(normalize_tokens(entry["code"], name))
+                cur = db.execute(
+                    "INSERT OR IGNORE INTO functions (name, library, tokens, signature) VALUES (?, ?, ?, ?)",
+                    (name, library, tokens, _pack(sig)),
+                )
+                if cur.rowcount:
+                    db.executemany("INSERT INTO bands VALUES (?, ?, ?)",
+                                   [(band, bucket, cur.lastrowid) for band, bucket in _bands(sig)])
+                    added += 1
+            db.commit()
+        return added
+
+    def match(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Best reference function at or above the threshold, or None."""
+        sig = fingerprint(entry)
+        if sig is None or not os.path.exists(self.path):
+            return None
+        bands = _bands(sig)
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT DISTINCT f.name, f.library, f.signature FROM bands b JOIN functions f ON f.id = b.function_id "
+                "WHERE " + " OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(bands)),
+                [v for pair in bands for v in pair],
+            ).fetchall()
+        best = None
+        for name, library, blob in rows:
+            score = similarity(sig, _unpack(blob))
+            if score >= self.threshold and (best is None or score > best["similarity"]):
+                best = {"name": name, "library": library, "similarity": round(score, 2)}
+        return best
+
+    def recognize(self, entries: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """{function name: match} for every entry recognized as a library function."""
+        if not os.path.exists(self.path):
+            return {}
+        matches = {}
+        for entry in entries:
+            found = self.match(entry)
+            if found is not None:
+                matches[entry.get("name")] = found
+        if matches:
+            logger.info(f"Recognized {len(matches)}/{len(entries)} functions as library code")
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {"functions": 0, "libraries": {}}
+        with self._lock:
+            rows = self._db().execute("SELECT library, COUNT(*) FROM functions GROUP BY library").fetchall()
+        return {"functions": sum(n for _, n in rows), "libraries": dict(rows)}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_db: Optional[FunctionSignatureDB] = None
+
+
+def get_signature_db() -> FunctionSignatureDB:
+    global _db
+    if _db is None:
+        _db = FunctionSignatureDB()
+    return _db
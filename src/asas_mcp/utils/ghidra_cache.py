@@ -0,0 +1,314 @@
+"""
+Persistent cache of raw Ghidra exports, keyed by binary sha256 + export script version.
+
+list_functions / decompile_function / analyze_binary all derive their answers
+from the same whole-program export, so one headless run per binary (and per
+version of GhidraExport.java) is enough. Entries are gzip-compressed JSON with
+a digest recorded in a sidecar for integrity checking; total size is bounded
+with least-recently-used eviction.
+
+File entries (e.g. the SQLite whole-program index) live in the same tree,
+with the same sidecar, digest check and eviction budget.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from .result_cache import DEFAULT_CACHE_DIR, file_digest
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process single-flight only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+GHIDRA_CACHE_DIR = os.environ.get("ASAS_GHIDRA_CACHE_DIR", os.path.join(DEFAULT_CACHE_DIR, "ghidra"))
+GHIDRA_CACHE_MAX_BYTES = int(os.environ.get("ASAS_GHIDRA_CACHE_MAX_MB", "1024")) * 1024 * 1024
+MEMORY_ENTRIES = 8
+DATA_SUFFIXES = (".json.gz", ".sqlite")
+
+
+def script_version(*paths: str, extra: str = "") -> str:
+    """Digest of the export script(s) (+ e.g. the Ghidra image); editing either invalidates old entries."""
+    h = hashlib.sha256(extra.encode())
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(path.encode())
+    return h.hexdigest()[:16]
+
+
+class GhidraAnalysisCache:
+    def __init__(self, root: str = GHIDRA_CACHE_DIR, max_bytes: int = GHIDRA_CACHE_MAX_BYTES,
+                 memory_entries: int = MEMORY_ENTRIES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "corrupt": 0}
+        self._verified: set = set()  # file entries already digest-checked by this process
+
+    def _paths(self, key: str):
+        base = os.path.join(self.root, key[:2], key)
+        return base + ".json.gz", base + ".meta.json"
+
+    @staticmethod
+    def make_key(binary_sha256: str, version: str) -> str:
+        return f"{binary_sha256}-{version}"
+
+    # --- storage ---
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(data_path, "rb") as f:
+                blob = f.read()
+        except (OSError, ValueError):
+            return None
+        if hashlib.sha256(blob).hexdigest() != meta.get("digest"):
+            logger.warning(f"Ghidra cache entry {key} failed integrity check; discarding")
+            self.stats["corrupt"] += 1
+            self._remove(key)
+            return None
+        try:
+            value = json.loads(gzip.decompress(blob))
+        except (OSError, ValueError):
+            self.stats["corrupt"] += 1
+            self._remove(key)
+            return None
+        os.utime(data_path)  # recency for eviction
+        self._remember(key, value)
+        self.stats["disk_hits"] += 1
+        return value
+
+    def put(self, key: str, value: Any, **meta):
+        self._remember(key, value)
+        blob = gzip.compress(json.dumps(value).encode(), compresslevel=6)
+        if len(blob) > self.max_bytes:
+            return
+        data_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(data_path + suffix, "wb") as f:
+                f.write(blob)
+            with open(meta_path + suffix, "w") as f:
+                json.dump({"digest": hashlib.sha256(blob).hexdigest(), "bytes": len(blob),
+                           "created": time.time(), **meta}, f)
+            # Data first: a reader that sees the new meta always finds matching data
+            os.replace(data_path + suffix, data_path)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError as e:
+            logger.warning(f"Ghidra cache write failed: {e}")
+            return
+        self._evict()
+
+    # --- file entries ---
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".sqlite")
+
+    def get_file(self, key: str) -> Optional[str]:
+        """Path of a stored file entry, or None (missing or failed its integrity check)."""
+        path, (_, meta_path) = self._file_path(key), self._paths(key)
+        if key not in self._verified:
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+            except (OSError, ValueError):
+                return None
+            if digest.hexdigest() != meta.get("digest"):
+                logger.warning(f"Ghidra cache file {key} failed integrity check; discarding")
+                self.stats["corrupt"] += 1
+                self._remove(key)
+                return None
+            self._verified.add(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self._verified.discard(key)
+            return None
+        self.stats["disk_hits"] += 1
+        return path
+
+    def put_file(self, key: str, src_path: str, **meta) -> Optional[str]:
+        """Move a finished file into the cache (src should be on the same filesystem)."""
+        path, (_, meta_path) = self._file_path(key), self._paths(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = hashlib.sha256()
+        with open(src_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(meta_path + suffix, "w") as f:
+                json.dump({"digest": digest.hexdigest(), "bytes": os.path.getsize(src_path),
+                           "created": time.time(), **meta}, f)
+            shutil.move(src_path, path)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError as e:
+            logger.warning(f"Ghidra cache write failed: {e}")
+            return None
+        with self._lock:
+            self._verified.add(key)
+        self._evict()
+        return path if os.path.exists(path) else None
+
+    def get_or_build_file(self, file_path: str, version: str, build: Callable[[str], Any]) -> Any:
+        """Path of the cached file for this binary/version; ``build(tmp_path)`` creates it on a miss.
+
+        ``build`` returns None on success or an error value, which is returned (and not cached).
+        """
+        digest = file_digest(file_path)
+        if digest is None:
+            return {"error": f"File not found: {file_path}"}
+        key = self.make_key(digest, version)
+        path = self.get_file(key)
+        if path is not None:
+            return path
+        with self._single_flight(key):
+            path = self.get_file(key)
+            if path is not None:
+                return path
+            self.stats["misses"] += 1
+            os.makedirs(self.root, exist_ok=True)
+            tmp = tempfile.mkdtemp(prefix=".build-", dir=self.root)
+            try:
+                tmp_path = os.path.join(tmp, "entry")
+                error = build(tmp_path)
+                if error is not None:
+                    return error
+                path = self.put_file(key, tmp_path, binary_sha256=digest, script_version=version,
+                                     source=os.path.basename(file_path))
+                return path if path is not None else {"error": "Failed to store Ghidra cache entry"}
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+    def _remember(self, key: str, value: Any):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _remove(self, key: str):
+        with self._lock:
+            self._memory.pop(key, None)
+            self._verified.discard(key)
+        data_path, meta_path = self._paths(key)
+        for path in (data_path, self._file_path(key), meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.root):
+            for name in files:
+                suffix = next((s for s in DATA_SUFFIXES if name.endswith(s)), None)
+                if suffix:
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, name[:-len(suffix)]))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        for _, _, key in self._entries():
+            self._remove(key)
+
+    # --- single-flight lookup ---
+
+    @contextmanager
+    def _single_flight(self, key: str):
+        """Serialize producers of one key, across threads and across server processes."""
+        with self._lock:
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, f".{key}.lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def lookup(self, file_path: str, version: str) -> Optional[Any]:
+        """Cached value for this binary/version, without running an analysis."""
+        digest = file_digest(file_path)
+        return None if digest is None else self.get(self.make_key(digest, version))
+
+    def get_or_analyze(self, file_path: str, version: str, analyze: Callable[[], Any],
+                       is_error: Callable[[Any], bool] = lambda v: isinstance(v, dict) and "error" in v) -> Any:
+        digest = file_digest(file_path)
+        if digest is None:
+            return analyze()
+        key = self.make_key(digest, version)
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._single_flight(key):
+            value = self.get(key)  # another thread/process may have produced it meanwhile
+            if value is not None:
+                return value
+            self.stats["misses"] += 1
+            value = analyze()
+            if not is_error(value):
+                self.put(key, value, binary_sha256=digest, script_version=version,
+                         source=os.path.basename(file_path))
+            return value
+
+
+_cache: Optional[GhidraAnalysisCache] = None
+
+
+def get_ghidra_cache() -> GhidraAnalysisCache:
+    global _cache
+    if _cache is None:
+        _cache = GhidraAnalysisCache()
+    return _cache
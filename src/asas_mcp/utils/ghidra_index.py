@@ -0,0 +1,169 @@
+"""
+SQLite whole-program index built from the Ghidra export's index records.
+
+One Ghidra pass records call graph edges, data/string references, defined
+strings, imports and exports (see GhidraExport.java, mode=index). They are
+loaded into an indexed SQLite file kept in the Ghidra analysis cache, so
+xref/caller/string queries are lookups instead of re-analysis.
+"""
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE refs (
+    kind TEXT NOT NULL,          -- call | data | string
+    from_func TEXT,
+    from_func_addr TEXT,
+    site TEXT,
+    to_addr TEXT,
+    to_name TEXT,
+    type TEXT,
+    value TEXT
+);
+CREATE TABLE strings (addr TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE imports (name TEXT NOT NULL, library TEXT);
+CREATE TABLE exports (name TEXT, addr TEXT);
+CREATE INDEX refs_to_name ON refs(to_name);
+CREATE INDEX refs_to_addr ON refs(to_addr);
+CREATE INDEX refs_from ON refs(kind, from_func);
+CREATE INDEX imports_name ON imports(name);
+"""
+
+MAX_DEPTH = 5
+
+
+def normalize_address(value: Optional[str]) -> Optional[str]:
+    """'0x401136' / '00401136' / 'ram:00401136' -> '401136'; non-addresses -> None."""
+    if not value:
+        return None
+    text = value.strip().lower().rsplit(":", 1)[-1]
+    if text.startswith("0x"):
+        text = text[2:]
+    try:
+        return format(int(text, 16), "x")
+    except ValueError:
+        return None
+
+
+def build_index(records: Iterable[Dict[str, Any]], db_path: str) -> Dict[str, int]:
+    """Write index records into a new SQLite file; returns per-table counts."""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(SCHEMA)
+        refs, strings, imports, exports = [], {}, [], []
+        for r in records:
+            kind = r.get("k")
+            if kind == "ref":
+                refs.append((
+                    r.get("kind"), r.get("from_func"), normalize_address(r.get("from_func_addr")),
+                    normalize_address(r.get("site")), normalize_address(r.get("to_addr")),
+                    r.get("to_name"), r.get("type"), r.get("value"),
+                ))
+            elif kind == "string":
+                strings[normalize_address(r.get("addr"))] = r.get("value", "")
+            elif kind == "import":
+                imports.append((r.get("name"), r.get("library")))
+            elif kind == "export":
+                exports.append((r.get("name"), normalize_address(r.get("addr"))))
+        conn.executemany("INSERT INTO refs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", refs)
+        conn.executemany("INSERT OR REPLACE INTO strings VALUES (?, ?)", strings.items())
+        conn.executemany("INSERT INTO imports VALUES (?, ?)", imports)
+        conn.executemany("INSERT INTO exports VALUES (?, ?)", exports)
+        conn.commit()
+    finally:
+        conn.close()
+    return {"refs": len(refs), "strings": len(strings), "imports": len(imports), "exports": len(exports)}
+
+
+class GhidraIndex:
+    """Read-only queries over one binary's index."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rows(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        return [{k: row[k] for k in row.keys() if row[k] is not None}
+                for row in self.conn.execute(sql, params)]
+
+    def xrefs_to(self, target: str, limit: int = 200) -> List[Dict[str, Any]]:
+        """Every reference to a function/symbol name, an address, or an exact string value."""
+        addr = normalize_address(target)
+        return self._rows(
+            "SELECT kind, from_func, from_func_addr, site, to_addr, to_name, type, value FROM refs "
+            "WHERE to_name = ? OR to_addr = ? OR (kind = 'string' AND value = ?) "
+            "ORDER BY from_func_addr, site LIMIT ?",
+            (target, addr, target, limit),
+        )
+
+    def callers(self, function: str, depth: int = 1, limit: int = 200) -> List[Dict[str, Any]]:
+        """Functions calling ``function`` (name or address), transitively up to ``depth`` levels."""
+        depth = max(1, min(depth, MAX_DEPTH))
+        frontier = {function}
+        seen = {function}
+        result: List[Dict[str, Any]] = []
+        for level in range(1, depth + 1):
+            if not frontier:
+                break
+            names = list(frontier)
+            addrs = [a for a in (normalize_address(n) for n in names) if a]
+            marks = ",".join("?" * len(names))
+            addr_marks = ",".join("?" * len(addrs)) or "NULL"
+            rows = self._rows(
+                f"SELECT from_func AS caller, from_func_addr AS caller_addr, to_name AS callee, "
+                f"COUNT(*) AS call_sites, MIN(site) AS first_site FROM refs "
+                f"WHERE kind = 'call' AND (to_name IN ({marks}) OR to_addr IN ({addr_marks})) "
+                f"GROUP BY from_func, to_name ORDER BY from_func_addr",
+                (*names, *addrs),
+            )
+            frontier = set()
+            for row in rows:
+                row["depth"] = level
+                result.append(row)
+                if row.get("caller") and row["caller"] not in seen:
+                    seen.add(row["caller"])
+                    frontier.add(row["caller"])
+            if len(result) >= limit:
+                break
+        return result[:limit]
+
+    def callees(self, function: str) -> List[Dict[str, Any]]:
+        return self._rows(
+            "SELECT to_name AS callee, to_addr AS callee_addr, COUNT(*) AS call_sites FROM refs "
+            "WHERE kind = 'call' AND from_func = ? GROUP BY to_name ORDER BY MIN(site)",
+            (function,),
+        )
+
+    def strings(self, pattern: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Defined strings (substring match, case-insensitive) with the functions referencing them."""
+        rows = self._rows(
+            "SELECT s.addr, s.value, GROUP_CONCAT(DISTINCT r.from_func) AS functions FROM strings s "
+            "LEFT JOIN refs r ON r.kind = 'string' AND r.to_addr = s.addr "
+            "WHERE (? IS NULL OR s.value LIKE ?) GROUP BY s.addr ORDER BY s.addr LIMIT ?",
+            (pattern, f"%{pattern}%", limit),
+        )
+        for row in rows:
+            row["functions"] = row["functions"].split(",") if row.get("functions") else []
+        return rows
+
+    def imports(self) -> List[Dict[str, Any]]:
+        return self._rows("SELECT name, library FROM imports ORDER BY library, name")
+
+    def exports(self) -> List[Dict[str, Any]]:
+        return self._rows("SELECT name, addr FROM exports ORDER BY addr")
+
+    def summary(self) -> Dict[str, int]:
+        counts = {}
+        for table in ("refs", "strings", "imports", "exports"):
+            counts[table] = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return counts
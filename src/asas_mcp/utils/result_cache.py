@@ -0,0 +1,314 @@
+"""
+Content-addressed result cache for deterministic MCP tools.
+
+Results are keyed by tool name plus a canonical hash of the arguments, where
+file-path arguments are replaced by the sha256 of the file contents. Two tiers:
+an in-memory LRU and a size-bounded on-disk JSON store.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ASAS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ctf-asas")
+)
+MEMORY_ENTRIES = int(os.environ.get("ASAS_RESULT_CACHE_ENTRIES", "256"))
+DISK_MAX_BYTES = int(os.environ.get("ASAS_RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+_MISSING = object()
+
+
+@dataclass
+class CachePolicy:
+    """Per-tool caching rules."""
+    ttl: Optional[float] = None          # seconds; None = never expires
+    file_args: Tuple[str, ...] = ()      # arguments holding host file paths
+    enabled: bool = True
+
+
+DAY = 24 * 3600
+
+# Only tools listed here are cached (opt-in)
+TOOL_POLICIES: Dict[str, CachePolicy] = {
+    "crypto_decode": CachePolicy(),
+    "reverse_extract_strings": CachePolicy(),
+    "reverse_strings": CachePolicy(file_args=("file_path",)),
+    "misc_identify_file": CachePolicy(),
+    "reverse_ghidra_decompile": CachePolicy(ttl=7 * DAY, file_args=("file_path",)),
+    "ghidra_list_functions": CachePolicy(ttl=7 * DAY, file_args=("file_path",)),
+    "ghidra_decompile_function": CachePolicy(ttl=7 * DAY, file_args=("file_path",)),
+}
+
+
+def _env_list(name: str) -> set:
+    return {t.strip() for t in os.environ.get(name, "").split(",") if t.strip()}
+
+
+def file_digest(path: str, _memo: Dict[tuple, str] = {}) -> Optional[str]:
+    """sha256 of a file's contents, memoized on (path, size, mtime)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _memo[memo_key] = digest
+    return digest
+
+
+def _is_error(value: Any) -> bool:
+    if isinstance(value, dict):
+        return "error" in value
+    if isinstance(value, str):
+        return value.startswith(("Error", "Sandbox Error", "Execution error"))
+    return False
+
+
+class ResultCache:
+    """Two-tier (memory LRU + disk) cache with per-tool TTLs and hit/miss counters."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 memory_entries: int = MEMORY_ENTRIES,
+                 disk_max_bytes: int = DISK_MAX_BYTES,
+                 policies: Optional[Dict[str, CachePolicy]] = None):
+        self.disk_dir = os.path.join(cache_dir, "results")
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.policies = TOOL_POLICIES if policies is None else policies
+        self.enabled = os.environ.get("ASAS_RESULT_CACHE", "1") != "0"
+        self.include = _env_list("ASAS_RESULT_CACHE_TOOLS")
+        self.exclude = _env_list("ASAS_RESULT_CACHE_EXCLUDE")
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # --- configuration ---
+
+    def policy_for(self, tool: str) -> Optional[CachePolicy]:
+        if not self.enabled or tool in self.exclude:
+            return None
+        policy = self.policies.get(tool)
+        if policy is None and tool in self.include:
+            policy = CachePolicy()
+        if policy is None or not policy.enabled:
+            return None
+        return policy
+
+    def make_key(self, tool: str, args: Dict[str, Any], policy: CachePolicy) -> Optional[str]:
+        canonical = dict(args)
+        for name in policy.file_args:
+            if canonical.get(name) is not None:
+                digest = file_digest(canonical[name])
+                if digest is None:
+                    return None
+                canonical[name] = {"sha256": digest}
+        try:
+            blob = json.dumps([tool, canonical], sort_keys=True, separators=(",", ":"), default=str)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    # --- counters ---
+
+    def _count(self, tool: str, event: str):
+        with self._lock:
+            counters = self._stats.setdefault(tool, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0})
+            counters[event] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_tool = {t: dict(c) for t, c in self._stats.items()}
+            memory_size = len(self._memory)
+        totals = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        for counters in per_tool.values():
+            for k, v in counters.items():
+                totals[k] += v
+        lookups = totals["memory_hits"] + totals["disk_hits"] + totals["misses"]
+        hits = totals["memory_hits"] + totals["disk_hits"]
+        return {
+            "enabled": self.enabled,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "totals": totals,
+            "tools": per_tool,
+            "memory_entries": memory_size,
+            "disk_bytes": self._disk_usage(),
+            "disk_max_bytes": self.disk_max_bytes,
+        }
+
+    # --- storage tiers ---
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_usage(self) -> int:
+        if self._disk_bytes is None:
+            total = 0
+            for root, _, files in os.walk(self.disk_dir):
+                for name in files:
+                    try:
+                        total += os.path.getsize(os.path.join(root, name))
+                    except OSError:
+                        pass
+            self._disk_bytes = total
+        return self._disk_bytes
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > now:
+                    self._memory.move_to_end(key)
+                    return value, "memory"
+                del self._memory[key]
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING, None
+        if record.get("expires") is not None and record["expires"] <= now:
+            self._remove_file(path)
+            return _MISSING, None
+        os.utime(path)  # refresh recency for disk eviction
+        self._remember(key, record.get("expires"), record["value"])
+        return record["value"], "disk"
+
+    def put(self, key: str, value: Any, ttl: Optional[float]):
+        expires = time.time() + ttl if ttl else None
+        self._remember(key, expires, value)
+        try:
+            data = json.dumps({"expires": expires, "value": value})
+        except (TypeError, ValueError):
+            return  # memory tier only for non-JSON results
+        if len(data) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_bytes = self._disk_usage() + len(data) - old_size
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Result cache write failed: {e}")
+
+    def _remember(self, key: str, expires: Optional[float], value: Any):
+        with self._lock:
+            self._memory[key] = (expires, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _remove_file(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes -= size
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        """Drop least recently used disk entries until under the size bound."""
+        if self._disk_usage() <= self.disk_max_bytes:
+            return
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                    entries.append((st.st_mtime, st.st_size, path))
+                except OSError:
+                    pass
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._stats.clear()
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                self._remove_file(os.path.join(root, name))
+        self._disk_bytes = 0
+
+    # --- tool wrapper ---
+
+    def lookup_or_call(self, tool: str, args: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        policy = self.policy_for(tool)
+        key = self.make_key(tool, args, policy) if policy else None
+        if key is None:
+            return fn()
+        value, tier = self.get(key)
+        if value is not _MISSING:
+            self._count(tool, f"{tier}_hits")
+            return value
+        self._count(tool, "misses")
+        value = fn()
+        if not _is_error(value):
+            self.put(key, value, policy.ttl)
+            self._count(tool, "stores")
+        return value
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
+
+
+def cached_tool(tool_name: str):
+    """Decorator caching a (sync) MCP tool wrapper according to TOOL_POLICIES."""
+    import inspect
+
+    def decorator(fn):
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return get_result_cache().lookup_or_call(
+                tool_name, dict(bound.arguments), lambda: fn(*args, **kwargs)
+            )
+        return wrapper
+    return decorator
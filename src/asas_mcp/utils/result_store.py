@@ -0,0 +1,231 @@
+"""
+Server-side store for oversized tool outputs.
+
+Large results are written to disk and replaced by a compact handle plus a
+head/tail preview; the full text is paged or filtered with result_read.
+"""
+import functools
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INLINE_LIMIT = int(os.environ.get("ASAS_RESULT_INLINE_CHARS", "8000"))
+PREVIEW_CHARS = int(os.environ.get("ASAS_RESULT_PREVIEW_CHARS", "1500"))
+STORE_MAX_BYTES = int(os.environ.get("ASAS_RESULT_STORE_MAX_MB", "256")) * 1024 * 1024
+# Shared by every pooled server process, so any session can serve result_read
+STORE_DIR = os.environ.get("ASAS_RESULT_STORE_DIR", os.path.join(tempfile.gettempdir(), "asas_results"))
+STORE_MAX_AGE = 24 * 3600
+_HANDLE_RE = re.compile(r"^res_[0-9a-f]{12}$")
+DEFAULT_READ_LENGTH = 4000
+MAX_READ_LENGTH = 32000
+
+
+class ResultStore:
+    """Size-bounded on-disk store of full tool outputs, addressed by handle."""
+
+    def __init__(self, root: str = STORE_DIR, max_bytes: int = STORE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._prune_stale()
+
+    def _prune_stale(self):
+        """Remove results left behind by earlier missions."""
+        cutoff = time.time() - STORE_MAX_AGE
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def put(self, tool: str, text: str) -> Dict[str, Any]:
+        handle = f"res_{uuid.uuid4().hex[:12]}"
+        path = os.path.join(self.root, f"{handle}.txt")
+        data = text.encode("utf-8")
+        os.makedirs(self.root, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        meta = {
+            "handle": handle,
+            "tool": tool,
+            "path": path,
+            "bytes": len(data),
+            "lines": text.count("\n") + 1,
+        }
+        with self._lock:
+            self._entries[handle] = meta
+            self._total += len(data)
+            # Evict oldest results to bound disk usage per mission
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._total -= old["bytes"]
+                try:
+                    os.remove(old["path"])
+                except OSError:
+                    pass
+        return meta
+
+    def get(self, handle: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meta = self._entries.get(handle)
+        if meta is not None:
+            return meta
+        # Written by another server process in the pool
+        if not _HANDLE_RE.match(handle or ""):
+            return None
+        path = os.path.join(self.root, f"{handle}.txt")
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        return {"handle": handle, "tool": None, "path": path, "bytes": size, "lines": None}
+
+    def read(self, handle: str, offset: int = 0, length: int = DEFAULT_READ_LENGTH,
+             grep: Optional[str] = None, ignore_case: bool = False) -> Dict[str, Any]:
+        meta = self.get(handle)
+        if meta is None:
+            return {"error": f"Unknown or expired result handle: {handle}"}
+        offset = max(0, offset)
+        length = max(1, min(length, MAX_READ_LENGTH))
+
+        if grep:
+            try:
+                pattern = re.compile(grep, re.IGNORECASE if ignore_case else 0)
+            except re.error as e:
+                return {"error": f"Invalid grep pattern: {e}"}
+            return self._read_grep(meta, pattern, offset, length)
+
+        with open(meta["path"], "rb") as f:
+            f.seek(offset)
+            chunk = f.read(length)
+        end = offset + len(chunk)
+        return {
+            "handle": handle,
+            "offset": offset,
+            "total_bytes": meta["bytes"],
+            "next_offset": end if end < meta["bytes"] else None,
+            "content": chunk.decode("utf-8", errors="replace"),
+        }
+
+    def _read_grep(self, meta: Dict[str, Any], pattern, offset: int, length: int) -> Dict[str, Any]:
+        """Stream matching lines; offset/length page through the filtered text."""
+        out, pos, total_matches = [], 0, 0
+        end = offset + length
+        with open(meta["path"], "r", encoding="utf-8", errors="replace") as f:
+            for lineno, line in enumerate(f, 1):
+                if not pattern.search(line):
+                    continue
+                total_matches += 1
+                entry = f"{lineno}: {line.rstrip()}\n"
+                start, pos = pos, pos + len(entry)
+                if pos <= offset or start >= end:
+                    continue
+                out.append(entry[max(0, offset - start):end - start])
+        return {
+            "handle": meta["handle"],
+            "grep": pattern.pattern,
+            "matches": total_matches,
+            "offset": offset,
+            "total_chars": pos,
+            "next_offset": end if pos > end else None,
+            "content": "".join(out),
+        }
+
+    def clear(self):
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), OrderedDict()
+            self._total = 0
+        for meta in entries:
+            try:
+                os.remove(meta["path"])
+            except OSError:
+                pass
+
+
+_store: Optional[ResultStore] = None
+
+
+def get_result_store() -> ResultStore:
+    global _store
+    if _store is None:
+        _store = ResultStore()
+    return _store
+
+
+def _read_hint(handle: str) -> str:
+    return (f'Use result_read(handle="{handle}", offset=0, length={DEFAULT_READ_LENGTH}, grep="...") '
+            "to page or filter the full output.")
+
+
+def summarize_result(tool: str, result: Any, limit: int = INLINE_LIMIT) -> Any:
+    """Replace an oversized result with a handle and a head/tail preview."""
+    if isinstance(result, str):
+        text = result
+    elif isinstance(result, (dict, list)):
+        try:
+            text = json.dumps(result, ensure_ascii=False, indent=1)
+        except (TypeError, ValueError):
+            return result
+    else:
+        return result
+    if len(text) <= limit:
+        return result
+
+    meta = get_result_store().put(tool, text)
+    head, tail = text[:PREVIEW_CHARS], text[-PREVIEW_CHARS:]
+    if isinstance(result, str):
+        return (
+            f"[Output too large: {len(text)} chars, {meta['lines']} lines — stored as {meta['handle']}]\n"
+            f"--- head ---\n{head}\n...\n--- tail ---\n{tail}\n"
+            f"{_read_hint(meta['handle'])}"
+        )
+    summary = {
+        "truncated": True,
+        "handle": meta["handle"],
+        "total_chars": len(text),
+        "total_lines": meta["lines"],
+        "head": head,
+        "tail": tail,
+        "hint": _read_hint(meta["handle"]),
+    }
+    # Keep cheap top-level scalars (counts, status) visible without a round-trip
+    if isinstance(result, dict):
+        for k, v in result.items():
+            if isinstance(v, (int, float, bool)) or (isinstance(v, str) and len(v) < 200):
+                summary.setdefault(k, v)
+    return summary
+
+
+def paged_result(tool_name: str):
+    """Decorator storing oversized results of an MCP tool behind a handle."""
+    import inspect
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return summarize_result(tool_name, await fn(*args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return summarize_result(tool_name, fn(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -16,21 +16,30 @@ async def test_reverse_agent_fuzz_e2e_flow():
     mock_llm = MagicMock()
     
     # 模拟思维过程：
-    # 1. 启动 Fuzzing
-    ai_msg_1 = AIMessage(content="逻辑太复杂，我启动 Fuzzing。\nCALL: pwn_fuzz_start(binary_path='/tmp/pwnable', duration_sec=300)")
-    # 2. 检查结果并发现崩溃
-    ai_msg_2 = AIMessage(content="已经发现了崩溃。我开始自动化 Triage。\nCALL: pwn_fuzz_triage(container_id='cont_101', crash_filename='id:000')")
-    # 3. 得到结论
-    ai_msg_3 = AIMessage(content="分析显示这是一个典型的栈溢出漏洞。可以编写 Exploit 获取 Flag。")
+    # 1. 启动后台 Fuzz 任务
+    ai_msg_1 = AIMessage(content="逻辑太复杂，我启动 Fuzzing。\nCALL: fuzz_job_start(binary_path='/tmp/pwnable', duration_sec=300)")
+    # 2. 一次 job_wait 等待第一个崩溃（不轮询）
+    ai_msg_2 = AIMessage(content="等待第一个崩溃。\nCALL: job_wait(job_id='job_1', until='crash')")
+    # 3. 发现崩溃，自动化 Triage
+    ai_msg_3 = AIMessage(content="已经发现了崩溃。我开始自动化 Triage。\nCALL: pwn_fuzz_triage(container_id='cont_101', crash_filename='id:000')")
+    # 4. 得到结论
+    ai_msg_4 = AIMessage(content="分析显示这是一个典型的栈溢出漏洞。可以编写 Exploit 获取 Flag。")
     
-    mock_llm.invoke.side_effect = [ai_msg_1, ai_msg_2, ai_msg_3]
+    mock_llm.invoke.side_effect = [ai_msg_1, ai_msg_2, ai_msg_3, ai_msg_4]
     
     # Mocking the tools in the reverse module
-    with patch("asas_agent.agents.reverse.pwn_fuzz_start") as mock_start, \
+    with patch("asas_agent.agents.reverse.fuzz_job_start") as mock_start, \
+         patch("asas_agent.agents.reverse.job_wait") as mock_wait, \
          patch("asas_agent.agents.reverse.pwn_fuzz_triage") as mock_triage:
         
-        mock_start.name = "pwn_fuzz_start"
-        mock_start.ainvoke = AsyncMock(return_value=json.dumps({"status": "started", "container_id": "cont_101"}))
+        mock_start.name = "fuzz_job_start"
+        mock_start.ainvoke = AsyncMock(return_value=json.dumps({"job_id": "job_1", "status": "running"}))
+        
+        mock_wait.name = "job_wait"
+        mock_wait.ainvoke = AsyncMock(return_value=json.dumps({
+            "job_id": "job_1", "status": "running", "condition_met": True,
+            "events": [{"type": "container", "data": {"container_id": "cont_101"}},
+                       {"type": "crash", "data": {"files": ["id:000"], "total": 1}}]}))
         
         mock_triage.name = "pwn_fuzz_triage"
         mock_triage.ainvoke = AsyncMock(return_value="--- Crash Triage Report ---\nExploitable: YES\nVulnerability: Stack Overflow")
@@ -41,6 +50,7 @@ async def test_reverse_agent_fuzz_e2e_flow():
         result = await agent_graph.ainvoke(inputs)
         
         assert mock_start.ainvoke.called
+        assert mock_wait.ainvoke.call_count == 1
         assert mock_triage.ainvoke.called
         assert "栈溢出" in result["messages"][-1].content
         print(f"✓ E2E Fuzzing integration verified. Findings: {result['messages'][-1].content}")
@@ -17,7 +17,7 @@ async def test_reverse_agent_horde_interop_e2e_flow():
     
     # 模拟思维过程：
     # 1. 启动 Fuzzing
-    m1 = AIMessage(content="目标疑似有深层逻辑，启动 Fuzzing。\nCALL: pwn_fuzz_start(binary_path='/tmp/horde_bin')")
+    m1 = AIMessage(content="目标疑似有深层逻辑，启动 Fuzzing。\nCALL: fuzz_job_start(binary_path='/tmp/horde_bin')")
     # 2. 检查进度，发现停滞 (total_paths 没增加)
     m2 = AIMessage(content="Fuzzing 停滞，开始提取种子进行符号解算。\nCALL: pwn_horde_get_seeds(container_id='cont_horde')")
     # 3. 使用种子辅助 Angr 解算
@@ -30,13 +30,15 @@ async def test_reverse_agent_horde_interop_e2e_flow():
     mock_llm.invoke.side_effect = [m1, m2, m3, m4, m5]
     
     # Mock all the tools
-    with patch("asas_agent.agents.reverse.pwn_fuzz_start") as t_start, \
+    with patch("asas_agent.agents.reverse.fuzz_job_start") as t_start, \
          patch("asas_agent.agents.reverse.pwn_horde_get_seeds") as t_get, \
          patch("asas_agent.agents.reverse.reverse_angr_solve") as t_solve, \
          patch("asas_agent.agents.reverse.pwn_horde_inject_seed") as t_inject:
         
-        t_start.name = "pwn_fuzz_start"
-        t_start.ainvoke = AsyncMock(return_value=json.dumps({"status": "started", "container_id": "cont_horde"}))
+        t_start.name = "fuzz_job_start"
+        t_start.ainvoke = AsyncMock(return_value=json.dumps({
+            "job_id": "job_1", "status": "running",
+            "events": [{"type": "container", "data": {"container_id": "cont_horde"}}]}))
         
         t_get.name = "pwn_horde_get_seeds"
         t_get.ainvoke = AsyncMock(return_value=json.dumps({"seeds": {"id:001": "414141"}}))
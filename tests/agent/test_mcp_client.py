@@ -26,4 +26,167 @@ async def test_call_tool():
             result = await client.call_tool("test_tool", {"arg": "val"})
             
             assert result == "Tool Output"
-            mock_session.call_tool.assert_called_with("test_tool", {"arg": "val"})
+            assert mock_session.call_tool.call_args.args == ("test_tool", {"arg": "val"})
+
+
+def _text_result(text):
+    item = AsyncMock()
+    item.type = "text"
+    item.text = text
+    result = AsyncMock()
+    result.content = [item]
+    return result
+
+
+@pytest.mark.asyncio
+async def test_pooled_session_is_reused():
+    """Consecutive calls share one warm, initialized session."""
+    with patch("asas_agent.mcp_client.client.stdio_client") as mock_stdio:
+        mock_session = AsyncMock()
+        mock_session.call_tool.return_value = _text_result("ok")
+        mock_stdio.return_value.__aenter__.return_value = (AsyncMock(), AsyncMock())
+
+        with patch("asas_agent.mcp_client.client.ClientSession") as MockSession:
+            MockSession.return_value.__aenter__.return_value = mock_session
+
+            async with MCPToolClient(pool_size=1) as client:
+                for _ in range(3):
+                    assert await client.call_tool("test_tool", {}) == "ok"
+
+            assert mock_stdio.call_count == 1
+            assert mock_session.initialize.await_count == 1
+            assert mock_session.call_tool.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_pooled_session_reconnects_after_server_death():
+    """A dead server is replaced transparently and the unsent call is retried."""
+    import anyio
+
+    with patch("asas_agent.mcp_client.client.stdio_client") as mock_stdio:
+        mock_session = AsyncMock()
+        mock_session.call_tool.side_effect = [anyio.ClosedResourceError(), _text_result("recovered")]
+        mock_stdio.return_value.__aenter__.return_value = (AsyncMock(), AsyncMock())
+
+        with patch("asas_agent.mcp_client.client.ClientSession") as MockSession:
+            MockSession.return_value.__aenter__.return_value = mock_session
+
+            async with MCPToolClient(pool_size=1) as client:
+                result = await client.call_tool("test_tool", {})
+
+            assert result == "recovered"
+            assert mock_stdio.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_started_tool_call_is_not_reissued_after_server_death():
+    """A call the dead server may already have run fails instead of running twice."""
+    from mcp.shared.exceptions import McpError
+    from mcp.types import CONNECTION_CLOSED, ErrorData
+    lost = McpError(ErrorData(code=CONNECTION_CLOSED, message="Connection closed"))
+
+    with patch("asas_agent.mcp_client.client.stdio_client") as mock_stdio:
+        mock_session = AsyncMock()
+        mock_session.call_tool.side_effect = [lost, _text_result("next call")]
+        mock_session.list_tools.side_effect = [lost, AsyncMock(tools=["t"])]
+        mock_stdio.return_value.__aenter__.return_value = (AsyncMock(), AsyncMock())
+
+        with patch("asas_agent.mcp_client.client.ClientSession") as MockSession:
+            MockSession.return_value.__aenter__.return_value = mock_session
+
+            async with MCPToolClient(pool_size=1, use_manifest_cache=False) as client:
+                with pytest.raises(McpError):
+                    await client.call_tool("job_submit", {})
+                assert mock_session.call_tool.await_count == 1
+                # the dead session was dropped: the next call gets a new server
+                assert await client.call_tool("job_submit", {}) == "next call"
+                # listing tools has no side effects, so it is retried
+                assert await client.list_tools() == ["t"]
+
+            assert mock_stdio.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_caps_concurrency_per_session():
+    """No session serves more than max_concurrency calls at once."""
+    import asyncio
+
+    peak = 0
+    active = 0
+
+    async def slow_call(name, args, **kwargs):
+        nonlocal peak, active
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return _text_result("done")
+
+    with patch("asas_agent.mcp_client.client.stdio_client") as mock_stdio:
+        mock_session = AsyncMock()
+        mock_session.call_tool.side_effect = slow_call
+        mock_stdio.return_value.__aenter__.return_value = (AsyncMock(), AsyncMock())
+
+        with patch("asas_agent.mcp_client.client.ClientSession") as MockSession:
+            MockSession.return_value.__aenter__.return_value = mock_session
+
+            async with MCPToolClient(pool_size=1, max_concurrency=2) as client:
+                await asyncio.gather(*[client.call_tool("t", {}) for _ in range(6)])
+
+            assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_list_tools_uses_manifest_cache(tmp_path):
+    """Once the manifest is cached, listing tools does not start the server."""
+    from mcp.types import Tool
+
+    tool = Tool(name="test_tool", description="A test tool",
+                inputSchema={"type": "object", "properties": {"arg": {"type": "string"}}})
+
+    with patch("asas_agent.mcp_client.client.stdio_client") as mock_stdio:
+        mock_session = AsyncMock()
+        mock_session.list_tools.return_value = type("Resp", (), {"tools": [tool]})()
+        mock_stdio.return_value.__aenter__.return_value = (AsyncMock(), AsyncMock())
+
+        with patch("asas_agent.mcp_client.client.ClientSession") as MockSession:
+            MockSession.return_value.__aenter__.return_value = mock_session
+
+            async with MCPToolClient(cache_dir=str(tmp_path)) as client:
+                first = await client.list_tools()
+            async with MCPToolClient(cache_dir=str(tmp_path)) as client:
+                second = await client.list_tools()
+
+            assert mock_stdio.call_count == 1
+            assert [t.name for t in second] == ["test_tool"]
+            assert second[0].inputSchema == first[0].inputSchema
+
+
+def test_pool_kills_sessions_left_on_a_closed_loop():
+    """A pool reused from a new event loop does not leak the old loop's server processes."""
+    import asyncio
+    import sys
+    import psutil
+    from mcp import StdioServerParameters
+    from asas_agent.mcp_client.client import MCPSessionPool
+
+    server = "from mcp.server.fastmcp import FastMCP; FastMCP('t').run()"
+    pool = MCPSessionPool(StdioServerParameters(command=sys.executable, args=["-c", server]), size=1)
+
+    async def borrow():
+        async with pool.session() as pooled:
+            return pooled
+
+    old_loop = asyncio.new_event_loop()
+    first = old_loop.run_until_complete(borrow())
+    old_loop.close()  # e.g. a sync wrapper's loop, gone without closing the pool
+    assert first.process is not None and first.process.is_running()
+
+    async def reuse():
+        second = await borrow()
+        await pool.close()
+        return second
+
+    assert asyncio.run(reuse()) is not first
+    first.process.wait(timeout=5)
+    assert not first.process.is_running()
@@ -29,3 +29,68 @@ async def test_convert_mcp_tools():
     assert result == "Success"
     mock_client.call_tool.assert_called_with("test_tool", {"arg1": "value"})
 
+
+
+def _mcp_tool(name, schema, description=""):
+    return type("Tool", (), {"name": name, "description": description, "inputSchema": schema})()
+
+
+SQLMAP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "url": {"title": "Url", "type": "string"},
+        "args": {"default": "--batch --banner", "title": "Args", "type": "string"},
+    },
+    "required": ["url"],
+}
+
+
+@pytest.mark.asyncio
+async def test_args_schema_is_generated_from_input_schema():
+    mock_client = AsyncMock()
+    mock_client.list_tools.return_value = [_mcp_tool(
+        "ghidra_decompile_function",
+        {
+            "type": "object",
+            "properties": {
+                "function_name": {"title": "Function Name", "type": "string"},
+                "file_path": {"default": None, "title": "File Path", "type": "string"},
+                "artifact_ids": {"anyOf": [{"items": {}, "type": "array"}, {"type": "null"}], "default": None},
+            },
+            "required": ["function_name"],
+        },
+        "Decompile one function.\n\n    Args:\n        function_name: 目标函数名称\n        file_path: 宿主机路径\n",
+    )]
+
+    tool = (await convert_mcp_to_langchain_tools(mock_client))[0]
+    schema = tool.tool_call_schema.model_json_schema()
+
+    assert schema["required"] == ["function_name"]
+    assert set(schema["properties"]) == {"function_name", "file_path", "artifact_ids"}
+    assert schema["properties"]["function_name"]["description"] == "目标函数名称"
+
+
+@pytest.mark.asyncio
+async def test_aliases_repaired_and_values_coerced():
+    mock_client = AsyncMock()
+    mock_client.list_tools.return_value = [_mcp_tool("kali_sqlmap", SQLMAP_SCHEMA)]
+    mock_client.call_tool.return_value = "ok"
+
+    tool = (await convert_mcp_to_langchain_tools(mock_client))[0]
+    result = await tool.ainvoke({"target_url": "http://t/?id=1", "extra_args": ["--batch", "--dbs"]})
+
+    assert result == "ok"
+    mock_client.call_tool.assert_called_with("kali_sqlmap", {"url": "http://t/?id=1", "args": "--batch --dbs"})
+
+
+@pytest.mark.asyncio
+async def test_invalid_call_fails_locally():
+    mock_client = AsyncMock()
+    mock_client.list_tools.return_value = [_mcp_tool("kali_sqlmap", SQLMAP_SCHEMA)]
+
+    tool = (await convert_mcp_to_langchain_tools(mock_client))[0]
+    result = await tool.ainvoke({"args": "--batch", "bogus": 1})
+
+    assert result.startswith("Error: invalid arguments for kali_sqlmap")
+    assert "url" in result and "bogus" in result
+    mock_client.call_tool.assert_not_called()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+import pytest
+from langchain_core.tools import tool
+from asas_agent.graph.tool_executor import execute_tool_calls
+
+
+@tool
+async def slow_echo(text: str, delay: float = 0.2) -> str:
+    """Echo text after a delay."""
+    await asyncio.sleep(delay)
+    return text
+
+
+@tool
+async def broken(text: str) -> str:
+    """Always fails."""
+    raise RuntimeError("boom")
+
+
+def _call(name, call_id, **args):
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently_and_keep_order():
+    calls = [_call("slow_echo", f"c{i}", text=f"r{i}", delay=0.3 - i * 0.1) for i in range(3)]
+
+    start = time.perf_counter()
+    messages = await execute_tool_calls([slow_echo], calls)
+    elapsed = time.perf_counter() - start
+
+    assert [m.tool_call_id for m in messages] == ["c0", "c1", "c2"]
+    assert [m.content for m in messages] == ["r0", "r1", "r2"]
+    # Sequential would take 0.6s
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_failure_does_not_cancel_siblings():
+    calls = [
+        _call("broken", "c0", text="x"),
+        _call("slow_echo", "c1", text="ok", delay=0.05),
+        _call("missing_tool", "c2"),
+    ]
+    messages = await execute_tool_calls([slow_echo, broken], calls)
+
+    assert "Error: boom" in messages[0].content
+    assert messages[1].content == "ok"
+    assert "not found" in messages[2].content
+
+
+@pytest.mark.asyncio
+async def test_per_tool_concurrency_limit():
+    calls = [_call("slow_echo", f"c{i}", text="x", delay=0.1) for i in range(3)]
+
+    start = time.perf_counter()
+    await execute_tool_calls([slow_echo], calls, concurrency={"slow_*": 1})
+    elapsed = time.perf_counter() - start
+
+    assert elapsed >= 0.3
+
+
+@pytest.mark.asyncio
+async def test_barrier_tool_runs_in_order():
+    order = []
+
+    @tool
+    async def kali_upload_file(host_path: str) -> str:
+        """Upload stub."""
+        await asyncio.sleep(0.05)
+        order.append("upload")
+        return "uploaded"
+
+    @tool
+    async def kali_file(file_path_guest: str) -> str:
+        """File stub."""
+        order.append("file")
+        return "ELF"
+
+    calls = [
+        _call("kali_upload_file", "c0", host_path="/tmp/a"),
+        _call("kali_file", "c1", file_path_guest="/tmp/a"),
+    ]
+    messages = await execute_tool_calls([kali_upload_file, kali_file], calls)
+
+    assert order == ["upload", "file"]
+    assert [m.content for m in messages] == ["uploaded", "ELF"]
@@ -42,9 +42,70 @@ async def test_concolic_breaker_trigger():
     expert_node.execute_tool.assert_called()
     args = expert_node.execute_tool.call_args[0][1]
     assert args["strategy"] == "explore_new_branches"
+    assert args["max_solutions"] == breaker.max_solutions
+    # 破局种子回灌到全局种子池
+    assert len(janitor.global_seed_pool) == 2
     
     print("\n✅ Concolic 破局触发验证成功: 停滞检测与专家节点调度工作正常")
 
+@pytest.mark.asyncio
+async def test_concolic_breaker_warms_expert_once():
+    """验证已知目标二进制时，专家节点只预热一次 angr 项目缓存，后续破局直接复用"""
+    router = SwarmRouter()
+    janitor = SeedJanitor(router)
+    breaker = ConcolicBreaker(router, janitor, binary_path="/tmp/target", target_addr="0x401234")
+
+    expert_node = SwarmWorker("Expert-Node")
+    expert_node.get_status = AsyncMock(return_value={"load": 0, "capabilities": {"software": {"angr": True}}})
+    expert_node.warm_start_angr = AsyncMock(return_value={"status": "success"})
+    expert_node.execute_tool = AsyncMock(return_value={"status": "success"})
+    router.add_worker("Expert-Node", expert_node)
+    janitor.global_seed_pool["hash1"] = {"filename": "seed1", "content_b64": "YWFh"}
+
+    await breaker.trigger_breakthrough()
+    await breaker.trigger_breakthrough()
+
+    expert_node.warm_start_angr.assert_awaited_once_with("/tmp/target", cfg=True)
+    assert expert_node.execute_tool.await_count == 2
+    assert expert_node.execute_tool.call_args[0][1]["binary_path"] == "/tmp/target"
+
+@pytest.mark.asyncio
+async def test_concolic_breaker_directed_at_target():
+    """验证给定未覆盖分支地址时，破局任务以定向模式从种子前缀出发，并在预热时构建 CFG"""
+    router = SwarmRouter()
+    janitor = SeedJanitor(router)
+    breaker = ConcolicBreaker(router, janitor, binary_path="/tmp/target", target_addr="0x401234")
+
+    expert_node = SwarmWorker("Expert-Node")
+    expert_node.get_status = AsyncMock(return_value={"load": 0, "capabilities": {"software": {"angr": True}}})
+    expert_node.warm_start_angr = AsyncMock(return_value={"status": "success"})
+    expert_node.execute_tool = AsyncMock(return_value={"status": "success"})
+    router.add_worker("Expert-Node", expert_node)
+    janitor.global_seed_pool["hash1"] = {"filename": "seed1", "content_b64": "YWFh"}
+
+    await breaker.trigger_breakthrough()
+
+    expert_node.warm_start_angr.assert_awaited_once_with("/tmp/target", cfg=True)
+    args = expert_node.execute_tool.call_args[0][1]
+    assert args["find_addr"] == "0x401234" and args["directed"] is True
+    assert args["stdin_prefix_hex"] == "616161"
+
+@pytest.mark.asyncio
+async def test_concolic_breaker_without_target_on_real_worker():
+    """验证未给定目标时，真实 SwarmWorker 不会进入 angr 求解路径，任务记录仍为成功"""
+    router = SwarmRouter()
+    janitor = SeedJanitor(router)
+    breaker = ConcolicBreaker(router, janitor)
+
+    expert_node = SwarmWorker("Expert-Node")
+    expert_node.get_status = AsyncMock(return_value={"load": 0, "capabilities": {"software": {"angr": True}}})
+    router.add_worker("Expert-Node", expert_node)
+    janitor.global_seed_pool["hash1"] = {"filename": "seed1", "content_b64": "YWFh"}
+
+    await breaker.trigger_breakthrough()
+
+    assert expert_node.task_history == [{"tool": "reverse_angr_solve", "success": True}]
+
 if __name__ == "__main__":
     import pytest
     pytest.main([__file__])
@@ -21,21 +21,29 @@ async def test_reverse_agent_v6_swarm_gpu_e2e_flow():
     # 1. 检查集群状态
     m1 = AIMessage(content="我要开始大规模挖掘。先检查集群 GPU 算力。\nCALL: gpu_status()")
     # 2. 发现程序中有一个 MD5，启动 GPU 爆破
-    m2 = AIMessage(content="发现硬编码 Hash: 5d41402abc4b2a76b9719d911017c592。启动 GPU 集群爆破。\nCALL: gpu_hashcat_crack(hash_value='5d41402abc4b2a76b9719d911017c592', hash_type='0')")
-    # 3. 得到结果并得出结论
-    m3 = AIMessage(content="GPU 成功爆破出密码: 'hello'。这是一个后门账户。任务完成。")
+    m2 = AIMessage(content="发现硬编码 Hash: 5d41402abc4b2a76b9719d911017c592。启动 GPU 集群爆破。\nCALL: hashcat_job_start(hash_value='5d41402abc4b2a76b9719d911017c592', hash_type='0')")
+    # 3. 一次 job_wait 等待破解结果
+    m3 = AIMessage(content="等待破解结果。\nCALL: job_wait(job_id='job_1', until='cracked')")
+    # 4. 得到结果并得出结论
+    m4 = AIMessage(content="GPU 成功爆破出密码: 'hello'。这是一个后门账户。任务完成。")
     
-    mock_llm.invoke.side_effect = [m1, m2, m3]
+    mock_llm.invoke.side_effect = [m1, m2, m3, m4]
     
     # Mocking tools
     with patch("asas_agent.agents.reverse.gpu_status") as t_status, \
-         patch("asas_agent.agents.reverse.gpu_hashcat_crack") as t_crack:
+         patch("asas_agent.agents.reverse.hashcat_job_start") as t_crack, \
+         patch("asas_agent.agents.reverse.job_wait") as t_wait:
         
         t_status.name = "gpu_status"
         t_status.ainvoke = AsyncMock(return_value="NVIDIA GeForce RTX 4090 [Active]")
         
-        t_crack.name = "gpu_hashcat_crack"
-        t_crack.ainvoke = AsyncMock(return_value="Success! Cracked result: 5d41402abc4b2a76b9719d911017c592:hello")
+        t_crack.name = "hashcat_job_start"
+        t_crack.ainvoke = AsyncMock(return_value=json.dumps({"job_id": "job_1", "status": "running"}))
+        
+        t_wait.name = "job_wait"
+        t_wait.ainvoke = AsyncMock(return_value=json.dumps({
+            "job_id": "job_1", "status": "succeeded", "condition_met": True,
+            "events": [{"type": "cracked", "data": {"hash": "5d41402abc4b2a76b9719d911017c592", "plain": "hello"}}]}))
         
         agent_graph = create_reverse_agent(mock_llm, [])
         
@@ -44,5 +52,6 @@ async def test_reverse_agent_v6_swarm_gpu_e2e_flow():
         
         assert t_status.ainvoke.called
         assert t_crack.ainvoke.called
+        assert t_wait.ainvoke.called
         assert "hello" in result["messages"][-1].content
         print(f"✓ E2E v6.0 Swarm/GPU verification successful.")
@@ -22,11 +22,13 @@ class DemoLLM:
         elif self.step == 3:
             return AIMessage(content="[算力准备] 检查 GPU 算力节点。\nCALL: gpu_status()")
         elif self.step == 4:
-            return AIMessage(content="[硬核破解] 调用 GPU 集群进行爆破。\nCALL: gpu_hashcat_crack(hash_value='0192023a7bbd73250516f069df18b500', hash_type='0')")
+            return AIMessage(content="[硬核破解] 调用 GPU 集群进行爆破。\nCALL: hashcat_job_start(hash_value='0192023a7bbd73250516f069df18b500', hash_type='0')")
         elif self.step == 5:
+            return AIMessage(content="[等待结果] 阻塞等待破解完成。\nCALL: job_wait(job_id='job_1', until='cracked')")
+        elif self.step == 6:
             # 这一步必须包含工具调用，否则 workflow 会结束
             return AIMessage(content="[深度寻路] 爆破获得前缀 admin123。现在定位 Success 地址 0x100003e44 并请求 Angr 协同。\nCALL: reverse_angr_solve(binary_path='" + binary_path + "', find_addr='0x100003e44')")
-        elif self.step == 6:
+        elif self.step == 7:
             return AIMessage(content="[最终总结] Angr 解算完成。攻击载荷已锁定：'admin123'。任务圆满成功。")
         else:
             return AIMessage(content="演习结束。")
@@ -49,7 +51,7 @@ async def test_v6_swarm_real_e2e():
         return tool
 
     # Mock 掉 IDA 和 GPU，保持 Angr 真实
-    with patch("asas_agent.agents.reverse.ida_get_imports", create_mock_tool("ida_get_imports", "Imports: [strlen, printf, strcmp]")),          patch("asas_agent.agents.reverse.ida_find_regex", create_mock_tool("ida_find_regex", "Found: 0192023a7bbd73250516f069df18b500 in .rodata")),          patch("asas_agent.agents.reverse.gpu_status", create_mock_tool("gpu_status", "NVIDIA GeForce RTX 4090 [Worker-01: ACTIVE]")),          patch("asas_agent.agents.reverse.gpu_hashcat_crack", create_mock_tool("gpu_hashcat_crack", "Success! Cracked result: 0192023a7bbd73250516f069df18b500:admin123")):
+    with patch("asas_agent.agents.reverse.ida_get_imports", create_mock_tool("ida_get_imports", "Imports: [strlen, printf, strcmp]")),          patch("asas_agent.agents.reverse.ida_find_regex", create_mock_tool("ida_find_regex", "Found: 0192023a7bbd73250516f069df18b500 in .rodata")),          patch("asas_agent.agents.reverse.gpu_status", create_mock_tool("gpu_status", "NVIDIA GeForce RTX 4090 [Worker-01: ACTIVE]")),          patch("asas_agent.agents.reverse.hashcat_job_start", create_mock_tool("hashcat_job_start", '{"job_id": "job_1", "status": "running"}')),          patch("asas_agent.agents.reverse.job_wait", create_mock_tool("job_wait", '{"job_id": "job_1", "status": "succeeded", "events": [{"type": "cracked", "data": {"plain": "admin123"}}]}')):
         
         agent_graph = create_reverse_agent(mock_llm, [])
         inputs = {"messages": [HumanMessage(content="武装分析 demo_challenge")]}
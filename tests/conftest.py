@@ -4,6 +4,7 @@ Sets ASAS_NO_RAY before modules are imported so SwarmWorker stays a plain class.
 """
 import os
 import sys
+import tempfile
 
 # Must set before any import of swarm modules
 os.environ["ASAS_NO_RAY"] = "1"
@@ -12,3 +13,6 @@ os.environ["ASAS_NO_RAY"] = "1"
 mods_to_reload = [k for k in sys.modules if "asas_agent.distributed" in k]
 for m in mods_to_reload:
     del sys.modules[m]
+
+# Keep functions indexed by reverse_ghidra during tests out of the user's code search index
+os.environ.setdefault("ASAS_CODE_SEARCH_DB", os.path.join(tempfile.mkdtemp(prefix="asas-test-"), "code_search.sqlite"))
@@ -19,3 +19,29 @@ async def test_swarm_orchestrator_dispatch():
     result = await worker.execute_tool("test_tool", {"arg": 1})
     assert result["status"] == "success"
     assert "Distributed Result from" in result["result"]
+
+@pytest.mark.asyncio
+async def test_swarm_worker_runs_angr_solve_in_process(monkeypatch):
+    """reverse_angr_solve runs on the worker's own angr cache; solutions come back as seeds."""
+    import threading
+    from asas_mcp.tools import reverse_angr
+    from asas_mcp.utils import angr_cache
+    calls, warm_threads = [], []
+
+    async def fake_solve(binary_path, find_addr, stdin_prefix_hex=None, max_solutions=1, directed=False):
+        calls.append((binary_path, find_addr, stdin_prefix_hex, max_solutions, directed))
+        return {"solutions": [b"ccc", b"ccd"], "notes": ["stopped: timeout after 300s"]}
+
+    monkeypatch.setattr(reverse_angr, "solve_stdin", fake_solve)
+    monkeypatch.setattr(angr_cache, "get_angr_cache", lambda: type("Cache", (), {
+        "warm": lambda self, path, cfg=False: warm_threads.append(threading.current_thread()) or {"cfg": cfg}})())
+    worker = SwarmWorker("test-node")
+    assert (await worker.warm_start_angr("/tmp/target", cfg=True))["cfg"] is True
+    assert warm_threads[0] is not threading.current_thread()  # off the actor's event loop
+
+    result = await worker.execute_tool("reverse_angr_solve", {
+        "binary_path": "/tmp/target", "find_addr": "0x401234", "stdin_prefix_hex": "616161",
+        "max_solutions": 8, "directed": True, "strategy": "explore_new_branches", "seed_prefix_b64": "YWFh"})
+    assert calls == [("/tmp/target", "0x401234", "616161", 8, True)]
+    assert result["status"] == "success" and [s["content_b64"] for s in result["new_seeds"]] == ["Y2Nj", "Y2Nk"]
+    assert "timeout" in result["result"]
@@ -22,3 +22,14 @@ def test_start_fuzzer_container():
         assert args[0] == "ctf-asas-fuzzer"
         assert "volumes" in kwargs
         assert "/tmp" in str(kwargs["volumes"])
+
+def test_stop_container_removes_owned_dir(tmp_path):
+    with patch("asas_mcp.executors.docker_manager.docker") as mock_docker:
+        mock_docker.from_env.return_value = MagicMock()
+        manager = DockerManager()
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+        manager.remove_with_container("cont_123", str(work_dir))
+
+        assert manager.stop_container("cont_123")
+        assert not work_dir.exists()
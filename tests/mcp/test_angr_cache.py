@@ -0,0 +1,123 @@
+import asyncio
+import os
+import sys
+import types
+import pytest
+from asas_mcp.tools import reverse_angr
+from asas_mcp.utils import angr_cache
+from asas_mcp.utils.angr_cache import AngrProjectCache
+
+
+class FakeState:
+    def __init__(self):
+        self.posix = types.SimpleNamespace(stdin=types.SimpleNamespace(content=[]))
+
+    def copy(self):
+        return FakeState()
+
+
+class FakeSimgr:
+    def __init__(self, state):
+        self.active, self.found, self.deadended = [], [], [state]
+        self.stashes = {"active": self.active, "found": self.found, "deadended": self.deadended}
+
+    def explore(self, find=None, avoid=None, **kwargs):
+        pass
+
+
+class FakeFactory:
+    def entry_state(self, **kwargs):
+        return FakeState()
+
+    def simgr(self, state):
+        return FakeSimgr(state)
+
+
+class FakeAnalyses:
+    def CFGFast(self, normalize=False):
+        return {"functions": 3}
+
+
+class FakeProject:
+    loads = 0
+
+    def __init__(self, path, **options):
+        FakeProject.loads += 1
+        self.path, self.options = path, options
+        self.factory, self.analyses = FakeFactory(), FakeAnalyses()
+
+
+@pytest.fixture
+def fake_angr(monkeypatch):
+    module = types.ModuleType("angr")
+    module.Project = FakeProject
+    module.__version__ = "0.0-test"
+    monkeypatch.setitem(sys.modules, "angr", module)
+    FakeProject.loads = 0
+    return module
+
+
+@pytest.fixture
+def binary(tmp_path):
+    path = tmp_path / "chall"
+    path.write_bytes(b"\x7fELF" + b"\x01" * 64)
+    return str(path)
+
+
+def test_project_loaded_once_per_binary(fake_angr, binary, tmp_path):
+    cache = AngrProjectCache(root=str(tmp_path / "angr"))
+    first, second = cache.get(binary), cache.get(binary)
+    assert first is second and FakeProject.loads == 1
+    assert first.project.options == {"auto_load_libs": False}
+    assert first.entry_state() is not first.entry_state()  # independent copies of the template
+    assert cache.summary()["hits"] == 1
+
+    other = tmp_path / "other"
+    other.write_bytes(b"\x7fELF" + b"\x02" * 64)
+    assert cache.get(str(other)) is not first and FakeProject.loads == 2
+    cache.get(binary, load_options={"auto_load_libs": True})
+    assert FakeProject.loads == 3  # load options are part of the key
+
+
+def test_eviction_under_memory_budget(fake_angr, tmp_path, monkeypatch):
+    monkeypatch.setattr(angr_cache, "SIZE_FACTOR", 4)  # a 25 byte binary costs 100
+    cache = AngrProjectCache(root=str(tmp_path / "angr"), max_bytes=250)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"bin{i}"
+        path.write_bytes(bytes([i]) * 25)
+        paths.append(str(path))
+        cache.get(paths[-1])
+    assert cache.summary()["entries"] == 2 and cache.stats["evictions"] == 1
+    assert cache.memory_bytes() == 200
+    cache.get(paths[0])  # evicted: loaded again
+    assert FakeProject.loads == 4
+
+
+def test_pickle_warm_start_in_another_process(fake_angr, binary, tmp_path):
+    root = str(tmp_path / "angr")
+    warmed = AngrProjectCache(root=root).warm(binary, cfg=True)
+    assert warmed["cfg"] and os.path.exists(warmed["pickle"])
+
+    fresh = AngrProjectCache(root=root)  # e.g. a SwarmWorker actor sharing the directory
+    entry = fresh.get(binary)
+    assert FakeProject.loads == 1 and fresh.stats["disk_hits"] == 1
+    assert entry.cfg == {"functions": 3}
+
+
+def test_corrupt_pickle_is_discarded(fake_angr, binary, tmp_path):
+    root = str(tmp_path / "angr")
+    cache = AngrProjectCache(root=root, persist=True)
+    path = cache._pickle_path(cache.get(binary).key)
+    with open(path, "wb") as f:
+        f.write(b"not a pickle")
+    AngrProjectCache(root=root).get(binary)
+    assert FakeProject.loads == 2 and not os.path.exists(path)
+
+
+def test_reverse_angr_solve_reuses_project(fake_angr, binary, tmp_path, monkeypatch):
+    monkeypatch.setattr(angr_cache, "_cache", AngrProjectCache(root=str(tmp_path / "angr")))
+    for _ in range(3):
+        result = asyncio.run(reverse_angr.reverse_angr_solve.ainvoke({"binary_path": binary, "find_addr": "0x401234"}))
+        assert result.startswith("Could not find a path")
+    assert FakeProject.loads == 1
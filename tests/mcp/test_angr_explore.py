@@ -0,0 +1,271 @@
+import asyncio
+import sys
+import types
+import pytest
+from asas_mcp.tools import reverse_angr
+from asas_mcp.utils import angr_cache, angr_explore
+from asas_mcp.utils.angr_cache import AngrProjectCache, AngrProjectEntry
+from asas_mcp.utils.angr_explore import ExplorationBudget
+
+
+class FakeState:
+    """
+    A path is its stdin so far; every step branches on one more input byte,
+    except within the concrete ``prefix`` where the next byte is known.
+    """
+
+    def __init__(self, data=b"", prefix=b""):
+        self.data, self.prefix = data, prefix
+        self.addr = addr_of(data)
+        self.posix = types.SimpleNamespace(dumps=lambda fd: self.data,
+                                           stdin=types.SimpleNamespace(load=lambda *a: None, size=None, content=[]))
+        self.solver = types.SimpleNamespace(eval_upto=lambda bv, n, cast_to=None: [self.data + b"!" * i for i in range(n)])
+
+    def copy(self):
+        return FakeState(self.data, self.prefix)
+
+    def successors(self):
+        if len(self.data) < len(self.prefix):
+            return [FakeState(self.prefix[:len(self.data) + 1], self.prefix)]
+        return [FakeState(self.data + bytes([byte]), self.prefix) for byte in b"ab"]
+
+
+def addr_of(data):
+    return int.from_bytes(b"\x01" + data, "big")  # one block per path
+
+
+class FakeSimgr:
+    steps = 0  # states stepped, across instances
+
+    def __init__(self, states, found_at, depth=None):
+        self.found_at, self.depth = found_at, depth
+        self.techniques = []
+        self.stashes = {"active": list(states), "found": [], "deadended": [], "pruned": []}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["stashes"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def use_technique(self, technique):
+        self.techniques.append(technique)
+
+    def split(self, from_stash, to_stash, limit):
+        states = self.stashes[from_stash]
+        self.stashes[to_stash] += states[limit:]
+        del states[limit:]
+
+    def explore(self, find=None, avoid=None, num_find=1, until=None):
+        while self.active and len(self.found) < num_find:
+            stepped = []
+            FakeSimgr.steps += len(self.active)
+            for state in self.active:
+                for child in state.successors():
+                    if self.found_at(child.data):
+                        self.found.append(child)
+                    elif child.addr in (avoid or []) or len(child.data) == self.depth:
+                        self.deadended.append(child)
+                    else:
+                        stepped.append(child)
+            self.stashes["active"] = stepped
+            if until and until(self):
+                break
+
+    def run(self, until=None):
+        self.explore(num_find=float("inf"), until=until)
+
+
+class FakeProject:
+    def __init__(self, found_at, depth=None, prefix=b""):
+        self.factory = types.SimpleNamespace(simgr=lambda s: FakeSimgr(s if isinstance(s, list) else [s], found_at, depth))
+        self.analyses = types.SimpleNamespace(
+            CFGFast=lambda normalize=False: types.SimpleNamespace(graph=FakeGraph(depth, prefix)))
+
+
+class Block:
+    def __init__(self, addr, path, name=None):
+        self.addr, self.size, self.path, self.name = addr, 1, path, name
+
+
+class FakeGraph:
+    """The CFG of the fake program: a block per input path up to ``depth`` bytes."""
+
+    def __init__(self, depth, prefix=b""):
+        paths = [prefix[:i] for i in range(len(prefix) + 1)]
+        for _ in range(depth - len(prefix)):
+            paths += [p + bytes([byte]) for p in paths if len(p) == len(paths[-1]) for byte in b"ab"]
+        self.blocks = {p: Block(addr_of(p), p) for p in paths}
+
+    def nodes(self):
+        return list(self.blocks.values())
+
+    def predecessors(self, node):
+        return [self.blocks[node.path[:-1]]] if node.path else []
+
+
+def three_bytes_ending_in_b(data):
+    return len(data) == 3 and data.endswith(b"b")
+
+
+def test_returns_distinct_solutions():
+    result = angr_explore.explore(FakeProject(three_bytes_ending_in_b), FakeState(), find=0x400003, max_solutions=3)
+    assert len(result["solutions"]) == 3 == len(set(result["solutions"]))
+    assert all(three_bytes_ending_in_b(s) for s in result["solutions"])
+    assert result["stopped"] is None and result["workers"] == 1
+
+
+def test_extra_models_fill_up_from_one_state():
+    states = [FakeState(b"abb")]
+    assert angr_explore.stdin_solutions(states, 3) == [b"abb", b"abb!", b"abb!!"]
+
+
+def test_timeout_and_active_budget_stop_a_hopeless_search(monkeypatch):
+    budget = ExplorationBudget(seconds=0.2, memory_mb=None, max_active=8)
+    result = angr_explore.explore(FakeProject(lambda data: False), FakeState(), find=0, budget=budget)
+    assert result["solutions"] == [] and result["stopped"].startswith("timeout")
+    assert result["stashes"]["active"] <= 8 and result["pruned"] > 0
+
+
+def test_memory_budget(monkeypatch):
+    rss = iter(range(0, 1 << 40, 64 << 20))
+    monkeypatch.setattr(angr_explore, "_rss", lambda: next(rss))  # 64 MB per step
+    budget = ExplorationBudget(seconds=None, memory_mb=200, max_active=None)
+    result = angr_explore.explore(FakeProject(lambda data: False), FakeState(), find=0, budget=budget)
+    assert result["stopped"] == "memory budget of 200 MB exceeded"
+
+
+def test_techniques_by_name(monkeypatch):
+    techniques = types.SimpleNamespace(**{cls: type(cls, (), {"__init__": lambda self, **kw: setattr(self, "kw", kw)})
+                                          for cls in angr_explore.TECHNIQUES.values()})
+    monkeypatch.setitem(sys.modules, "angr", types.SimpleNamespace(exploration_techniques=techniques))
+    simgr = FakeSimgr([], None)
+    angr_explore.use_techniques(simgr, ["dfs", "length_limiter"], max_length=50)
+    assert [type(t).__name__ for t in simgr.techniques] == ["DFS", "LengthLimiter"]
+    assert simgr.techniques[1].kw == {"max_length": 50}
+    with pytest.raises(ValueError):
+        angr_explore.use_techniques(simgr, ["bfs"])
+
+
+def test_active_stash_split_across_processes():
+    # 5-byte inputs without "aa": both shards ("a...", "b...") hold at least 4
+    found_at = lambda data: len(data) == 5 and b"aa" not in data
+    result = angr_explore.explore(FakeProject(found_at, depth=8), FakeState(), find=0x400005, max_solutions=4, workers=2)
+    assert result["workers"] == 2
+    assert len(result["solutions"]) == 4 == len(set(result["solutions"]))
+    assert all(found_at(s) for s in result["solutions"])
+
+
+def test_concurrent_parallel_solve_stays_in_process():
+    found_at = lambda data: len(data) == 5 and b"aa" not in data
+    with angr_explore._fork_lock:  # another solve is forking
+        result = angr_explore.explore(FakeProject(found_at, depth=8), FakeState(), find=0x400005, max_solutions=4,
+                                      workers=2)
+    assert result["workers"] == 1 and len(set(result["solutions"])) == 4
+    assert all(found_at(s) for s in result["solutions"])
+    assert not angr_explore._fork_lock.locked()
+    assert angr_explore.explore(FakeProject(found_at, depth=8), FakeState(), find=0x400005, max_solutions=4,
+                                workers=2)["workers"] == 2
+    assert angr_explore._shard_job is None  # only ever set in the workers
+
+
+def test_solve_tool_lists_every_solution(tmp_path, monkeypatch):
+    angr = types.ModuleType("angr")
+    angr.Project = lambda path, **kw: FakeProject(three_bytes_ending_in_b)
+    monkeypatch.setitem(sys.modules, "angr", angr)
+    monkeypatch.setattr(angr_cache, "_cache", AngrProjectCache(root=str(tmp_path / "angr")))
+    monkeypatch.setattr(angr_cache.AngrProjectEntry, "entry_state", lambda self: FakeState())
+    binary = tmp_path / "chall"
+    binary.write_bytes(b"\x7fELF")
+
+    result = asyncio.run(reverse_angr.reverse_angr_solve.ainvoke(
+        {"binary_path": str(binary), "find_addr": "0x400003", "max_solutions": 2}))
+    assert result.startswith("Success! Found 2 distinct inputs reaching 0x400003")
+    assert "(hex: 616162)" in result
+
+
+def test_cfg_distances_and_unresolved_jumps():
+    graph = FakeGraph(2)
+    distances, known = angr_explore.cfg_distances(graph, addr_of(b"ab"))
+    assert distances == {addr_of(b"ab"): 0, addr_of(b"a"): 1, addr_of(b""): 2}
+    assert addr_of(b"bb") in known
+    assert angr_explore.cfg_distances(graph, 0x10) is None
+
+    # a block jumping somewhere CFGFast could not resolve may still reach the target
+    graph.blocks[b"bbb"] = Block(0x10, b"bbb", name="UnresolvableJumpTarget")
+    assert addr_of(b"bb") not in angr_explore.cfg_distances(graph, addr_of(b"ab"))[1]
+
+
+def test_distance_through_the_call_stack():
+    search = angr_explore.DirectedSearch({0x10: 3, 0x20: 0}, frozenset({0x10, 0x20, 0x30}))
+    callee = types.SimpleNamespace(addr=0x30, callstack=[types.SimpleNamespace(ret_addr=0x10)])
+    assert search.distance(callee) == 4  # return, then 3 blocks
+    assert search.distance(types.SimpleNamespace(addr=0x30)) is None
+    assert search.distance(types.SimpleNamespace(addr=0x99)) == float("inf")  # not in the CFG: kept
+
+
+def test_directed_search_steps_far_fewer_states_than_bfs():
+    target = b"babbab"
+    found_at = lambda data: data == target
+    steps = {}
+    for mode in ("bfs", "directed"):
+        project = FakeProject(found_at, depth=len(target))
+        entry = AngrProjectEntry("k", project, 0)
+        search = angr_explore.directed_search(entry, addr_of(target), beam=2) if mode == "directed" else None
+        FakeSimgr.steps = 0
+        result = angr_explore.explore(project, FakeState(), find=addr_of(target), directed=search)
+        assert result["solutions"] == [target]
+        steps[mode] = FakeSimgr.steps
+    assert result["unreachable"] > 0
+    assert steps["directed"] <= len(target) < steps["bfs"]
+    assert ("distances", addr_of(target)) in entry.derived
+
+
+def test_seed_fork_point_is_cached_per_prefix():
+    project = FakeProject(lambda data: False)
+    entry = AngrProjectEntry("k", project, 0)
+    budget = ExplorationBudget(seconds=5, memory_mb=None, max_active=None)
+    FakeSimgr.steps = 0
+    states = angr_explore.seed_states(entry, FakeState(prefix=b"xyz"), b"xyz", budget)
+    assert sorted(s.data for s in states) == [b"xyza", b"xyzb"]  # first fork after the concrete bytes
+    assert FakeSimgr.steps == 4
+    again = angr_explore.seed_states(entry, FakeState(prefix=b"xyz"), b"xyz", budget)
+    assert FakeSimgr.steps == 4 and again[0] is not states[0]  # cached, handed out as copies
+
+
+def test_solve_tool_directed_from_seed(tmp_path, monkeypatch):
+    target = b"seedab"
+    angr = types.ModuleType("angr")
+    angr.Project = lambda path, **kw: FakeProject(lambda data: data == target, depth=8, prefix=b"seed")
+    monkeypatch.setitem(sys.modules, "angr", angr)
+    monkeypatch.setattr(angr_cache, "_cache", AngrProjectCache(root=str(tmp_path / "angr")))
+    monkeypatch.setattr(angr_cache.AngrProjectEntry, "entry_state", lambda self: FakeState(prefix=b"seed"))
+    binary = tmp_path / "chall"
+    binary.write_bytes(b"\x7fELF")
+
+    result = asyncio.run(reverse_angr.reverse_angr_solve.ainvoke(
+        {"binary_path": str(binary), "find_addr": hex(addr_of(target)), "stdin_prefix_hex": b"seed".hex(),
+         "directed": True}))
+    assert result.startswith("Success! Path found.") and result.endswith("seedab")
+    assert "cannot reach the target" in result
+
+
+def test_solve_loads_the_project_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+    threads = []
+    angr = types.ModuleType("angr")
+    angr.Project = lambda path, **kw: threads.append(threading.current_thread()) or FakeProject(three_bytes_ending_in_b)
+    monkeypatch.setitem(sys.modules, "angr", angr)
+    monkeypatch.setattr(angr_cache, "_cache", AngrProjectCache(root=str(tmp_path / "angr")))
+    monkeypatch.setattr(angr_cache.AngrProjectEntry, "entry_state",
+                        lambda self: threads.append(threading.current_thread()) or FakeState())
+    binary = tmp_path / "chall"
+    binary.write_bytes(b"\x7fELF")
+
+    async def solve():
+        result = await reverse_angr.solve_stdin(str(binary), "0x400003")
+        return result, threading.current_thread()
+
+    result, loop_thread = asyncio.run(solve())
+    assert result["solutions"] and len(threads) == 2
+    assert loop_thread not in threads
@@ -0,0 +1,66 @@
+import base64
+import hashlib
+import pytest
+from asas_mcp.utils import artifact_store
+from asas_mcp.utils.artifact_store import ArtifactStore, ArtifactError
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    s = ArtifactStore(root=str(tmp_path / "artifacts"))
+    monkeypatch.setattr(artifact_store, "_store", s)
+    return s
+
+
+def test_ingest_path_is_content_addressed(store, tmp_path):
+    binary = tmp_path / "chall.elf"
+    binary.write_bytes(b"\x7fELF" + b"\x00" * 100 + b"flag{artifact}")
+
+    meta = store.ingest_path(str(binary))
+    assert meta["artifact_id"] == hashlib.sha256(binary.read_bytes()).hexdigest()
+    assert meta["name"] == "chall.elf"
+
+    # Re-ingesting the same bytes (any source) is a no-op
+    again = store.ingest_bytes(binary.read_bytes(), name="other")
+    assert again["artifact_id"] == meta["artifact_id"]
+    assert again["name"] == "chall.elf"
+    assert len(store.list()) == 1
+
+
+def test_stored_copy_is_immutable_snapshot(store, tmp_path):
+    binary = tmp_path / "bin"
+    binary.write_bytes(b"version-1")
+    artifact_id = store.ingest_path(str(binary))["artifact_id"]
+
+    binary.write_bytes(b"version-2")
+    with store.open(artifact_id) as data:
+        assert data[:] == b"version-1"
+
+
+def test_resolve_prefix_and_errors(store):
+    artifact_id = store.ingest_bytes(b"abc", name="x")["artifact_id"]
+    assert store.resolve(artifact_id[:12]) == artifact_id
+    assert store.resolve(f"sha256:{artifact_id}") == artifact_id
+
+    with pytest.raises(ArtifactError):
+        store.resolve("../../etc/passwd")
+    with pytest.raises(ArtifactError):
+        store.resolve("0" * 64)
+
+
+def test_tools_accept_artifact_id(store):
+    from asas_mcp.server import misc_identify_file, reverse_extract_strings
+
+    png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32 + b"HiddenText\x00"
+    artifact_id = store.ingest_bytes(png, name="img.png")["artifact_id"]
+
+    assert misc_identify_file(artifact_id=artifact_id)["type"] == "PNG"
+    assert "HiddenText" in reverse_extract_strings(artifact_id=artifact_id, min_length=6)
+    # The inline payload path still works
+    assert misc_identify_file(data_base64=base64.b64encode(png).decode())["type"] == "PNG"
+
+
+def test_empty_artifact(store):
+    artifact_id = store.ingest_bytes(b"")["artifact_id"]
+    with store.open(artifact_id) as data:
+        assert data == b""
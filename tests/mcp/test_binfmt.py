@@ -0,0 +1,121 @@
+import os
+import shutil
+import subprocess
+import pytest
+from asas_mcp.tools import binfmt, kali, reverse_ghidra
+from asas_mcp.utils import ghidra_cache
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "fixtures")
+STATIC_ELF = os.path.join(FIXTURES, "simple_reverse")  # aarch64, static, not stripped
+PE = os.path.join(FIXTURES, "buuctf", "reverse_1.exe")  # PE32+ console, MSVC debug build
+
+SOURCE = '#include <stdio.h>\n#include <string.h>\n' \
+         'int main(int c, char **v) { char b[32]; strcpy(b, v[0]); printf("%s\\n", b); return 0; }\n'
+
+
+@pytest.fixture(scope="module")
+def compiled(tmp_path_factory):
+    if shutil.which("gcc") is None:
+        pytest.skip("gcc not available")
+    tmp = tmp_path_factory.mktemp("binfmt")
+    src = tmp / "t.c"
+    src.write_text(SOURCE)
+    builds = {
+        "hardened": ["-O2", "-D_FORTIFY_SOURCE=2", "-fstack-protector-all", "-pie", "-fPIE", "-Wl,-z,relro,-z,now"],
+        "weak": ["-no-pie", "-fno-stack-protector", "-z", "execstack", "-Wl,-z,norelro"],
+    }
+    paths = {}
+    for name, flags in builds.items():
+        out = tmp / name
+        subprocess.run(["gcc", *flags, "-o", str(out), str(src)], check=True, capture_output=True)
+        paths[name] = str(out)
+    stripped = tmp / "stripped"
+    shutil.copy(paths["weak"], stripped)
+    subprocess.run(["strip", str(stripped)], check=True)
+    paths["stripped"] = str(stripped)
+    return paths
+
+
+def test_static_elf_info():
+    info = binfmt.binary_info(STATIC_ELF)
+    assert (info["format"], info["bits"], info["arch"], info["type"]) == ("ELF", 64, "aarch64", "executable")
+    assert info["static"] and not info["stripped"] and info["debug_info"]
+    assert info["description"].startswith("ELF 64-bit LSB executable, ARM aarch64, statically linked")
+    sec = info["security"]
+    assert sec["nx"] is True and sec["pie"] is False and sec["base"] == "0x400000"
+    assert sec["fortify"] is None  # static libc defines every *_chk itself
+
+
+def test_checksec_of_compiled_binaries(compiled):
+    hardened = binfmt.checksec(compiled["hardened"])
+    assert (hardened["relro"], hardened["canary"], hardened["nx"], hardened["pie"]) == ("full", True, True, True)
+    assert hardened["fortify"] and "__strcpy_chk" in hardened["fortified"]
+
+    weak = binfmt.checksec(compiled["weak"])
+    assert (weak["relro"], weak["canary"], weak["nx"], weak["pie"], weak["fortify"]) == ("none", False, False, False, False)
+    report = binfmt.checksec_report(compiled["weak"])
+    assert "No RELRO" in report and "No canary found" in report and "NX disabled" in report and "No PIE (0x400000)" in report
+
+
+def test_imports_and_symbols(compiled):
+    imports = binfmt.imports(compiled["weak"])
+    assert imports["libraries"] == ["libc.so.6"] and "strcpy" in imports["functions"]
+    main = binfmt.symbols(compiled["weak"], pattern="main", kind="func", defined_only=True)["symbols"]
+    assert [s["name"] for s in main] == ["main"]
+    assert binfmt.symbols(compiled["stripped"], pattern="main", defined_only=True)["total"] == 0
+    assert ".text" in [s["name"] for s in binfmt.sections(compiled["weak"])]
+
+
+def test_pe_info():
+    info = binfmt.binary_info(PE)
+    assert (info["format"], info["bits"], info["arch"], info["subsystem"]) == ("PE", 64, "amd64", "console")
+    assert info["description"] == "PE32+ executable (console) x86-64, for MS Windows, 10 sections"
+    assert info["security"]["nx"] and info["security"]["aslr"] and info["security"]["canary"]
+    imports = binfmt.imports(PE)
+    assert "KERNEL32.dll" in imports["libraries"] and "GetCurrentProcessId" in imports["by_library"]["KERNEL32.dll"]
+
+
+def test_garbage_raises_format_error(tmp_path):
+    for content in [b"", b"plain text", b"\x7fELF" + b"\x02\x01" + b"\x00" * 10, b"MZ" + b"\x00" * 10]:
+        path = tmp_path / "bad"
+        path.write_bytes(content)
+        with pytest.raises(binfmt.BinaryFormatError):
+            binfmt.binary_info(str(path))
+        assert binfmt.function_symbols(str(path)) is None
+
+
+def test_list_functions_uses_symbol_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "ghidra")))
+
+    def no_ghidra(*a, **kw):
+        raise AssertionError("Ghidra must not run for an unstripped ELF")
+
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export", no_ghidra)
+    listing = reverse_ghidra.list_functions(STATIC_ELF)
+    assert listing["source"] == "symtab"
+    main = next(f for f in listing["functions"] if f["name"] == "main")
+    assert len(main["address"]) == 8 and main["size"] > 0
+    assert not any(f["name"].startswith("_dl_") for f in listing["functions"])
+
+
+def test_kali_tools_answer_from_uploaded_host_copy(monkeypatch):
+    class FakeExecutor:
+        commands = []
+
+        def copy_to_guest(self, host_path, guest_path):
+            return f"Success: File uploaded to {guest_path}"
+
+        def execute(self, cmd):
+            self.commands.append(cmd)
+            return "from vm"
+
+    executor = FakeExecutor()
+    monkeypatch.setattr(kali, "_executor", executor)
+    monkeypatch.setattr(kali, "_host_copies", {})
+    kali.upload_file(STATIC_ELF, "/tmp/")
+
+    assert kali.file_cmd("/tmp/simple_reverse").startswith("/tmp/simple_reverse: ELF 64-bit LSB executable")
+    assert "NX enabled" in kali.checksec("/tmp/simple_reverse")
+    assert executor.commands == []
+    assert kali.file_cmd("/tmp/unknown") == "from vm"  # never uploaded from this host
@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from asas_mcp.tools import ida_tools, reverse_ghidra
+from asas_mcp.utils import code_search, ghidra_cache
+from asas_mcp.utils.code_search import CodeSearchIndex, required_literals
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+
+CHECK = """int check(char *param_1)
+{
+  int iVar1;
+  iVar1 = strcmp(param_1, "flag{s3cr3t}");
+  if (iVar1 == 0) {
+    puts("Correct!");
+  }
+  return iVar1;
+}
+"""
+
+EXPORT = [
+    {"name": "main", "address": "00401136", "code": "int main(void)\n{\n  fgets(buf, 0x40, stdin);\n  return check(buf);\n}\n"},
+    {"name": "check", "address": "00401100", "code": CHECK},
+    {"name": "helper", "address": "00401200", "code": "void helper(void)\n{\n  memset(buf, 0, 0x40);\n}\n"},
+]
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    idx = CodeSearchIndex(path=str(tmp_path / "code_search.sqlite"))
+    monkeypatch.setattr(code_search, "_index", idx)
+    yield idx
+    idx.close()
+
+
+def test_required_literals():
+    assert required_literals(r"strcmp\(.*flag") == ["strcmp(", "flag"]
+    assert required_literals("strcmp|memcmp") == []
+    assert required_literals(r"x[0-9]+y") == []
+
+
+def test_search_returns_function_hits_with_snippets(index):
+    index.add_functions("a" * 64, "chall", EXPORT, complete=True)
+    result = index.search(r"strcmp\(.*flag\{")
+    assert [h["function"] for h in result["hits"]] == ["check"]
+    assert result["hits"][0]["snippet"] == ['4: iVar1 = strcmp(param_1, "flag{s3cr3t}");']
+    assert result["candidates"] == 1  # the trigram index narrowed the scan
+
+    alternation = index.search("strcmp|memset")
+    assert {h["function"] for h in alternation["hits"]} == {"check", "helper"}
+    assert index.search("CORRECT", ignore_case=True)["hits"][0]["function"] == "check"
+    assert index.search("flag{")["hits"][0]["function"] == "check"  # invalid regex: literal search
+
+
+def test_binary_filter_and_updates(index):
+    index.add_functions("a" * 64, "chall", EXPORT)
+    index.add_functions("b" * 64, "other", [{"name": "check", "address": "1", "code": "int check(void) { return strcmp(a, b); }"}])
+    assert len(index.search("strcmp")["hits"]) == 2
+    assert [h["binary"] for h in index.search("strcmp", binary="other")["hits"]] == ["other"]
+    assert [h["binary"] for h in index.search("strcmp", binary="aaaaaaaa")["hits"]] == ["chall"]
+    assert index.search("strcmp", binary="bbbb")["hits"] == []  # too short to be a digest prefix
+
+    index.add_functions("b" * 64, "other", [{"name": "check", "address": "1", "code": "int check(void) { return 0; }"}])
+    assert [h["binary"] for h in index.search("strcmp")["hits"]] == ["chall"]
+    assert index.count() == 4
+
+
+def test_reverse_ghidra_indexes_exports(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "ghidra")))
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export", lambda *a, **kw: [dict(e) for e in EXPORT])
+    binary = tmp_path / "chall"
+    binary.write_bytes(b"\x7fELF" + b"\x06" * 64)
+
+    reverse_ghidra.list_functions(str(binary))  # metadata: nothing to index
+    assert index.count() == 0
+    reverse_ghidra.analyze_binary(str(binary))
+    hit = index.search("fgets")["hits"][0]
+    assert (hit["binary"], hit["function"], hit["source"]) == ("chall", "main", "ghidra")
+    reverse_ghidra.analyze_binary(str(binary))  # cache hit: already indexed
+    assert index.count() == 3
+
+
+def test_ida_decompilations_are_indexed(index, monkeypatch):
+    class FakeIda:
+        base_url = "http://localhost:8745"
+        idb = {"module": "crackme", "path": "/work/crackme", "sha256": "C" * 64}
+
+        async def execute_tool(self, method, params):
+            if method == "get_metadata":
+                return self.idb
+            return {"name": "main", "addr": "0x401000", "code": f"int main() {{ return memcmp(a, {self.idb['module']}, 16); }}"}
+
+    ida = FakeIda()
+    monkeypatch.setattr(ida_tools, "_ida_client", ida)
+    asyncio.run(ida_tools.ida_decompile.ainvoke({"addr": "main"}))
+    hit = index.search("memcmp", binary="crackme")["hits"][0]
+    assert (hit["function"], hit["source"], hit["sha256"]) == ("main", "ida", "c" * 12)
+
+    # another binary opened on the same IDA server keeps its own main
+    ida.idb = {"module": "keygenme", "path": "/work/keygenme", "sha256": "d" * 64}
+    asyncio.run(ida_tools.ida_decompile.ainvoke({"addr": "main"}))
+    assert {h["binary"] for h in index.search("memcmp")["hits"]} == {"crackme", "keygenme"}
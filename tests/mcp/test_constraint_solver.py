@@ -0,0 +1,182 @@
+import asyncio
+import itertools
+import operator
+import sys
+import types
+import pytest
+from asas_mcp.tools import reverse_angr
+from asas_mcp.utils import constraint_solver
+from asas_mcp.utils.constraint_solver import ConstraintCache, ExpressionError, compile_expression
+
+
+class Sym:
+    """A claripy-like expression: a function of a variable assignment."""
+
+    def __init__(self, fn, bits=None):
+        self.fn, self.bits = fn, bits
+
+    def __call__(self, env):
+        return self.fn(env)
+
+
+def _value(x, env):
+    return x(env) if isinstance(x, Sym) else x
+
+
+def _arith(op):
+    def apply(a, b):
+        bits = a.bits if isinstance(a, Sym) else b.bits
+        return Sym(lambda env: op(_value(a, env), _value(b, env)) % (1 << bits), bits)
+    return apply
+
+
+def _compare(op):
+    return lambda a, b: Sym(lambda env: op(_value(a, env), _value(b, env)))
+
+
+for name, op in [("add", operator.add), ("sub", operator.sub), ("mul", operator.mul), ("xor", operator.xor),
+                 ("and", operator.and_), ("or", operator.or_), ("lshift", operator.lshift), ("rshift", operator.rshift),
+                 ("floordiv", operator.floordiv), ("truediv", operator.floordiv), ("mod", operator.mod)]:
+    setattr(Sym, f"__{name}__", _arith(op))
+    setattr(Sym, f"__r{name}__", lambda self, other, op=op: _arith(op)(other, self))
+for name, op in [("eq", operator.eq), ("ne", operator.ne), ("lt", operator.lt),
+                 ("le", operator.le), ("gt", operator.gt), ("ge", operator.ge)]:
+    setattr(Sym, f"__{name}__", _compare(op))
+Sym.__invert__ = lambda self: Sym(lambda env: ~self(env) % (1 << self.bits), self.bits)
+
+
+class FakeSolver:
+    """Brute force over every assignment of the (small) declared variables."""
+
+    adds = 0
+
+    def __init__(self, claripy, constraints=()):
+        self.claripy, self.constraints = claripy, list(constraints)
+
+    def add(self, constraint):
+        FakeSolver.adds += 1
+        self.constraints.append(constraint)
+
+    def branch(self):
+        return FakeSolver(self.claripy, self.constraints)
+
+    def _models(self, extra):
+        names = sorted(self.claripy.widths)
+        for values in itertools.product(*(range(1 << self.claripy.widths[n]) for n in names)):
+            env = dict(zip(names, values))
+            if all(_value(c, env) for c in self.constraints + list(extra)):
+                yield env
+
+    def satisfiable(self, extra_constraints=()):
+        return next(self._models(extra_constraints), None) is not None
+
+    def eval(self, expr, n, extra_constraints=()):
+        values = []
+        for env in self._models(extra_constraints):
+            if _value(expr, env) not in values:
+                values.append(_value(expr, env))
+            if len(values) == n:
+                break
+        return values
+
+    def min(self, expr, extra_constraints=()):
+        return min(_value(expr, env) for env in self._models(extra_constraints))
+
+    def max(self, expr, extra_constraints=()):
+        return max(_value(expr, env) for env in self._models(extra_constraints))
+
+
+@pytest.fixture
+def fake_claripy(monkeypatch):
+    claripy = types.ModuleType("claripy")
+    claripy.widths = {}
+
+    def BVS(name, bits, explicit_name=False):
+        claripy.widths[name] = bits
+        return Sym(lambda env: env[name], bits)
+
+    claripy.BVS = BVS
+    claripy.Solver = lambda: FakeSolver(claripy)
+    claripy.And = lambda *a: Sym(lambda env: all(_value(x, env) for x in a))
+    claripy.Or = lambda *a: Sym(lambda env: any(_value(x, env) for x in a))
+    claripy.Not = lambda a: Sym(lambda env: not _value(a, env))
+    claripy.BoolV = lambda b: b
+    monkeypatch.setitem(sys.modules, "claripy", claripy)
+    monkeypatch.setattr(constraint_solver, "_cache", ConstraintCache())
+    FakeSolver.adds = 0
+    return claripy
+
+
+CONCRETE = types.SimpleNamespace(And=lambda *a: all(a), Or=lambda *a: any(a), Not=operator.not_,
+                                 If=lambda c, a, b: a if c else b, BoolV=bool)
+
+
+def test_compiled_expressions_follow_python_precedence():
+    names = frozenset({"x", "y"})
+    run = lambda text, **env: compile_expression(text, names)(env, CONCRETE)
+    assert run("x + 5 * y == 17 and not x > y", x=2, y=3)
+    assert run("1 < x < y <= 3", x=2, y=3) and not run("1 < x < y <= 3", x=3, y=3)
+    assert run("(x ^ 0x20) | (y << 4) == 0x4a", x=0x6a, y=0)
+    assert run("If(x == 1, y, -y) == 3", x=1, y=3)
+    assert run("~x == -3", x=2)
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os').system('id')", "x.__class__", "open('flag')", "[c for c in x]", "lambda: x",
+    "x ** 2", "x if y else 0", "1 << 100000", "z == 1", "Concat(x, y=1)", "x[y:0]", "x == 'a'", "x ==",
+])
+def test_rejects_everything_outside_the_whitelist(text):
+    with pytest.raises(ExpressionError):
+        compile_expression(text, frozenset({"x", "y"}))
+
+
+@pytest.mark.parametrize("text", ["x == 1 << (1 << 28)", "x == (1 << 4000) * (1 << 4000)", "x == 1 // (y - y)"])
+def test_constant_arithmetic_is_bounded_when_evaluated(text):
+    compiled = compile_expression(text, frozenset({"x", "y"}))
+    with pytest.raises(ExpressionError):
+        compiled({"x": 1, "y": 2}, CONCRETE)
+
+
+def test_division_of_ints_is_integer_division():
+    run = lambda text, **env: compile_expression(text, frozenset({"x"}))(env, CONCRETE)
+    assert run("x == 7 / 2", x=3) and run("x / 2 == 3", x=7)
+
+
+def test_enumerates_distinct_joint_solutions(fake_claripy):
+    system, reused = constraint_solver.get_constraint_cache().system({"a": 4, "b": 4}, ["a ^ b == 3", "a > 5"])
+    result = system.solve(max_solutions=20)
+    models = [(m["a"], m["b"]) for m in result["solutions"]]
+    assert reused == 0 and len(models) == 10 == len(set(models))  # a in 6..15
+    assert all(a ^ b == 3 and a > 5 for a, b in models)
+
+
+def test_optimisation(fake_claripy):
+    system, _ = constraint_solver.get_constraint_cache().system({"a": 4, "b": 4}, ["a + b == 12", "a > b"])
+    low = system.solve(minimize="a")
+    assert low["minimum"] == 7 and low["solutions"] == [{"a": 7, "b": 5}]
+    high = system.solve(max_solutions=2, maximize="a - b")
+    assert high["maximum"] == 12 and high["solutions"] == [{"a": 12, "b": 0}]  # the optimum is unique
+
+
+def test_follow_up_queries_only_add_deltas(fake_claripy):
+    cache = constraint_solver.get_constraint_cache()
+    base = ["a ^ b == 3", "a > 5"]
+    cache.system({"a": 4, "b": 4}, base)
+    assert FakeSolver.adds == 2
+    system, reused = cache.system({"a": 4, "b": 4, "c": 2}, base + ["c == a & 3"])
+    assert reused == 2 and FakeSolver.adds == 3
+    assert all(m["c"] == m["a"] & 3 for m in system.solve(max_solutions=4)["solutions"])
+    assert cache.system({"b": 4, "a": 4}, base) == (cache.system({"a": 4, "b": 4}, base)[0], 2)
+    assert FakeSolver.adds == 3 and cache.stats == {"hits": 2, "extended": 1, "built": 1}
+    # a different width for a declared variable is a different system
+    cache.system({"a": 3, "b": 4}, base)
+    assert cache.stats["built"] == 2
+
+
+def test_eval_tool(fake_claripy):
+    run = lambda **args: asyncio.run(reverse_angr.reverse_angr_eval.ainvoke(args))
+    result = run(expression="", symbolic_vars={"a": 4, "b": 4}, constraints=["a ^ b == 3", "a > 13"], max_solutions=5)
+    assert result == "Found 2 distinct solutions:\n[1] {'a': '0xe', 'b': '0xd'}\n[2] {'a': '0xf', 'b': '0xc'}"
+    assert run(expression="a == 14", symbolic_vars={"a": 4}, maximize="a").startswith("Solution found!\nMaximum: 0xe")
+    assert run(expression="a == 1", symbolic_vars={"a": 4}, constraints=["a == 2"]).startswith("Unsatisifiable")
+    assert run(expression="a.__class__", symbolic_vars={"a": 4}) == "Error: Unsupported syntax: 'a.__class__'"
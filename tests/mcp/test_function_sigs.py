@@ -0,0 +1,111 @@
+import pytest
+from asas_mcp.tools import reverse_ghidra
+from asas_mcp.utils import function_sigs, ghidra_cache
+from asas_mcp.utils.function_sigs import FunctionSignatureDB, fingerprint, normalize_tokens, similarity
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+
+RC4_INIT = """
+void {name}(byte *param_1,long param_2,int param_3)
+
+{{
+  byte bVar1;
+  int {i};
+  uint {j};
+
+  for ({i} = 0; {i} < 0x100; {i} = {i} + 1) {{
+    param_1[{i}] = (byte){i};
+  }}
+  {j} = 0;
+  for ({i} = 0; {i} < 0x100; {i} = {i} + 1) {{
+    {j} = (uint)param_1[{i}] + {j} + (uint)*(byte *)(param_2 + {i} % param_3) & 0xff;
+    bVar1 = param_1[{i}];
+    param_1[{i}] = param_1[(int){j}];
+    param_1[(int){j}] = bVar1;
+  }}
+  {ref} = {i};
+  return;
+}}
+"""
+
+CHECK = """
+int {name}(char *param_1)
+
+{{
+  size_t sVar1;
+  int local_c;
+
+  sVar1 = strlen(param_1);
+  if (sVar1 != 0x20) {{
+    puts("Wrong length");
+    return 0;
+  }}
+  for (local_c = 0; local_c < 0x20; local_c = local_c + 1) {{
+    if ((param_1[local_c] ^ 0x37) != (&DAT_00404060)[local_c]) {{
+      return 0;
+    }}
+  }}
+  return 1;
+}}
+"""
+
+
+def rc4(name, i="local_14", j="local_10", ref="DAT_004c6f20"):
+    return {"name": name, "address": "00402a10", "code": RC4_INIT.format(name=name, i=i, j=j, ref=ref)}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    sigs = FunctionSignatureDB(path=str(tmp_path / "libsigs.sqlite"))
+    monkeypatch.setattr(function_sigs, "_db", sigs)
+    assert sigs.add([rc4("rc4_set_key"), {"name": "FUN_00401000", "code": RC4_INIT}], "libcrypto-static-O0") == 1
+    yield sigs
+    sigs.close()
+
+
+def test_normalization_erases_build_specific_names():
+    a = normalize_tokens(rc4("rc4_set_key")["code"], "rc4_set_key")
+    b = normalize_tokens(rc4("FUN_00431c80", i="local_24", j="local_1c", ref="DAT_0049a010")["code"], "FUN_00431c80")
+    assert a == b and "V" in a and "DAT" in a and "0xff" in a
+
+
+def test_stripped_copy_is_recognized(db):
+    stripped = rc4("FUN_00431c80", i="local_24", j="local_1c", ref="DAT_0049a010")
+    match = db.match(stripped)
+    assert match == {"name": "rc4_set_key", "library": "libcrypto-static-O0", "similarity": 1.0}
+    assert db.match({"name": "FUN_00401236", "code": CHECK.format(name="FUN_00401236")}) is None
+
+
+def test_similarity_degrades_with_changes():
+    base = fingerprint(rc4("f"))
+    other = fingerprint({"name": "g", "code": CHECK.format(name="g")})
+    assert similarity(base, base) == 1.0 and similarity(base, other) < 0.3
+    assert fingerprint({"name": "tiny", "code": "int tiny(void)\n{\n  return 0;\n}\n"}) is None
+
+
+def test_duplicate_signatures_not_stored_twice(db):
+    assert db.add([rc4("rc4_set_key")], "libcrypto-static-O0") == 0
+    assert db.stats() == {"functions": 1, "libraries": {"libcrypto-static-O0": 1}}
+
+
+def test_analyze_binary_hides_library_functions(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "ghidra")))
+    export = [
+        {"name": "main", "address": "00401300", "code": "\nint main(void)\n\n{\n  return FUN_00401236(DAT_004c7000);\n}\n"},
+        {"name": "FUN_00401236", "address": "00401236", "code": CHECK.format(name="FUN_00401236")},
+        rc4("FUN_00431c80", i="local_24", j="local_1c", ref="DAT_0049a010"),
+    ]
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export", lambda *a, **kw: [dict(e) for e in export])
+    binary = tmp_path / "stripped_static"
+    binary.write_bytes(b"\x7fELF" + b"\x05" * 64)
+
+    result = reverse_ghidra.analyze_binary(str(binary), token_budget=0)
+    assert result["library_functions"] == {"FUN_00431c80": "rc4_set_key (libcrypto-static-O0)"}
+    assert {f["name"] for f in result["functions"]} == {"main", "FUN_00401236"}
+    assert "FUN_00431c80" not in [f["name"] for f in reverse_ghidra.list_functions(str(binary))["functions"]]
+    assert reverse_ghidra.decompile_function(str(binary), "FUN_00431c80")["library_match"].startswith("rc4_set_key")
+
+
+def test_missing_db_recognizes_nothing(tmp_path):
+    sigs = FunctionSignatureDB(path=str(tmp_path / "absent.sqlite"))
+    assert sigs.recognize([rc4("FUN_00431c80")]) == {}
+    assert not (tmp_path / "absent.sqlite").exists()
@@ -0,0 +1,197 @@
+import json
+import os
+import subprocess
+import threading
+import time
+import pytest
+from asas_mcp.tools import reverse_ghidra
+from asas_mcp.utils import ghidra_cache
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+
+EXPORT = [
+    {"name": "_start", "address": "00401000", "code": ""},
+    {"name": "main", "address": "00401136", "code": "int main(void) { return check_flag(); }"},
+    {"name": "check_flag", "address": "00401100", "code": "int check_flag(void) { return 0; }"},
+]
+
+
+@pytest.fixture
+def exports(tmp_path, monkeypatch):
+    cache = GhidraAnalysisCache(root=str(tmp_path / "ghidra"))
+    monkeypatch.setattr(ghidra_cache, "_cache", cache)
+    calls = []
+
+    def fake_export(path, mode="full", functions=None, on_function=None):
+        calls.append((path, mode))
+        time.sleep(0.05)
+        if mode == "targeted":
+            return reverse_ghidra._select([dict(e) for e in EXPORT], functions)
+        if mode == "metadata":
+            return [{"name": e["name"], "address": e["address"]} for e in EXPORT]
+        return [dict(e) for e in EXPORT]
+
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export", fake_export)
+    return calls
+
+
+@pytest.fixture
+def binary(tmp_path):
+    path = tmp_path / "chall"
+    path.write_bytes(b"\x7fELF" + b"\x01" * 64)
+    return str(path)
+
+
+def test_list_and_decompile_use_cheapest_mode(exports, binary, monkeypatch):
+    monkeypatch.setattr(reverse_ghidra.get_ghidra_pool(), "available", lambda: True)  # warm service workers
+    assert reverse_ghidra.list_functions(binary)["user_functions"] == 2
+    for name in ("main", "check_flag", "main", "0x401136"):
+        assert "(void)" in reverse_ghidra.decompile_function(binary, name)["code"]
+    modes = [mode for _, mode in exports]
+    assert modes == ["metadata", "targeted", "targeted", "targeted"]
+
+
+def test_one_shot_decompiles_from_one_full_export(exports, binary, monkeypatch):
+    monkeypatch.setattr(reverse_ghidra.get_ghidra_pool(), "available", lambda: False)
+    for name in ("main", "check_flag", "0x401136"):
+        assert "(void)" in reverse_ghidra.decompile_function(binary, name)["code"]
+    assert [mode for _, mode in exports] == ["full"]
+    assert reverse_ghidra.analyze_binary(binary)["functions"] and len(exports) == 1
+
+
+def test_cached_full_export_answers_every_mode(exports, binary):
+    reverse_ghidra.analyze_binary(binary)
+    listing = reverse_ghidra.list_functions(binary)
+    assert "code" not in listing["functions"][0]
+    assert reverse_ghidra.decompile_function(binary, "00401100")["name"] == "check_flag"
+    assert len(exports) == 1
+
+
+def test_missing_function_lists_available(exports, binary):
+    result = reverse_ghidra.decompile_function(binary, "nope")
+    assert result["available_functions"] == ["main", "check_flag"]
+
+
+def test_disk_tier_survives_restart_and_is_fast(exports, binary, tmp_path, monkeypatch):
+    reverse_ghidra.analyze_binary(binary)
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "ghidra")))
+
+    start = time.perf_counter()
+    result = reverse_ghidra.analyze_binary(binary)
+    assert time.perf_counter() - start < 0.05
+    assert result["total_functions"] == 3
+    assert len(exports) == 1
+
+
+def test_changed_binary_or_script_invalidates(exports, binary, monkeypatch):
+    reverse_ghidra.analyze_binary(binary)
+    with open(binary, "ab") as f:
+        f.write(b"patched")
+    reverse_ghidra.analyze_binary(binary)
+    monkeypatch.setattr(reverse_ghidra, "_export_version", lambda: "v2")
+    reverse_ghidra.analyze_binary(binary)
+    assert len(exports) == 3
+
+
+def test_corrupt_entry_is_discarded(tmp_path):
+    cache = GhidraAnalysisCache(root=str(tmp_path), memory_entries=0)
+    cache.put("k" * 8, EXPORT)
+    data_path, _ = cache._paths("k" * 8)
+    with open(data_path, "r+b") as f:
+        f.seek(20)
+        f.write(b"\x00\x00\x00")
+    assert cache.get("k" * 8) is None
+    assert cache.stats["corrupt"] == 1
+
+
+def test_size_bounded_eviction(tmp_path):
+    cache = GhidraAnalysisCache(root=str(tmp_path), max_bytes=2500, memory_entries=0)
+    for i in range(10):
+        cache.put(f"key{i:02d}xx", [{"name": f"f{j}", "code": os.urandom(200).hex()} for j in range(2)])
+        time.sleep(0.01)
+    assert cache.disk_bytes() <= 2500
+    assert cache.get("key09xx") is not None
+    assert cache.get("key00xx") is None
+
+
+def test_concurrent_requests_share_one_analysis(exports, binary):
+    threads = [threading.Thread(target=reverse_ghidra.list_functions, args=(binary,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(exports) == 1
+
+
+def test_errors_are_not_cached(tmp_path, monkeypatch, binary):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "g")))
+    calls = []
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export",
+                        lambda p, *a, **kw: calls.append(p) or {"error": "Ghidra produced no output"})
+    reverse_ghidra.analyze_binary(binary)
+    reverse_ghidra.analyze_binary(binary)
+    assert len(calls) == 2
+
+
+def test_oneshot_streams_jsonl_before_ghidra_exits(tmp_path, monkeypatch, binary):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "g")))
+    monkeypatch.setattr(reverse_ghidra.get_ghidra_pool(), "enabled", False)
+    seen = []
+
+    def fake_docker(cmd, **kwargs):
+        data_dir = cmd[cmd.index("-v") + 1].split(":")[0]
+        with open(os.path.join(data_dir, "output.jsonl"), "w") as out:
+            for entry in EXPORT[::-1]:  # main is not last in address order...
+                out.write(json.dumps(entry) + "\n")
+                out.flush()
+                time.sleep(0.3)
+                seen.append(("written", entry["name"]))
+            out.write(json.dumps({"done": len(EXPORT)}))  # no trailing newline
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(reverse_ghidra, "run_process", fake_docker)
+    raw = reverse_ghidra.export_binary(binary, on_function=lambda e: seen.append(("streamed", e["name"])))
+    assert [e["name"] for e in raw] == ["check_flag", "main", "_start"]
+    # ...each function reaches the caller before Ghidra has finished writing the next
+    assert seen.index(("streamed", "check_flag")) < seen.index(("written", "check_flag"))
+    assert seen.index(("streamed", "main")) < seen.index(("written", "main"))
+
+    # A cache hit replays the entries
+    replay = []
+    reverse_ghidra.export_binary(binary, on_function=lambda e: replay.append(e["name"]))
+    assert replay == ["check_flag", "main", "_start"]
+
+
+@pytest.mark.parametrize("returncode, trailer", [
+    (0, ""),  # killed before the end marker
+    (0, json.dumps({"done": 5}) + "\n"),  # fewer entries than the marker counts
+    (1, json.dumps({"done": 3}) + "\n"),  # the script failed
+])
+def test_truncated_oneshot_export_is_an_error_and_not_cached(tmp_path, monkeypatch, binary, returncode, trailer):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "g")))
+    monkeypatch.setattr(reverse_ghidra.get_ghidra_pool(), "enabled", False)
+    runs = []
+
+    def fake_docker(cmd, **kwargs):
+        runs.append(cmd)
+        data_dir = cmd[cmd.index("-v") + 1].split(":")[0]
+        with open(os.path.join(data_dir, "output.jsonl"), "w") as out:
+            out.write("".join(json.dumps(e) + "\n" for e in EXPORT) + trailer)
+        return subprocess.CompletedProcess(cmd, returncode, "", "decompiler crashed")
+
+    monkeypatch.setattr(reverse_ghidra, "run_process", fake_docker)
+    assert "error" in reverse_ghidra.export_binary(binary)
+    assert "error" in reverse_ghidra.export_binary(binary)
+    assert len(runs) == 2
+
+
+@pytest.mark.asyncio
+async def test_export_job_emits_main_early(exports, binary):
+    from asas_mcp.executors.jobs import JobManager
+
+    manager = JobManager(max_workers=1)
+    job = manager.submit("ghidra", lambda ctx: reverse_ghidra.export_job(ctx, binary))
+    snap = await manager.wait(job.id, until="main", timeout=5)
+    main = next(e for e in snap["events"] if e["type"] == "main")
+    assert main["data"]["code"].startswith("int main")
+    final = await manager.wait(job.id, timeout=5)
+    assert final["result"]["user_functions"] == 2
@@ -0,0 +1,171 @@
+from asas_mcp.tools import reverse_ghidra
+from asas_mcp.tools.ghidra_compress import compress_code, compress_functions, prune_declarations, strip_casts
+from asas_mcp.tools.ghidra_rank import estimate_tokens
+from asas_mcp.utils import ghidra_cache
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+
+# Ghidra 11 output for tests/fixtures/simple_reverse (gcc -no-pie)
+CHECK_FLAG = """
+/* WARNING: Unknown calling convention -- yet parameter storage is locked */
+
+void check_flag(char *param_1)
+
+{
+  int iVar1;
+  size_t sVar2;
+  long in_FS_OFFSET;
+  int local_3c;
+  undefined8 local_38;
+  undefined8 local_30;
+  undefined8 local_28;
+  undefined local_20;
+  undefined4 local_1c;
+  long local_10;
+
+  local_10 = *(long *)(in_FS_OFFSET + 0x28);
+  local_38 = 0x1d3072393a25232e;
+  local_30 = 0x7130713471301d30;
+  local_28 = 0x3f30713631762f1d;
+  local_20 = 0;
+  sVar2 = strlen((char *)&local_38);
+  iVar1 = (int)sVar2;
+  sVar2 = strlen(param_1);
+  if ((int)sVar2 == iVar1) {
+    for (local_3c = 0; local_3c < iVar1; local_3c = local_3c + 1) {
+      if ((byte)(param_1[local_3c] ^ 0x42U) != *(byte *)((long)&local_38 + (long)local_3c)) {
+        printf("Wrong! Try harder.\\n");
+        goto LAB_004011f6;
+      }
+    }
+    printf("Correct! You got the flag!\\n");
+  }
+  else {
+    printf("Wrong length! Expected %d characters.\\n",(ulong)(uint)iVar1);
+  }
+LAB_004011f6:
+  if (local_10 != *(long *)(in_FS_OFFSET + 0x28)) {
+                    /* WARNING: Subroutine does not return */
+    __stack_chk_fail();
+  }
+  return;
+}
+"""
+
+MAIN = """
+undefined8 main(void)
+
+{
+  size_t sVar1;
+  long in_FS_OFFSET;
+  undefined8 uVar2;
+  char local_98 [136];
+  long local_10;
+
+  local_10 = *(long *)(in_FS_OFFSET + 0x28);
+  printf("Enter the flag: ");
+  fgets(local_98,0x80,stdin);
+  sVar1 = strlen(local_98);
+  if ((0 < (int)sVar1) && (local_98[(int)sVar1 + -1] == '\\n')) {
+    local_98[(int)sVar1 + -1] = '\\0';
+  }
+  check_flag(local_98);
+  if (local_10 != *(long *)(in_FS_OFFSET + 0x28)) {
+                    /* WARNING: Subroutine does not return */
+    __stack_chk_fail();
+  }
+  return 0;
+}
+"""
+
+
+def _thunk(name):
+    return f"\nvoid {name}(void)\n\n{{\n                    /* WARNING: Could not recover jumptable. Too many branches */\n  (*(code *)PTR_{name}_00404018)();\n  return;\n}}\n"
+
+
+EXPORT = [
+    {"name": "check_flag", "address": "00401176", "code": CHECK_FLAG},
+    {"name": "main", "address": "00401220", "code": MAIN},
+    {"name": "frame_helper_a", "address": "00401300", "code": "\nint frame_helper_a(int param_1)\n\n{\n  return param_1 * 2;\n}\n"},
+    {"name": "frame_helper_b", "address": "00401320", "code": "\nint frame_helper_b(int param_1)\n\n{\n  return param_1 * 2;\n}\n"},
+]
+
+
+def test_casts_only_dropped_where_harmless():
+    out = strip_casts(CHECK_FLAG)
+    # size_t -> int truncates, int -> uint -> ulong changes signedness and width
+    assert "iVar1 = (int)sVar2;" in out and ",(ulong)(uint)iVar1);" in out
+    # pointer arithmetic and truncation casts keep their meaning
+    assert "*(byte *)((long)&local_38 + (long)local_3c)" in out
+    assert "(byte)(param_1[local_3c] ^ 0x42U)" in out
+    assert "strlen((char *)&local_38)" in out
+
+
+def test_casts_dropped_only_between_identical_types():
+    code = "\nint f(int param_1,uint param_2)\n\n{\n  char cVar1;\n\n" \
+           "  return (int)param_1 + (uint)param_2 + (int)7 + (uint)7 + (int)0xffffffff + (char)cVar1 +" \
+           " (char)param_1 + (int)param_2 + (uint)param_1 >> 0x1f;\n}\n"
+    out = strip_casts(code)
+    assert "return param_1 + param_2 + 7 + (uint)7 + (int)0xffffffff + cVar1 +" in out
+    assert "(char)param_1 + (int)param_2 + (uint)param_1 >> 0x1f;" in out
+
+
+def test_literals_and_comments_untouched():
+    code = "\nint f(int param_1)\n\n{\n  char cVar1;\n\n  /* byte count: (int)param_1 */\n" \
+           "  puts(\"Enter the secret word, one byte at a time\");\n" \
+           "  puts(\"flag{this_is_a_really_long_flag_body}\");\n" \
+           "  return (char)cVar1 == '\\'' && g_a_really_long_global_identifier == param_1;\n}\n"
+    out = compress_code(code)
+    assert '"Enter the secret word, one byte at a time"' in out and "(int)param_1 */" in out
+    assert "return cVar1 == '\\'' && " in out
+    result = compress_functions([{"name": "f", "code": code}], abbreviate_identifiers=True)
+    code = result["functions"][0]["code"]
+    assert '"flag{this_is_a_really_long_flag_body}"' in code and "id1 == p1" in code
+    assert result["identifiers"] == {"id1": "g_a_really_long_global_identifier"}
+
+
+def test_unused_declarations_removed_and_merged():
+    out = prune_declarations(CHECK_FLAG)
+    assert "local_1c" not in out
+    assert "  undefined8 local_38, local_30, local_28;" in out
+    assert "  int iVar1, local_3c;" in out
+    assert "char local_98[136];" in prune_declarations(MAIN)
+
+
+def test_compress_code_reduces_tokens():
+    before = estimate_tokens(CHECK_FLAG) + estimate_tokens(MAIN)
+    after = estimate_tokens(compress_code(CHECK_FLAG)) + estimate_tokens(compress_code(MAIN))
+    assert after <= 0.9 * before
+    out = compress_code(CHECK_FLAG)
+    assert "Unknown calling convention" not in out and "does not return" in out
+    assert "u64 local_38" in out and not out.rstrip().endswith("return;\n}")
+    assert compress_code(MAIN).startswith("u64 main(void)\n{")
+
+
+def test_identical_bodies_deduplicated():
+    out = compress_functions(EXPORT)["functions"]
+    assert out[3] == {"name": "frame_helper_b", "address": "00401320", "code": "", "same_as": "frame_helper_a"}
+    thunks = compress_functions([{"name": n, "code": _thunk(n)} for n in ("puts", "printf")])["functions"]
+    assert "same_as" not in thunks[1]  # different PLT slots are different code
+
+
+def test_abbreviation_keeps_function_names():
+    long_name = "verify_license_key_checksum_v2"
+    entries = [{"name": long_name, "code": f"\nint {long_name}(int param_1)\n\n{{\n  return g_license_checksum_table_v2[param_1];\n}}\n"}]
+    result = compress_functions(entries, abbreviate_identifiers=True)
+    code = result["functions"][0]["code"]
+    assert code.startswith(f"int {long_name}(int p1)")
+    assert result["identifiers"] == {"id1": "g_license_checksum_table_v2"} and "id1[p1]" in code
+
+
+def test_analyze_binary_returns_compressed_code(tmp_path, monkeypatch):
+    monkeypatch.setattr(reverse_ghidra, "COMPRESS_OUTPUT", True)
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "ghidra")))
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export", lambda *a, **kw: [dict(e) for e in EXPORT])
+    binary = tmp_path / "simple_reverse"
+    binary.write_bytes(b"\x7fELF" + b"\x04" * 64)
+
+    result = reverse_ghidra.analyze_binary(str(binary), token_budget=0)
+    assert result["duplicates"] == {"frame_helper_b": "frame_helper_a"}
+    assert {f["name"] for f in result["functions"][:2]} == {"main", "check_flag"}
+    assert all("undefined8" not in f["code"] for f in result["functions"])
+    assert "undefined" not in reverse_ghidra.decompile_function(str(binary), "check_flag")["code"]
@@ -0,0 +1,122 @@
+import threading
+import pytest
+from asas_mcp.tools import reverse_ghidra
+from asas_mcp.utils import ghidra_cache
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+from asas_mcp.utils.ghidra_index import GhidraIndex, build_index, normalize_address
+
+
+def _call(caller, caller_addr, site, callee, callee_addr):
+    return {"k": "ref", "kind": "call", "from_func": caller, "from_func_addr": caller_addr, "site": site,
+            "to_addr": callee_addr, "to_name": callee, "type": "UNCONDITIONAL_CALL"}
+
+
+RECORDS = [
+    _call("main", "00401136", "00401150", "check_flag", "00401100"),
+    _call("main", "00401136", "00401160", "puts", "00401030"),
+    _call("check_flag", "00401100", "00401110", "strcmp", "00401040"),
+    _call("check_flag", "00401100", "00401120", "strcmp", "00401040"),
+    _call("verify", "00401200", "00401210", "check_flag", "00401100"),
+    {"k": "ref", "kind": "string", "from_func": "check_flag", "from_func_addr": "00401100", "site": "00401108",
+     "to_addr": "00402010", "to_name": "s_flag_prefix", "type": "DATA", "value": "flag{"},
+    {"k": "ref", "kind": "string", "from_func": "main", "from_func_addr": "00401136", "site": "00401158",
+     "to_addr": "00402020", "to_name": "s_Correct", "type": "DATA", "value": "Correct!"},
+    {"k": "ref", "kind": "data", "from_func": "check_flag", "from_func_addr": "00401100", "site": "0040110c",
+     "to_addr": "00404040", "to_name": "key", "type": "READ"},
+    {"k": "string", "addr": "00402010", "value": "flag{"},
+    {"k": "string", "addr": "00402020", "value": "Correct!"},
+    {"k": "string", "addr": "00402030", "value": "Wrong"},
+    {"k": "import", "name": "strcmp", "library": "libc.so.6"},
+    {"k": "import", "name": "puts", "library": "libc.so.6"},
+    {"k": "export", "name": "_start", "addr": "00401000"},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    db = str(tmp_path / "index.sqlite")
+    counts = build_index(RECORDS, db)
+    assert counts == {"refs": 8, "strings": 3, "imports": 2, "exports": 1}
+    with GhidraIndex(db) as idx:
+        yield idx
+
+
+def test_normalize_address():
+    assert normalize_address("0x401136") == normalize_address("ram:00401136") == "401136"
+    assert normalize_address("main") is None
+
+
+def test_xrefs_by_name_address_and_string(index):
+    by_name = index.xrefs_to("strcmp")
+    assert [r["site"] for r in by_name] == ["401110", "401120"]
+    assert index.xrefs_to("0x404040")[0]["from_func"] == "check_flag"
+    assert index.xrefs_to("Correct!")[0]["from_func"] == "main"
+
+
+def test_callers_transitive(index):
+    direct = index.callers("strcmp")
+    assert [(r["caller"], r["call_sites"], r["depth"]) for r in direct] == [("check_flag", 2, 1)]
+    deep = index.callers("strcmp", depth=2)
+    assert {(r["caller"], r["depth"]) for r in deep} == {("check_flag", 1), ("main", 2), ("verify", 2)}
+    assert index.callers("0x401100")[0]["callee"] == "check_flag"
+
+
+def test_strings_with_referencing_functions(index):
+    rows = index.strings("FLAG")
+    assert rows == [{"addr": "402010", "value": "flag{", "functions": ["check_flag"]}]
+    assert [r["value"] for r in index.strings()] == ["flag{", "Correct!", "Wrong"]
+    assert index.strings("Wrong")[0]["functions"] == []
+
+
+@pytest.fixture
+def indexed(tmp_path, monkeypatch):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "ghidra")))
+    calls = []
+
+    def fake_export(path, mode="full", functions=None, on_function=None):
+        calls.append(mode)
+        return [dict(r) for r in RECORDS]
+
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export", fake_export)
+    binary = tmp_path / "chall"
+    binary.write_bytes(b"\x7fELF" + b"\x02" * 64)
+    return str(binary), calls
+
+
+def test_queries_share_one_index_build(indexed):
+    binary, calls = indexed
+    assert reverse_ghidra.callers(binary, "check_flag")["count"] == 2
+    assert reverse_ghidra.xrefs_to(binary, "puts")["xrefs"][0]["from_func"] == "main"
+    result = reverse_ghidra.strings(binary)
+    assert result["count"] == 3 and {i["name"] for i in result["imports"]} == {"strcmp", "puts"}
+    assert calls == ["index"]
+
+
+def test_concurrent_first_queries_build_once(indexed):
+    binary, calls = indexed
+    threads = [threading.Thread(target=reverse_ghidra.strings, args=(binary, "flag")) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["index"]
+
+
+def test_corrupt_index_is_rebuilt(indexed):
+    binary, calls = indexed
+    with reverse_ghidra.binary_index(binary) as idx:
+        path = idx.db_path
+    with open(path, "r+b") as f:
+        f.seek(100)
+        f.write(b"\xff" * 16)
+    fresh = GhidraAnalysisCache(root=ghidra_cache.get_ghidra_cache().root)  # new process: verifies again
+    ghidra_cache._cache = fresh
+    assert reverse_ghidra.callers(binary, "strcmp")["count"] == 1
+    assert calls == ["index", "index"] and fresh.stats["corrupt"] == 1
+
+
+def test_index_errors_are_not_cached(indexed, monkeypatch):
+    binary, _ = indexed
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export", lambda *a, **kw: {"error": "Ghidra produced no output"})
+    assert reverse_ghidra.xrefs_to(binary, "main") == {"error": "Ghidra produced no output"}
+    assert reverse_ghidra.binary_index(binary + ".missing")["error"].startswith("File not found")
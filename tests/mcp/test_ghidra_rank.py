@@ -0,0 +1,106 @@
+import pytest
+from asas_mcp.tools import ghidra_rank, reverse_ghidra
+from asas_mcp.tools.ghidra_rank import estimate_tokens, rank_functions, select_functions
+from asas_mcp.utils import ghidra_cache
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+
+MAIN = """int main(void)
+{
+  char buf[64];
+  puts("Input the flag:");
+  read(0, buf, 0x40);
+  if (check(buf) == 0) {
+    puts("Wrong!");
+    return 1;
+  }
+  puts("Correct!");
+  return 0;
+}
+"""
+
+CHECK = """int check(char *s)
+{
+  int i;
+  for (i = 0; i < 32; i = i + 1) {
+    if ((s[i] ^ key[i]) != enc[i]) {
+      return 0;
+    }
+  }
+  return memcmp(s, "flag{", 5) == 0;
+}
+"""
+
+TEA = """void encrypt(uint *v, uint *k)
+{
+  uint sum = 0;
+  int i;
+  for (i = 0; i < 32; i = i + 1) {
+    sum = sum + 0x9e3779b9;
+    v[0] = v[0] + ((v[1] << 4) + k[0] ^ v[1] + sum ^ (v[1] >> 5) + k[1]);
+  }
+  return;
+}
+"""
+
+FILLER = "void helper_{i}(void)\n{{\n  counter = counter + {i};\n  counter = counter * 3;\n  log_value(counter);\n  return;\n}}\n"
+
+
+def _entries(n_filler=40):
+    entries = [{"name": f"helper_{i}", "address": f"{0x401000 + i * 0x40:08x}", "code": FILLER.format(i=i)}
+               for i in range(n_filler)]
+    entries += [
+        {"name": "encrypt", "address": "00402000", "code": TEA},
+        {"name": "check", "address": "00402100", "code": CHECK},
+        {"name": "main", "address": "00402200", "code": MAIN},
+        {"name": "thunk_puts", "address": "00402300", "code": "void thunk_puts(void)\n{\n  puts();\n}\n"},
+    ]
+    return entries
+
+
+def test_signals_rank_interesting_functions_first():
+    ranked = rank_functions(_entries())
+    assert [e["name"] for e in ranked[:3]] == ["main", "check", "encrypt"]
+    check = next(e for e in ranked if e["name"] == "check")
+    assert any(s.startswith("calls: memcmp") for s in check["signals"])
+    assert "reachable from main (depth 1)" in check["signals"]
+    encrypt = next(e for e in ranked if e["name"] == "encrypt")
+    assert "crypto: tea/xtea" in encrypt["signals"]
+    assert ranked[-1]["name"] == "thunk_puts"
+
+
+def test_budget_bounds_returned_code():
+    entries = _entries()
+    everything = sum(estimate_tokens(e["code"]) for e in entries)
+    result = select_functions(entries, token_budget=300)
+    assert result["estimated_tokens"] <= 300 < everything
+    assert result["functions"][0]["name"] == "main"
+    assert len(result["functions"]) + len(result["omitted"]) == len(entries)
+    assert set(result["omitted"][0]) == {"name", "address", "score"}
+
+
+def test_top_k_and_oversized_best_function():
+    assert [f["name"] for f in select_functions(_entries(), token_budget=0, top_k=2)["functions"]] == ["main", "check"]
+    # The best function is returned even when it alone exceeds the budget
+    assert [f["name"] for f in select_functions(_entries(), token_budget=10)["functions"]] == ["main"]
+
+
+def test_analyze_binary_applies_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "ghidra")))
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_export",
+                        lambda *a, **kw: [{"name": "_start", "address": "00401000", "code": ""}] + _entries())
+    binary = tmp_path / "chall"
+    binary.write_bytes(b"\x7fELF" + b"\x03" * 64)
+
+    result = reverse_ghidra.analyze_binary(str(binary), token_budget=400)
+    assert result["user_functions"] == 44 and result["total_functions"] == 45
+    assert result["functions"][0]["name"] == "main" and result["estimated_tokens"] <= 400
+    assert len(result["functions"]) + len(result["omitted"]) == 44
+
+    unbounded = reverse_ghidra.analyze_binary(str(binary), token_budget=0)
+    assert unbounded["omitted"] == [] and len(unbounded["functions"]) == 44
+
+
+@pytest.mark.parametrize("name", ["__isoc99_scanf", "_strcmp"])
+def test_prefixed_library_calls_are_recognized(name):
+    info = ghidra_rank.score_function({"name": "f", "code": f"void f(void)\n{{\n  {name}(a, b);\n}}\n"})
+    assert info["signals"][0].startswith("calls: ")
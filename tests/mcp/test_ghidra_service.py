@@ -0,0 +1,204 @@
+import json
+import socketserver
+import threading
+import time
+import pytest
+from asas_mcp.executors import ghidra_service
+from asas_mcp.executors.ghidra_service import (
+    GhidraServiceError, GhidraServicePool, GhidraServiceUnavailable, GhidraWorker,
+)
+from asas_mcp.tools import reverse_ghidra
+from asas_mcp.utils import ghidra_cache
+from asas_mcp.utils.ghidra_cache import GhidraAnalysisCache
+
+FUNCTIONS = [
+    {"name": "_start", "address": "00401000", "code": ""},
+    {"name": "main", "address": "00401136", "code": "int main(void) { return check(); }"},
+    {"name": "check", "address": "00401100", "code": "int check(void) { return 0; }"},
+]
+
+
+class FakeGhidraService(socketserver.ThreadingTCPServer):
+    """Speaks the GhidraService.java protocol; 'analysis' takes `delay` seconds once per program."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.analyzed = []
+        self.ops = []
+        self.lock = threading.Lock()  # the real service handles one connection at a time
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class FakeHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            req = json.loads(line)
+            with self.server.lock:
+                self.server.ops.append(req["op"])
+                try:
+                    result = self.dispatch(req)
+                    if req["op"] in ("export", "decompile"):
+                        # streamed: one item per function, then the count
+                        for item in result:
+                            self.wfile.write((json.dumps({"item": item}) + "\n").encode())
+                        reply = {"ok": True, "streamed": len(result)}
+                    else:
+                        reply = {"ok": True, "result": result}
+                except KeyError as e:
+                    reply = {"ok": False, "error": f"IllegalArgumentException: unknown function {e}"}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+    def dispatch(self, req):
+        op = req["op"]
+        if op == "ping":
+            return {"open": list(self.server.analyzed)}
+        if req["program"] not in self.server.analyzed:
+            time.sleep(self.server.delay)
+            self.server.analyzed.append(req["program"])
+        if op == "export":
+            return FUNCTIONS
+        if op == "list":
+            return [{k: v for k, v in f.items() if k != "code"} for f in FUNCTIONS]
+        if op == "decompile":
+            by_name = {f["name"]: f for f in FUNCTIONS}
+            return [by_name[name] for name in req["functions"]]
+        if op == "xrefs":
+            return [{"from_address": "00401140", "from_function": "main", "type": "UNCONDITIONAL_CALL"}]
+        raise KeyError(op)
+
+
+@pytest.fixture
+def services():
+    servers = [FakeGhidraService(delay=0.3), FakeGhidraService(delay=0.3)]
+    yield servers
+    for s in servers:
+        s.shutdown()
+        s.server_close()
+
+
+@pytest.fixture
+def pool(services, tmp_path):
+    workers = [GhidraWorker(i, s.port, service_dir=str(tmp_path), managed=False) for i, s in enumerate(services)]
+    return GhidraServicePool(workers=workers, service_dir=str(tmp_path))
+
+
+def _binaries(tmp_path, pool):
+    """Two binaries that are routed to different workers."""
+    seen = {}
+    i = 0
+    while len(seen) < 2:
+        path = tmp_path / f"bin{i}"
+        path.write_bytes(b"\x7fELF" + bytes([i]) * 64)
+        worker = pool.worker_for(ghidra_cache.file_digest(str(path)))
+        seen.setdefault(worker.index, str(path))
+        i += 1
+    return seen[0], seen[1]
+
+
+def test_programs_stay_warm_on_their_worker(pool, services, tmp_path):
+    binary, _ = _binaries(tmp_path, pool)
+    assert pool.export(binary) == FUNCTIONS
+    start = time.perf_counter()
+    assert pool.decompile(binary, ["main"])[0]["name"] == "main"
+    assert pool.xrefs(binary, "check")[0]["from_function"] == "main"
+    assert time.perf_counter() - start < 0.25  # no second analysis
+    assert len(services[0].analyzed) == 1 and services[1].ops == []
+
+
+def test_export_streams_functions(pool, tmp_path):
+    binary, _ = _binaries(tmp_path, pool)
+    seen = []
+    assert pool.export(binary, on_function=lambda f: seen.append(f["name"])) == FUNCTIONS
+    assert seen == [f["name"] for f in FUNCTIONS]
+
+
+def test_different_binaries_are_analyzed_in_parallel(pool, services, tmp_path):
+    a, b = _binaries(tmp_path, pool)
+    start = time.perf_counter()
+    threads = [threading.Thread(target=pool.export, args=(p,)) for p in (a, b)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - start < 0.55
+    assert [len(s.analyzed) for s in services] == [1, 1]
+
+
+def test_binary_is_staged_by_sha256(pool, tmp_path):
+    binary, _ = _binaries(tmp_path, pool)
+    pool.export(binary)
+    digest = ghidra_cache.file_digest(binary)
+    assert (tmp_path / "bin" / digest).read_bytes() == open(binary, "rb").read()
+
+
+def test_remote_errors_are_not_unavailability(pool, tmp_path):
+    binary, _ = _binaries(tmp_path, pool)
+    with pytest.raises(GhidraServiceError) as exc:
+        pool.decompile(binary, ["nope"])
+    assert not isinstance(exc.value, GhidraServiceUnavailable)
+    assert pool.available()
+
+
+def test_reverse_ghidra_uses_pool_and_falls_back(monkeypatch, pool, services, tmp_path):
+    monkeypatch.setattr(ghidra_cache, "_cache", GhidraAnalysisCache(root=str(tmp_path / "cache")))
+    monkeypatch.setattr(ghidra_service, "_pool", pool)
+    binary, _ = _binaries(tmp_path, pool)
+
+    result = reverse_ghidra.decompile_function(binary, "main")
+    assert result["code"].startswith("int main")
+
+    # Worker gone: the one-shot container path takes over
+    for s in services:
+        s.shutdown()
+        s.server_close()
+    oneshot = []
+    monkeypatch.setattr(reverse_ghidra, "_run_ghidra_oneshot", lambda path, *a: oneshot.append(path) or FUNCTIONS)
+    other = tmp_path / "other"
+    other.write_bytes(b"different")
+    assert reverse_ghidra.list_functions(str(other))["user_functions"] == 2
+    assert oneshot == [str(other)]
+    assert not pool.available()  # backs off instead of retrying every call
+
+
+@pytest.mark.asyncio
+async def test_timed_out_call_releases_the_worker(monkeypatch, tmp_path):
+    from asas_mcp.executors import tool_runner
+    from asas_mcp.executors.tool_runner import ToolFamily, ToolRunner, ToolTimeout, offloaded
+    monkeypatch.setattr(tool_runner, "TOOL_FAMILIES", {
+        "ghidra": ToolFamily(max_concurrency=2, timeout=0.3), "default": ToolFamily(max_concurrency=4, timeout=5)})
+    monkeypatch.setattr(tool_runner, "_runner", ToolRunner(max_workers=2))
+    hung = FakeGhidraService(delay=30)  # analysis outlives the family timeout
+    try:
+        worker = GhidraWorker(0, hung.port, service_dir=str(tmp_path), managed=False)
+        pool = GhidraServicePool(workers=[worker], service_dir=str(tmp_path))
+        binary = tmp_path / "chall"
+        binary.write_bytes(b"\x7fELF")
+
+        @offloaded("ghidra")
+        def export():
+            return pool.export(str(binary))
+
+        start = time.perf_counter()
+        with pytest.raises(ToolTimeout):
+            await export()
+        # the socket read was aborted, so the worker lock is free again within the cancel grace
+        assert worker.lock.acquire(timeout=1)
+        worker.lock.release()
+        assert time.perf_counter() - start < 2
+        assert pool.available()  # a timeout is not an unreachable worker
+    finally:
+        tool_runner.get_tool_runner().shutdown()
+        hung.shutdown()
+        hung.server_close()
+
+
+def test_request_timeout_follows_the_ghidra_family():
+    from asas_mcp.executors.tool_runner import family_limits
+    assert ghidra_service.REQUEST_TIMEOUT <= (family_limits("ghidra").timeout or float("inf"))
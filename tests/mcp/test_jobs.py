@@ -0,0 +1,114 @@
+import asyncio
+import time
+import pytest
+from asas_mcp.executors.jobs import JobManager, JobError, parse_condition
+from asas_mcp.executors.tool_runner import run_process
+
+
+@pytest.fixture
+def manager():
+    return JobManager(max_workers=2)
+
+
+def fake_fuzzer(ctx, rounds=5, crash_at=3):
+    for i in range(1, rounds + 1):
+        if not ctx.sleep(0.05):
+            return {"stopped": i}
+        ctx.progress(total_paths=i * 10, unique_crashes=int(i >= crash_at))
+        if i == crash_at:
+            ctx.event("crash", files=[f"id:00000{i}"])
+    return {"rounds": rounds}
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_on_event_before_job_finishes(manager):
+    job = manager.submit("fuzz", lambda ctx: fake_fuzzer(ctx, rounds=40, crash_at=3))
+
+    snap = await manager.wait(job.id, until="crash", timeout=5)
+    assert snap["condition_met"] and snap["status"] == "running"
+    assert [e["type"] for e in snap["events"]] == ["started", "crash"]
+    assert snap["metrics"]["unique_crashes"] == 1
+
+    manager.cancel(job.id)
+    final = await manager.wait(job.id, timeout=5)
+    assert final["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_metric_condition_and_done(manager):
+    job = manager.submit("fuzz", fake_fuzzer)
+    snap = await manager.wait(job.id, until="total_paths >= 20", timeout=5)
+    assert snap["condition_met"] and snap["metrics"]["total_paths"] >= 20
+
+    final = await manager.wait(job.id, until="done", timeout=5, since=snap["next_since"])
+    assert final["status"] == "succeeded"
+    assert final["result"] == {"rounds": 5}
+    assert all(e["seq"] > snap["next_since"] for e in final["events"])
+
+
+@pytest.mark.asyncio
+async def test_wait_streams_events_to_callback(manager):
+    seen = []
+
+    async def on_event(job, event):
+        seen.append(event["type"])
+
+    job = manager.submit("fuzz", fake_fuzzer)
+    await manager.wait(job.id, timeout=5, on_event=on_event)
+    assert seen[0] == "started" and seen[-1] == "done"
+    assert "crash" in seen and seen.count("progress") == 5
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_returns_current_state(manager):
+    job = manager.submit("slow", lambda ctx: ctx.sleep(5))
+    start = time.perf_counter()
+    snap = await manager.wait(job.id, until="done", timeout=0.2)
+    assert time.perf_counter() - start < 1
+    assert snap["timed_out"] and snap["status"] == "running"
+    manager.cancel(job.id)
+
+
+@pytest.mark.asyncio
+async def test_cancel_kills_job_processes(manager):
+    job = manager.submit("proc", lambda ctx: run_process(["sleep", "30"]).returncode)
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    manager.cancel(job.id)
+    snap = await manager.wait(job.id, timeout=5)
+    assert snap["status"] == "cancelled"
+    assert time.perf_counter() - start < 3
+
+
+@pytest.mark.asyncio
+async def test_async_job_failure_is_reported(manager):
+    async def broken():
+        raise RuntimeError("docker not available")
+
+    job = manager.submit_async("kali_sqlmap", broken())
+    snap = await manager.wait(job.id, timeout=5)
+    assert snap["status"] == "failed"
+    assert "docker not available" in snap["error"]
+
+
+def test_bad_condition_and_unknown_job(manager):
+    with pytest.raises(JobError):
+        parse_condition("1 + 1")
+    with pytest.raises(JobError):
+        manager.get("job_missing")
+
+
+@pytest.mark.asyncio
+async def test_langchain_job_tools_start_then_wait_once(manager, monkeypatch):
+    import json
+    from asas_mcp.executors import jobs
+    from asas_mcp.tools import job_tools, pwn_fuzz
+    monkeypatch.setattr(jobs, "_manager", manager)
+    monkeypatch.setattr(pwn_fuzz, "fuzz_job", lambda ctx, path, duration_sec: fake_fuzzer(ctx, rounds=40))
+
+    started = json.loads(await job_tools.fuzz_job_start.ainvoke({"binary_path": "/tmp/chall", "duration_sec": 5}))
+    assert started["kind"] == "fuzz" and manager.get(started["job_id"]).params["binary"] == "chall"
+    snap = json.loads(await job_tools.job_wait.ainvoke({"job_id": started["job_id"], "until": "crash", "timeout": 5}))
+    assert snap["condition_met"] and snap["events"][-1]["type"] == "crash"
+    manager.cancel(started["job_id"])
+    assert (await manager.wait(started["job_id"], timeout=5))["status"] == "cancelled"
@@ -0,0 +1,83 @@
+import time
+import pytest
+from asas_mcp.utils.result_cache import ResultCache, CachePolicy
+
+POLICIES = {
+    "decode": CachePolicy(),
+    "short_lived": CachePolicy(ttl=0.05),
+    "ghidra": CachePolicy(file_args=("file_path",)),
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(cache_dir=str(tmp_path), memory_entries=2, policies=POLICIES)
+
+
+def test_hit_after_miss(cache):
+    calls = []
+    compute = lambda: calls.append(1) or "decoded"
+
+    assert cache.lookup_or_call("decode", {"content": "x"}, compute) == "decoded"
+    assert cache.lookup_or_call("decode", {"content": "x"}, compute) == "decoded"
+
+    assert len(calls) == 1
+    stats = cache.stats()["tools"]["decode"]
+    assert stats["misses"] == 1 and stats["memory_hits"] == 1
+
+
+def test_uncached_tool_always_runs(cache):
+    calls = []
+    for _ in range(2):
+        cache.lookup_or_call("kali_exec", {"cmd_str": "id"}, lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_errors_are_not_cached(cache):
+    calls = []
+    compute = lambda: calls.append(1) or {"error": "Ghidra produced no output"}
+    cache.lookup_or_call("decode", {"content": "x"}, compute)
+    cache.lookup_or_call("decode", {"content": "x"}, compute)
+    assert len(calls) == 2
+
+
+def test_ttl_expiry(cache):
+    calls = []
+    compute = lambda: calls.append(1) or "v"
+    cache.lookup_or_call("short_lived", {}, compute)
+    time.sleep(0.1)
+    cache.lookup_or_call("short_lived", {}, compute)
+    assert len(calls) == 2
+
+
+def test_file_args_keyed_by_content(cache, tmp_path):
+    binary = tmp_path / "bin"
+    binary.write_bytes(b"\x7fELF-v1")
+    calls = []
+    compute = lambda: calls.append(1) or {"functions": len(calls)}
+
+    cache.lookup_or_call("ghidra", {"file_path": str(binary)}, compute)
+    cache.lookup_or_call("ghidra", {"file_path": str(binary)}, compute)
+    assert len(calls) == 1
+
+    binary.write_bytes(b"\x7fELF-v2-changed")
+    cache.lookup_or_call("ghidra", {"file_path": str(binary)}, compute)
+    assert len(calls) == 2
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    first = ResultCache(cache_dir=str(tmp_path), policies=POLICIES)
+    first.lookup_or_call("decode", {"content": "x"}, lambda: "from-disk")
+
+    second = ResultCache(cache_dir=str(tmp_path), policies=POLICIES)
+    value = second.lookup_or_call("decode", {"content": "x"}, lambda: pytest.fail("recomputed"))
+
+    assert value == "from-disk"
+    assert second.stats()["totals"]["disk_hits"] == 1
+
+
+def test_disk_tier_is_size_bounded(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path), disk_max_bytes=600, policies=POLICIES)
+    for i in range(10):
+        cache.lookup_or_call("decode", {"content": str(i)}, lambda: "x" * 100)
+    assert cache.stats()["disk_bytes"] <= 600
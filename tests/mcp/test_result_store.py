@@ -0,0 +1,69 @@
+import pytest
+from asas_mcp.utils import result_store
+from asas_mcp.utils.result_store import ResultStore, summarize_result
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    s = ResultStore(root=str(tmp_path))
+    monkeypatch.setattr(result_store, "_store", s)
+    return s
+
+
+def test_small_results_pass_through(store):
+    assert summarize_result("kali_exec", "short output") == "short output"
+    assert summarize_result("reverse_ghidra_decompile", {"functions": []}) == {"functions": []}
+
+
+def test_large_text_becomes_handle_with_preview(store):
+    text = "\n".join(f"line {i}" for i in range(5000))
+    summary = summarize_result("kali_tshark", text, limit=1000)
+
+    assert "stored as res_" in summary
+    assert "line 0" in summary and "line 4999" in summary
+    assert len(summary) < len(text)
+
+
+def test_large_dict_keeps_scalars(store):
+    result = {"total_functions": 900, "functions": [{"code": "x" * 100}] * 200}
+    summary = summarize_result("reverse_ghidra_decompile", result, limit=1000)
+
+    assert summary["truncated"] is True
+    assert summary["total_functions"] == 900
+    assert "functions" not in summary
+
+
+def test_read_pages_through_full_output(store):
+    text = "".join(f"{i:04d}\n" for i in range(1000))
+    handle = store.put("kali_exec", text)["handle"]
+
+    chunks, offset = [], 0
+    while offset is not None:
+        page = store.read(handle, offset=offset, length=700)
+        chunks.append(page["content"])
+        offset = page["next_offset"]
+
+    assert "".join(chunks) == text
+
+
+def test_read_with_grep(store):
+    text = "noise\nflag{found_it}\nmore noise\nFLAG{upper}\n"
+    handle = store.put("kali_sqlmap", text)["handle"]
+
+    page = store.read(handle, grep=r"flag\{", ignore_case=True)
+    assert page["matches"] == 2
+    assert page["content"] == "2: flag{found_it}\n4: FLAG{upper}\n"
+
+
+def test_handle_readable_from_another_process_store(store, tmp_path):
+    handle = store.put("kali_exec", "shared output")["handle"]
+    other = ResultStore(root=str(tmp_path))
+    assert other.read(handle)["content"] == "shared output"
+    assert "error" in other.read("../../etc/passwd")
+
+
+def test_store_is_size_bounded(tmp_path):
+    s = ResultStore(root=str(tmp_path), max_bytes=250)
+    handles = [s.put("kali_exec", "x" * 100)["handle"] for _ in range(5)]
+    assert s.get(handles[0]) is None
+    assert s.read(handles[-1])["content"] == "x" * 100
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import time
+import pytest
+from mcp.server.fastmcp import FastMCP
+from asas_mcp.executors import tool_runner
+from asas_mcp.executors.tool_runner import ToolFamily, ToolRunner, ToolTimeout, offloaded, run_process
+
+
+@pytest.fixture(autouse=True)
+def runner(monkeypatch):
+    monkeypatch.setattr(tool_runner, "TOOL_FAMILIES", {
+        "slow": ToolFamily(max_concurrency=4, timeout=5),
+        "serial": ToolFamily(max_concurrency=1, timeout=5),
+        "short": ToolFamily(max_concurrency=2, timeout=0.3),
+        "default": ToolFamily(max_concurrency=4, timeout=5),
+    })
+    r = ToolRunner(max_workers=8)
+    monkeypatch.setattr(tool_runner, "_runner", r)
+    yield r
+    r.shutdown()
+
+
+@offloaded("slow")
+def blocking_sleep(delay: float) -> float:
+    time.sleep(delay)
+    return delay
+
+
+@offloaded("serial")
+def serial_sleep(delay: float) -> float:
+    time.sleep(delay)
+    return delay
+
+
+@pytest.mark.asyncio
+async def test_blocking_calls_overlap_and_loop_stays_responsive():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    tick_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(blocking_sleep(0.3) for _ in range(4)))
+    elapsed = time.perf_counter() - start
+    tick_task.cancel()
+
+    assert results == [0.3] * 4
+    assert elapsed < 0.6  # serial execution would take 1.2s
+    assert ticks > 10
+
+
+@pytest.mark.asyncio
+async def test_family_concurrency_limit():
+    start = time.perf_counter()
+    await asyncio.gather(*(serial_sleep(0.15) for _ in range(3)))
+    assert time.perf_counter() - start >= 0.45
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_child_process_tree(tmp_path):
+    pid_file = tmp_path / "pid"
+
+    @offloaded("short")
+    def hung_tool() -> str:
+        # The shell's child (sleep) must die too, not just the direct child
+        run_process(["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"])
+        return "finished"
+
+    start = time.perf_counter()
+    with pytest.raises(ToolTimeout):
+        await hung_tool()
+    assert time.perf_counter() - start < 3
+
+    pid = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("grandchild process survived the timeout")
+
+
+@pytest.mark.asyncio
+async def test_fastmcp_schema_and_concurrency_preserved():
+    server = FastMCP("test")
+
+    @server.tool()
+    @offloaded("slow")
+    def slow_tool(delay: float, label: str = "x") -> str:
+        """Sleep then echo."""
+        time.sleep(delay)
+        return label
+
+    tool = (await server.list_tools())[0]
+    assert set(tool.inputSchema["properties"]) == {"delay", "label"}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(server.call_tool("slow_tool", {"delay": 0.3}) for _ in range(3)))
+    assert time.perf_counter() - start < 0.6
+
+
+@pytest.mark.asyncio
+async def test_hung_vmrun_does_not_stall_the_loop(monkeypatch, tmp_path):
+    from asas_mcp.tools import vms_vnc
+    monkeypatch.setitem(tool_runner.TOOL_FAMILIES, "vnc", ToolFamily(max_concurrency=2, timeout=0.3))
+    vmrun = tmp_path / "vmrun"
+    vmrun.write_text("#!/bin/sh\nsleep 30\n")
+    vmrun.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    tick_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    result = await vms_vnc.get_vm_ip("kali")
+    tick_task.cancel()
+    assert result.startswith("Error") and "timed out" in result
+    assert time.perf_counter() - start < 3 and ticks > 10
@@ -4,3 +4,22 @@ from asas_mcp.server import create_app
 def test_server_creation():
     app = create_app()
     assert app is not None
+
+def test_server_import_defers_heavy_modules():
+    """Tool implementations and the memory stack load lazily, not at startup."""
+    import subprocess
+    import sys
+    code = (
+        "import sys, asas_mcp.server as s; "
+        "heavy = ['chromadb', 'requests', 'bs4', 'asas_mcp.tools.web', 'asas_mcp.memory.db']; "
+        "print(','.join(m for m in heavy if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+def test_lazy_tool_module_loads_on_first_call():
+    from asas_mcp.server import _LazyModule
+    misc = _LazyModule("tools.misc")
+    assert misc._module is None
+    assert misc.identify_file_type(b"%PDF-1.7")["type"] == "PDF"
+    assert misc._module is not None
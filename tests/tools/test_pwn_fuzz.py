@@ -1,6 +1,8 @@
+import os
+import shutil
 import pytest
 from unittest.mock import MagicMock, patch
-from asas_mcp.tools.pwn_fuzz import pwn_fuzz_start, pwn_fuzz_triage
+from asas_mcp.tools.pwn_fuzz import fuzz_job, pwn_fuzz_start, pwn_fuzz_triage
 
 @pytest.mark.asyncio
 async def test_pwn_fuzz_start():
@@ -34,3 +36,59 @@ async def test_pwn_fuzz_triage():
         
         assert "Stack Buffer Overflow" in result
         assert "Report" in result
+
+
+class FakeCtx:
+    """Job context on a fake clock; ``cancelled`` makes the first sleep report a cancel."""
+
+    def __init__(self, cancelled=False):
+        self.cancelled, self.now = cancelled, 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        return not self.cancelled
+
+    def event(self, kind, **data):
+        pass
+
+    def progress(self, **metrics):
+        pass
+
+
+def _fuzz_dm(tmp_path, dirs):
+    dm = MagicMock()
+    dm.start_fuzzer_container.side_effect = lambda path: dirs.append(os.path.dirname(path)) or MagicMock(id="cont_123")
+    dm.exec_command.return_value = "unique crashes 1"
+    dm.list_files.return_value = ["id:000,sig:11", "README.txt"]
+    dm.read_file.return_value = b"AAAA"
+    return dm
+
+
+def test_fuzz_job_hands_work_dir_to_the_kept_container(tmp_path):
+    binary, dirs = tmp_path / "chall", []
+    binary.write_bytes(b"\x7fELF")
+    dm = _fuzz_dm(tmp_path, dirs)
+    ctx = FakeCtx()
+    with patch("asas_mcp.tools.pwn_fuzz.get_docker_manager", return_value=dm), \
+            patch("asas_mcp.tools.pwn_fuzz.time.time", ctx.time):
+        result = fuzz_job(ctx, str(binary), duration_sec=30)
+    assert result["status"] == "finished" and result["crash_inputs"] == {"id:000,sig:11": "QUFBQQ=="}
+    dm.remove_with_container.assert_called_once_with("cont_123", dirs[0])
+    assert os.path.isdir(dirs[0]) and not dm.stop_container.called
+    shutil.rmtree(dirs[0])
+
+
+def test_fuzz_job_removes_work_dir_when_cancelled_or_failed(tmp_path):
+    binary, dirs = tmp_path / "chall", []
+    binary.write_bytes(b"\x7fELF")
+    dm = _fuzz_dm(tmp_path, dirs)
+    with patch("asas_mcp.tools.pwn_fuzz.get_docker_manager", return_value=dm):
+        assert fuzz_job(FakeCtx(cancelled=True), str(binary), duration_sec=60)["status"] == "cancelled"
+        dm.stop_container.assert_called_once_with("cont_123")
+        dm.start_fuzzer_container.side_effect = lambda path: dirs.append(os.path.dirname(path)) and None
+        with pytest.raises(RuntimeError):
+            fuzz_job(FakeCtx(), str(binary))
+    assert len(dirs) == 2 and not any(os.path.exists(d) for d in dirs)
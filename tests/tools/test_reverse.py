@@ -7,3 +7,61 @@ def test_extract_strings():
     assert "Hello" in result
     assert "World" in result
     assert "Test" in result
+
+
+def _blob():
+    return (b"\x7f\x01" + b"ascii_flag{plain}\x00" + b"\x00" * 2
+            + "wide_flag{le}".encode("utf-16le") + b"\x00\x00"
+            + "BE_text".encode("utf-16be") + b"\x00\x00\xff\xfe")
+
+
+def test_iter_strings_offsets_and_encodings():
+    data = _blob()
+    found = [(s["offset"], s["encoding"], s["string"]) for s in reverse.iter_strings(data)]
+    assert found == [
+        (2, "ascii", "ascii_flag{plain}"),
+        (22, "utf-16le", "wide_flag{le}"),
+        (50, "utf-16be", "BE_text"),
+    ]
+    only_be = reverse.iter_strings(data, encodings=("utf-16be",))
+    assert [s["string"] for s in only_be] == ["BE_text"]
+
+
+def test_chunked_scan_matches_single_pass(monkeypatch):
+    data = b"".join(bytes([i % 251]) * (i % 7) + _blob() for i in range(300))
+    single = list(reverse.iter_strings(data))
+    for size in (97, 256, 1000):
+        monkeypatch.setattr(reverse, "CHUNK_SIZE", size)
+        assert list(reverse.iter_strings(data)) == single
+
+
+def test_string_longer_than_a_chunk(monkeypatch):
+    import random
+    monkeypatch.setattr(reverse, "CHUNK_SIZE", 16)
+    assert [s["string"] for s in reverse.iter_strings(b"A" * 100)] == ["A" * 100]
+    wide = "L" * 60
+    assert [(s["offset"], s["string"]) for s in reverse.iter_strings(b"\0\0" + wide.encode("utf-16le"), encodings=("utf-16le",))] \
+        == [(2, wide)]
+
+    rng = random.Random(7)
+    for _ in range(200):  # runs of every length around the chunk size, at every alignment
+        data = bytes(rng.choice(b"AAAA\0\x01b") for _ in range(rng.randrange(1, 200)))
+        monkeypatch.setattr(reverse, "CHUNK_SIZE", 1 << 30)
+        single = list(reverse.iter_strings(data, min_length=2))
+        monkeypatch.setattr(reverse, "CHUNK_SIZE", rng.randrange(1, 40))
+        assert list(reverse.iter_strings(data, min_length=2)) == single
+
+
+def test_scan_file_strings_filters_limit_and_sections(tmp_path):
+    import os
+    fixture = os.path.join(os.path.dirname(__file__), "..", "fixtures", "simple_reverse")
+    result = reverse.scan_file_strings(fixture, pattern="GLIBC", limit=3)
+    assert result["count"] == 3 and result["truncated"]
+    rodata = reverse.scan_file_strings(fixture, section=".rodata", limit=5)["strings"]
+    assert rodata and all(s["section"] == ".rodata" for s in rodata)
+
+    raw = tmp_path / "dump.bin"
+    raw.write_bytes(_blob())
+    strings = reverse.scan_file_strings(str(raw), encodings=("utf-16le",), pattern="flag")["strings"]
+    assert strings == [{"offset": 22, "encoding": "utf-16le", "string": "wide_flag{le}"}]  # no sections
+    assert "error" in reverse.scan_file_strings(str(raw), encodings=("utf-32",))